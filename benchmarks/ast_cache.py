@@ -0,0 +1,96 @@
+"""
+Cold and warm cost of the on-disk AST cache.
+
+The corpus consists of the parsable examples and synthetic programs of
+increasing size. For every file, compares parsing (with the parser tables
+already loaded) to loading the AST from the cache, and the size of a cache
+entry to the source and to a pickle of the AST.
+
+Then runs ``python -m pycoolc --cache -j 1`` over the whole corpus in a fresh
+process, once with an empty cache (cold) and once with all entries present
+(warm). The warm run never builds the lexer or parser.
+
+Usage::
+
+    python3 benchmarks/ast_cache.py
+
+"""
+import os
+import pickle
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from pycoolc.cache import ASTCache
+from pycoolc.parser import parse
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CLASS = '''class C{0} inherits IO {{
+  count : Int <- {0};
+  step(n : Int, by : Int) : Int {{ {{
+    if n < count then count <- count + by * 2 else count <- ~n fi;
+    let i : Int <- 0 in while i < n loop i <- i + 1 pool;
+    case self of x : C{0} => x.step(n - 1, by); o : Object => 0; esac;
+    out_string("count").out_int(count);
+  }} }};
+}};
+'''
+
+
+def write_corpus(directory):
+    for name in ['factorial.cl', 'simple.cl']:
+        shutil.copy(os.path.join(ROOT, 'examples', name), directory)
+    for n in [10, 100, 1000]:
+        with open(os.path.join(directory, 'synthetic{}.cl'.format(n)), 'w') as target:
+            target.write(''.join(CLASS.format(i) for i in range(n)))
+
+
+def best(function, repeat=3):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def run_cli(corpus, cache_dir):
+    env = dict(os.environ, PYCOOLC_CACHE_DIR=cache_dir, PYTHONPATH=ROOT)
+    start = time.perf_counter()
+    subprocess.run([sys.executable, '-m', 'pycoolc', '--cache', '-j', '1', corpus],
+                   env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+    return time.perf_counter() - start
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        corpus = os.path.join(tmp, 'corpus')
+        os.mkdir(corpus)
+        write_corpus(corpus)
+        cache = ASTCache(os.path.join(tmp, 'cache'))
+
+        print('{:<18} {:>9} {:>9} {:>9} {:>10} {:>10}'.format(
+            'file', 'source', 'entry', 'pickle', 'parse [ms]', 'load [ms]'))
+        for name in sorted(os.listdir(corpus)):
+            with open(os.path.join(corpus, name)) as source:
+                data = source.read()
+            tree = parse(data)
+            cache.put(data, tree)
+            with open(cache.path(cache.key(data)), 'rb') as entry:
+                size = len(entry.read())
+            print('{:<18} {:>9,} {:>9,} {:>9,} {:>10.2f} {:>10.2f}'.format(
+                name, len(data), size, len(pickle.dumps(tree, pickle.HIGHEST_PROTOCOL)),
+                best(lambda: parse(data)) * 1e3, best(lambda: cache.get(data)) * 1e3))
+
+        cli_cache = os.path.join(tmp, 'cli-cache')
+        cold = run_cli(corpus, cli_cache)
+        warm = run_cli(corpus, cli_cache)
+        print('python -m pycoolc --cache, whole corpus: cold {:.2f}s, warm {:.2f}s'.format(cold, warm))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+"""
+Memory per AST node of the slotted node classes compared to namedtuples.
+
+Parses a large synthetic program, then rebuilds its tree while tracing
+allocations: once with the node classes of :mod:`pycoolc.ast`, and once
+with namedtuples of the same fields, as the AST was stored before. Leaves
+(names, literals) are shared with the parsed tree, so only nodes and the
+tuples of child lists are counted.
+
+The span offsets share int objects with the tokens, which a rebuilt tree
+wouldn't, so their cost is measured on a freshly parsed tree instead: the
+memory it keeps alive, less the memory left after clearing its spans.
+
+Usage::
+
+    python3 benchmarks/ast_memory.py [number of classes]
+
+"""
+import sys
+import tracemalloc
+from collections import namedtuple
+
+from pycoolc import ast
+from pycoolc.parser import Parser
+from pycoolc.scanner import TokenBuffer
+
+
+CLASS = '''class C{0} inherits IO {{
+  count : Int <- {0};
+  name : String <- "class {0}";
+  step(n : Int, by : Int) : Int {{ {{
+    if n < count then count <- count + by * 2 else count <- ~n fi;
+    let i : Int <- 0, j : Int in while i < n loop i <- i + 1 pool;
+    case self of x : C{0} => x.step(n - 1, by); o : Object => 0; esac;
+    out_string(name).out_int(count);
+    isvoid new C{0};
+  }} }};
+}};
+'''
+
+NAMEDTUPLES = dict((name, namedtuple(name, cls._fields)) for name, cls in vars(ast).items()
+                   if isinstance(cls, type) and issubclass(cls, ast.Node) and cls is not ast.Node)
+
+
+def rebuild(tree, make):
+    """Copy the nodes and tuples of ``tree``, creating nodes with ``make``."""
+    if isinstance(tree, ast.Node):
+        return make(tree, [rebuild(value, make) for value in tree])
+    if isinstance(tree, tuple):
+        return tuple(rebuild(value, make) for value in tree)
+    return tree
+
+
+def slotted(node, values):
+    return node.__class__(*values)
+
+
+def namedtuples(node, values):
+    return NAMEDTUPLES[node.__class__.__name__](*values)
+
+
+def count(tree):
+    if isinstance(tree, ast.Node):
+        return 1 + sum(count(value) for value in tree)
+    if isinstance(tree, tuple):
+        return sum(count(value) for value in tree)
+    return 0
+
+
+def clear_spans(tree):
+    if isinstance(tree, ast.Node):
+        tree.span = None
+    if isinstance(tree, (ast.Node, tuple)):
+        for value in tree:
+            clear_spans(value)
+
+
+def measure_spans(source):
+    tracemalloc.start()
+    tree = Parser(lexer=TokenBuffer()).parse(source)
+    size = tracemalloc.get_traced_memory()[0]
+    clear_spans(tree)
+    size -= tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return size
+
+
+def measure(tree, make):
+    tracemalloc.start()
+    copy = rebuild(tree, make)
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del copy
+    return size
+
+
+def main(n):
+    source = ''.join(CLASS.format(i) for i in range(n))
+    tree = Parser(lexer=TokenBuffer()).parse(source)
+    nodes = count(tree)
+    print('{} classes, {:,} characters, {:,} nodes'.format(n, len(source), nodes))
+    print('{:<22} {:>12} {:>12}'.format('layout', 'size [KiB]', 'bytes/node'))
+    namedtuple_size = measure(tree, namedtuples)
+    slotted_size = measure(tree, slotted)
+    layouts = [
+        ('namedtuple, no span', namedtuple_size),
+        ('__slots__, no span', slotted_size),
+        ('__slots__ + span', slotted_size + measure_spans(source)),
+    ]
+    for name, size in layouts:
+        print('{:<22} {:>12,.0f} {:>12.1f}'.format(name, size / 1024, size / nodes))
+
+
+if __name__ == '__main__':
+    sys.setrecursionlimit(10000)
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
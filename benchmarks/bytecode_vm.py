@@ -0,0 +1,86 @@
+"""
+Speed and size of the bytecode VM compared to the AST engines on the
+programs in ``examples/``.
+
+Every example which parses and type checks is run repeatedly with the
+tree-walking evaluator, the closure compiling interpreter and the bytecode
+VM, all reading the same input. The time per run is the best of three
+batches and includes creating the engine, but not compiling the bytecode.
+The size columns are the memory allocated when loading the program from
+its serialized form: the AST (:mod:`pycoolc.serialize`) and the bytecode
+(:meth:`pycoolc.bytecode.Program.dumps`).
+
+Usage::
+
+    python3 benchmarks/bytecode_vm.py [runs per batch]
+
+"""
+import glob
+import io
+import os
+import sys
+import time
+import tracemalloc
+
+from pycoolc import serialize
+from pycoolc.bytecode import Program, compile_program
+from pycoolc.evaluator import Evaluator
+from pycoolc.interpreter import Interpreter
+from pycoolc.parser import parse
+from pycoolc.semant import ClassTable
+from pycoolc.typecheck import check
+from pycoolc.vm import VM
+
+
+EXAMPLES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'examples')
+STDIN = '12\n'
+
+
+def measure(create, runs):
+    best = None
+    for _ in range(3):
+        start = time.perf_counter()
+        for _ in range(runs):
+            stdout = io.StringIO()
+            create(io.StringIO(STDIN), stdout).run()
+        elapsed = (time.perf_counter() - start) / runs
+        best = elapsed if best is None else min(best, elapsed)
+    return best, stdout.getvalue()
+
+
+def allocated(load):
+    tracemalloc.start()
+    value = load()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del value
+    return size
+
+
+def main(runs):
+    print('{:<14} {:>10} {:>10} {:>10} {:>8} {:>10} {:>14}'.format(
+        'example', 'eval [us]', 'interp [us]', 'vm [us]', 'vm/eval', 'AST [B]', 'bytecode [B]'))
+    for path in sorted(glob.glob(os.path.join(EXAMPLES, '*.cl'))):
+        with open(path) as source:
+            tree = parse(source.read())
+        if tree is None or check(tree):
+            continue
+        table = ClassTable(tree)
+        program = compile_program(tree, table)
+        evaluator, expected = measure(
+            lambda stdin, stdout: Evaluator(tree, table, stdin, stdout), runs)
+        interpreter, output = measure(
+            lambda stdin, stdout: Interpreter(tree, table, stdin, stdout), runs)
+        assert output == expected, (output, expected)
+        vm, output = measure(lambda stdin, stdout: VM(program, stdin, stdout), runs)
+        assert output == expected, (output, expected)
+        tree_data = serialize.dumps(tree)
+        program_data = program.dumps()
+        print('{:<14} {:>10.1f} {:>10.1f} {:>10.1f} {:>7.1f}x {:>10} {:>14}'.format(
+            os.path.basename(path), evaluator * 1e6, interpreter * 1e6, vm * 1e6,
+            evaluator / vm, allocated(lambda: serialize.loads(tree_data)),
+            allocated(lambda: Program.loads(program_data))))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
@@ -0,0 +1,74 @@
+"""
+Cost of a method call and the maximum depth of recursion in the execution
+engines.
+
+A method recursing ``n`` times is run with every engine, once adding to the
+result of the recursive call (``sum``) and once with the call in tail
+position (``count``). The table shows the time per call, the best of three
+runs, or ``overflow`` if the engine ran out of stack. The bytecode VM keeps
+its frames in the heap and reuses the frame of the caller for tail calls,
+so it is the only engine running the deep recursions.
+
+Usage::
+
+    python3 benchmarks/call_overhead.py [depth ...]
+
+"""
+import io
+import sys
+import time
+
+from pycoolc.codegen import PythonProgram
+from pycoolc.evaluator import Evaluator
+from pycoolc.interpreter import Interpreter
+from pycoolc.parser import parse
+from pycoolc.runtime import ExecutionError
+from pycoolc.semant import ClassTable
+from pycoolc.vm import VM
+
+
+SOURCE = '''
+class Main {
+  sum(n : Int) : Int { if n = 0 then 0 else n + sum(n - 1) fi };
+  count(n : Int, acc : Int) : Int { if n = 0 then acc else count(n - 1, acc + 1) fi };
+  main() : Int { %s };
+};
+'''
+
+CALLS = [('sum', 'sum({})'), ('count', 'count({}, 0)')]
+
+ENGINES = [
+    ('evaluator', lambda tree, table: Evaluator(tree, table, stdout=io.StringIO())),
+    ('interpreter', lambda tree, table: Interpreter(tree, table, stdout=io.StringIO())),
+    ('codegen', lambda tree, table: PythonProgram.compile(tree, table, stdout=io.StringIO())),
+    ('vm', lambda tree, table: VM.compile(tree, table, stdout=io.StringIO())),
+]
+
+
+def measure(create, tree, table, depth):
+    best = None
+    for _ in range(3):
+        engine = create(tree, table)
+        start = time.perf_counter()
+        try:
+            engine.run()
+        except ExecutionError as e:
+            return e.message.lower()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return '{:.0f}'.format(best / depth * 1e9)
+
+
+def main(depths):
+    print('{:<8} {:>7} '.format('method', 'depth') +
+          ' '.join('{:>16}'.format(name + ' [ns]') for name, create in ENGINES))
+    for method, call in CALLS:
+        for depth in depths:
+            tree = parse(SOURCE % call.format(depth))
+            table = ClassTable(tree)
+            print('{:<8} {:>7} '.format(method, depth) + ' '.join(
+                '{:>16}'.format(measure(create, tree, table, depth)) for name, create in ENGINES))
+
+
+if __name__ == '__main__':
+    main([int(arg) for arg in sys.argv[1:]] or [100, 1000, 10000, 100000])
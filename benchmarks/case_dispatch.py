@@ -0,0 +1,100 @@
+"""
+Speed of ``case`` expressions on deep class hierarchies with many branches.
+
+The program defines a chain of classes ``C0`` to ``C<depth - 1>``, each
+inheriting from the previous one, and a ``case`` with a branch for every
+``step``-th class of the chain. A loop runs the ``case`` on objects of
+every class of the chain in turn. The table shows the time per ``case`` for
+every execution engine, the best of three runs.
+
+Usage::
+
+    python3 benchmarks/case_dispatch.py [iterations]
+
+"""
+import io
+import sys
+import time
+
+from pycoolc.codegen import PythonProgram
+from pycoolc.evaluator import Evaluator
+from pycoolc.interpreter import Interpreter
+from pycoolc.parser import parse
+from pycoolc.semant import ClassTable
+from pycoolc.vm import VM
+
+
+# Depths of the hierarchy and numbers of branches
+SHAPES = [(8, 2), (32, 4), (32, 16), (128, 8), (128, 64)]
+
+TEMPLATE = '''
+{classes}
+class Main {{
+  objects : Cell;
+  select(o : Object) : Int {{ case o of {branches} o : Object => 0; esac }};
+  main() : Int {{
+    let i : Int <- 0, sum : Int <- 0, cell : Cell in {{
+      {cells}
+      cell <- objects;
+      while i < {iterations} loop {{
+        sum <- sum + select(cell.get());
+        cell <- (cell.get_next());
+        if isvoid cell then cell <- objects else 0 fi;
+        i <- i + 1;
+      }} pool;
+      sum;
+    }}
+  }};
+}};
+class Cell {{
+  value : Object;
+  next : Cell;
+  init(v : Object, n : Cell) : Cell {{ {{ value <- v; next <- n; self; }} }};
+  get() : Object {{ value }};
+  get_next() : Cell {{ next }};
+}};
+'''
+
+ENGINES = [
+    ('evaluator', lambda tree, table: Evaluator(tree, table, stdout=io.StringIO())),
+    ('interpreter', lambda tree, table: Interpreter(tree, table, stdout=io.StringIO())),
+    ('codegen', lambda tree, table: PythonProgram.compile(tree, table, stdout=io.StringIO())),
+    ('vm', lambda tree, table: VM.compile(tree, table, stdout=io.StringIO())),
+]
+
+
+def source(depth, branches, iterations):
+    classes = ['class C0 {};'] + ['class C{} inherits C{} {{}};'.format(i, i - 1)
+                                  for i in range(1, depth)]
+    step = depth // branches
+    cases = ' '.join('c{0} : C{0} => {0};'.format(i) for i in range(0, depth, step))
+    cells = ' '.join('objects <- ((new Cell).init(new C{}, objects));'.format(i)
+                     for i in range(depth))
+    return TEMPLATE.format(classes='\n'.join(classes), branches=cases, cells=cells,
+                           iterations=iterations)
+
+
+def main(iterations):
+    print('{:>6} {:>9} '.format('depth', 'branches') +
+          ' '.join('{:>16}'.format(name + ' [ns]') for name, create in ENGINES))
+    for depth, branches in SHAPES:
+        tree = parse(source(depth, branches, iterations))
+        table = ClassTable(tree)
+        times = []
+        results = set()
+        for name, create in ENGINES:
+            best = None
+            for _ in range(3):
+                engine = create(tree, table)
+                start = time.perf_counter()
+                results.add(engine.run())
+                elapsed = time.perf_counter() - start
+                best = elapsed if best is None else min(best, elapsed)
+            times.append(best)
+        assert len(results) == 1, results
+        print('{:>6} {:>9} '.format(depth, branches) +
+              ' '.join('{:>16.0f}'.format(time / iterations * 1e9) for time in times))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
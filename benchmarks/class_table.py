@@ -0,0 +1,78 @@
+"""
+Method lookups and joins with the class table compared to walking the chain.
+
+Builds a chain of ``depth`` classes with a method in every class, then looks
+up the methods of the root class from the deepest class and joins pairs of
+classes from two branches, once with the flattened tables of
+:class:`pycoolc.semant.ClassTable` and once by walking the parents.
+
+Usage::
+
+    python3 benchmarks/class_table.py [depths...]
+
+"""
+import sys
+import time
+
+from pycoolc.parser import parse
+from pycoolc.semant import ClassTable
+
+
+def program(depth):
+    classes = ['class C0 { m0() : Int { 0 }; };']
+    for i in range(1, depth):
+        classes.append('class C{0} inherits C{1} {{ m{0}() : Int {{ {0} }}; }};'.format(i, i - 1))
+    # A second branch starting in the middle of the chain
+    classes.append('class D{0} inherits C{0} {{}};'.format(depth // 2))
+    return ''.join(classes)
+
+
+def walk_method(table, cls, name):
+    while cls is not None:
+        for feature in table[cls].node.features:
+            if feature.ident.name == name:
+                return feature
+        cls = table[cls].parent
+    return None
+
+
+def walk_join(table, a, b):
+    ancestors = set()
+    while a is not None:
+        ancestors.add(a)
+        a = table[a].parent
+    while b not in ancestors:
+        b = table[b].parent
+    return b
+
+
+def timed(function, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - start) / repeat
+
+
+def main(depths):
+    print('{:>6} {:>10} {:>12} {:>12} {:>12} {:>12}'.format(
+        'depth', 'build [ms]', 'lookup [us]', 'walk [us]', 'join [us]', 'walk [us]'))
+    for depth in depths:
+        tree = parse(program(depth))
+        start = time.perf_counter()
+        table = ClassTable(tree)
+        build = time.perf_counter() - start
+        deepest = 'C{}'.format(depth - 1)
+        branch = 'D{}'.format(depth // 2)
+        assert table.method(deepest, 'm0').node is walk_method(table, deepest, 'm0')
+        assert table.join(deepest, branch) == walk_join(table, deepest, branch)
+        repeat = 1000
+        print('{:>6} {:>10.1f} {:>12.3f} {:>12.3f} {:>12.3f} {:>12.3f}'.format(
+            depth, build * 1e3,
+            timed(lambda: table.method(deepest, 'm0'), repeat) * 1e6,
+            timed(lambda: walk_method(table, deepest, 'm0'), repeat // 10) * 1e6,
+            timed(lambda: table.join(deepest, branch), repeat) * 1e6,
+            timed(lambda: walk_join(table, deepest, branch), repeat // 10) * 1e6))
+
+
+if __name__ == '__main__':
+    main([int(arg) for arg in sys.argv[1:]] or [10, 100, 1000])
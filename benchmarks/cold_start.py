@@ -0,0 +1,66 @@
+"""
+Cold start cost of the lexer and parser.
+
+Every measurement runs in a fresh interpreter process, which is what
+short-lived compile workers see. Reported are the median wall times of
+several runs minus the bare interpreter startup.
+
+Usage::
+
+    python3 benchmarks/cold_start.py [runs]
+
+"""
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROGRAM = 'class Main inherits IO { main() : Object { out_string("hi") }; };'
+
+CASES = [
+    ('import pycoolc.parser',
+     'import pycoolc.parser'),
+    ('first parse, pregenerated tables',
+     'from pycoolc.parser import parse; parse({!r})'.format(PROGRAM)),
+    ('first parse, full table build',
+     'import ply.lex as lex, ply.yacc as yacc\n'
+     'from pycoolc import lexer, parser\n'
+     'lex.lex(module=lexer)\n'
+     'yacc.yacc(module=parser, debug=False, write_tables=False,'
+     ' errorlog=yacc.NullLogger()).parse({!r})'.format(PROGRAM)),
+]
+
+
+def run(code, path):
+    env = dict(os.environ, PYTHONPATH=path)
+    start = time.perf_counter()
+    subprocess.check_call([sys.executable, '-c', code], env=env, cwd=path)
+    return time.perf_counter() - start
+
+
+def median(code, path, runs):
+    return statistics.median(run(code, path) for _ in range(runs))
+
+
+def main(runs):
+    # Work on a copy of the package, so the benchmark never writes into the tree
+    workdir = tempfile.mkdtemp()
+    try:
+        shutil.copytree(os.path.join(ROOT, 'pycoolc'), os.path.join(workdir, 'pycoolc'),
+                        ignore=shutil.ignore_patterns('__pycache__'))
+        baseline = median('pass', workdir, runs)
+        print('interpreter startup: {:.1f} ms'.format(baseline * 1e3))
+        for name, code in CASES:
+            elapsed = median(code, workdir, runs) - baseline
+            print('{:<34} {:>8.1f} ms'.format(name, elapsed * 1e3))
+    finally:
+        shutil.rmtree(workdir)
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10)
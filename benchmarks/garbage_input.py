@@ -0,0 +1,54 @@
+"""
+Time and output of compiling garbage input.
+
+Compiles a file of random bytes (decoded as Latin-1) with both lexers and
+reports the time, the number of error messages and their total size. Before
+the errors were collected, every illegal character and every syntax error
+was printed on its own.
+
+Usage::
+
+    python3 benchmarks/garbage_input.py [size in KiB]
+
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+from pycoolc import cli
+
+
+def garbage(size, seed=0):
+    rng = random.Random(seed)
+    return bytes(rng.randrange(256) for _ in range(size)).decode('latin-1')
+
+
+def timed(function, *args, repeat=3, **kwargs):
+    """Return the result and the best time of several runs."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function(*args, **kwargs)
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def main(size):
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'garbage.cl')
+        with open(path, 'w') as source:
+            source.write(garbage(size))
+        print('input: {:.0f} KiB of random bytes'.format(size / 1024))
+        print('{:<12} {:>10} {:>10} {:>14}'.format('lexer', 'time [s]', 'messages',
+                                                   'output [KiB]'))
+        for name, scanner in [('PLY lexer', False), ('Scanner', True)]:
+            result, elapsed = timed(cli.compile_file, path, scanner=scanner)
+            output = sum(len(message) + 1 for message in result.diagnostics)
+            print('{:<12} {:>10.3f} {:>10,} {:>14,.1f}'.format(
+                name, elapsed, len(result.diagnostics), output / 1024))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) * 1024 if len(sys.argv) > 1 else 1024 * 1024)
@@ -0,0 +1,53 @@
+"""
+Incremental reparsing compared to a full parse after a small edit.
+
+Generates programs with ``n`` classes and changes an expression in a method
+of the middle class, once keeping the length of the source (no spans to
+shift) and once making it longer (the spans of all following classes are
+shifted). Every result is checked against a full parse.
+
+Usage::
+
+    python3 benchmarks/incremental_reparse.py [numbers of classes...]
+
+"""
+import sys
+import time
+
+from pycoolc.incremental import Edit, reparse
+from pycoolc.parser import parse
+
+
+CLASS = '''class C{0} inherits IO {{
+  count : Int <- {0};
+  step(n : Int) : Int {{ {{
+    if n < count then count <- count + 1 else count <- ~n fi;
+    let i : Int <- 0 in while i < n loop i <- i + 1 pool;
+    out_string("count").out_int(count);
+  }} }};
+}};
+'''
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def main(sizes):
+    print('{:>8} {:<12} {:>10} {:>12}'.format('classes', 'edit', 'full [ms]', 'reparse [ms]'))
+    for n in sizes:
+        source = ''.join(CLASS.format(i) for i in range(n))
+        pos = source.index('count + 1', source.index('class C{} '.format(n // 2)))
+        for label, edit in [('same length', Edit(pos + 8, pos + 9, '2')),
+                            ('longer', Edit(pos + 8, pos + 9, '2 * n'))]:
+            tree = parse(source)
+            (new_source, new_tree), incremental = timed(reparse, source, tree, edit)
+            expected, full = timed(parse, new_source)
+            assert new_tree == expected
+            print('{:>8} {:<12} {:>10.1f} {:>12.1f}'.format(n, label, full * 1e3, incremental * 1e3))
+
+
+if __name__ == '__main__':
+    main([int(arg) for arg in sys.argv[1:]] or [100, 1000, 5000])
@@ -0,0 +1,102 @@
+"""
+Cost of dynamic dispatch with and without inline caches.
+
+A loop walks a circular list of receivers of 1 to 8 subclasses of ``Shape``
+and calls ``area()`` on each, so that call site is monomorphic, polymorphic
+or megamorphic; the two calls walking the list are monomorphic. The loop is
+run by the closure compiling interpreter without inline caches, with inline
+caches and with inline caches counting their hits.
+The time per iteration is the best of five alternating runs, the speedup
+compares the caches without counting to no caches.
+
+Usage::
+
+    python3 benchmarks/inline_caches.py [iterations]
+
+"""
+import io
+import sys
+import time
+
+from pycoolc.interpreter import Interpreter
+from pycoolc.parser import parse
+from pycoolc.semant import ClassTable
+
+
+DEGREES = (1, 2, 4, 8)
+
+TEMPLATE = '''
+class Shape {{ area() : Int {{ 0 }}; }};
+{shapes}
+class Cell {{
+  shape : Shape;
+  next : Cell;
+  init(s : Shape) : Cell {{ {{ shape <- s; self; }} }};
+  get_shape() : Shape {{ shape }};
+  get_next() : Cell {{ next }};
+  set_next(n : Cell) : Cell {{ next <- n }};
+}};
+class Main {{
+  main() : Int {{
+    let first : Cell <- ((new Cell).init(new S0)), cell : Cell <- first,
+        i : Int <- 0, sum : Int <- 0 in {{
+      {cells}
+      cell.set_next(first);
+      cell <- first;
+      while i < {iterations} loop {{
+        sum <- sum + (cell.get_shape().area());
+        cell <- (cell.get_next());
+        i <- i + 1;
+      }} pool;
+      sum;
+    }}
+  }};
+}};
+'''
+
+
+def source(degree, iterations):
+    shapes = '\n'.join('class S{0} inherits Shape {{ area() : Int {{ {0} }}; }};'.format(i)
+                       for i in range(max(DEGREES)))
+    cells = '\n'.join('cell <- (cell.set_next((new Cell).init(new S{})));'.format(i)
+                      for i in range(1, degree))
+    return TEMPLATE.format(shapes=shapes, cells=cells, iterations=iterations)
+
+
+MODES = [{'inline_caches': False}, {}, {'count_hits': True}]
+
+
+def run(program, table, options):
+    interpreter = Interpreter(program, table, stdout=io.StringIO(), **options)
+    start = time.perf_counter()
+    result = interpreter.run()
+    return time.perf_counter() - start, result, interpreter.runtime.cache_statistics()
+
+
+def main(iterations):
+    print('{:<8} {:>11} {:>11} {:>12} {:>8} {:>10} {:>8}  {}'.format(
+        'classes', 'plain [ns]', 'cached [ns]', 'counted [ns]', 'speedup', 'hits', 'misses',
+        'call sites'))
+    for degree in DEGREES:
+        program = parse(source(degree, iterations))
+        table = ClassTable(program)
+        times = [None] * len(MODES)
+        results = set()
+        # Alternate the runs, so that all modes see the same load of the machine
+        for _ in range(5):
+            for i, options in enumerate(MODES):
+                elapsed, result, statistics = run(program, table, options)
+                times[i] = elapsed if times[i] is None else min(times[i], elapsed)
+                results.add(result)
+        assert len(results) == 1, results
+        plain, cached, counted = times
+        states = ', '.join('{} {}'.format(statistics[state], state) for state in
+                           ('monomorphic', 'polymorphic', 'megamorphic') if statistics[state])
+        print('{:<8} {:>11.0f} {:>11.0f} {:>12.0f} {:>7.2f}x {:>10} {:>8}  {}'.format(
+            degree, plain / iterations * 1e9, cached / iterations * 1e9,
+            counted / iterations * 1e9, plain / cached, statistics['hits'],
+            statistics['misses'], states))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,111 @@
+"""
+Speed of the closure compiling interpreter, the Python code generator and
+the bytecode VM compared to the tree-walking evaluator.
+
+Runs recursive, loop-heavy and string-building programs with all engines,
+checks that they produce the same output and reports the best of three runs.
+The times of the code generator and the VM do not include translating and
+compiling the program, which is done once.
+
+Usage::
+
+    python3 benchmarks/interpreter_speed.py [scale]
+
+"""
+import io
+import sys
+import time
+
+from pycoolc.bytecode import compile_program
+from pycoolc.codegen import PythonProgram
+from pycoolc.evaluator import Evaluator
+from pycoolc.interpreter import Interpreter
+from pycoolc.parser import parse
+from pycoolc.semant import ClassTable
+from pycoolc.typecheck import check
+from pycoolc.vm import VM
+
+
+PROGRAMS = {
+    # Recursion, repeated, as the depth is limited by the Python stack
+    'factorial': '''class Main inherits IO {
+      factorial(n : Int) : Int { if n = 0 then 1 else n * factorial(n - 1) fi };
+      main() : Object { let i : Int <- 0, sum : Int <- 0 in {
+        while i < {n} loop { sum <- sum + factorial(12); i <- i + 1; } pool;
+        out_int(sum);
+      } };
+    };''',
+    'fibonacci': '''class Main inherits IO {
+      fib(n : Int) : Int { if n < 2 then n else fib(n - 1) + fib(n - 2) fi };
+      main() : Object { out_int(fib({depth})) };
+    };''',
+    'while': '''class Main inherits IO {
+      main() : Object { let i : Int <- 0, sum : Int <- 0 in {
+        while i < {n} * 10 loop {
+          if i - i / 3 * 3 = 0 then sum <- sum + i else sum <- sum - 1 fi;
+          i <- i + 1;
+        } pool;
+        out_int(sum);
+      } };
+    };''',
+    'strings': '''class Main inherits IO {
+      main() : Object { let i : Int <- 0, s : String <- "" in {
+        while i < {n} loop {
+          s <- (s.concat(i.type_name().substr(0, 1)));
+          if 100 < (s.length()) then s <- "" else 0 fi;
+          i <- i + 1;
+        } pool;
+        out_string(s);
+      } };
+    };''',
+    'objects': '''class Counter {
+      n : Int;
+      inc(by : Int) : SELF_TYPE { { n <- n + by; self; } };
+      get() : Int { n };
+    };
+    class Main inherits IO {
+      main() : Object { let i : Int <- 0, c : Counter <- new Counter in {
+        while i < {n} loop { c <- (new Counter).inc(c.get()).inc(1); i <- i + 1; } pool;
+        out_int(c.get());
+      } };
+    };''',
+}
+
+
+def measure(engine, program, table):
+    times = []
+    for _ in range(3):
+        stdout = io.StringIO()
+        start = time.perf_counter()
+        engine(program, table, stdout=stdout).run()
+        times.append(time.perf_counter() - start)
+    return min(times), stdout.getvalue()
+
+
+def main(scale):
+    print('{:<10} {:>14} {:>16} {:>8} {:>14} {:>8} {:>8} {:>8}'.format(
+        'program', 'evaluator [ms]', 'interpreter [ms]', 'speedup', 'codegen [ms]', 'speedup',
+        'vm [ms]', 'speedup'))
+    for name, source in PROGRAMS.items():
+        source = source.replace('{n}', str(2000 * scale)).replace('{depth}', str(15 + scale))
+        program = parse(source)
+        assert check(program) == [], name
+        table = ClassTable(program)
+        evaluator, expected = measure(Evaluator, program, table)
+        interpreter, output = measure(Interpreter, program, table)
+        assert output == expected, (output, expected)
+        code = PythonProgram.compile(program, table).code
+        codegen, output = measure(lambda program, table, stdout: PythonProgram(code, stdout=stdout),
+                                  program, table)
+        assert output == expected, (output, expected)
+        compiled = compile_program(program, table)
+        vm, output = measure(lambda program, table, stdout: VM(compiled, stdout=stdout),
+                             program, table)
+        assert output == expected, (output, expected)
+        print('{:<10} {:>14.1f} {:>16.1f} {:>7.1f}x {:>14.1f} {:>7.1f}x {:>8.1f} {:>7.1f}x'.format(
+            name, evaluator * 1e3, interpreter * 1e3, evaluator / interpreter, codegen * 1e3,
+            evaluator / codegen, vm * 1e3, evaluator / vm))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1)
@@ -0,0 +1,87 @@
+"""
+Memory and time of allocation-heavy programs in the execution engines.
+
+The program builds a linked list of objects with an ``Int``, a ``String``,
+a ``Bool`` and an object attribute, and then walks it reading and writing
+the attributes. The table shows the peak memory traced by ``tracemalloc``
+per object while the program runs and the best time of three runs (without
+``tracemalloc``) per object, for every engine.
+
+Usage::
+
+    python3 benchmarks/object_model.py [objects]
+
+"""
+import io
+import sys
+import time
+import tracemalloc
+
+from pycoolc.codegen import PythonProgram
+from pycoolc.evaluator import Evaluator
+from pycoolc.interpreter import Interpreter
+from pycoolc.parser import parse
+from pycoolc.semant import ClassTable
+from pycoolc.vm import VM
+
+
+SOURCE = '''
+class Item {
+  value : Int;
+  label : String <- "item";
+  marked : Bool;
+  next : Item;
+  init(v : Int, n : Item) : Item { { value <- v; next <- n; self; } };
+  get_value() : Int { value };
+  get_next() : Item { next };
+  mark() : Bool { marked <- not marked };
+};
+class Main {
+  main() : Int {
+    let list : Item, i : Int <- 0, sum : Int <- 0 in {
+      while i < %d loop {
+        list <- ((new Item).init(i, list));
+        i <- i + 1;
+      } pool;
+      while not isvoid list loop {
+        list.mark();
+        sum <- sum + (list.get_value());
+        list <- (list.get_next());
+      } pool;
+      sum;
+    }
+  };
+};
+'''
+
+ENGINES = [
+    ('evaluator', lambda tree, table: Evaluator(tree, table, stdout=io.StringIO())),
+    ('interpreter', lambda tree, table: Interpreter(tree, table, stdout=io.StringIO())),
+    ('codegen', lambda tree, table: PythonProgram.compile(tree, table, stdout=io.StringIO())),
+    ('vm', lambda tree, table: VM.compile(tree, table, stdout=io.StringIO())),
+]
+
+
+def main(objects):
+    tree = parse(SOURCE % objects)
+    table = ClassTable(tree)
+    print('{:<12} {:>14} {:>14}'.format('engine', 'peak [B/obj]', 'time [us/obj]'))
+    for name, create in ENGINES:
+        best = None
+        for _ in range(3):
+            engine = create(tree, table)
+            start = time.perf_counter()
+            result = engine.run()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        assert result == objects * (objects - 1) // 2, result
+        engine = create(tree, table)
+        tracemalloc.start()
+        engine.run()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print('{:<12} {:>14.1f} {:>14.2f}'.format(name, peak / objects, best / objects * 1e6))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
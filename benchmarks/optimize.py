@@ -0,0 +1,112 @@
+"""
+Effect of the optimization passes on the programs in ``examples/`` and on a
+loop with constant subexpressions.
+
+For every program which parses and type checks, the table shows the time
+taken by the optimizer, the changes counted by each pass, and the AST
+nodes, bytecode instructions, length of the generated Python source and
+time per run of the bytecode VM before and after optimizing. The time per
+run is the best of three batches.
+
+Usage::
+
+    python3 benchmarks/optimize.py [runs per batch]
+
+"""
+import glob
+import io
+import os
+import sys
+import time
+
+from pycoolc.ast import Node
+from pycoolc.bytecode import compile_program
+from pycoolc.codegen import generate
+from pycoolc.optimize import PASSES, optimize
+from pycoolc.parser import parse
+from pycoolc.semant import ClassTable
+from pycoolc.typecheck import check
+from pycoolc.vm import VM
+
+
+EXAMPLES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'examples')
+STDIN = '12\n'
+
+CONSTANTS = '''
+class Main inherits IO {
+  debug : Bool <- false;
+  main() : Object {
+    let i : Int <- 0, sum : Int <- 0, width : Int <- 8, height : Int <- 4 in {
+      while i < 200 loop {
+        if debug then out_string("iteration") else 0 fi;
+        if not (width * height < 10) then
+          sum <- sum + width * height - (2 + 3) * 4
+        else
+          sum <- sum - 1
+        fi;
+        "unused";
+        i <- i + 1;
+      } pool;
+      out_int(sum);
+    }
+  };
+};
+'''
+
+
+def nodes(tree):
+    count = 0
+    stack = [tree]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, Node):
+            count += 1
+        if isinstance(value, (Node, tuple, list)):
+            stack.extend(value)
+    return count
+
+
+def measure(program, runs):
+    best = None
+    for _ in range(3):
+        start = time.perf_counter()
+        for _ in range(runs):
+            stdout = io.StringIO()
+            VM(program, io.StringIO(STDIN), stdout).run()
+        elapsed = (time.perf_counter() - start) / runs
+        best = elapsed if best is None else min(best, elapsed)
+    return best, stdout.getvalue()
+
+
+def sources():
+    for path in sorted(glob.glob(os.path.join(EXAMPLES, '*.cl'))):
+        with open(path) as source:
+            yield os.path.basename(path), source.read()
+    yield '(constants)', CONSTANTS
+
+
+def main(runs):
+    print('{:<14} {:>8}  {:<14} {:>11} {:>13} {:>13} {:>19}'.format(
+        'example', 'opt [ms]', 'changes', 'nodes', 'instructions', 'source [B]', 'vm [us]'))
+    for name, source in sources():
+        tree = parse(source)
+        if tree is None or check(tree):
+            continue
+        start = time.perf_counter()
+        optimized, stats = optimize(tree, table=ClassTable(tree))
+        elapsed = time.perf_counter() - start
+        programs = [compile_program(tree), compile_program(optimized)]
+        instructions = [sum(len(function.instructions) for function in program.functions)
+                        for program in programs]
+        lengths = [len(generate(tree)), len(generate(optimized))]
+        (before, expected), (after, output) = [measure(program, runs) for program in programs]
+        assert output == expected, (output, expected)
+        print('{:<14} {:>8.2f}  {:<14} {:>5} {:>5} {:>6} {:>6} {:>6} {:>6} {:>9.1f} {:>9.1f}'
+              .format(name, elapsed * 1e3, '/'.join(str(stats[each]) for each in PASSES),
+                      nodes(tree), nodes(optimized), instructions[0], instructions[1],
+                      lengths[0], lengths[1], before * 1e6, after * 1e6))
+    print('changes: {}'.format('/'.join(PASSES)))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500)
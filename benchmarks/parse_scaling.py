@@ -0,0 +1,75 @@
+"""
+Parse time scaling of the list productions.
+
+Generates programs where a single list (classes, features, block elements,
+formals, parameters, let bindings or case branches) grows from 1k to 100k
+elements and reports the parse time per element. With linear list building
+the per-element cost stays flat as the list grows.
+
+Usage::
+
+    python3 benchmarks/parse_scaling.py [sizes...]
+
+"""
+import sys
+import time
+
+from pycoolc.parser import yacc
+
+
+def classes(n):
+    return ''.join('class C{} {{ }};\n'.format(i) for i in range(n))
+
+
+def features(n):
+    body = ''.join('a{} : Int;\n'.format(i) for i in range(n))
+    return 'class Main {{\n{}}};\n'.format(body)
+
+
+def block(n):
+    body = ''.join('{};\n'.format(i) for i in range(n))
+    return 'class Main {{ main() : Int {{ {{\n{}}} }}; }};\n'.format(body)
+
+
+def formals(n):
+    args = ', '.join('a{} : Int'.format(i) for i in range(n))
+    return 'class Main {{ main({}) : Int {{ 0 }}; }};\n'.format(args)
+
+
+def params(n):
+    args = ', '.join(str(i) for i in range(n))
+    return 'class Main {{ main() : Int {{ f({}) }}; }};\n'.format(args)
+
+
+def let_bindings(n):
+    bindings = ',\n'.join('a{} : Int <- {}'.format(i, i) for i in range(n))
+    return 'class Main {{ main() : Int {{ let {} in 0 }}; }};\n'.format(bindings)
+
+
+def case_branches(n):
+    branches = ''.join('a{} : T{} => {};\n'.format(i, i, i) for i in range(n))
+    return 'class Main {{ main() : Int {{ case 0 of {} esac }}; }};\n'.format(branches)
+
+
+GENERATORS = [classes, features, block, formals, params, let_bindings, case_branches]
+
+
+def measure(source):
+    start = time.perf_counter()
+    tree = yacc.parse(source)
+    elapsed = time.perf_counter() - start
+    assert tree is not None, 'benchmark input failed to parse'
+    return elapsed
+
+
+def main(sizes):
+    print('{:<15} {:>8} {:>10} {:>14}'.format('list', 'elements', 'total [s]', 'per elem [us]'))
+    for generator in GENERATORS:
+        for n in sizes:
+            elapsed = measure(generator(n))
+            print('{:<15} {:>8} {:>10.3f} {:>14.2f}'.format(
+                generator.__name__, n, elapsed, elapsed / n * 1e6))
+
+
+if __name__ == '__main__':
+    main([int(arg) for arg in sys.argv[1:]] or [1000, 10000, 100000])
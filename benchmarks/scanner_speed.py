@@ -0,0 +1,93 @@
+"""
+Tokens per second of the PLY lexer and the single-regex scanner.
+
+The input is the concatenation of the example programs, repeated until it
+reaches the requested size.
+
+Usage::
+
+    python3 benchmarks/scanner_speed.py [size in KiB]
+
+"""
+import glob
+import os
+import sys
+import time
+
+from pycoolc.diagnostics import Diagnostics
+from pycoolc.lexer import get_lexer
+from pycoolc.parser import Parser
+from pycoolc.scanner import Scanner, scan
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def corpus(size):
+    examples = ''
+    for path in sorted(glob.glob(os.path.join(ROOT, 'examples', '*.cl'))):
+        # Only use examples which parse, so the parse benchmark is meaningful
+        with open(path) as source:
+            data = source.read()
+        diagnostics = Diagnostics()
+        if Parser().parse(data, diagnostics) is not None and not diagnostics:
+            examples += data + '\n'
+    return examples * (size // len(examples) + 1)
+
+
+def ply_tokens(data):
+    lexer = get_lexer().clone()
+    lexer.input(data)
+    token = lexer.token
+    count = 0
+    while token() is not None:
+        count += 1
+    return count
+
+
+def scanner_tokens(data):
+    scanner = Scanner()
+    scanner.input(data)
+    token = scanner.token
+    count = 0
+    while token() is not None:
+        count += 1
+    return count
+
+
+def scan_tokens(data):
+    count = 0
+    for _ in scan(data):
+        count += 1
+    return count
+
+
+def timed(function, *args, repeat=3):
+    """Return the result and the best time of several runs."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function(*args)
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def main(size):
+    data = corpus(size)
+    print('input: {:.0f} KiB'.format(len(data) / 1024))
+
+    print('{:<26} {:>10} {:>14}'.format('lexer', 'time [s]', 'tokens/s'))
+    for name, function in [('PLY lexer', ply_tokens),
+                           ('Scanner.token()', scanner_tokens),
+                           ('scan()', scan_tokens)]:
+        count, elapsed = timed(function, data)
+        print('{:<26} {:>10.3f} {:>14,.0f}'.format(name, elapsed, count / elapsed))
+
+    print('{:<26} {:>10}'.format('parse', 'time [s]'))
+    for name, lexer in [('PLY lexer', None), ('Scanner', Scanner())]:
+        tree, elapsed = timed(Parser(lexer=lexer).parse, data)
+        print('{:<26} {:>10.3f}'.format(name, elapsed))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) * 1024 if len(sys.argv) > 1 else 4 * 1024 * 1024)
@@ -0,0 +1,233 @@
+"""
+Benchmark suite of all compiler stages on synthetic programs.
+
+Generates a program with :mod:`synthetic` and runs every stage on it: the
+PLY lexer, the scanner, the parser, ``print_ast``, the class table, the
+type checker, the optimizer and both back ends. For every stage it reports
+the best time of several runs, the throughput in tokens and AST nodes per
+second (of the whole program, so the stages can be compared) and the peak
+memory allocated while it runs, measured with ``tracemalloc`` in a separate
+run.
+
+The results can be saved as JSON and compared with an earlier run, e.g. to
+find regressions between two versions::
+
+    git checkout v1 && PYTHONPATH=. python3 benchmarks/suite.py --json v1.json
+    git checkout v2 && PYTHONPATH=. python3 benchmarks/suite.py --compare v1.json
+
+Usage, from the root of the repository::
+
+    PYTHONPATH=. python3 benchmarks/suite.py [--size small|medium|large] [--seed N]
+                                             [--repeat N] [--stages STAGE,...]
+                                             [--json PATH] [--compare PATH]
+                                             [--classes N] [--methods N] [--block N]
+                                             [--depth N] [--strings P] [--comments P]
+
+"""
+import argparse
+import io
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+from pycoolc import ast
+from pycoolc.bytecode import compile_program as compile_bytecode
+from pycoolc.codegen import compile_program as compile_python
+from pycoolc.diagnostics import Diagnostics
+from pycoolc.lexer import get_lexer
+from pycoolc.optimize import optimize
+from pycoolc.parser import Parser
+from pycoolc.scanner import scan
+from pycoolc.semant import ClassTable
+from pycoolc.typecheck import check
+from pycoolc.utils import print_ast
+from pycoolc.visitor import children
+
+from synthetic import DEFAULTS, generate
+
+
+# Version of the format of the JSON results
+FORMAT = 1
+
+SIZES = {
+    'small': {'classes': 10, 'methods': 4},
+    'medium': {'classes': 50, 'methods': 8},
+    'large': {'classes': 200, 'methods': 10},
+}
+
+
+def count_tokens(source):
+    lexer = get_lexer().clone()
+    lexer.input(source)
+    token = lexer.token
+    count = 0
+    while token() is not None:
+        count += 1
+    return count
+
+
+def count_nodes(tree):
+    count = 0
+    stack = [tree]
+    while stack:
+        tree = stack.pop()
+        if isinstance(tree, ast.Node):
+            count += 1
+        stack.extend(children(tree))
+    return count
+
+
+###### STAGES ######
+
+# Every stage is a function of the results of the earlier stages
+
+def lex(context):
+    return count_tokens(context['source'])
+
+
+def scanner(context):
+    count = 0
+    for _ in scan(context['source']):
+        count += 1
+    return count
+
+
+def parse(context):
+    diagnostics = Diagnostics()
+    tree = Parser().parse(context['source'], diagnostics)
+    assert tree is not None and not diagnostics, 'the synthetic program failed to parse'
+    return tree
+
+
+def dump(context):
+    output = io.StringIO()
+    print_ast(context['parse'], file=output)
+    return output.tell()
+
+
+def semant(context):
+    return ClassTable(context['parse'])
+
+
+def typecheck(context):
+    errors = check(context['parse'])
+    assert errors == [], errors[:3]
+
+
+def optimizer(context):
+    return optimize(context['parse'], table=context['semant'])
+
+
+def bytecode(context):
+    return compile_bytecode(context['parse'], context['semant'])
+
+
+def codegen(context):
+    return compile_python(context['parse'], context['semant'])
+
+
+STAGES = [('lex', lex), ('scan', scanner), ('parse', parse), ('print_ast', dump),
+          ('semant', semant), ('typecheck', typecheck), ('optimize', optimizer),
+          ('bytecode', bytecode), ('codegen', codegen)]
+
+
+def measure(function, context, repeat):
+    """Return the result, the best time and the peak memory of a stage."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function(context)
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    function(context)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, best, peak
+
+
+def run(parameters, seed, repeat, stages):
+    """Run the stages, returning the results as a dict."""
+    source = generate(seed, **parameters)
+    context = {'source': source}
+    program = {'bytes': len(source), 'lines': source.count('\n'),
+               'tokens': count_tokens(source), 'nodes': count_nodes(parse(context))}
+    results = {}
+    for name, function in STAGES:
+        # The tree and the class table are needed by the later stages
+        if name not in stages and name not in ('parse', 'semant'):
+            continue
+        result, seconds, peak = measure(function, context, repeat if name in stages else 1)
+        context[name] = result
+        if name in stages:
+            results[name] = {
+                'seconds': seconds,
+                'tokens_per_second': program['tokens'] / seconds,
+                'nodes_per_second': program['nodes'] / seconds,
+                'peak_bytes': peak,
+            }
+    return {'format': FORMAT, 'python': platform.python_version(),
+            'parameters': dict(parameters, seed=seed), 'program': program, 'stages': results}
+
+
+def report(results, baseline=None):
+    program = results['program']
+    print('{bytes:,} bytes, {lines:,} lines, {tokens:,} tokens, {nodes:,} nodes'.format(**program))
+    header = '{:<10} {:>10} {:>12} {:>12} {:>11}'.format('stage', 'time [ms]', 'tokens/s',
+                                                         'nodes/s', 'peak [KiB]')
+    if baseline is not None:
+        header += ' {:>9} {:>9}'.format('time vs', 'peak vs')
+        if baseline['parameters'] != results['parameters']:
+            print('warning: the baseline was run with other parameters: {}'.format(
+                baseline['parameters']))
+    print(header)
+    for name, stage in results['stages'].items():
+        line = '{:<10} {:>10.1f} {:>12,.0f} {:>12,.0f} {:>11,.0f}'.format(
+            name, stage['seconds'] * 1e3, stage['tokens_per_second'],
+            stage['nodes_per_second'], stage['peak_bytes'] / 1024)
+        old = baseline['stages'].get(name) if baseline is not None else None
+        if old is not None:
+            line += ' {:>8.2f}x {:>8.2f}x'.format(stage['seconds'] / old['seconds'],
+                                                  stage['peak_bytes'] / max(old['peak_bytes'], 1))
+        print(line)
+
+
+def main(argv=None):
+    argparser = argparse.ArgumentParser(description='Benchmark the compiler stages.')
+    argparser.add_argument('--size', choices=sorted(SIZES), default='medium',
+                           help='preset of the program parameters (default: medium)')
+    argparser.add_argument('--seed', type=int, default=0)
+    argparser.add_argument('--repeat', type=int, default=3,
+                           help='runs of every stage, the best time is reported (default: 3)')
+    argparser.add_argument('--stages', default=','.join(name for name, _ in STAGES),
+                           help='comma separated stages to run (default: all)')
+    argparser.add_argument('--json', metavar='PATH', help='write the results to a JSON file')
+    argparser.add_argument('--compare', metavar='PATH',
+                           help='compare with the results in a JSON file')
+    for name, value in sorted(DEFAULTS.items()):
+        argparser.add_argument('--' + name, type=type(value),
+                               help='program parameter, overrides the size preset')
+    args = argparser.parse_args(argv)
+    stages = args.stages.split(',')
+    unknown = set(stages) - set(name for name, _ in STAGES)
+    if unknown:
+        argparser.error('unknown stages: {}'.format(', '.join(sorted(unknown))))
+    parameters = dict(DEFAULTS, **SIZES[args.size])
+    for name in DEFAULTS:
+        if getattr(args, name) is not None:
+            parameters[name] = getattr(args, name)
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    results = run(parameters, args.seed, args.repeat, stages)
+    report(results, baseline)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+
+
+if __name__ == '__main__':
+    sys.setrecursionlimit(10000)
+    main()
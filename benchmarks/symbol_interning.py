@@ -0,0 +1,103 @@
+"""
+Memory and lookup savings of interned names in the AST.
+
+Parses a synthetic program and collects all identifier and type name
+occurrences of the AST. Compares the memory of the distinct interned strings
+with the memory one string per occurrence would take, as the lexer produced
+before. Then times dictionary lookups and equality checks with the interned
+names against equal, but separate string objects, and list indexing with
+symbol ids.
+
+Usage::
+
+    python3 benchmarks/symbol_interning.py [number of classes]
+
+"""
+import sys
+import time
+
+from pycoolc import ast
+from pycoolc.parser import Parser
+from pycoolc.scanner import TokenBuffer
+
+
+CLASS = '''class Counter{0} inherits IO {{
+  count : Int <- {0};
+  label : String <- "counter";
+  increment(amount : Int) : SELF_TYPE {{ {{
+    count <- count + amount;
+    self;
+  }} }};
+  report() : SELF_TYPE {{ out_string(label).out_int(count) }};
+  twice(other : Counter{0}) : Counter{0} {{ other.increment(count).increment(count) }};
+}};
+'''
+
+NAME_FIELDS = ('name', 'inherits', 'type', 'targettype')
+
+
+def names(tree):
+    """Return all name occurrences in ``tree``."""
+    out = []
+    stack = [tree]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, ast.Node):
+            for field, value in node._asdict().items():
+                if field in NAME_FIELDS and isinstance(value, str):
+                    out.append(value)
+                else:
+                    stack.append(value)
+        elif isinstance(node, tuple):
+            stack.extend(node)
+    return out
+
+
+def best(function, repeat=5):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main(n):
+    source = ''.join(CLASS.format(i) for i in range(n))
+    parser = Parser(lexer=TokenBuffer())
+    occurrences = names(parser.parse(source))
+    symbols = parser.symbols
+    distinct = dict((id(name), name) for name in occurrences).values()
+    fresh = [name.encode().decode() for name in occurrences]
+
+    print('{} classes, {:,} name occurrences, {:,} distinct name objects'.format(
+        n, len(occurrences), len(distinct)))
+    print('memory of names: {:,.0f} KiB interned, {:,.0f} KiB with one string per occurrence'.format(
+        sum(sys.getsizeof(name) for name in distinct) / 1024,
+        sum(sys.getsizeof(name) for name in fresh) / 1024))
+
+    table = dict((name, name) for name in distinct)
+    by_id = list(symbols)
+    ids = [symbols.id(name) for name in occurrences]
+
+    def lookup(keys):
+        return lambda: [table[key] for key in keys]
+
+    def compare(others):
+        return lambda: [a == b for a, b in zip(occurrences, others)]
+
+    def index():
+        return [by_id[i] for i in ids]
+
+    print('{:<28} {:>10}'.format('operation', 'ns/op'))
+    for label, function in [
+            ('dict lookup, fresh strings', lookup(fresh)),
+            ('dict lookup, interned', lookup(occurrences)),
+            ('list index by symbol id', index),
+            ('==, fresh strings', compare(fresh)),
+            ('==, interned', compare(occurrences))]:
+        print('{:<28} {:>10.1f}'.format(label, best(function) / len(occurrences) * 1e9))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
@@ -0,0 +1,314 @@
+"""
+Seeded generator of synthetic, type correct cool programs.
+
+The programs are meant as benchmark inputs of any size and shape: the
+number of classes, the methods per class, the length of blocks, the nesting
+depth of expressions and the density of strings and comments can be chosen
+independently. The same parameters and seed always produce the same
+program. The programs type check, but they are not meant to be run: methods
+call each other freely, so they may recurse forever.
+
+Usage::
+
+    python3 benchmarks/synthetic.py [--seed N] [--classes N] [--methods N] [--block N]
+                                    [--depth N] [--strings P] [--comments P]
+
+prints a program to stdout.
+
+"""
+import argparse
+import random
+
+
+# The parameters of generate() and their defaults
+DEFAULTS = {'classes': 20, 'methods': 5, 'block': 4, 'depth': 4, 'strings': 0.2,
+            'comments': 0.1}
+
+TYPES = ('Int', 'String', 'Bool')
+
+_WORDS = ('alpha', 'beta', 'gamma', 'delta', 'cool', 'class', 'object', 'value', 'tree',
+          'node', 'list', 'stack', 'x', 'y', 'z', 'foo', 'bar', 'baz')
+_ESCAPES = ('\\n', '\\t', '\\b', '\\\\')
+# The methods generating the expressions specific to every type
+_FORMS = {'Int': ('_arithmetic', '_negation', '_length'),
+          'Bool': ('_comparison', '_not', '_isvoid'),
+          'String': ('_concat', '_substr', '_type_name')}
+
+
+class Generator(object):
+    """Generates one program, see :func:`generate` for the arguments."""
+
+    def __init__(self, seed, classes, methods, block, depth, strings, comments):
+        self.rng = random.Random(seed)
+        self.block = block
+        self.depth = depth
+        self.strings = strings
+        self.comments = comments
+        self.names = 0
+        # The parent, attributes and methods of every class. Signatures are
+        # planned first, so every method may call any other one
+        self.classes = []
+        for i in range(classes):
+            parent = 'C{}'.format(self.rng.randrange(i)) if i and self.rng.random() < 0.6 else 'IO'
+            attributes = [('{}{}'.format(type[0].lower(), i), type) for type in TYPES]
+            signatures = []
+            for k in range(methods):
+                formals = [('p{}'.format(j), self.rng.choice(TYPES))
+                           for j in range(self.rng.randrange(4))]
+                signatures.append(('m{}_{}'.format(i, k), formals, self.rng.choice(TYPES)))
+            self.classes.append(('C{}'.format(i), parent, attributes, signatures))
+        self.by_name = dict((cls[0], cls) for cls in self.classes)
+
+    def program(self):
+        """Return the source code of the program."""
+        parts = [self._class(cls) for cls in self.classes]
+        self.variables = dict((type, []) for type in TYPES)
+        self.assignable = dict((type, []) for type in TYPES)
+        self.methods = []
+        calls = ['out_string({}.type_name())'.format(self._dispatch('(new {})'.format(name),
+                                                                    signatures[0], 2, 2))
+                 for name, parent, attributes, signatures in self.classes if signatures]
+        body = '{\n' + ''.join('    {};\n'.format(call) for call in calls) + '    self;\n  }'
+        parts.append('class Main inherits IO {{\n  main() : Object {{ {} }};\n}};\n'.format(
+            body))
+        return '\n'.join(parts)
+
+    ###### DECLARATIONS ######
+
+    def _class(self, cls):
+        name, parent, attributes, signatures = cls
+        # Attributes and methods visible in the class
+        self.variables = dict((type, []) for type in TYPES)
+        self.assignable = dict((type, []) for type in TYPES)
+        self.methods = []
+        while name != 'IO':
+            name, parent, attributes, signatures = self.by_name[name]
+            for attribute, type in attributes:
+                self.variables[type].append(attribute)
+                self.assignable[type].append(attribute)
+            self.methods.extend(signatures)
+            name = parent
+        name, parent, attributes, signatures = cls
+        lines = [self._comment(0) + 'class {} inherits {} {{'.format(name, parent)]
+        for attribute, type in attributes:
+            lines.append('  {}{} : {} <- {};'.format(self._comment(1), attribute, type,
+                                                     self._expr(type, 1, 1)))
+        for method, formals, type in signatures:
+            variables = self.variables
+            self.variables = dict((t, list(names)) for t, names in variables.items())
+            for formal, formal_type in formals:
+                self.variables[formal_type].append(formal)
+            lines.append('  {}{}({}) : {} {{ {} }};'.format(
+                self._comment(1), method,
+                ', '.join('{} : {}'.format(*formal) for formal in formals), type,
+                self._block(type, self.depth, 2)[0]))
+            self.variables = variables
+        lines.append('};')
+        return '\n'.join(lines) + '\n'
+
+    def _comment(self, level):
+        if self.rng.random() >= self.comments:
+            return ''
+        words = ' '.join(self.rng.choice(_WORDS) for _ in range(self.rng.randint(2, 10)))
+        if self.rng.random() < 0.5:
+            return '-- {}\n{}'.format(words, '  ' * level)
+        return '(* {} *) '.format(words)
+
+    def _name(self, prefix):
+        self.names += 1
+        return '{}{}'.format(prefix, self.names)
+
+    ###### EXPRESSIONS ######
+
+    def _expr(self, type, depth, level):
+        """Return an expression of ``type`` nested at most ``depth`` deep."""
+        return self._term(type, depth, level)[0]
+
+    def _operand(self, type, depth, level):
+        """Return an expression usable as the operand of an operator."""
+        text, atomic = self._term(type, depth, level)
+        return text if atomic else '(' + text + ')'
+
+    def _term(self, type, depth, level):
+        """Return an expression and whether it needs no parentheses as an operand."""
+        if depth <= 0 or self.rng.random() < 0.15:
+            return self._leaf(type), True
+        forms = [self._if, self._let, self._call, self._case]
+        if self.block:
+            forms.append(self._block)
+        if self.assignable[type]:
+            forms.append(self._assign)
+        forms.extend(getattr(self, name) for name in _FORMS[type])
+        form = self.rng.choice(forms)
+        return form(type, depth - 1, level)
+
+    def _leaf(self, type):
+        variables = self.variables[type]
+        if variables and self.rng.random() < 0.5:
+            return self.rng.choice(variables)
+        if type == 'Int':
+            if self.rng.random() < self.strings:
+                return '({}.length())'.format(self._string_literal())
+            return str(self.rng.randrange(1000))
+        if type == 'Bool':
+            return self.rng.choice(('true', 'false'))
+        return self._string_literal()
+
+    def _string_literal(self):
+        words = []
+        for _ in range(self.rng.randint(0, int(12 * self.strings) + 1)):
+            if self.rng.random() < 0.05:
+                words.append(self.rng.choice(_ESCAPES))
+            else:
+                words.append(self.rng.choice(_WORDS) + ' ')
+        return '"{}"'.format(''.join(words))
+
+    def _if(self, type, depth, level):
+        return 'if {} then {} else {} fi'.format(self._expr('Bool', depth, level),
+                                                 self._expr(type, depth, level),
+                                                 self._expr(type, depth, level)), True
+
+    def _let(self, type, depth, level):
+        bindings = []
+        variables = self.variables
+        self.variables = dict((t, list(names)) for t, names in variables.items())
+        for _ in range(self.rng.randint(1, 3)):
+            binding_type = self.rng.choice(TYPES)
+            name = self._name('v')
+            bindings.append('{} : {} <- {}'.format(name, binding_type,
+                                                   self._expr(binding_type, depth, level)))
+            self.variables[binding_type].append(name)
+        body = self._expr(type, depth, level)
+        self.variables = variables
+        return 'let {} in {}'.format(', '.join(bindings), body), False
+
+    def _case(self, type, depth, level):
+        scrutinee = self.rng.choice(['self', 'new ' + self.rng.choice(self.classes)[0],
+                                     self._operand(self.rng.choice(TYPES), depth, level)])
+        choices = [cls[0] for cls in self.classes] + list(TYPES)
+        types = self.rng.sample(choices, min(len(choices), self.rng.randint(1, 4))) + ['Object']
+        branches = []
+        for branch_type in types:
+            name = self._name('b')
+            variables = self.variables
+            if branch_type in TYPES:
+                self.variables = dict((t, list(names)) for t, names in variables.items())
+                self.variables[branch_type].append(name)
+            branches.append('{} : {} => {};'.format(name, branch_type,
+                                                    self._expr(type, depth, level)))
+            self.variables = variables
+        return 'case {} of {} esac'.format(scrutinee, ' '.join(branches)), True
+
+    def _call(self, type, depth, level):
+        candidates = [signature for signature in self.methods if signature[2] == type]
+        if candidates and self.rng.random() < 0.7:
+            method, formals, _ = self.rng.choice(candidates)
+            args = ', '.join(self._expr(formal_type, depth, level)
+                             for name, formal_type in formals)
+            return '{}({})'.format(method, args), True
+        name, parent, attributes, signatures = self.rng.choice(self.classes)
+        candidates = [signature for signature in signatures if signature[2] == type]
+        if not candidates:
+            return self._leaf(type), True
+        return self._dispatch('(new {})'.format(name), self.rng.choice(candidates),
+                              depth, level), True
+
+    def _dispatch(self, receiver, signature, depth, level):
+        method, formals, _ = signature
+        args = ', '.join(self._expr(formal_type, depth, level) for name, formal_type in formals)
+        return '({}.{}({}))'.format(receiver, method, args)
+
+    def _block(self, type, depth, level):
+        if not self.block:
+            return self._expr(type, depth, level), False
+        indent = '  ' * (level + 1)
+        elements = []
+        for _ in range(self.rng.randint(1, self.block) - 1):
+            if self.rng.random() < 0.2:
+                element = 'while {} loop {} pool'.format(
+                    self._expr('Bool', depth - 1, level + 1),
+                    self._expr(self.rng.choice(TYPES), depth - 1, level + 1))
+            else:
+                element = self._expr(self.rng.choice(TYPES), depth, level + 1)
+            elements.append(element)
+        elements.append(self._expr(type, depth, level + 1))
+        body = ''.join('{}{}{};\n'.format(indent, self._comment(level + 1), element)
+                       for element in elements)
+        return '{{\n{}{}}}'.format(body, '  ' * level), True
+
+    def _assign(self, type, depth, level):
+        return '{} <- {}'.format(self.rng.choice(self.assignable[type]),
+                                 self._expr(type, depth, level)), False
+
+    def _arithmetic(self, type, depth, level):
+        return '{} {} {}'.format(self._operand('Int', depth, level), self.rng.choice('+-*/'),
+                                 self._operand('Int', depth, level)), False
+
+    def _negation(self, type, depth, level):
+        return '~' + self._operand('Int', depth, level), False
+
+    def _length(self, type, depth, level):
+        return '({}.length())'.format(self._operand('String', depth, level)), True
+
+    def _comparison(self, type, depth, level):
+        operand_type = self.rng.choice(TYPES) if self.rng.random() < 0.3 else 'Int'
+        operator = '=' if operand_type != 'Int' else self.rng.choice(('<', '<=', '='))
+        return '{} {} {}'.format(self._operand(operand_type, depth, level), operator,
+                                 self._operand(operand_type, depth, level)), False
+
+    def _not(self, type, depth, level):
+        return 'not ' + self._operand('Bool', depth, level), False
+
+    def _isvoid(self, type, depth, level):
+        return 'isvoid ' + self._operand(self.rng.choice(TYPES), depth, level), False
+
+    def _concat(self, type, depth, level):
+        return '({}.concat({}))'.format(self._operand('String', depth, level),
+                                        self._expr('String', depth, level)), True
+
+    def _substr(self, type, depth, level):
+        return '({}.substr({}, {}))'.format(self._operand('String', depth, level),
+                                            self._expr('Int', depth, level),
+                                            self._expr('Int', depth, level)), True
+
+    def _type_name(self, type, depth, level):
+        return 'type_name()', True
+
+
+def generate(seed=0, **parameters):
+    """Generate a type correct cool program.
+
+    Args:
+        seed: The seed of the random numbers.
+        classes: The number of classes besides ``Main``.
+        methods: The number of methods of every class.
+        block: The maximum number of expressions in a block. With ``0``,
+            no blocks are generated.
+        depth: The maximum nesting depth of expressions.
+        strings: The density of strings, from 0 to 1. Controls the length of
+            string literals and how often ``Int``\\ s are computed from them.
+        comments: The probability of a comment before a feature or a block
+            element.
+
+    Returns:
+        The source code of the program.
+
+    """
+    unknown = set(parameters) - set(DEFAULTS)
+    if unknown:
+        raise TypeError('Unknown parameters: {}'.format(', '.join(sorted(unknown))))
+    arguments = dict(DEFAULTS, **parameters)
+    return Generator(seed, **arguments).program()
+
+
+def main(argv=None):
+    argparser = argparse.ArgumentParser(description='Generate a synthetic cool program.')
+    argparser.add_argument('--seed', type=int, default=0)
+    for name, value in sorted(DEFAULTS.items()):
+        argparser.add_argument('--' + name, type=type(value), default=value)
+    args = vars(argparser.parse_args(argv))
+    print(generate(**args), end='')
+
+
+if __name__ == '__main__':
+    main()
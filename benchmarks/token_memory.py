@@ -0,0 +1,60 @@
+"""
+Memory per token of PLY ``LexToken`` objects compared to a ``TokenBuffer``.
+
+Tokenizes a synthetic source and measures the traced allocations that remain
+while all tokens are held: a list of ``LexToken`` objects from the PLY lexer
+and the array columns of a :class:`~pycoolc.scanner.TokenBuffer`.
+
+Usage::
+
+    python3 benchmarks/token_memory.py [size in KiB]
+
+"""
+import os
+import sys
+import time
+import tracemalloc
+
+from pycoolc.lexer import get_lexer
+from pycoolc.scanner import TokenBuffer
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def make_source(size):
+    with open(os.path.join(ROOT, 'examples', 'factorial.cl')) as source:
+        example = source.read()
+    return example * (size // len(example) + 1)
+
+
+def lex_tokens(data):
+    lexer = get_lexer().clone()
+    lexer.input(data)
+    return list(iter(lexer.token, None))
+
+
+def measure(function, data):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = function(data)
+    elapsed = time.perf_counter() - start
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return elapsed, size
+
+
+def main(size):
+    data = make_source(size * 1024)
+    get_lexer()
+    count = len(TokenBuffer(data))
+    print('{} tokens in {:,} characters'.format(count, len(data)))
+    print('{:<12} {:>9} {:>12} {:>12}'.format('method', 'time [s]', 'held [KiB]', 'bytes/token'))
+    for name, function in [('LexToken', lex_tokens), ('TokenBuffer', TokenBuffer)]:
+        elapsed, held = measure(function, data)
+        print('{:<12} {:>9.2f} {:>12,.0f} {:>12.1f}'.format(name, elapsed, held / 1024, held / count))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1024)
@@ -0,0 +1,68 @@
+"""
+Peak memory of streaming tokenization compared to reading the whole file.
+
+Writes synthetic sources of increasing size to a temporary directory and
+measures time and the peak of traced allocations while counting the tokens with
+``tokenize()`` and with ``read()`` followed by ``scan()``.
+
+Usage::
+
+    python3 benchmarks/tokenize_memory.py [sizes in MiB...]
+
+"""
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from pycoolc.scanner import scan, tokenize
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def write_source(path, size):
+    with open(os.path.join(ROOT, 'examples', 'factorial.cl')) as source:
+        example = source.read() + '(* a block comment\n spanning lines *)\n'
+    with open(path, 'w') as target:
+        for _ in range(size // len(example) + 1):
+            target.write(example)
+
+
+def streaming(path):
+    return sum(1 for _ in tokenize(path))
+
+
+def whole(path):
+    with open(path) as source:
+        tokens = list(scan(source.read()))
+    return len(tokens)
+
+
+def measure(function, path):
+    # Time without tracing, as tracemalloc slows down every allocation
+    start = time.perf_counter()
+    count = function(path)
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    function(path)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return count, elapsed, peak
+
+
+def main(sizes):
+    print('{:>6} {:<10} {:>10} {:>9} {:>14}'.format('MiB', 'method', 'tokens', 'time [s]', 'peak [KiB]'))
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            path = os.path.join(tmp, 'input.cl')
+            write_source(path, size * 1024 * 1024)
+            for name, function in [('tokenize', streaming), ('read+scan', whole)]:
+                count, elapsed, peak = measure(function, path)
+                print('{:>6} {:<10} {:>10} {:>9.2f} {:>14,.0f}'.format(
+                    size, name, count, elapsed, peak / 1024))
+
+
+if __name__ == '__main__':
+    main([int(arg) for arg in sys.argv[1:]] or [1, 4, 8])
@@ -0,0 +1,61 @@
+"""
+Throughput of the type checker with an increasing number of worker processes.
+
+Generates a program with ``n`` classes in a shallow hierarchy, each with a
+few methods full of dispatches, lets and cases, and type checks it with
+``jobs`` from 1 to the number of CPUs (at least 4). The time includes
+building the environment and starting the pool.
+
+Usage::
+
+    python3 benchmarks/typecheck_scaling.py [classes]
+
+"""
+import os
+import pickle
+import sys
+import time
+
+from pycoolc.parser import parse
+from pycoolc.semant import ClassTable
+from pycoolc.typecheck import Environment, check
+
+
+CLASS = '''class C{0} inherits {1} {{
+  count{0} : Int <- {0};
+  name{0} : String <- "C{0}";
+  step{0}(n : Int, by : Int) : Int {{ {{
+    if n < count{0} then count{0} <- count{0} + by * 2 else count{0} <- ~n fi;
+    let i : Int <- 0, s : String <- name{0} in while i < n loop {{ i <- i + 1; s <- s.concat("x"); }} pool;
+    case self of x : C{0} => x.step{0}(n - 1, by); o : Object => 0; esac;
+  }} }};
+  describe{0}() : SELF_TYPE {{ {{ out_string(name{0}).out_int(count{0}); self; }} }};
+}};
+'''
+
+
+def program(n):
+    classes = []
+    for i in range(n):
+        parent = 'IO' if i < 10 else 'C{}'.format(i % 10)
+        classes.append(CLASS.format(i, parent))
+    classes.append('class Main { main() : Object { (new C0).describe0() }; };')
+    return ''.join(classes)
+
+
+def main(n):
+    tree = parse(program(n))
+    environment = Environment(ClassTable(tree))
+    print('{} classes, environment {:,} bytes pickled'.format(
+        n, len(pickle.dumps(environment, pickle.HIGHEST_PROTOCOL))))
+    print('{:>4} {:>10} {:>14}'.format('jobs', 'time [s]', 'classes/s'))
+    for jobs in range(1, max(4, os.cpu_count() or 1) + 1):
+        start = time.perf_counter()
+        errors = check(tree, jobs=jobs)
+        elapsed = time.perf_counter() - start
+        assert errors == [], errors[:3]
+        print('{:>4} {:>10.2f} {:>14,.0f}'.format(jobs, elapsed, n / elapsed))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
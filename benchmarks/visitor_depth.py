@@ -0,0 +1,95 @@
+"""
+Visitors, transformers and print_ast on very deeply nested programs.
+
+Parses programs with ``n`` nested ``if ... else if ...`` expressions and
+times a counting visitor, a visitor computing the depth of the tree from the
+results of the children, and a transformer renaming every identifier. Then
+prints the AST to a sink that only counts the characters.
+
+The indentation of ``print_ast`` grows with the depth, so its output (and
+time) grows quadratically: 10k levels already produce about 600 MB of text.
+It is therefore only run up to a smaller depth.
+
+Usage::
+
+    python3 benchmarks/visitor_depth.py [depth] [print depth]
+
+"""
+import sys
+import time
+
+from pycoolc.parser import Parser
+from pycoolc.scanner import TokenBuffer
+from pycoolc.utils import print_ast
+from pycoolc.visitor import NodeTransformer, NodeVisitor, children
+
+
+class Counter(NodeVisitor):
+
+    def __init__(self):
+        self.count = 0
+
+    def generic_visit(self, tree):
+        self.count += 1
+        return super().generic_visit(tree)
+
+
+class Depth(NodeVisitor):
+
+    def generic_visit(self, tree):
+        depth = 0
+        for child in children(tree):
+            depth = max(depth, (yield child))
+        return depth + 1
+
+
+class Rename(NodeTransformer):
+
+    def visit_Ident(self, node):
+        return node._replace(name=node.name.upper())
+
+
+class Sink(object):
+
+    def __init__(self):
+        self.size = 0
+
+    def write(self, text):
+        self.size += len(text)
+
+
+def nested(n):
+    return 'class Main {{ a : Bool; main() : Int {{ {} 0 {} }}; }};'.format(
+        'if a then 1 else ' * n, ' fi' * n)
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def main(depth, print_depth):
+    print('recursion limit: {}'.format(sys.getrecursionlimit()))
+    tree, elapsed = timed(Parser(lexer=TokenBuffer()).parse, nested(depth))
+    print('depth {:,}: parse {:.2f}s'.format(depth, elapsed))
+
+    counter = Counter()
+    _, elapsed = timed(counter.visit, tree)
+    print('  count visitor    {:.2f}s, {:,} objects'.format(elapsed, counter.count))
+    result, elapsed = timed(Depth().visit, tree)
+    print('  depth visitor    {:.2f}s, depth {:,}'.format(elapsed, result))
+    _, elapsed = timed(Rename().visit, tree)
+    print('  rename transform {:.2f}s'.format(elapsed))
+
+    depth = 1000
+    while depth <= print_depth:
+        sink = Sink()
+        _, elapsed = timed(print_ast, Parser(lexer=TokenBuffer()).parse(nested(depth)), 0, False, sink)
+        print('print_ast depth {:,}: {:.2f}s, {:,.1f} MB'.format(depth, elapsed, sink.size / 1e6))
+        depth *= 2
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000,
+         int(sys.argv[2]) if len(sys.argv) > 2 else 8000)
@@ -1,20 +1,129 @@
-from collections import namedtuple
-
-
-Assignment = namedtuple('Assignment', 'ident expr')
-Attribute = namedtuple('Attribute', 'ident type expr')
-BinaryOperation = namedtuple('BinaryOperation', 'operator left right')
-Block = namedtuple('Block', 'elements')
-Case = namedtuple('Case', 'expr typeactions')
-Formal = namedtuple('Formal', 'ident type')
-FunctionCall = namedtuple('FunctionCall', 'ident params')
-Ident = namedtuple('Ident', 'name')
-If = namedtuple('If', 'condition true false')
-Let = namedtuple('Let', 'assignments expr')
-MethodCall = namedtuple('MethodCall', 'object targettype method')
-Method = namedtuple('Method', 'ident type formals expr')
-New = namedtuple('New', 'type')
-Type = namedtuple('Type', 'name inherits features')
-TypeAction = namedtuple('TypeAction', 'ident type expr')
-UnaryOperation = namedtuple('UnaryOperation', 'operator right')
-While = namedtuple('While', 'condition action')
+"""
+The nodes of the abstract syntax tree.
+
+Nodes are instances of small classes with ``__slots__``, created by
+:func:`node`. They behave like the namedtuples they replace: they have
+``_fields``, ``_asdict()`` and ``_replace()``, can be iterated and indexed,
+compare equal when their type and fields are equal and have the same repr.
+
+Every node additionally carries the span of source code it was parsed from,
+see :attr:`Node.span`. It is kept as the start offset, which is the very
+int object of the first token and thus shared by nodes starting there, and
+the length, which is mostly a small int cached by Python.
+
+Nodes are mutable, see :class:`pycoolc.visitor.NodeTransformer`, so they
+compare by value but are not hashable.
+
+"""
+
+
+class Node(object):
+    """Base class of all AST nodes."""
+
+    __slots__ = ('_start', '_length')
+    _fields = ()
+
+    @property
+    def span(self):
+        """The ``(start, end)`` offsets of the node in the source, or `None`.
+
+        The end offset is exclusive. Nodes created by a parser without
+        position tracking have no span.
+
+        """
+        if self._start is None:
+            return None
+        return self._start, self._start + self._length
+
+    @span.setter
+    def span(self, span):
+        if span is None:
+            self._start = self._length = None
+        else:
+            self._start, self._length = span[0], span[1] - span[0]
+
+    def __iter__(self):
+        for name in self._fields:
+            yield getattr(self, name)
+
+    def __len__(self):
+        return len(self._fields)
+
+    def __getitem__(self, index):
+        return getattr(self, self._fields[index])
+
+    def __eq__(self, other):
+        if self.__class__ is not other.__class__:
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self._fields)
+
+    __hash__ = None
+
+    def __repr__(self):
+        return '{}({})'.format(self.__class__.__name__, ', '.join(
+            '{}={!r}'.format(name, getattr(self, name)) for name in self._fields))
+
+    def __reduce__(self):
+        return self.__class__, tuple(self) + (self.span,)
+
+    def _asdict(self):
+        """Return a dict mapping the field names to their values."""
+        return dict((name, getattr(self, name)) for name in self._fields)
+
+    def _replace(self, **kwargs):
+        """Return a copy of the node with some fields replaced, keeping its span."""
+        values = self._asdict()
+        values.update(kwargs)
+        values.setdefault('span', self.span)
+        return self.__class__(**values)
+
+
+def node(typename, field_names):
+    """Create a node class, like ``collections.namedtuple``.
+
+    Args:
+        typename: The name of the class.
+        field_names: The names of the fields, separated by whitespace.
+
+    Returns:
+        A subclass of :class:`Node`. Its constructor takes the fields, as
+        positional or keyword arguments, and an optional ``span`` keyword.
+
+    """
+    fields = tuple(field_names.split())
+    # Generate the constructor like namedtuple does, a generic one taking
+    # *args and **kwargs would be several times slower
+    source = 'def __init__(self, {}, span=None):\n'.format(', '.join(fields))
+    for name in fields:
+        source += '    self.{0} = {0}\n'.format(name)
+    source += '    if span is None:\n'
+    source += '        self._start = self._length = None\n'
+    source += '    else:\n'
+    source += '        self._start, self._length = span[0], span[1] - span[0]\n'
+    namespace = {}
+    exec(source, namespace)
+    return type(typename, (Node,), {
+        '__slots__': fields,
+        '__module__': __name__,
+        '__init__': namespace['__init__'],
+        '_fields': fields,
+    })
+
+
+Assignment = node('Assignment', 'ident expr')
+Attribute = node('Attribute', 'ident type expr')
+BinaryOperation = node('BinaryOperation', 'operator left right')
+Block = node('Block', 'elements')
+Case = node('Case', 'expr typeactions')
+Formal = node('Formal', 'ident type')
+FunctionCall = node('FunctionCall', 'ident params')
+Ident = node('Ident', 'name')
+If = node('If', 'condition true false')
+Let = node('Let', 'assignments expr')
+MethodCall = node('MethodCall', 'object targettype method')
+Method = node('Method', 'ident type formals expr')
+New = node('New', 'type')
+Type = node('Type', 'name inherits features')
+TypeAction = node('TypeAction', 'ident type expr')
+UnaryOperation = node('UnaryOperation', 'operator right')
+While = node('While', 'condition action')
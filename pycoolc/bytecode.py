@@ -0,0 +1,682 @@
+"""
+A compact register-based bytecode for cool programs.
+
+Every method is compiled into a :class:`Function`: a flat ``array('i')`` of
+instructions operating on the registers of its frame. Register 0 holds
+``self``, the following registers the arguments, the rest the local
+variables and intermediate values. An instruction is an opcode followed by
+its operands, see :data:`OPERANDS`. Values which do not fit into an operand,
+like strings and the branch tables of ``case`` expressions, are stored in
+the constant pool of the :class:`Program`.
+
+Attributes and methods are addressed by their index in the flattened class
+table: an object stores its attributes in a list with the inherited ones
+first, and a class has a table of its methods where an overriding method
+keeps the index of the method it overrides. So ``GETATTR`` indexes a list
+and ``CALL`` indexes the method table of the receiver's class.
+
+Calls in tail position of a method body, i.e. its value is returned by
+``If``, ``Block``, ``Let`` and ``Case`` expressions without further
+computation, are compiled into ``TAILCALL`` and ``TAILSCALL``, which reuse
+the frame of the caller.
+
+A :class:`Program` only consists of numbers, strings and arrays and can be
+stored with :meth:`Program.dumps`. It is run by :class:`pycoolc.vm.VM`.
+
+Example::
+
+    >>> program = compile_program(parse('class Main { main() : Int { 6 * 7 }; };'))
+    >>> print(disassemble(program))
+    function 0 Main.main (params 0, registers 3)
+          0  LOADI    r1, 6
+          3  LOADI    r2, 7
+          6  MUL      r1, r1, r2
+         10  RETURN   r1
+
+"""
+from array import array
+import marshal
+import sys
+
+from . import ast
+from .runtime import INT_MAX, INT_MIN, default, unescape
+from .semant import BOOL, INT, MAIN, MAIN_METHOD, SELF, SELF_TYPE, STRING, ClassTable
+from .typecheck import annotate
+from .visitor import NodeVisitor, children
+
+
+FORMAT_VERSION = 3
+
+###### INSTRUCTIONS ######
+
+(MOVE, LOADI, LOADK, GETATTR, SETATTR, ADD, SUB, MUL, DIV, LT, LE, EQ, NEG, NOT, ISVOID, JUMP,
+ JUMPF, NEW, NEWSELF, CALL, SCALL, CASE, RETURN, TAILCALL, TAILSCALL) = range(25)
+
+NAMES = ('MOVE', 'LOADI', 'LOADK', 'GETATTR', 'SETATTR', 'ADD', 'SUB', 'MUL', 'DIV', 'LT', 'LE',
+         'EQ', 'NEG', 'NOT', 'ISVOID', 'JUMP', 'JUMPF', 'NEW', 'NEWSELF', 'CALL', 'SCALL', 'CASE',
+         'RETURN', 'TAILCALL', 'TAILSCALL')
+
+# The operands of every opcode: a register (r), an immediate integer (i), an
+# index into the constant pool (k), an attribute (a), a class (c), a method
+# (m), a source span (s), a jump target (t) and a count of registers
+# following the fixed operands (n).
+OPERANDS = (
+    'rr',       # MOVE      r[A] = r[B]
+    'ri',       # LOADI     r[A] = I
+    'rk',       # LOADK     r[A] = K[B]
+    'ra',       # GETATTR   r[A] = self.attribute[B]
+    'ar',       # SETATTR   self.attribute[A] = r[B]
+    'rrr',      # ADD       r[A] = r[B] + r[C]
+    'rrr',      # SUB
+    'rrr',      # MUL
+    'rrrs',     # DIV       raises an error at span D on division by zero
+    'rrr',      # LT
+    'rrr',      # LE
+    'rrr',      # EQ
+    'rr',       # NEG       r[A] = ~r[B]
+    'rr',       # NOT
+    'rr',       # ISVOID
+    't',        # JUMP      jump to A
+    'rt',       # JUMPF     jump to B if r[A] is false
+    'rc',       # NEW       r[A] = new class C
+    'r',        # NEWSELF   r[A] = new SELF_TYPE
+    'rmsn',     # CALL      r[A] = dispatch of method B to r[first], with the other arguments
+    'rcmsn',    # SCALL     the same, with the method of class B
+    'rks',      # CASE      jump to the branch K[B][tag] for the class tag of r[A]
+    'r',        # RETURN    return r[A]
+    'msn',      # TAILCALL  return the result of the dispatch of method A
+    'cmsn',     # TAILSCALL the same, with the method of class A
+)
+
+# Instructions whose first operand is the register they write
+WRITES = frozenset([MOVE, LOADI, LOADK, GETATTR, ADD, SUB, MUL, DIV, LT, LE, EQ, NEG, NOT, ISVOID,
+                    NEW, NEWSELF, CALL, SCALL])
+
+
+def instructions(code):
+    """Yield the position, opcode and operands of every instruction of ``code``."""
+    pc = 0
+    while pc < len(code):
+        opcode = code[pc]
+        size = len(OPERANDS[opcode])
+        if OPERANDS[opcode].endswith('n'):
+            size += code[pc + size]
+        yield pc, opcode, list(code[pc + 1:pc + 1 + size])
+        pc += 1 + size
+
+
+###### PROGRAMS ######
+
+class Function(object):
+    """The bytecode of a method or of the attribute initializers of a class.
+
+    Attributes:
+        name: The name of the method, or ``init`` for initializers.
+        owner: The name of the class defining it.
+        params: The number of parameters, besides ``self``.
+        registers: The size of the frame.
+        code: The instructions, an ``array('i')``.
+        padding: A list of `None` for the registers after the arguments.
+        instructions: The instructions as a tuple, which the VM indexes
+            faster than the array.
+
+    """
+
+    __slots__ = ('name', 'owner', 'params', 'registers', 'code', 'padding', 'instructions')
+
+    def __init__(self, name, owner, params, registers, code):
+        self.name = name
+        self.owner = owner
+        self.params = params
+        self.registers = registers
+        self.code = code
+        self.padding = [None] * (registers - params - 1)
+        self.instructions = tuple(code)
+
+    def __repr__(self):
+        return '<Function {}.{}>'.format(self.owner, self.name)
+
+
+class ClassLayout(object):
+    """A class of a compiled program.
+
+    Attributes:
+        name: The name of the class.
+        ancestors: The names of the ancestors from ``Object`` to the class.
+        defaults: The default values of the attributes, in the order of
+            their indexes.
+        methods: The method table: For every method index, the index of a
+            :class:`Function`, or the name of a method of a basic class.
+        initializers: The indexes of the initializer functions to run on new
+            objects, ancestors first.
+
+    """
+
+    __slots__ = ('name', 'ancestors', 'defaults', 'methods', 'initializers')
+
+    def __init__(self, name, ancestors, defaults, methods, initializers):
+        self.name = name
+        self.ancestors = ancestors
+        self.defaults = defaults
+        self.methods = methods
+        self.initializers = initializers
+
+    def __repr__(self):
+        return '<ClassLayout {}>'.format(self.name)
+
+
+class Program(object):
+    """A compiled program.
+
+    Attributes:
+        classes: The :class:`ClassLayout`\\ s, indexed by class tag.
+        functions: The :class:`Function`\\ s.
+        constants: The constant pool.
+        spans: The source spans referenced by instructions which can fail.
+        main: The tag of class ``Main``.
+        main_method: The method index of ``main()``.
+
+    """
+
+    __slots__ = ('classes', 'functions', 'constants', 'spans', 'main', 'main_method')
+
+    def __init__(self, classes, functions, constants, spans, main, main_method):
+        self.classes = classes
+        self.functions = functions
+        self.constants = constants
+        self.spans = spans
+        self.main = main
+        self.main_method = main_method
+
+    def dumps(self):
+        """Serialize the program into bytes.
+
+        The instructions are stored little-endian, so the data can be loaded
+        on any platform with the same Python version.
+
+        """
+        functions = []
+        for function in self.functions:
+            code = array('i', function.code)
+            if sys.byteorder == 'big':
+                code.byteswap()
+            functions.append((function.name, function.owner, function.params,
+                              function.registers, code.tobytes()))
+        classes = [(cls.name, cls.ancestors, cls.defaults, cls.methods, cls.initializers)
+                   for cls in self.classes]
+        return marshal.dumps((FORMAT_VERSION, classes, functions, self.constants, self.spans,
+                              self.main, self.main_method))
+
+    @classmethod
+    def loads(cls, data):
+        """Load a program serialized with :meth:`dumps`.
+
+        Raises:
+            ValueError: If the data is corrupt or of another format version.
+
+        """
+        try:
+            version, classes, functions, constants, spans, main, main_method = \
+                marshal.loads(data)
+        except (EOFError, TypeError, ValueError) as e:
+            raise ValueError('Invalid program: {}'.format(e))
+        if version != FORMAT_VERSION:
+            raise ValueError('Unsupported format version {}'.format(version))
+        loaded = []
+        for name, owner, params, registers, code in functions:
+            instructions = array('i')
+            instructions.frombytes(code)
+            if sys.byteorder == 'big':
+                instructions.byteswap()
+            loaded.append(Function(name, owner, params, registers, instructions))
+        return cls([ClassLayout(*layout) for layout in classes], loaded, constants, spans, main,
+                   main_method)
+
+
+###### COMPILER ######
+
+class _Assignments(NodeVisitor):
+    """Collects the ids of the nodes containing an assignment."""
+
+    def __init__(self):
+        self.found = set()
+
+    def generic_visit(self, tree):
+        found = isinstance(tree, ast.Assignment)
+        for child in children(tree):
+            if (yield child):
+                found = True
+        if found:
+            self.found.add(id(tree))
+        return found
+
+
+def tail_calls(expr):
+    """Return the ids of the calls in tail position of a method body."""
+    calls = set()
+    stack = [expr]
+    while stack:
+        node = stack.pop()
+        cls = node.__class__
+        if cls is ast.If:
+            stack.append(node.true)
+            stack.append(node.false)
+        elif cls is ast.Block:
+            stack.append(node.elements[-1])
+        elif cls is ast.Let:
+            stack.append(node.expr)
+        elif cls is ast.Case:
+            stack.extend(action.expr for action in node.typeactions)
+        elif cls is ast.FunctionCall or cls is ast.MethodCall:
+            calls.add(id(node))
+    return calls
+
+
+class Compiler(NodeVisitor):
+    """Compiles a program into bytecode.
+
+    Registers are allocated like a stack: A variable or intermediate value
+    gets the lowest free register and frees the registers of the values it
+    was computed from. Every visitor method returns the register holding the
+    value of its node.
+
+    Args:
+        program: The AST of the program.
+        table: The :class:`pycoolc.semant.ClassTable` of the program, if it
+            is already known.
+
+    Raises:
+        pycoolc.semant.SemanticError: The first error found in the program.
+
+    """
+
+    def __init__(self, program, table=None):
+        self.program = program
+        self.table = table or ClassTable(program)
+        self.annotations = annotate(program, self.table)
+        self.functions = []
+        self.constants = []
+        self._constants = {}
+        self.spans = []
+
+    def compile(self):
+        """Return the compiled :class:`Program`."""
+        indexes = {}
+        initializers = {}
+        for info in self.table:
+            if info.basic:
+                continue
+            for feature in info.node.features:
+                if isinstance(feature, ast.Method):
+                    indexes[info.name, feature.ident.name] = self._method(info, feature)
+            if any(feature.expr is not None for feature in info.node.features
+                   if isinstance(feature, ast.Attribute)):
+                initializers[info.name] = self._initializer(info)
+        classes = []
+        for info in self.table:
+            defaults = [default(attribute.type) for attribute in info.attributes.values()]
+            methods = [None] * len(info.methods)
+            for name, method in info.methods.items():
+                methods[method.index] = indexes.get((method.owner, name), name)
+            classes.append(ClassLayout(
+                info.name, info.ancestors, defaults, methods,
+                [initializers[name] for name in info.ancestors if name in initializers]))
+        main = self.table[MAIN]
+        return Program(classes, self.functions, self.constants, self.spans, main.tag,
+                       main.methods[MAIN_METHOD].index)
+
+    ###### FUNCTIONS ######
+
+    def _start(self, info, params, body, tail=None):
+        """Start compiling a function of class ``info``."""
+        self.cls = info
+        self.tail = set() if tail is None else tail_calls(tail)
+        self.code = []
+        self.labels = set()
+        self.last = None
+        self.scope = {}
+        self.bound = set()
+        for i, name in enumerate(params):
+            self.scope[name] = i + 1
+            self.bound.add(i + 1)
+        self.top = self.registers = len(params) + 1
+        finder = _Assignments()
+        for node in body:
+            finder.visit(node)
+        self.assigning = finder.found
+
+    def _finish(self, name, params):
+        self.functions.append(Function(name, self.cls.name, params, self.registers,
+                                       array('i', self.code)))
+        return len(self.functions) - 1
+
+    def _method(self, info, node):
+        self._start(info, [formal.ident.name for formal in node.formals], [node.expr],
+                    node.expr)
+        self.emit(RETURN, self.visit(node.expr))
+        return self._finish(node.ident.name, len(node.formals))
+
+    def _initializer(self, info):
+        attributes = [feature for feature in info.node.features
+                      if isinstance(feature, ast.Attribute) and feature.expr is not None]
+        self._start(info, [], [attribute.expr for attribute in attributes])
+        for attribute in attributes:
+            mark = self.top
+            register = self.visit(attribute.expr)
+            self.emit(SETATTR, info.attributes[attribute.ident.name].index, register)
+            self.top = mark
+        self.emit(RETURN, 0)
+        return self._finish('init', 0)
+
+    ###### EMITTING ######
+
+    def emit(self, opcode, *operands):
+        """Append an instruction, returning its position."""
+        self.last = len(self.code)
+        self.code.append(opcode)
+        self.code.extend(operands)
+        return self.last
+
+    def _temp(self):
+        """Allocate a register for an intermediate value."""
+        register = self.top
+        self.top += 1
+        self.registers = max(self.registers, self.top)
+        return register
+
+    def _constant(self, value):
+        """Return the index of a value in the constant pool."""
+        key = value.__class__, value
+        if key not in self._constants:
+            self._constants[key] = len(self.constants)
+            self.constants.append(value)
+        return self._constants[key]
+
+    def _span(self, node):
+        self.spans.append(node.span)
+        return len(self.spans) - 1
+
+    def _label(self):
+        """Return the current position as the target of a jump."""
+        self.labels.add(len(self.code))
+        return len(self.code)
+
+    def _patch(self, position):
+        """Let the jump at ``position`` jump to the current position."""
+        self.code[position + len(OPERANDS[self.code[position]])] = self._label()
+
+    def _move(self, target, source):
+        """Copy a register.
+
+        If ``source`` holds an intermediate value computed by the last
+        instruction, that instruction writes to ``target`` directly instead.
+
+        """
+        if target == source:
+            return
+        last = self.last
+        if (last is not None and self.code[last] in WRITES and self.code[last + 1] == source and
+                source != 0 and source not in self.bound and len(self.code) not in self.labels):
+            self.code[last + 1] = target
+        else:
+            self.emit(MOVE, target, source)
+
+    def _load(self, register, value):
+        if value.__class__ is int and INT_MIN <= value <= INT_MAX:
+            self.emit(LOADI, register, value)
+        else:
+            self.emit(LOADK, register, self._constant(value))
+
+    def _sequence(self, nodes):
+        """Compile expressions evaluated from left to right.
+
+        The value of a variable is copied if a later expression could
+        assign the variable before the value is used.
+
+        Returns:
+            The list of the registers of the values.
+
+        """
+        registers = []
+        for i, node in enumerate(nodes):
+            register = yield node
+            if register in self.bound and any(id(later) in self.assigning
+                                              for later in nodes[i + 1:]):
+                copy = self._temp()
+                self.emit(MOVE, copy, register)
+                register = copy
+            registers.append(register)
+        return registers
+
+    ###### EXPRESSIONS ######
+
+    def visit_int(self, value):
+        register = self._temp()
+        self._load(register, value)
+        return register
+
+    visit_bool = visit_int
+
+    def visit_str(self, value):
+        return self.visit_int(unescape(value))
+
+    def visit_Ident(self, node):
+        if node.name == SELF:
+            return 0
+        if node.name in self.scope:
+            return self.scope[node.name]
+        register = self._temp()
+        self.emit(GETATTR, register, self.cls.attributes[node.name].index)
+        return register
+
+    def visit_Assignment(self, node):
+        mark = self.top
+        register = yield node.expr
+        name = node.ident.name
+        if name in self.scope:
+            self._move(self.scope[name], register)
+            self.top = mark
+            return self.scope[name]
+        self.emit(SETATTR, self.cls.attributes[name].index, register)
+        return register
+
+    def visit_Block(self, node):
+        *init, last = node.elements
+        for element in init:
+            mark = self.top
+            yield element
+            self.top = mark
+        return (yield last)
+
+    def visit_If(self, node):
+        mark = self.top
+        condition = yield node.condition
+        self.top = mark
+        result = self._temp()
+        jump = self.emit(JUMPF, condition, 0)
+        self._move(result, (yield node.true))
+        self.top = result + 1
+        end = self.emit(JUMP, 0)
+        self._patch(jump)
+        self._move(result, (yield node.false))
+        self.top = result + 1
+        self._patch(end)
+        return result
+
+    def visit_While(self, node):
+        mark = self.top
+        start = self._label()
+        condition = yield node.condition
+        self.top = mark
+        jump = self.emit(JUMPF, condition, 0)
+        yield node.action
+        self.top = mark
+        self.emit(JUMP, start)
+        self._patch(jump)
+        result = self._temp()
+        self._load(result, None)
+        return result
+
+    def visit_Let(self, node):
+        scope, bound = self.scope, self.bound
+        for attribute in node.assignments:
+            register = self._temp()
+            if attribute.expr is None:
+                self._load(register, default(attribute.type))
+            else:
+                # The initializer still sees the previous binding of the name
+                self._move(register, (yield attribute.expr))
+                self.top = register + 1
+            self.scope = dict(self.scope)
+            self.scope[attribute.ident.name] = register
+            self.bound = self.bound | {register}
+        result = yield node.expr
+        self.scope, self.bound = scope, bound
+        return result
+
+    def visit_Case(self, node):
+        value = yield node.expr
+        result = self._temp()
+        # The position of the selected branch for every class tag, or -1
+        branches = []
+        self.emit(CASE, value, self._constant_table(branches), self._span(node))
+        scope, bound = self.scope, self.bound
+        ends = []
+        labels = []
+        for action in node.typeactions:
+            labels.append(self._label())
+            register = self._temp()
+            self.emit(MOVE, register, value)
+            self.scope = dict(scope)
+            self.scope[action.ident.name] = register
+            self.bound = bound | {register}
+            self._move(result, (yield action.expr))
+            self.top = result + 1
+            ends.append(self.emit(JUMP, 0))
+        self.scope, self.bound = scope, bound
+        for end in ends:
+            self._patch(end)
+        selected = self.table.case_table([action.type for action in node.typeactions])
+        branches.extend(-1 if i is None else labels[i] for i in selected)
+        return result
+
+    def _constant_table(self, table):
+        # Branch tables are filled in later, so they are never shared
+        self.constants.append(table)
+        return len(self.constants) - 1
+
+    def visit_New(self, node):
+        register = self._temp()
+        if node.type in (INT, STRING, BOOL):
+            self._load(register, default(node.type))
+        elif node.type == SELF_TYPE:
+            self.emit(NEWSELF, register)
+        else:
+            self.emit(NEW, register, self.table[node.type].tag)
+        return register
+
+    def visit_UnaryOperation(self, node):
+        mark = self.top
+        right = yield node.right
+        self.top = mark
+        register = self._temp()
+        operator = node.operator.lower()
+        opcode = NEG if operator == '~' else NOT if operator == 'not' else ISVOID
+        self.emit(opcode, register, right)
+        return register
+
+    _BINARY = {'+': ADD, '-': SUB, '*': MUL, '/': DIV, '<': LT, '<=': LE, '=': EQ}
+
+    def visit_BinaryOperation(self, node):
+        mark = self.top
+        left, right = yield from self._sequence([node.left, node.right])
+        self.top = mark
+        register = self._temp()
+        opcode = self._BINARY[node.operator]
+        if opcode == DIV:
+            self.emit(DIV, register, left, right, self._span(node))
+        else:
+            self.emit(opcode, register, left, right)
+        return register
+
+    def visit_FunctionCall(self, node):
+        mark = self.top
+        args = yield from self._sequence(node.params)
+        self.top = mark
+        register = self._temp()
+        index = self.cls.methods[node.ident.name].index
+        if id(node) in self.tail:
+            self.emit(TAILCALL, index, self._span(node), len(args) + 1, 0, *args)
+        else:
+            self.emit(CALL, register, index, self._span(node), len(args) + 1, 0, *args)
+        return register
+
+    def visit_MethodCall(self, node):
+        call = node.method
+        mark = self.top
+        *args, receiver = yield from self._sequence(list(call.params) + [node.object])
+        self.top = mark
+        register = self._temp()
+        cls = self.table[self.annotations[id(node)]]
+        index = cls.methods[call.ident.name].index
+        tail = id(node) in self.tail
+        if node.targettype is None and tail:
+            self.emit(TAILCALL, index, self._span(node), len(args) + 1, receiver, *args)
+        elif node.targettype is None:
+            self.emit(CALL, register, index, self._span(node), len(args) + 1, receiver, *args)
+        elif tail:
+            self.emit(TAILSCALL, cls.tag, index, self._span(node), len(args) + 1, receiver,
+                      *args)
+        else:
+            self.emit(SCALL, register, cls.tag, index, self._span(node), len(args) + 1,
+                      receiver, *args)
+        return register
+
+
+def compile_program(program, table=None):
+    """Compile a type correct program into a :class:`Program`.
+
+    Raises:
+        pycoolc.semant.SemanticError: If the program is not type correct.
+
+    """
+    return Compiler(program, table).compile()
+
+
+###### DISASSEMBLER ######
+
+def disassemble(program):
+    """Return a listing of all functions of a program."""
+    lines = []
+    for i, function in enumerate(program.functions):
+        lines.append('function {} {}.{} (params {}, registers {})'.format(
+            i, function.owner, function.name, function.params, function.registers))
+        for pc, opcode, operands in instructions(function.code):
+            lines.append('  {:>5}  {:<8} {}'.format(
+                pc, NAMES[opcode], _operands(program, function, opcode, operands)))
+        lines.append('')
+    return '\n'.join(lines)
+
+
+def _operands(program, function, opcode, operands):
+    formatted = []
+    kinds = OPERANDS[opcode]
+    for i, value in enumerate(operands):
+        kind = kinds[i] if i < len(kinds) else 'r'
+        if kind == 'r':
+            formatted.append('r{}'.format(value))
+        elif kind == 'k':
+            formatted.append('k{} ({!r})'.format(value, program.constants[value]))
+        elif kind == 'c':
+            formatted.append(program.classes[value].name)
+        elif kind == 'a':
+            formatted.append('@{}'.format(value))
+        elif kind == 'm':
+            formatted.append('#{}'.format(value))
+        elif kind == 't':
+            formatted.append('-> {}'.format(value))
+        elif kind in 'sn':
+            continue
+        else:
+            formatted.append(str(value))
+    return ', '.join(formatted)
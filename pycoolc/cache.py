@@ -0,0 +1,156 @@
+"""
+An on-disk cache of parsed ASTs, keyed by the content of the source.
+
+Entries are stored in the format of :mod:`pycoolc.serialize` under the
+SHA-256 hash of the source code and of everything the AST depends on:
+
+* the serialization format version, the Python version and the marshal
+  version,
+* the contents of the modules defining tokens, grammar rules, rule actions,
+  node classes and the pregenerated lexer and parser tables.
+
+Editing the source, the grammar, the AST construction or the tables
+therefore changes the key, and the stale entry is never read again. Entries
+are written atomically; unreadable or corrupt entries count as misses. Only
+sources which parsed without any diagnostics should be stored, so that a
+cache hit never hides an error message.
+
+Looking up an entry neither builds the lexer nor the parser.
+
+"""
+import hashlib
+import marshal
+import os
+import sys
+import tempfile
+import threading
+
+from . import serialize
+
+
+# Modules the AST of a source depends on
+VERSIONED_MODULES = (
+    'ast.py', 'lexer.py', 'lextab.py', 'parser.py', 'parsetab.py',
+    'scanner.py', 'serialize.py', 'symbols.py',
+)
+
+_version = None
+_version_lock = threading.Lock()
+
+
+def compiler_version():
+    """Return a hash of everything besides the source that determines an AST."""
+    global _version
+    if _version is None:
+        with _version_lock:
+            if _version is None:
+                digest = hashlib.sha256('{} {} {}\n'.format(
+                    serialize.FORMAT_VERSION, sys.version_info[:2], marshal.version).encode())
+                package_dir = os.path.dirname(os.path.abspath(__file__))
+                for name in VERSIONED_MODULES:
+                    with open(os.path.join(package_dir, name), 'rb') as module:
+                        digest.update(module.read())
+                _version = digest.hexdigest()
+    return _version
+
+
+def default_directory():
+    """Return the default cache directory.
+
+    This is ``$PYCOOLC_CACHE_DIR`` if set, else ``pycoolc`` in
+    ``$XDG_CACHE_HOME`` or ``~/.cache``.
+
+    """
+    directory = os.environ.get('PYCOOLC_CACHE_DIR')
+    if directory:
+        return directory
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'pycoolc')
+
+
+def write_atomic(path, data):
+    """Write a file atomically, creating its directory.
+
+    Returns:
+        Whether the file was written.
+
+    """
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as entry:
+                entry.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+    except OSError:
+        return False
+    return True
+
+
+class ASTCache(object):
+    """A directory of serialized ASTs.
+
+    Args:
+        directory: The cache directory, created on the first write. Defaults
+            to :func:`default_directory`.
+
+    """
+
+    suffix = '.ast'
+
+    def __init__(self, directory=None):
+        self.directory = directory or default_directory()
+
+    def version(self):
+        """Return the hash of everything besides the source that an entry depends on."""
+        return compiler_version()
+
+    def key(self, source):
+        """Return the cache key of a source string."""
+        digest = hashlib.sha256(self.version().encode())
+        digest.update(source.encode('utf-8', 'surrogatepass'))
+        return digest.hexdigest()
+
+    def path(self, key):
+        """Return the file path of the entry with ``key``."""
+        return os.path.join(self.directory, key[:2], key[2:] + self.suffix)
+
+    def get(self, source):
+        """Return the cached AST of ``source``, or `None` if there is none."""
+        try:
+            with open(self.path(self.key(source)), 'rb') as entry:
+                return self.decode(entry.read())
+        except (OSError, ValueError):
+            return None
+
+    def put(self, source, tree):
+        """Store the AST of ``source``.
+
+        Errors writing the entry are ignored, the cache is only an
+        optimization.
+
+        Returns:
+            Whether the entry was written.
+
+        """
+        return write_atomic(self.path(self.key(source)), self.encode(tree))
+
+    def encode(self, tree):
+        """Return the contents of the entry for ``tree``."""
+        return serialize.dumps(tree)
+
+    def decode(self, data):
+        """Return the value stored in an entry, raising `ValueError` if it is corrupt."""
+        return serialize.loads(data)
+
+    def clear(self):
+        """Remove all entries."""
+        if not os.path.isdir(self.directory):
+            return
+        for dirpath, dirnames, filenames in os.walk(self.directory):
+            for name in filenames:
+                if name.endswith((self.suffix, '.tmp')):
+                    os.unlink(os.path.join(dirpath, name))
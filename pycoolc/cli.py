@@ -0,0 +1,274 @@
+"""
+Command line interface to compile many cool source files in parallel.
+
+Usage::
+
+    python3 -m pycoolc [-j JOBS] [--ordered] [--scanner] [--cache] [--check] [--ast]
+                       [--stats [{text,json}]] [--no-memory] [--max-errors N]
+                       path [path ...]
+
+Directories are searched recursively for ``.cl`` files. The files are parsed
+in a pool of worker processes that load the parser tables once, and the
+results are reported as they complete (or in input order with
+``--ordered``), followed by a throughput summary on stderr. With ``--cache``,
+the ASTs of unchanged files are loaded from the cache in
+``pycoolc.cache.default_directory()``. With ``--check``, the parsed programs
+are type checked as well. With ``--stats``, the time, CPU time and peak
+memory of every phase and the numbers of tokens, reductions and AST nodes
+are reported on stderr, as a table or as JSON with ``--stats json``. Tracing
+the memory makes the phases several times slower, ``--no-memory`` turns it
+off to get accurate timings. At most ``--max-errors`` errors are reported
+per file.
+
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from . import lexer, parser, typecheck
+from .cache import ASTCache
+from .diagnostics import MAX_ERRORS, Diagnostics, line_number
+from .scanner import Scanner
+from .stats import Stats
+from .utils import print_ast
+
+
+Result = namedtuple('Result', 'path ok ast diagnostics size elapsed cached stats',
+                    defaults=(False, None))
+
+
+def find_sources(paths):
+    """Expand directories into the ``.cl`` files they contain.
+
+    Args:
+        paths: File and directory paths.
+
+    Returns:
+        A list of file paths. Files are kept in the given order, directory
+        contents are sorted.
+
+    """
+    sources = []
+    for path in paths:
+        if os.path.isdir(path):
+            found = []
+            for dirpath, dirnames, filenames in os.walk(path):
+                found.extend(os.path.join(dirpath, name) for name in filenames
+                             if name.endswith('.cl'))
+            sources.extend(sorted(found))
+        else:
+            sources.append(path)
+    return sources
+
+
+def init_worker():
+    """Load the lexer and parser tables once per worker process."""
+    lexer.get_lexer()
+    parser.get_parser()
+
+
+_scanner_parser = None
+
+
+def _parse(data, scanner, diagnostics, stats=None):
+    global _scanner_parser
+    if stats is not None:
+        return parser.Parser(lexer=Scanner() if scanner else None,
+                             stats=stats).parse(data, diagnostics)
+    if not scanner:
+        return parser.parse(data, diagnostics)
+    if _scanner_parser is None:
+        _scanner_parser = parser.Parser(lexer=Scanner())
+    return _scanner_parser.parse(data, diagnostics)
+
+
+def _phase(stats, name):
+    """Return a context manager measuring a phase if ``stats`` is given."""
+    return contextlib.nullcontext() if stats is None else stats.phase(name)
+
+
+def compile_file(path, show_ast=False, scanner=False, cache=False, check=False, stats=False,
+                 memory=True, max_errors=MAX_ERRORS):
+    """Parse a single source file.
+
+    Args:
+        path: Path to the cool source file.
+        show_ast: Whether to include the formatted AST in the result.
+        scanner: Whether to use the fast scanner instead of the PLY lexer.
+        cache: Whether to look up the AST in the :class:`ASTCache` first, and
+            to store it there after a successful parse.
+        check: Whether to type check the program after parsing it.
+        stats: Whether to collect the :class:`pycoolc.stats.Stats` of the
+            phases.
+        memory: Whether the statistics include the peak memory.
+        max_errors: The maximum number of errors of the lexer and parser.
+
+    Returns:
+        A :class:`Result`. Error messages of the lexer and parser are
+        collected in its ``diagnostics``.
+
+    """
+    start = time.perf_counter()
+    stats = Stats(memory) if stats else None
+    try:
+        with _phase(stats, 'read'), open(path, 'r') as source:
+            data = source.read()
+    except (OSError, UnicodeDecodeError) as e:
+        return Result(path, False, None, [str(e)], 0, time.perf_counter() - start,
+                      stats=stats)
+    tree = None
+    if cache:
+        with _phase(stats, 'cache'):
+            tree = ASTCache().get(data)
+    cached = tree is not None
+    diagnostics = []
+    if not cached:
+        errors = Diagnostics(max_errors)
+        tree = _parse(data, scanner, errors, stats)
+        diagnostics = errors.format(data)
+    if cache and not cached and tree is not None and not diagnostics:
+        with _phase(stats, 'cache'):
+            ASTCache().put(data, tree)
+    if check and tree is not None and not diagnostics:
+        with _phase(stats, 'typecheck'):
+            errors = typecheck.check(tree)
+        for error in errors:
+            if error.span is None:
+                diagnostics.append(error.message)
+            else:
+                diagnostics.append('Line {}: {}'.format(line_number(data, error.span[0]),
+                                                        error.message))
+    text = None
+    if show_ast and tree is not None:
+        buf = io.StringIO()
+        with _phase(stats, 'print_ast'):
+            print_ast(tree, file=buf)
+        text = buf.getvalue()
+    elapsed = time.perf_counter() - start
+    ok = tree is not None and not diagnostics
+    return Result(path, ok, text, diagnostics, len(data), elapsed, cached, stats)
+
+
+def run(paths, jobs=None, ordered=False, show_ast=False, scanner=False, cache=False,
+        check=False, stats=False, memory=True, max_errors=MAX_ERRORS):
+    """Compile files in a process pool.
+
+    Args:
+        paths: The source files.
+        jobs: Number of worker processes. Defaults to the number of CPUs. With
+            a single job, everything runs in the current process.
+        ordered: Whether to yield results in input order instead of
+            completion order.
+        show_ast: Whether to include the formatted AST in the results.
+        scanner: Whether to use the fast scanner instead of the PLY lexer.
+        cache: Whether to use the AST cache.
+        check: Whether to type check the programs.
+        stats: Whether to collect the statistics of the phases.
+        memory: Whether the statistics include the peak memory.
+        max_errors: The maximum number of errors of the lexer and parser per
+            file.
+
+    Yields:
+        A :class:`Result` per file.
+
+    """
+    jobs = jobs or os.cpu_count() or 1
+    if jobs == 1:
+        if not cache:
+            init_worker()
+        for path in paths:
+            yield compile_file(path, show_ast, scanner, cache, check, stats, memory,
+                               max_errors)
+        return
+    # With the cache, the tables are only loaded by workers that need to parse
+    initializer = None if cache else init_worker
+    with ProcessPoolExecutor(max_workers=jobs, initializer=initializer) as executor:
+        if ordered:
+            chunksize = max(1, len(paths) // (jobs * 8))
+            for result in executor.map(compile_file, paths, [show_ast] * len(paths),
+                                       [scanner] * len(paths), [cache] * len(paths),
+                                       [check] * len(paths), [stats] * len(paths),
+                                       [memory] * len(paths), [max_errors] * len(paths),
+                                       chunksize=chunksize):
+                yield result
+        else:
+            futures = [executor.submit(compile_file, path, show_ast, scanner, cache, check,
+                                       stats, memory, max_errors)
+                       for path in paths]
+            for future in as_completed(futures):
+                yield future.result()
+
+
+def main(argv=None):
+    argparser = argparse.ArgumentParser(prog='python3 -m pycoolc',
+                                        description='Compile cool source files.')
+    argparser.add_argument('paths', nargs='+', metavar='path',
+                           help='cool source file or directory to search for .cl files')
+    argparser.add_argument('-j', '--jobs', type=int, default=None,
+                           help='number of worker processes (default: number of CPUs)')
+    argparser.add_argument('--ordered', action='store_true',
+                           help='report results in input order instead of completion order')
+    argparser.add_argument('--scanner', action='store_true',
+                           help='use the fast scanner instead of the PLY lexer')
+    argparser.add_argument('--cache', action='store_true',
+                           help='load the ASTs of unchanged files from the AST cache')
+    argparser.add_argument('--check', action='store_true',
+                           help='type check the programs')
+    argparser.add_argument('--ast', action='store_true',
+                           help='print the AST of every file')
+    argparser.add_argument('--stats', nargs='?', const='text', choices=('text', 'json'),
+                           help='report the time, memory and counters of every phase on '
+                                'stderr')
+    argparser.add_argument('--no-memory', action='store_true',
+                           help='do not trace the peak memory of the phases with --stats, '
+                                'which slows them down')
+    argparser.add_argument('--max-errors', type=int, default=MAX_ERRORS, metavar='N',
+                           help='report at most N lexer and parser errors per file '
+                                '(default: {})'.format(MAX_ERRORS))
+    args = argparser.parse_args(argv)
+
+    paths = find_sources(args.paths)
+    if not paths:
+        print('No cool source files found.', file=sys.stderr)
+        return 1
+
+    start = time.perf_counter()
+    failed = 0
+    size = 0
+    stats = Stats()
+    for result in run(paths, args.jobs, args.ordered, args.ast, args.scanner, args.cache,
+                      args.check, args.stats is not None, not args.no_memory,
+                      args.max_errors):
+        size += result.size
+        if result.stats is not None:
+            stats.merge(result.stats)
+        if not result.ok:
+            failed += 1
+        status = 'ok' if result.ok else 'error'
+        if result.cached:
+            status += ' (cached)'
+        print('{}: {} ({:.2f} ms)'.format(result.path, status, result.elapsed * 1e3))
+        for message in result.diagnostics:
+            print('  ' + message)
+        if result.ast is not None:
+            sys.stdout.write(result.ast)
+    elapsed = time.perf_counter() - start
+
+    if args.stats == 'json':
+        summary = {'files': len(paths), 'failed': failed, 'bytes': size, 'elapsed': elapsed}
+        json.dump(dict(stats.to_dict(), summary=summary), sys.stderr, indent=2)
+        print(file=sys.stderr)
+        return 1 if failed else 0
+    print('{} files, {} failed, {:.2f} s, {:.1f} files/s, {:.1f} KiB/s'.format(
+        len(paths), failed, elapsed, len(paths) / elapsed, size / 1024 / elapsed),
+        file=sys.stderr)
+    if args.stats == 'text':
+        print(file=sys.stderr)
+        print(stats.format(), file=sys.stderr)
+    return 1 if failed else 0
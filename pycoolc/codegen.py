@@ -0,0 +1,719 @@
+"""
+A backend translating cool programs into Python source code.
+
+The program is translated into a Python module, which is compiled with
+:func:`compile` and executed with :func:`exec`:
+
+* Every cool class becomes a Python class ``C_<name>`` inheriting from the
+  class of its parent, with the attributes in ``__slots__`` (``a_<name>``).
+  ``Object`` and ``IO`` are defined by a fixed prelude. ``Int``, ``Bool``
+  and ``String`` are native Python values, as in the other engines.
+* Every method becomes a Python method ``m_<name>``, so a dispatch is a
+  Python method call, a static dispatch a call of the function of the
+  target class.
+* Variables become Python locals, ``While``, ``If``, ``Let`` and ``Case``
+  are lowered into ``while`` loops, ``if`` statements and assignments.
+  Expressions containing statements are split into statements assigning
+  temporaries, keeping cool's evaluation order (the arguments of a dispatch
+  are evaluated before its receiver).
+* Static types known from type checking pick the cheapest translation of
+  the ``=`` operator and inline the methods of ``String``.
+
+The code objects can be stored in a :class:`CodeCache`, so that running an
+unchanged program neither parses, checks nor translates it again.
+
+Usage::
+
+    python3 -m pycoolc.codegen [--print] path/to/sourcefile.cl
+
+Example::
+
+    >>> program = parse('class Main inherits IO { main() : Object { out_int(6 * 7) }; };')
+    >>> PythonProgram.compile(program).run()
+    42
+
+Limitations: Python allows at most 100 levels of indentation, which limits
+how deeply ``If``, ``While``, ``Let`` and ``Case`` expressions containing
+statements can be nested.
+
+"""
+import builtins
+import hashlib
+import importlib.util
+import marshal
+import os
+import re
+import sys
+
+from . import ast
+from .cache import ASTCache, compiler_version
+from .runtime import Abort, ExecutionError, unescape
+from .semant import BOOL, INT, MAIN, OBJECT, SELF, SELF_TYPE, STRING, ClassTable, \
+        SemanticError
+from .typecheck import annotate
+from .visitor import NodeVisitor
+
+
+# The runtime support of the generated code. ``_stdin``, ``_stdout``,
+# ``ExecutionError`` and ``Abort`` are provided by the namespace the code
+# runs in, ``_SPANS`` is appended to every module.
+PRELUDE = r'''
+_write = _stdout.write
+_readline = _stdin.readline
+_NAMES = {int: 'Int', bool: 'Bool', str: 'String'}
+
+
+def _class_name(obj):
+    return _NAMES.get(obj.__class__) or obj._name
+
+
+def _void(k):
+    raise ExecutionError('Dispatch to void', _SPANS[k])
+
+
+def _static(obj, k):
+    if obj is None:
+        _void(k)
+    return obj
+
+
+def _call(obj, name, k):
+    if obj is None:
+        _void(k)
+    if obj.__class__ in _NAMES:
+        return getattr(C_Object, name)(obj)
+    return getattr(obj, name)()
+
+
+def _case_void(k):
+    raise ExecutionError('Case on void', _SPANS[k])
+
+
+def _no_branch(obj, k):
+    raise ExecutionError('No case branch matches class ' + _class_name(obj), _SPANS[k])
+
+
+def _div(left, right, k):
+    if right == 0:
+        raise ExecutionError('Division by zero', _SPANS[k])
+    quotient = abs(left) // abs(right)
+    if (left < 0) != (right < 0):
+        return -quotient
+    return quotient if quotient <= 2147483647 else -2147483648
+
+
+def _substr(s, i, l, k):
+    if i < 0 or l < 0 or i + l > len(s):
+        raise ExecutionError('Substring out of range', _SPANS[k])
+    return s[i:i + l]
+
+
+def _eq(left, right):
+    return left is right or (left.__class__ is right.__class__ and
+                             left.__class__ in _NAMES and left == right)
+
+
+class C_Object(object):
+    __slots__ = ()
+    _name = 'Object'
+    _attributes = ()
+
+    def m_abort(self):
+        _write('Abort called from class ' + _class_name(self) + '\n')
+        raise Abort()
+
+    def m_type_name(self):
+        return _class_name(self)
+
+    def m_copy(self):
+        if self.__class__ in _NAMES:
+            return self
+        obj = object.__new__(self.__class__)
+        for name in self._attributes:
+            setattr(obj, name, getattr(self, name))
+        return obj
+
+
+class C_IO(C_Object):
+    __slots__ = ()
+    _name = 'IO'
+
+    def m_out_string(self, x):
+        _write(x)
+        return self
+
+    def m_out_int(self, x):
+        _write(str(x))
+        return self
+
+    def m_in_string(self):
+        line = _readline()
+        return line[:-1] if line.endswith('\n') else line
+
+    def m_in_int(self):
+        try:
+            value = int(_readline().strip())
+        except ValueError:
+            return 0
+        return value if -2147483648 <= value <= 2147483647 else 0
+'''
+
+# Expressions without side effects, which need not be evaluated for their
+# side effects and may be evaluated later than written
+_SIMPLE_RE = re.compile(r'(self(\.a_\w+)?|v\w*|t\d+|-?\d+|True|False|None)\Z')
+# Expressions whose value never changes
+_CONSTANT_RE = re.compile(r'(self|t\d+|-?\d+|True|False|None)\Z')
+
+# Longer expressions are assigned to a temporary
+MAX_EXPRESSION_LENGTH = 300
+
+_DEFAULTS = {INT: '0', STRING: "''", BOOL: 'False'}
+# The Python classes of the values of the basic classes without a C_ class
+_PYTHON_CLASSES = {INT: 'int', BOOL: 'bool', STRING: 'str'}
+_WRAP = '((({}) + 2147483648 & 4294967295) - 2147483648)'
+
+
+def _simple(expr):
+    # Only string literals start with a quote, other expressions are in
+    # parentheses
+    return _SIMPLE_RE.match(expr) is not None or expr[0] in '\'"'
+
+
+def _constant(expr):
+    return _CONSTANT_RE.match(expr) is not None or expr[0] in '\'"'
+
+
+def _indent(lines):
+    return ['    ' + line if line else line for line in lines]
+
+
+def _select(number, branches, first=0):
+    """Return the lines running the branch number ``number``, by binary search."""
+    if len(branches) == 1:
+        return branches[0]
+    middle = len(branches) // 2
+    return (['if {} < {}:'.format(number, first + middle)] +
+            _indent(_select(number, branches[:middle], first)) + ['else:'] +
+            _indent(_select(number, branches[middle:], first + middle)))
+
+
+class Generator(NodeVisitor):
+    """Translates a program into the source code of a Python module.
+
+    Args:
+        program: The AST of the program, which must be type correct.
+        table: The :class:`pycoolc.semant.ClassTable` of the program, if it
+            is already known.
+
+    Raises:
+        pycoolc.semant.SemanticError: The first error found in the program.
+
+    """
+
+    def __init__(self, program, table=None):
+        self.program = program
+        self.table = table or ClassTable(program)
+        self.annotations = annotate(program, self.table)
+        self.spans = []
+        self.cases = []
+
+    def generate(self):
+        """Return the source code of the module."""
+        lines = [PRELUDE]
+        for name in self.table.order:
+            info = self.table[name]
+            if not info.basic:
+                lines.extend(self._class(info))
+        lines.append('')
+        lines.append('_SPANS = {!r}'.format(tuple(self.spans)))
+        lines.extend(self.cases)
+        return '\n'.join(lines) + '\n'
+
+    def _span(self, node):
+        """Return the index of the span of ``node`` in ``_SPANS``."""
+        self.spans.append(node.span)
+        return len(self.spans) - 1
+
+    ###### CLASSES AND METHODS ######
+
+    def _class(self, info):
+        self.cls = info
+        own = [name for name, attribute in info.attributes.items() if attribute.owner == info.name]
+        lines = ['', '', 'class C_{}(C_{}):'.format(info.name, info.parent)]
+        body = ['__slots__ = {!r}'.format(tuple('a_' + name for name in own)),
+                '_name = {!r}'.format(str(info.name)),
+                '_attributes = {!r}'.format(tuple('a_' + name for name in info.attributes))]
+        if info.attributes:
+            init = ['self.a_{} = {}'.format(name, _DEFAULTS.get(attribute.type, 'None'))
+                    for name, attribute in info.attributes.items()]
+            for ancestor in info.ancestors:
+                ancestor = self.table[ancestor]
+                if any(feature.expr is not None for feature in self._attributes(ancestor)):
+                    init.append('self._i_{}()'.format(ancestor.name))
+            body += [''] + self._function('__init__', [], init)
+        initializers = []
+        self._start({})
+        for feature in self._attributes(info):
+            if feature.expr is not None:
+                expr_lines, expr = self.compile(feature.expr)
+                initializers += expr_lines + ['self.a_{} = {}'.format(feature.ident.name, expr)]
+        if initializers:
+            body += [''] + self._function('_i_' + info.name, [], initializers)
+        for feature in info.node.features:
+            if isinstance(feature, ast.Method):
+                body += [''] + self._method(feature)
+        return lines + _indent(body)
+
+    def _attributes(self, info):
+        if info.basic:
+            return []
+        return [feature for feature in info.node.features if isinstance(feature, ast.Attribute)]
+
+    def _method(self, node):
+        names = [formal.ident.name for formal in node.formals]
+        self._start(dict((name, 'v_' + name) for name in names))
+        lines, expr = self.compile(node.expr)
+        return self._function('m_' + node.ident.name, ['v_' + name for name in names],
+                              lines + ['return ' + expr])
+
+    def _function(self, name, params, lines):
+        return ['def {}({}):'.format(name, ', '.join(['self'] + params))] + _indent(lines)
+
+    def _start(self, scope):
+        """Start translating the body of a new function."""
+        self.scope = scope
+        self.locals = 0
+
+    def _local(self, name):
+        """Return a new Python local for the cool variable ``name``."""
+        self.locals += 1
+        return 'v{}_{}'.format(self.locals, name)
+
+    def _temp(self):
+        """Return a new Python local for an intermediate value."""
+        self.locals += 1
+        return 't{}'.format(self.locals)
+
+    def _spill(self, lines, expr):
+        """Assign ``expr`` to a temporary, returning the temporary."""
+        temp = self._temp()
+        lines.append('{} = {}'.format(temp, expr))
+        return temp
+
+    ###### EXPRESSIONS ######
+
+    def compile(self, node):
+        """Translate an expression.
+
+        Returns:
+            A list of the lines of Python statements to execute first and
+            the Python expression computing the value.
+
+        """
+        return self.visit(node)
+
+    def _result(self, lines, expr):
+        """Return the translation of a compound expression.
+
+        Long expressions are assigned to a temporary, to stay below the
+        nesting limits of the Python parser.
+
+        """
+        if len(expr) > MAX_EXPRESSION_LENGTH:
+            lines = list(lines)
+            expr = self._spill(lines, expr)
+        return lines, expr
+
+    def _sequence(self, nodes):
+        """Translate expressions evaluated from left to right.
+
+        The value of an expression followed by one with statements is
+        assigned to a temporary, so that it is computed first.
+
+        Returns:
+            A list of lines and a list of Python expressions.
+
+        """
+        results = []
+        for node in nodes:
+            results.append((yield node))
+        last = max([i for i, (lines, expr) in enumerate(results) if lines] or [-1])
+        lines = []
+        exprs = []
+        for i, (node_lines, expr) in enumerate(results):
+            lines.extend(node_lines)
+            if i < last and not _constant(expr):
+                expr = self._spill(lines, expr)
+            exprs.append(expr)
+        return lines, exprs
+
+    def visit_int(self, value):
+        return [], repr(value)
+
+    visit_bool = visit_int
+
+    def visit_str(self, value):
+        return [], repr(str(unescape(value)))
+
+    def visit_Ident(self, node):
+        if node.name == SELF:
+            return [], 'self'
+        if node.name in self.scope:
+            return [], self.scope[node.name]
+        return [], 'self.a_' + node.name
+
+    def visit_Assignment(self, node):
+        lines, expr = yield node.expr
+        name = node.ident.name
+        target = self.scope[name] if name in self.scope else 'self.a_' + name
+        return lines + ['{} = {}'.format(target, expr)], target
+
+    def visit_Block(self, node):
+        lines = []
+        *init, last = node.elements
+        for element in init:
+            element_lines, expr = yield element
+            lines.extend(element_lines)
+            if not _simple(expr):
+                lines.append(expr)
+        last_lines, expr = yield last
+        return lines + last_lines, expr
+
+    def visit_If(self, node):
+        lines, condition = yield node.condition
+        true_lines, true = yield node.true
+        false_lines, false = yield node.false
+        if not true_lines and not false_lines:
+            return self._result(lines, '({} if {} else {})'.format(true, condition, false))
+        result = self._temp()
+        lines = lines + ['if {}:'.format(condition)]
+        lines += _indent(true_lines + ['{} = {}'.format(result, true)])
+        lines += ['else:'] + _indent(false_lines + ['{} = {}'.format(result, false)])
+        return lines, result
+
+    def visit_While(self, node):
+        condition_lines, condition = yield node.condition
+        body, expr = yield node.action
+        if not _simple(expr):
+            body = body + [expr]
+        if not condition_lines:
+            return ['while {}:'.format(condition)] + _indent(body or ['pass']), 'None'
+        body = condition_lines + ['if not {}:'.format(condition), '    break'] + body
+        return ['while True:'] + _indent(body), 'None'
+
+    def visit_Let(self, node):
+        scope = self.scope
+        lines = []
+        for attribute in node.assignments:
+            if attribute.expr is None:
+                expr = _DEFAULTS.get(attribute.type, 'None')
+            else:
+                expr_lines, expr = yield attribute.expr
+                lines.extend(expr_lines)
+            # The initializer still sees the previous binding of the name
+            name = self._local(attribute.ident.name)
+            self.scope = dict(self.scope)
+            self.scope[attribute.ident.name] = name
+            lines.append('{} = {}'.format(name, expr))
+        body_lines, expr = yield node.expr
+        self.scope = scope
+        return lines + body_lines, expr
+
+    def visit_Case(self, node):
+        lines, expr = yield node.expr
+        value = expr if expr == 'self' else self._spill(lines, expr)
+        span = self._span(node)
+        result = self._temp()
+        lines.append('if {} is None:'.format(value))
+        lines.append('    _case_void({})'.format(span))
+        # The branch is selected by its number, looked up by the class of the value
+        table = '_CASE{}'.format(span)
+        selected = self.table.case_table([action.type for action in node.typeactions])
+        self.cases.append('{} = {{{}}}'.format(table, ', '.join(
+            '{}: {}'.format(_PYTHON_CLASSES.get(info.name, 'C_' + info.name), selected[info.tag])
+            for info in self.table if selected[info.tag] is not None)))
+        number = self._temp()
+        lines.append('{} = {}.get({}.__class__)'.format(number, table, value))
+        lines.append('if {} is None:'.format(number))
+        lines.append('    _no_branch({}, {})'.format(value, span))
+        branches = []
+        for action in node.typeactions:
+            scope = self.scope
+            name = self._local(action.ident.name)
+            self.scope = dict(scope)
+            self.scope[action.ident.name] = name
+            branch_lines, expr = yield action.expr
+            self.scope = scope
+            branches.append(['{} = {}'.format(name, value)] + branch_lines +
+                            ['{} = {}'.format(result, expr)])
+        return lines + _select(number, branches), result
+
+    def visit_New(self, node):
+        if node.type in _DEFAULTS:
+            return [], _DEFAULTS[node.type]
+        if node.type == SELF_TYPE:
+            return [], 'self.__class__()'
+        return [], 'C_{}()'.format(node.type)
+
+    def visit_UnaryOperation(self, node):
+        lines, right = yield node.right
+        operator = node.operator.lower()
+        if operator == '~':
+            return self._result(lines, _WRAP.format('-' + right))
+        if operator == 'not':
+            return self._result(lines, '(not {})'.format(right))
+        if self.annotations[id(node)] in _DEFAULTS:
+            # Basic values are never void, and Python warns about comparing
+            # literals with "is"
+            if not _simple(right):
+                self._spill(lines, right)
+            return lines, 'False'
+        return self._result(lines, '({} is None)'.format(right))
+
+    def visit_BinaryOperation(self, node):
+        lines, (left, right) = yield from self._sequence([node.left, node.right])
+        operator = node.operator
+        if operator in ('+', '-', '*'):
+            return self._result(lines, _WRAP.format('{} {} {}'.format(left, operator, right)))
+        if operator == '/':
+            return self._result(lines, '_div({}, {}, {})'.format(left, right, self._span(node)))
+        if operator in ('<', '<='):
+            return self._result(lines, '({} {} {})'.format(left, operator, right))
+        types = self.annotations[id(node)]
+        if any(type in _DEFAULTS for type in types):
+            return self._result(lines, '({} == {})'.format(left, right))
+        if OBJECT not in types:
+            return self._result(lines, '({} is {})'.format(left, right))
+        return self._result(lines, '_eq({}, {})'.format(left, right))
+
+    def visit_FunctionCall(self, node):
+        lines, args = yield from self._sequence(node.params)
+        return self._result(lines, 'self.m_{}({})'.format(node.ident.name, ', '.join(args)))
+
+    def visit_MethodCall(self, node):
+        call = node.method
+        name = call.ident.name
+        lines, exprs = yield from self._sequence(list(call.params) + [node.object])
+        *args, receiver = exprs
+        # Python looks up the method before evaluating the arguments, cool
+        # evaluates the arguments first
+        if not _constant(receiver) and not all(_simple(expr) for expr in exprs):
+            args = [arg if _constant(arg) else self._spill(lines, arg) for arg in args]
+        cls = self.annotations[id(node)]
+        if cls in _DEFAULTS:
+            return self._result(lines, self._basic_method(node, name, receiver, args))
+        if node.targettype is not None:
+            receiver = '_static({}, {})'.format(receiver, self._span(node))
+            return self._result(lines, 'C_{}.m_{}({})'.format(cls, name,
+                                                              ', '.join([receiver] + args)))
+        if cls == OBJECT:
+            return self._result(lines, "_call({}, 'm_{}', {})".format(receiver, name,
+                                                                      self._span(node)))
+        if receiver != 'self' and not isinstance(node.object, ast.New):
+            # Check for void inline, the receiver is evaluated twice
+            if not _simple(receiver):
+                receiver = self._spill(lines, receiver)
+            receiver = '({0} if {0} is not None else _void({1}))'.format(receiver,
+                                                                         self._span(node))
+        return self._result(lines, '{}.m_{}({})'.format(receiver, name, ', '.join(args)))
+
+    def _basic_method(self, node, name, receiver, args):
+        """Translate a call of a method of ``Int``, ``Bool`` or ``String``.
+
+        Values of these classes are never void.
+
+        """
+        if name == 'length':
+            return 'len({})'.format(receiver)
+        if name == 'concat':
+            return '({} + {})'.format(receiver, args[0])
+        if name == 'substr':
+            return '_substr({}, {}, {}, {})'.format(receiver, args[0], args[1], self._span(node))
+        return 'C_Object.m_{}({})'.format(name, receiver)
+
+
+def generate(program, table=None):
+    """Return the source code of the Python module of a program.
+
+    Raises:
+        pycoolc.semant.SemanticError: If the program is not type correct.
+
+    """
+    return Generator(program, table).generate()
+
+
+def compile_program(program, table=None):
+    """Translate a program and compile it into a Python code object.
+
+    Raises:
+        pycoolc.semant.SemanticError: If the program is not type correct.
+
+    """
+    return compile(generate(program, table), '<cool>', 'exec')
+
+
+###### CACHE ######
+
+# Modules the generated code depends on, besides those of the AST
+VERSIONED_MODULES = ('codegen.py', 'runtime.py', 'semant.py', 'typecheck.py')
+
+MAGIC = importlib.util.MAGIC_NUMBER
+
+
+class CodeCache(ASTCache):
+    """A directory of compiled programs, keyed by their cool source.
+
+    Entries are marshaled code objects, prefixed like ``.pyc`` files with
+    the magic number of the Python version. Their keys additionally depend
+    on the code generator and the Python version.
+
+    Args:
+        directory: The cache directory, created on the first write. Defaults
+            to :func:`pycoolc.cache.default_directory`.
+
+    """
+
+    suffix = '.pyc'
+    _version = None
+
+    def version(self):
+        if CodeCache._version is None:
+            digest = hashlib.sha256(compiler_version().encode() + MAGIC)
+            package_dir = os.path.dirname(os.path.abspath(__file__))
+            for name in VERSIONED_MODULES:
+                with open(os.path.join(package_dir, name), 'rb') as module:
+                    digest.update(module.read())
+            CodeCache._version = digest.hexdigest()
+        return CodeCache._version
+
+    def encode(self, code):
+        return MAGIC + marshal.dumps(code)
+
+    def decode(self, data):
+        if data[:len(MAGIC)] != MAGIC:
+            raise ValueError('Bad magic number')
+        try:
+            return marshal.loads(data[len(MAGIC):])
+        except (EOFError, TypeError) as e:
+            raise ValueError(str(e))
+
+
+###### EXECUTION ######
+
+class PythonProgram(object):
+    """A program compiled into a Python code object.
+
+    Args:
+        code: The code object of the module, see :func:`compile_program`.
+        stdin: The input of the program. Defaults to ``sys.stdin``.
+        stdout: The output of the program. Defaults to ``sys.stdout``.
+
+    """
+
+    def __init__(self, code, stdin=None, stdout=None):
+        self.code = code
+        self.stdin = stdin or sys.stdin
+        self.stdout = stdout or sys.stdout
+
+    @classmethod
+    def compile(cls, program, table=None, stdin=None, stdout=None):
+        """Translate the AST of a program.
+
+        Raises:
+            pycoolc.semant.SemanticError: If the program is not type correct.
+
+        """
+        return cls(compile_program(program, table), stdin, stdout)
+
+    @classmethod
+    def load(cls, source, cache=None, stdin=None, stdout=None, diagnostics=None):
+        """Parse, check and translate the source code of a program.
+
+        Args:
+            source: The cool source code.
+            cache: A :class:`CodeCache` to look up the code in first, and to
+                store it in.
+            diagnostics: The :class:`pycoolc.diagnostics.Diagnostics` to
+                record the syntax errors in.
+
+        Returns:
+            The program, or `None` if the source could not be parsed.
+
+        Raises:
+            pycoolc.semant.SemanticError: If the program is not type correct.
+
+        """
+        code = None if cache is None else cache.get(source)
+        if code is None:
+            from .diagnostics import Diagnostics
+            from .parser import parse
+            if diagnostics is None:
+                diagnostics = Diagnostics()
+            program = parse(source, diagnostics)
+            if program is None or diagnostics:
+                return None
+            code = compile_program(program)
+            if cache is not None:
+                cache.put(source, code)
+        return cls(code, stdin, stdout)
+
+    def run(self):
+        """Run the program, calling ``main()`` on a new ``Main`` object.
+
+        Returns:
+            The result of ``main()``.
+
+        Raises:
+            pycoolc.runtime.ExecutionError: On a runtime error.
+            pycoolc.runtime.Abort: If the program called ``abort()``.
+
+        """
+        namespace = {'__name__': '__cool__', '__builtins__': builtins, '_stdin': self.stdin,
+                     '_stdout': self.stdout, 'ExecutionError': ExecutionError, 'Abort': Abort}
+        exec(self.code, namespace)
+        try:
+            return namespace['C_' + MAIN]().m_main()
+        except RecursionError:
+            raise ExecutionError('Stack overflow')
+
+
+def main(argv=None):
+    from .diagnostics import Diagnostics
+    from .parser import parse
+
+    argv = sys.argv[1:] if argv is None else argv
+    show = '--print' in argv
+    paths = [arg for arg in argv if arg != '--print']
+    if len(paths) != 1:
+        print('You need to specify a cool source file to run.', file=sys.stderr)
+        return 1
+    with open(paths[0], 'r') as source:
+        data = source.read()
+    diagnostics = Diagnostics()
+    try:
+        if show:
+            program = parse(data, diagnostics)
+            if program is not None and not diagnostics:
+                print(generate(program), end='')
+                return 0
+        else:
+            program = PythonProgram.load(data, CodeCache(), diagnostics=diagnostics)
+    except SemanticError as e:
+        print(e.message, file=sys.stderr)
+        return 1
+    for line in diagnostics.format(data):
+        print(line, file=sys.stderr)
+    if program is None or diagnostics:
+        return 1
+    try:
+        program.run()
+    except Abort:
+        return 1
+    except ExecutionError as e:
+        print('Runtime error: {}'.format(e.message), file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,143 @@
+"""
+Structured error reporting of the lexer and the parser.
+
+The lexers and the parser don't print anything, they record their errors in
+a :class:`Diagnostics` object, which the caller formats and reports once
+the source is parsed. Runs of illegal characters are recorded as a single
+diagnostic, and the number of errors per source is capped, so that garbage
+input produces a short list of errors instead of one line per character.
+
+Example::
+
+    >>> diagnostics = Diagnostics()
+    >>> tree = Parser().parse(source, diagnostics)
+    >>> for line in diagnostics.format(source):
+    ...     print(line, file=sys.stderr)
+
+"""
+from collections import namedtuple
+
+
+# The default number of errors reported per source
+MAX_ERRORS = 100
+
+# Kinds of diagnostics
+LEXICAL = 'lexical'
+SYNTAX = 'syntax'
+FATAL = 'fatal'
+
+# Illegal characters shown in a message, longer runs are abbreviated
+_SHOWN = 20
+
+
+Diagnostic = namedtuple('Diagnostic', 'kind message span')
+Diagnostic.__doc__ = """An error with its kind, message and ``(start, end)`` offsets,
+or `None` if it doesn't belong to a part of the source."""
+
+
+def line_number(source, offset):
+    """Return the line number of ``offset`` in ``source``, starting at 1."""
+    return source.count('\n', 0, offset) + 1
+
+
+def _illegal_message(text, length):
+    shown = text[:_SHOWN].encode('unicode_escape').decode('ascii').replace("'", "\\'")
+    if length > _SHOWN:
+        shown += '...'
+    if length == 1:
+        return "Illegal character '{}'".format(shown)
+    return "Illegal characters '{}'".format(shown)
+
+
+class Diagnostics(object):
+    """Collects the errors of a source.
+
+    Once ``limit`` errors are recorded, a last :data:`FATAL` diagnostic is
+    added and all further errors are dropped. The lexers and the parser stop
+    early when the collector is ``full``.
+
+    Args:
+        limit: The maximum number of errors recorded. Defaults to
+            :data:`MAX_ERRORS`.
+
+    Attributes:
+        errors: The :class:`Diagnostic`\\ s in the order they were found.
+        full: Whether the limit was reached.
+
+    """
+
+    def __init__(self, limit=MAX_ERRORS):
+        self.limit = limit
+        self.errors = []
+        self.full = False
+        # The start, end and shown text of the last diagnostic if it is a run
+        # of illegal characters
+        self._run = None
+
+    def __len__(self):
+        return len(self.errors)
+
+    def __bool__(self):
+        return bool(self.errors)
+
+    def __iter__(self):
+        return iter(self.errors)
+
+    def error(self, kind, message, span=None):
+        """Record an error.
+
+        Returns:
+            `False` if the error was dropped because the limit is reached.
+
+        """
+        self._run = None
+        if self.full:
+            return False
+        if len(self.errors) >= self.limit:
+            self.errors.append(Diagnostic(FATAL, 'Too many errors, giving up', None))
+            self.full = True
+            return False
+        self.errors.append(Diagnostic(kind, message, span))
+        return True
+
+    def illegal(self, text, start):
+        """Record the illegal characters ``text`` found at offset ``start``.
+
+        Characters directly following the previous illegal ones are merged
+        into its diagnostic.
+
+        Returns:
+            `False` if the error was dropped because the limit is reached.
+
+        """
+        run = self._run
+        end = start + len(text)
+        if run is not None and run[1] == start:
+            start = run[0]
+            # Only the start of a run is shown
+            text = (run[2] + text)[:_SHOWN + 1]
+            self.errors[-1] = Diagnostic(LEXICAL, _illegal_message(text, end - start),
+                                         (start, end))
+        elif not self.error(LEXICAL, _illegal_message(text, len(text)), (start, end)):
+            return False
+        self._run = start, end, text[:_SHOWN + 1]
+        return True
+
+    def format(self, source):
+        """Return the messages as a list of ``'Line N: message'`` strings."""
+        lines = []
+        # The errors are close to source order, so count the lines between
+        # an error and the previous one
+        offset, line = 0, 1
+        for diagnostic in self.errors:
+            if diagnostic.span is None:
+                lines.append(diagnostic.message)
+                continue
+            start = diagnostic.span[0]
+            if start < offset:
+                line -= source.count('\n', start, offset)
+            else:
+                line += source.count('\n', offset, start)
+            offset = start
+            lines.append('Line {}: {}'.format(line, diagnostic.message))
+        return lines
@@ -0,0 +1,213 @@
+"""
+A straightforward tree-walking evaluator.
+
+Evaluates the AST directly: every evaluation of a node looks up the method
+for its type and every variable is looked up by name in a dict. This is the
+reference implementation of the semantics, the faster execution engines are
+tested and benchmarked against it.
+
+Example::
+
+    >>> program = parse('class Main inherits IO { main() : Object { out_int(6 * 7) }; };')
+    >>> Evaluator(program).run()
+    42
+
+"""
+from .runtime import ExecutionError, Runtime, default, divide, equal, int32, unescape
+from .semant import MAIN, MAIN_METHOD, SELF, SELF_TYPE, ClassTable
+
+
+_MISSING = object()
+
+
+class Evaluator(object):
+    """Evaluates a program by walking its AST.
+
+    The program must be type correct, see :func:`pycoolc.typecheck.check`.
+
+    Args:
+        program: The AST of the program.
+        table: The :class:`pycoolc.semant.ClassTable` of the program, if it
+            is already known.
+        stdin: The input of the program. Defaults to ``sys.stdin``.
+        stdout: The output of the program. Defaults to ``sys.stdout``.
+
+    """
+
+    def __init__(self, program, table=None, stdin=None, stdout=None):
+        self.table = table or ClassTable(program)
+        self.runtime = Runtime(self.table, stdin, stdout)
+        for info in self.table:
+            if info.basic:
+                continue
+            cls = self.runtime.classes[info.name]
+            for name, method in info.methods.items():
+                if not self.table[method.owner].basic:
+                    cls.vtable[method.index] = self._method(method.node)
+            for attribute in info.attributes.values():
+                if attribute.node.expr is not None:
+                    cls.initializers.append(self._initializer(attribute))
+
+    def run(self):
+        """Run the program, calling ``main()`` on a new ``Main`` object.
+
+        Returns:
+            The result of ``main()``.
+
+        """
+        try:
+            main = self.runtime.new(self.runtime.classes[MAIN])
+            return main.cls.lookup(MAIN_METHOD)(main, [])
+        except RecursionError:
+            raise ExecutionError('Stack overflow')
+
+    def _method(self, node):
+        names = [formal.ident.name for formal in node.formals]
+
+        def method(receiver, args):
+            return self.evaluate(node.expr, receiver, dict(zip(names, args)))
+        return method
+
+    def _initializer(self, attribute):
+        def initializer(obj):
+            obj.fields[attribute.index] = self.evaluate(attribute.node.expr, obj, {})
+        return initializer
+
+    def evaluate(self, node, receiver, env):
+        """Evaluate an expression.
+
+        Args:
+            node: The expression.
+            receiver: The value of ``self``.
+            env: A dict of the local variables.
+
+        Returns:
+            The value of the expression.
+
+        """
+        return getattr(self, 'evaluate_' + node.__class__.__name__)(node, receiver, env)
+
+    def evaluate_int(self, node, receiver, env):
+        return node
+
+    evaluate_bool = evaluate_int
+
+    def evaluate_str(self, node, receiver, env):
+        return unescape(node)
+
+    def evaluate_Ident(self, node, receiver, env):
+        if node.name in env:
+            return env[node.name]
+        if node.name == SELF:
+            return receiver
+        return receiver.fields[receiver.cls.slots[node.name]]
+
+    def evaluate_Assignment(self, node, receiver, env):
+        value = self.evaluate(node.expr, receiver, env)
+        if node.ident.name in env:
+            env[node.ident.name] = value
+        else:
+            receiver.fields[receiver.cls.slots[node.ident.name]] = value
+        return value
+
+    def evaluate_Block(self, node, receiver, env):
+        value = None
+        for element in node.elements:
+            value = self.evaluate(element, receiver, env)
+        return value
+
+    def evaluate_If(self, node, receiver, env):
+        if self.evaluate(node.condition, receiver, env):
+            return self.evaluate(node.true, receiver, env)
+        return self.evaluate(node.false, receiver, env)
+
+    def evaluate_While(self, node, receiver, env):
+        while self.evaluate(node.condition, receiver, env):
+            self.evaluate(node.action, receiver, env)
+        return None
+
+    def _bind(self, env, name, value, body, receiver):
+        """Evaluate ``body`` with ``name`` bound to ``value``."""
+        previous = env.get(name, _MISSING)
+        env[name] = value
+        try:
+            return body(receiver, env)
+        finally:
+            if previous is _MISSING:
+                del env[name]
+            else:
+                env[name] = previous
+
+    def evaluate_Let(self, node, receiver, env, first=0):
+        if first == len(node.assignments):
+            return self.evaluate(node.expr, receiver, env)
+        attribute = node.assignments[first]
+        if attribute.expr is None:
+            value = default(attribute.type)
+        else:
+            value = self.evaluate(attribute.expr, receiver, env)
+        return self._bind(env, attribute.ident.name, value,
+                          lambda receiver, env: self.evaluate_Let(node, receiver, env, first + 1),
+                          receiver)
+
+    def evaluate_Case(self, node, receiver, env):
+        value = self.evaluate(node.expr, receiver, env)
+        if value is None:
+            raise ExecutionError('Case on void', node.span)
+        cls = self.runtime.class_of(value)
+        for ancestor in reversed(cls.ancestors):
+            for action in node.typeactions:
+                if action.type == ancestor:
+                    return self._bind(env, action.ident.name, value,
+                                      lambda receiver, env: self.evaluate(action.expr, receiver,
+                                                                          env),
+                                      receiver)
+        raise ExecutionError('No case branch matches class {}'.format(cls.name), node.span)
+
+    def evaluate_New(self, node, receiver, env):
+        if node.type == SELF_TYPE:
+            return self.runtime.new(receiver.cls)
+        return self.runtime.new(self.runtime.classes[node.type])
+
+    def evaluate_UnaryOperation(self, node, receiver, env):
+        value = self.evaluate(node.right, receiver, env)
+        operator = node.operator.lower()
+        if operator == '~':
+            return int32(-value)
+        if operator == 'not':
+            return not value
+        return value is None
+
+    def evaluate_BinaryOperation(self, node, receiver, env):
+        left = self.evaluate(node.left, receiver, env)
+        right = self.evaluate(node.right, receiver, env)
+        operator = node.operator
+        if operator == '+':
+            return int32(left + right)
+        if operator == '-':
+            return int32(left - right)
+        if operator == '*':
+            return int32(left * right)
+        if operator == '/':
+            return divide(left, right, node.span)
+        if operator == '<':
+            return left < right
+        if operator == '<=':
+            return left <= right
+        return equal(left, right)
+
+    def evaluate_FunctionCall(self, node, receiver, env):
+        args = [self.evaluate(param, receiver, env) for param in node.params]
+        return self.runtime.class_of(receiver).lookup(node.ident.name)(receiver, args)
+
+    def evaluate_MethodCall(self, node, receiver, env):
+        call = node.method
+        args = [self.evaluate(param, receiver, env) for param in call.params]
+        obj = self.evaluate(node.object, receiver, env)
+        if obj is None:
+            raise ExecutionError('Dispatch to void', node.span)
+        if node.targettype is None:
+            cls = self.runtime.class_of(obj)
+        else:
+            cls = self.runtime.classes[node.targettype]
+        return cls.lookup(call.ident.name)(obj, args)
@@ -0,0 +1,169 @@
+"""
+Incremental reparsing of edited sources at class granularity.
+
+A cool program is a sequence of ``class ... ;`` definitions. After an edit,
+only the classes touching the edited text are parsed again. The classes in
+front of the edit are reused as they are, the ones behind it are reused with
+their spans shifted by the change in length.
+
+Reparsing a region is only valid if the edit cannot change how the text
+around it is tokenized, e.g. by opening a comment that swallows the classes
+behind it. This is checked by making sure that the first class behind the
+region still starts with a ``class`` token. Whenever the region cannot be
+parsed on its own, the whole source is parsed instead, so the result is
+always the same as that of a full parse. The same happens after a parse
+with errors, whose AST lacks the broken parts of the source.
+
+Example::
+
+    >>> source = 'class A {}; class B {};'
+    >>> tree = parse(source)
+    >>> b = tree[1]
+    >>> source, tree = reparse(source, tree, Edit(9, 9, 'x : Int;'))
+    >>> source
+    'class A {x : Int;}; class B {};'
+    >>> tree[1] is b
+    True
+
+"""
+from collections import namedtuple
+
+from . import ast, scanner
+from .diagnostics import Diagnostics
+from .parser import parse
+
+
+Edit = namedtuple('Edit', 'start end text')
+Edit.__doc__ = """Replacement of ``source[start:end]`` by ``text``."""
+
+
+def apply_edit(source, edit):
+    """Return ``source`` with ``edit`` applied."""
+    return source[:edit.start] + edit.text + source[edit.end:]
+
+
+def _tokens(source, pos=0):
+    """Yield the ``(start, end)`` offsets of the tokens from ``pos`` on."""
+    regex, actions, kinds = scanner._get_table()
+    for match in regex.finditer(source, pos):
+        group = match.lastindex
+        if actions[group] > scanner._COMMENT:
+            yield match.span(group)
+
+
+def _extents(source, tree):
+    """Return the ``(start, stop)`` offsets of every class including its ``;``.
+
+    Returns `None` if the spans of the classes don't match the source.
+
+    """
+    extents = []
+    for cls in tree:
+        if cls.span is None:
+            return None
+        start, end = cls.span
+        # The span ends with the closing brace, the next token is the semicolon
+        semicolon = next(_tokens(source, end), None)
+        if semicolon is None or source[semicolon[0]:semicolon[1]] != ';':
+            return None
+        extents.append((start, semicolon[1]))
+    return extents
+
+
+def _shift(tree, offset):
+    """Move the spans of all nodes in ``tree`` by ``offset``, in place."""
+    stack = [tree]
+    while stack:
+        obj = stack.pop()
+        if isinstance(obj, ast.Node):
+            if obj._start is not None:
+                obj._start += offset
+            stack.extend(obj)
+        elif isinstance(obj, tuple):
+            stack.extend(obj)
+
+
+def _parse_region(source, start, end, parser):
+    """Parse the classes in ``source[start:end]``.
+
+    Returns:
+        A tuple of the classes with spans relative to ``source``, or `None` if
+        the region could not be parsed without errors.
+
+    """
+    region = source[start:end]
+    if next(_tokens(region), None) is None:
+        return ()
+    diagnostics = Diagnostics()
+    classes = parser(region, diagnostics)
+    if classes is None or diagnostics:
+        return None
+    if start:
+        _shift(classes, start)
+    return classes
+
+
+def _starts_class(source, start, pos):
+    """Return whether a ``class`` token starts at ``pos``, tokenizing from ``start``."""
+    for token_start, token_end in _tokens(source, start):
+        if token_start >= pos:
+            return token_start == pos and source[token_start:token_end].lower() == 'class'
+    return False
+
+
+def reparse(source, tree, edit, parser=None, diagnostics=None, previous=None):
+    """Parse an edited source, reusing the unchanged classes of its old AST.
+
+    The classes behind the edit are reused with their spans shifted in place,
+    so ``tree`` must not be used afterwards.
+
+    Args:
+        source: The source code before the edit.
+        tree: The AST of ``source``, with spans.
+        edit: The :class:`Edit`.
+        parser: A function parsing a source and recording its errors in a
+            :class:`pycoolc.diagnostics.Diagnostics` object, e.g.
+            ``Parser().parse``. Defaults to :func:`pycoolc.parser.parse`.
+        diagnostics: The :class:`pycoolc.diagnostics.Diagnostics` to record
+            the errors of the edited source in.
+        previous: The :class:`pycoolc.diagnostics.Diagnostics` of the parse
+            of ``source``. The parser leaves broken parts out of the AST, so
+            if there were errors, the whole edited source is parsed again.
+
+    Returns:
+        A ``(source, tree)`` tuple of the edited source and its AST. The AST
+        and the errors are the same as with a full parse.
+
+    """
+    parser = parser or parse
+    new_source = apply_edit(source, edit)
+    extents = _extents(source, tree) if tree and not previous else None
+    if extents is None:
+        return new_source, parser(new_source, diagnostics)
+
+    delta = len(edit.text) - (edit.end - edit.start)
+    # Classes ending before the edit, and the first one starting behind it
+    first = 0
+    while first < len(tree) and extents[first][1] <= edit.start:
+        first += 1
+    last = first
+    while last < len(tree) and extents[last][0] < edit.end:
+        last += 1
+    region_start = extents[first - 1][1] if first else 0
+    region_end = extents[last][0] + delta if last < len(tree) else len(new_source)
+
+    classes = None
+    if last == len(tree) or _starts_class(new_source, region_start, region_end):
+        classes = _parse_region(new_source, region_start, region_end, parser)
+    if classes is None:
+        return new_source, parser(new_source, diagnostics)
+
+    suffix = tree[last:]
+    if delta:
+        _shift(suffix, delta)
+    new_tree = tree[:first] + classes + suffix
+    if not new_tree:
+        # A program needs at least one class, let the parser report it
+        return new_source, parser(new_source, diagnostics)
+    return new_source, new_tree
+
@@ -0,0 +1,459 @@
+"""
+An interpreter compiling the AST into nested Python closures.
+
+Every expression is compiled once into a closure taking the receiver
+(``self``) and the frame of the current method call, a list of its local
+variables. The closure of a node calls the closures of its children
+directly, so running a program never dispatches on node types again. All
+decisions which depend only on the program are taken while compiling: which
+variable a name refers to (a fixed index into the frame, or an attribute),
+which operator an operation uses, which method a static dispatch calls and
+the values of string literals. Attributes are read and written by their slot
+number in the fields of the object, and calls to methods of ``self`` index
+the vtable of its class by method number, see :mod:`pycoolc.runtime`.
+
+Other dynamic dispatches look up the method by name in the class of the
+receiver, since the receiver may be of any class defining a method of that
+name. Every call site keeps a :class:`pycoolc.runtime.InlineCache` of the
+methods it called, so calls on a receiver of the same class as before only
+compare the class. Static dispatches bypass the caches.
+
+Usage::
+
+    python3 -m pycoolc.interpreter path/to/sourcefile.cl
+
+Example::
+
+    >>> program = parse('class Main inherits IO { main() : Object { out_int(6 * 7) }; };')
+    >>> Interpreter(program).run()
+    42
+
+"""
+import sys
+
+from . import ast
+from .runtime import INT_MAX, INT_MIN, Abort, ExecutionError, Instance, Runtime, default, \
+        divide, equal, int32, unescape
+from .semant import MAIN, MAIN_METHOD, SELF, SELF_TYPE, ClassTable
+
+
+class Interpreter(object):
+    """Compiles a program into closures and runs it.
+
+    The program must be type correct, see :func:`pycoolc.typecheck.check`.
+
+    Args:
+        program: The AST of the program.
+        table: The :class:`pycoolc.semant.ClassTable` of the program, if it
+            is already known.
+        stdin: The input of the program. Defaults to ``sys.stdin``.
+        stdout: The output of the program. Defaults to ``sys.stdout``.
+        inline_caches: Whether dynamic dispatches use inline caches. Their
+            statistics are returned by ``runtime.cache_statistics()``.
+        count_hits: Whether the inline caches count their hits, which makes
+            cached calls slower. Misses are always counted.
+
+    """
+
+    def __init__(self, program, table=None, stdin=None, stdout=None, inline_caches=True,
+                 count_hits=False):
+        self.table = table or ClassTable(program)
+        self.runtime = Runtime(self.table, stdin, stdout)
+        self.inline_caches = inline_caches
+        self.count_hits = count_hits
+        self._compile_classes()
+
+    def run(self):
+        """Run the program, calling ``main()`` on a new ``Main`` object.
+
+        Returns:
+            The result of ``main()``.
+
+        Raises:
+            pycoolc.runtime.ExecutionError: On a runtime error.
+            pycoolc.runtime.Abort: If the program called ``abort()``.
+
+        """
+        runtime = self.runtime
+        try:
+            main = runtime.new(runtime.classes[MAIN])
+            return main.cls.lookup(MAIN_METHOD)(main, [])
+        except RecursionError:
+            raise ExecutionError('Stack overflow')
+
+    ###### CLASSES AND METHODS ######
+
+    def _compile_classes(self):
+        runtime = self.runtime
+        functions = {}
+        for info in self.table:
+            if info.basic:
+                continue
+            cls = runtime.classes[info.name]
+            self.cls = cls
+            for feature in info.node.features:
+                if isinstance(feature, ast.Method):
+                    functions[info.name, feature.ident.name] = self._compile_method(feature)
+        for info in self.table:
+            if info.basic:
+                continue
+            cls = runtime.classes[info.name]
+            for name, method in info.methods.items():
+                if (method.owner, name) in functions:
+                    cls.vtable[method.index] = functions[method.owner, name]
+            # Attribute initializers run in the context of the declaring class
+            for attribute in info.attributes.values():
+                if attribute.node.expr is not None:
+                    self.cls = runtime.classes[attribute.owner]
+                    cls.initializers.append(self._compile_initializer(attribute))
+
+    def _compile_method(self, node):
+        self.scope = {}
+        self.size = self.slots = 0
+        for formal in node.formals:
+            self.scope[formal.ident.name] = self._allocate()
+        body = self.compile(node.expr)
+        size = self.size
+        count = len(node.formals)
+
+        if count == 0:
+            def method(receiver, args):
+                return body(receiver, [None] * size)
+        elif size == count:
+            def method(receiver, args):
+                return body(receiver, args)
+        else:
+            padding = [None] * (size - count)
+
+            def method(receiver, args):
+                return body(receiver, args + padding)
+        return method
+
+    def _compile_initializer(self, attribute):
+        self.scope = {}
+        self.size = self.slots = 0
+        expr = self.compile(attribute.node.expr)
+        size = self.size
+        index = attribute.index
+
+        def initializer(obj):
+            obj.fields[index] = expr(obj, [None] * size)
+        return initializer
+
+    def _allocate(self):
+        """Return the index of a new slot in the frame."""
+        index = self.slots
+        self.slots += 1
+        self.size = max(self.size, self.slots)
+        return index
+
+    ###### EXPRESSIONS ######
+
+    def compile(self, node):
+        """Compile an expression into a closure of receiver and frame."""
+        return getattr(self, 'compile_' + node.__class__.__name__)(node)
+
+    def compile_int(self, value):
+        return lambda self, frame: value
+
+    compile_bool = compile_int
+
+    def compile_str(self, value):
+        return self.compile_int(unescape(value))
+
+    def compile_Ident(self, node):
+        name = node.name
+        if name == SELF:
+            return lambda self, frame: self
+        if name in self.scope:
+            index = self.scope[name]
+            return lambda self, frame: frame[index]
+        index = self.cls.slots[name]
+        return lambda self, frame: self.fields[index]
+
+    def compile_Assignment(self, node):
+        name = node.ident.name
+        expr = self.compile(node.expr)
+        if name in self.scope:
+            index = self.scope[name]
+
+            def assign(self, frame):
+                frame[index] = value = expr(self, frame)
+                return value
+        else:
+            index = self.cls.slots[name]
+
+            def assign(self, frame):
+                self.fields[index] = value = expr(self, frame)
+                return value
+        return assign
+
+    def compile_Block(self, node):
+        elements = [self.compile(element) for element in node.elements]
+        *init, last = elements
+        if not init:
+            return last
+        if len(init) == 1:
+            first, = init
+
+            def block(self, frame):
+                first(self, frame)
+                return last(self, frame)
+        else:
+            def block(self, frame):
+                for element in init:
+                    element(self, frame)
+                return last(self, frame)
+        return block
+
+    def compile_If(self, node):
+        condition = self.compile(node.condition)
+        true = self.compile(node.true)
+        false = self.compile(node.false)
+
+        def if_(self, frame):
+            if condition(self, frame):
+                return true(self, frame)
+            return false(self, frame)
+        return if_
+
+    def compile_While(self, node):
+        condition = self.compile(node.condition)
+        action = self.compile(node.action)
+
+        def while_(self, frame):
+            while condition(self, frame):
+                action(self, frame)
+            return None
+        return while_
+
+    def compile_Let(self, node):
+        scope = self.scope
+        slots = self.slots
+        bindings = []
+        for attribute in node.assignments:
+            value = default(attribute.type)
+            expr = None if attribute.expr is None else self.compile(attribute.expr)
+            # Every binding gets a new slot, the initializer still sees the
+            # previous binding of the same name
+            self.scope = dict(self.scope)
+            index = self.scope[attribute.ident.name] = self._allocate()
+            bindings.append((index, expr, value))
+        body = self.compile(node.expr)
+        self.scope = scope
+        self.slots = slots
+
+        if len(bindings) == 1:
+            (index, expr, value), = bindings
+            if expr is None:
+                def let(self, frame):
+                    frame[index] = value
+                    return body(self, frame)
+            else:
+                def let(self, frame):
+                    frame[index] = expr(self, frame)
+                    return body(self, frame)
+        else:
+            def let(self, frame):
+                for index, expr, value in bindings:
+                    frame[index] = value if expr is None else expr(self, frame)
+                return body(self, frame)
+        return let
+
+    def compile_Case(self, node):
+        expr = self.compile(node.expr)
+        branches = []
+        for action in node.typeactions:
+            scope = self.scope
+            slots = self.slots
+            self.scope = dict(scope)
+            index = self.scope[action.ident.name] = self._allocate()
+            branches.append((index, self.compile(action.expr)))
+            self.scope = scope
+            self.slots = slots
+        # The slot and the closure of the selected branch for every class tag
+        selected = [None if i is None else branches[i]
+                    for i in self.table.case_table([action.type for action in node.typeactions])]
+        class_of = self.runtime.class_of
+        span = node.span
+
+        def case(self, frame):
+            value = expr(self, frame)
+            if value is None:
+                raise ExecutionError('Case on void', span)
+            cls = class_of(value)
+            branch = selected[cls.tag]
+            if branch is None:
+                raise ExecutionError('No case branch matches class {}'.format(cls.name), span)
+            index, branch = branch
+            frame[index] = value
+            return branch(self, frame)
+        return case
+
+    def compile_New(self, node):
+        new = self.runtime.new
+        if node.type == SELF_TYPE:
+            return lambda self, frame: new(self.cls)
+        cls = self.runtime.classes[node.type]
+        return lambda self, frame: new(cls)
+
+    def compile_UnaryOperation(self, node):
+        right = self.compile(node.right)
+        operator = node.operator.lower()
+        if operator == '~':
+            def negate(self, frame):
+                value = -right(self, frame)
+                return value if value <= INT_MAX else INT_MIN
+            return negate
+        if operator == 'not':
+            return lambda self, frame: not right(self, frame)
+        return lambda self, frame: right(self, frame) is None
+
+    def compile_BinaryOperation(self, node):
+        left = self.compile(node.left)
+        right = self.compile(node.right)
+        operator = node.operator
+        if operator == '+':
+            def add(self, frame):
+                value = left(self, frame) + right(self, frame)
+                return value if INT_MIN <= value <= INT_MAX else int32(value)
+            return add
+        if operator == '-':
+            def subtract(self, frame):
+                value = left(self, frame) - right(self, frame)
+                return value if INT_MIN <= value <= INT_MAX else int32(value)
+            return subtract
+        if operator == '*':
+            def multiply(self, frame):
+                value = left(self, frame) * right(self, frame)
+                return value if INT_MIN <= value <= INT_MAX else int32(value)
+            return multiply
+        if operator == '/':
+            span = node.span
+            return lambda self, frame: divide(left(self, frame), right(self, frame), span)
+        if operator == '<':
+            return lambda self, frame: left(self, frame) < right(self, frame)
+        if operator == '<=':
+            return lambda self, frame: left(self, frame) <= right(self, frame)
+        return lambda self, frame: equal(left(self, frame), right(self, frame))
+
+    def _compile_params(self, params):
+        params = [self.compile(param) for param in params]
+        if not params:
+            return lambda self, frame: []
+        if len(params) == 1:
+            param, = params
+            return lambda self, frame: [param(self, frame)]
+        return lambda self, frame: [param(self, frame) for param in params]
+
+    def compile_FunctionCall(self, node):
+        number = self.cls.numbers[node.ident.name]
+        params = self._compile_params(node.params)
+        # Only user defined classes have methods with a body, so self is
+        # always an Instance, and its class numbers the method like the
+        # class being compiled
+        return lambda self, frame: self.cls.vtable[number](self, params(self, frame))
+
+    def compile_MethodCall(self, node):
+        name = node.method.ident.name
+        params = self._compile_params(node.method.params)
+        receiver = self.compile(node.object)
+        span = node.span
+
+        if node.targettype is not None:
+            cls = self.runtime.classes[node.targettype]
+            vtable = cls.vtable
+            number = cls.numbers[name]
+
+            def static_dispatch(self, frame):
+                args = params(self, frame)
+                obj = receiver(self, frame)
+                if obj is None:
+                    raise ExecutionError('Dispatch to void', span)
+                return vtable[number](obj, args)
+            return static_dispatch
+
+        if not self.inline_caches:
+            basic = self.runtime.basic
+
+            def dispatch(self, frame):
+                args = params(self, frame)
+                obj = receiver(self, frame)
+                if obj is None:
+                    raise ExecutionError('Dispatch to void', span)
+                cls = basic.get(obj.__class__)
+                if cls is None:
+                    cls = obj.cls
+                return cls.vtable[cls.numbers[name]](obj, args)
+            return dispatch
+
+        cache = self.runtime.inline_cache(name)
+        entries = cache.entries
+
+        if self.count_hits:
+            def counted_dispatch(self, frame):
+                args = params(self, frame)
+                obj = receiver(self, frame)
+                key = obj.__class__
+                if key is Instance:
+                    key = obj.cls
+                elif obj is None:
+                    raise ExecutionError('Dispatch to void', span)
+                if key is cache.key:
+                    cache.hits += 1
+                    return cache.method(obj, args)
+                method = entries.get(key)
+                if method is None:
+                    return cache.lookup(key)(obj, args)
+                cache.hits += 1
+                return method(obj, args)
+            return counted_dispatch
+
+        def cached_dispatch(self, frame):
+            args = params(self, frame)
+            obj = receiver(self, frame)
+            key = obj.__class__
+            if key is Instance:
+                key = obj.cls
+            elif obj is None:
+                raise ExecutionError('Dispatch to void', span)
+            if key is cache.key:
+                return cache.method(obj, args)
+            return (entries.get(key) or cache.lookup(key))(obj, args)
+        return cached_dispatch
+
+
+def main(argv=None):
+    from .diagnostics import Diagnostics
+    from .parser import parse
+    from .typecheck import check
+
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) != 1:
+        print('You need to specify a cool source file to run.', file=sys.stderr)
+        return 1
+    with open(argv[0], 'r') as source:
+        data = source.read()
+    diagnostics = Diagnostics()
+    program = parse(data, diagnostics)
+    for line in diagnostics.format(data):
+        print(line, file=sys.stderr)
+    if program is None or diagnostics:
+        return 1
+    errors = check(program)
+    for error in errors:
+        print(error.message, file=sys.stderr)
+    if errors:
+        return 1
+    try:
+        Interpreter(program).run()
+    except Abort:
+        return 1
+    except ExecutionError as e:
+        print('Runtime error: {}'.format(e.message), file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
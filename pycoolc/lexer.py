@@ -1,3 +1,8 @@
+import os
+import re
+import sys
+import threading
+
 import ply.lex as lex
 
 
@@ -24,7 +29,7 @@ reserved = {
     'isvoid': 'ISVOID',
 }
 
-ignored = [' ', '\n', '\f', '\r', '\t', '\v']
+ignored = [' ', '\f', '\r', '\t', '\v']
 
 tokens = [
     # Identifiers
@@ -49,6 +54,7 @@ def t_INTEGER(t):
 
 def t_STRING(t):
     r'"[^\0\n"]*(\\\n[^\0\n"]*)*"'
+    t.lexer.lineno += t.value.count('\n')
     t.value = t.value[1:-1]
     return t
 
@@ -59,7 +65,8 @@ def t_BOOL(t):
 
 def t_COMMENT(t):
     r'--[^\n]+\n|\(\*[^(\*\))]+\*\)'
-    pass  # Discard comments
+    # Discard comments, only keep track of the line number
+    t.lexer.lineno += t.value.count('\n')
 
 # Other tokens with precedence before TYPE and ID
 
@@ -69,13 +76,23 @@ def t_NOT(t):
 
 # Identifiers
 
+# Names are interned in the lexer's symbol table, set by the parser, see
+# pycoolc.symbols
+
 def t_TYPE(t):
     r'[A-Z][A-Za-z0-9_]*'
+    symbols = getattr(t.lexer, 'symbols', None)
+    if symbols is not None:
+        t.value = symbols.intern(t.value)
     return t
 
 def t_ID(t):
     r'[a-z][A-Za-z0-9_]*'
     t.type = reserved.get(t.value.lower(), 'ID')
+    if t.type == 'ID':
+        symbols = getattr(t.lexer, 'symbols', None)
+        if symbols is not None:
+            t.value = symbols.intern(t.value)
     return t
 
 # Operators
@@ -93,16 +110,70 @@ t_ACTION = r'=>'
 
 ###### SPECIAL RULES ######
 
+def t_newline(t):
+    r'\n+'
+    t.lexer.lineno += len(t.value)
+
+# A character which cannot start a token or be ignored. Illegal characters
+# are skipped in runs, which are reported as a single error.
+illegal = '[^A-Za-z0-9"<=~\\n{}]'.format(re.escape(''.join(literals + ignored)))
+
+_illegal_run = re.compile(illegal + '*')
+
 def t_error(t):
-    print("Illegal character '{}'".format(t.value[0]))
-    t.lexer.skip(1)
+    lexer = t.lexer
+    start = lexer.lexpos
+    end = _illegal_run.match(lexer.lexdata, start + 1).end()
+    # Errors are recorded by the parser's collector, see pycoolc.diagnostics
+    diagnostics = getattr(lexer, 'diagnostics', None)
+    if diagnostics is not None and not diagnostics.illegal(lexer.lexdata[start:end], start):
+        end = len(lexer.lexdata)
+    lexer.skip(end - start)
 
 t_ignore = ''.join(ignored)
 
 
 ###### CREATE LEXER ######
 
-lex.lex()
+# The lexer tables are kept next to this module, so that they never end up
+# in the current working directory.
+TABLES_DIR = os.path.dirname(os.path.abspath(__file__))
+LEXTAB = 'pycoolc.lextab'
+
+_lexer = None
+_lexer_lock = threading.Lock()
+
+
+def get_lexer():
+    """Return the shared lexer, building it on first use.
+
+    The lexer is loaded from the pregenerated ``lextab`` module in the package
+    directory. If that module is missing, the lexer is built from the token
+    rules and the table module is written for the next process.
+
+    Returns:
+        The ``ply.lex.Lexer`` instance. It is also installed as the global
+        PLY lexer, so ``yacc.parse`` picks it up by default.
+
+    """
+    global _lexer
+    if _lexer is None:
+        with _lexer_lock:
+            if _lexer is None:
+                _lexer = lex.lex(module=sys.modules[__name__], optimize=1,
+                                 lextab=LEXTAB, outputdir=TABLES_DIR)
+    return _lexer
+
+
+def write_lextab():
+    """Validate the token rules and regenerate the ``lextab`` module.
+
+    This needs to be called whenever the token rules change, as the table is
+    loaded without validation in :func:`get_lexer`.
+
+    """
+    lexer = lex.lex(module=sys.modules[__name__])
+    lexer.writetab(LEXTAB, TABLES_DIR)
 
 
 ###### PROCESS INPUT ######
@@ -111,7 +182,6 @@ if __name__ == '__main__':
 
     # Get file as argument
 
-    import sys
     if len(sys.argv) != 2:
         print('You need to specify a cool source file to read from.', file=sys.stderr)
         sys.exit(1)
@@ -123,13 +193,21 @@ if __name__ == '__main__':
 
     # Read source file
 
+    from .diagnostics import Diagnostics
+
+    lexer = get_lexer()
+    lexer.diagnostics = Diagnostics()
     with open(sourcefile, 'r') as source:
-        lex.input(source.read())
+        data = source.read()
+    lexer.input(data)
 
     # Read tokens
 
     while True:
-        token = lex.token()
+        token = lexer.token()
         if token is None:
             break
         print(token)
+
+    for line in lexer.diagnostics.format(data):
+        print(line, file=sys.stderr)
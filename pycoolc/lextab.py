@@ -0,0 +1,9 @@
+# pycoolc.lextab.py. This file automatically created by PLY (version 3.4). Don't edit!
+_tabversion   = '3.4'
+_lextokens    = {'TYPE': 1, 'ID': 1, 'INTEGER': 1, 'STRING': 1, 'BOOL': 1, 'ACTION': 1, 'ASSIGN': 1, 'LESS': 1, 'LESSEQUAL': 1, 'EQUAL': 1, 'INT_COMPLEMENT': 1, 'NOT': 1, 'CLASS': 1, 'INHERITS': 1, 'IF': 1, 'THEN': 1, 'ELSE': 1, 'FI': 1, 'WHILE': 1, 'LOOP': 1, 'POOL': 1, 'LET': 1, 'IN': 1, 'CASE': 1, 'OF': 1, 'ESAC': 1, 'NEW': 1, 'ISVOID': 1}
+_lexreflags   = 0
+_lexliterals  = '+-*/:;(){}@.,'
+_lexstateinfo = {'INITIAL': 'inclusive'}
+_lexstatere   = {'INITIAL': [('(?P<t_INTEGER>[0-9]+)|(?P<t_STRING>"[^\\0\\n"]*(\\\\\\n[^\\0\\n"]*)*")|(?P<t_BOOL>true|false)|(?P<t_COMMENT>--[^\\n]+\\n|\\(\\*[^(\\*\\))]+\\*\\))|(?P<t_NOT>[nN][oO][tT])|(?P<t_TYPE>[A-Z][A-Za-z0-9_]*)|(?P<t_ID>[a-z][A-Za-z0-9_]*)|(?P<t_newline>\\n+)|(?P<t_ACTION>=>)|(?P<t_ASSIGN><-)|(?P<t_LESSEQUAL><=)|(?P<t_EQUAL>=)|(?P<t_INT_COMPLEMENT>~)|(?P<t_LESS><)', [None, ('t_INTEGER', 'INTEGER'), ('t_STRING', 'STRING'), None, ('t_BOOL', 'BOOL'), ('t_COMMENT', 'COMMENT'), ('t_NOT', 'NOT'), ('t_TYPE', 'TYPE'), ('t_ID', 'ID'), ('t_newline', 'newline'), (None, 'ACTION'), (None, 'ASSIGN'), (None, 'LESSEQUAL'), (None, 'EQUAL'), (None, 'INT_COMPLEMENT'), (None, 'LESS')])]}
+_lexstateignore = {'INITIAL': ' \x0c\r\t\x0b'}
+_lexstateerrorf = {'INITIAL': 't_error'}
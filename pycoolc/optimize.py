@@ -0,0 +1,340 @@
+"""
+Optimization passes over the AST.
+
+The passes rewrite a type correct program into an equivalent one which is
+cheaper to run and to compile:
+
+``fold``
+    Evaluates unary and binary operations on literals, like ``2 * 3`` or
+    ``not true``. Divisions by zero are kept, they fail at runtime.
+``branches``
+    Replaces an ``if`` with a literal condition by the branch taken, if the
+    branch has the static type of the ``if``, and removes the body of a
+    ``while false`` loop.
+``dead_code``
+    Removes expressions without side effects from the non-final positions
+    of blocks.
+``propagate``
+    Substitutes the values of ``let`` variables bound to a literal of their
+    declared type and never assigned, and removes their bindings.
+
+Each pass can be enabled on its own. The enabled passes run together in one
+traversal of the tree, which is repeated as long as it changes something,
+because the passes enable each other: propagating a constant allows folding
+an operation, which allows removing a branch.
+
+Example::
+
+    >>> optimizer = Optimizer()
+    >>> program = optimizer.optimize(parse(
+    ...     'class Main { main() : Int { let x : Int <- 6 in if x < 0 then 0 else x * 7 fi }; };'))
+    >>> program[0].features[0].expr
+    42
+    >>> optimizer.stats
+    {'fold': 2, 'branches': 1, 'dead_code': 0, 'propagate': 1, 'rounds': 3}
+
+"""
+from . import ast
+from .runtime import divide, int32, unescape
+from .semant import BOOL, INT, IO, OBJECT, STRING, ClassTable
+from .typecheck import annotate
+from .visitor import NodeTransformer
+
+
+PASSES = ('fold', 'branches', 'dead_code', 'propagate')
+
+# Rounds of optimizations after which the optimizer stops, even if the tree
+# still changes
+MAX_ROUNDS = 10
+
+_LITERAL_TYPES = {int: INT, bool: BOOL, str: STRING}
+_DEFAULTS = {INT: 0, BOOL: False, STRING: ''}
+# Classes whose objects are created without running any code
+_PLAIN_CLASSES = frozenset([INT, BOOL, STRING, OBJECT, IO])
+
+
+def is_literal(node):
+    """Return whether an expression is an Int, Bool or String literal."""
+    return node.__class__ in _LITERAL_TYPES
+
+
+def is_pure(node):
+    """Return whether evaluating an expression can neither fail nor have side effects."""
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        cls = node.__class__
+        if cls in _LITERAL_TYPES or cls is ast.Ident:
+            continue
+        if cls is ast.New:
+            if node.type not in _PLAIN_CLASSES:
+                return False
+        elif cls is ast.UnaryOperation:
+            stack.append(node.right)
+        elif cls is ast.BinaryOperation:
+            if node.operator == '/' and not (node.right.__class__ is int and node.right != 0):
+                return False
+            stack.append(node.left)
+            stack.append(node.right)
+        elif cls is ast.If:
+            stack.extend((node.condition, node.true, node.false))
+        elif cls is ast.Block:
+            stack.extend(node.elements)
+        elif cls is ast.While and node.condition is False:
+            continue
+        else:
+            return False
+    return True
+
+
+def fold_unary(operator, value):
+    """Return the result of a unary operation on a literal, or `None`."""
+    operator = operator.lower()
+    if operator == 'isvoid':
+        return False
+    if operator == '~' and value.__class__ is int:
+        return int32(-value)
+    if operator == 'not' and value.__class__ is bool:
+        return not value
+    return None
+
+
+def fold_binary(operator, left, right):
+    """Return the result of a binary operation on two literals, or `None`."""
+    if operator == '=':
+        if left.__class__ is not right.__class__:
+            return None
+        if left.__class__ is str:
+            return unescape(left) == unescape(right)
+        return left == right
+    if left.__class__ is not int or right.__class__ is not int:
+        return None
+    if operator == '+':
+        return int32(left + right)
+    if operator == '-':
+        return int32(left - right)
+    if operator == '*':
+        return int32(left * right)
+    if operator == '/':
+        return None if right == 0 else divide(left, right)
+    if operator == '<':
+        return left < right
+    if operator == '<=':
+        return left <= right
+    return None
+
+
+class Optimizer(NodeTransformer):
+    """Runs optimization passes over programs.
+
+    Args:
+        passes: The names of the passes to run, see :data:`PASSES`.
+
+    Attributes:
+        stats: A dict counting the changes of every pass, and the number of
+            rounds run.
+
+    """
+
+    def __init__(self, passes=PASSES):
+        unknown = set(passes) - set(PASSES)
+        if unknown:
+            raise ValueError('Unknown optimization passes: {}'.format(', '.join(sorted(unknown))))
+        self.passes = frozenset(passes)
+        self.stats = dict.fromkeys(PASSES, 0)
+        self.stats['rounds'] = 0
+        self.annotations = {}
+
+    def optimize(self, program, table=None):
+        """Optimize a program.
+
+        Args:
+            program: The AST of a type correct program.
+            table: The :class:`pycoolc.semant.ClassTable` of the program, if
+                it is already known.
+
+        Returns:
+            The optimized AST. Its classes are new nodes, so a class table of
+            the original program must not be used with it.
+
+        Raises:
+            pycoolc.semant.SemanticError: If the program is not type correct.
+
+        """
+        table = table or ClassTable(program)
+        for _ in range(MAX_ROUNDS):
+            if 'branches' in self.passes:
+                # Replacing an if by a branch depends on the static types
+                self.annotations = annotate(program, table)
+            before = sum(self.stats[name] for name in PASSES)
+            program = self.visit(program)
+            self.stats['rounds'] += 1
+            if sum(self.stats[name] for name in PASSES) == before:
+                break
+        self.annotations = {}
+        return program
+
+    def _count(self, name):
+        self.stats[name] += 1
+
+    ###### FOLDING ######
+
+    def visit_UnaryOperation(self, node):
+        node = yield from self.generic_visit(node)
+        if 'fold' in self.passes and is_literal(node.right):
+            value = fold_unary(node.operator, node.right)
+            if value is not None:
+                self._count('fold')
+                return value
+        return node
+
+    def visit_BinaryOperation(self, node):
+        node = yield from self.generic_visit(node)
+        if 'fold' in self.passes and is_literal(node.left) and is_literal(node.right):
+            value = fold_binary(node.operator, node.left, node.right)
+            if value is not None:
+                self._count('fold')
+                return value
+        return node
+
+    ###### BRANCHES ######
+
+    def visit_If(self, node):
+        types = self.annotations.get(id(node))
+        node = yield from self.generic_visit(node)
+        if 'branches' in self.passes and node.condition.__class__ is bool and types:
+            true, false, type = types
+            if node.condition and true == type:
+                self._count('branches')
+                return node.true
+            if not node.condition and false == type:
+                self._count('branches')
+                return node.false
+        return node
+
+    def visit_While(self, node):
+        node = yield from self.generic_visit(node)
+        if ('branches' in self.passes and node.condition is False and
+                not is_literal(node.action)):
+            self._count('branches')
+            return node._replace(action=0)
+        return node
+
+    ###### DEAD CODE ######
+
+    def visit_Block(self, node):
+        node = yield from self.generic_visit(node)
+        if 'dead_code' not in self.passes:
+            return node
+        *init, last = node.elements
+        elements = [element for element in init if not is_pure(element)]
+        if len(elements) == len(init):
+            return node
+        self.stats['dead_code'] += len(init) - len(elements)
+        if not elements:
+            return last
+        return node._replace(elements=tuple(elements) + (last,))
+
+    ###### CONSTANT PROPAGATION ######
+
+    def visit_Let(self, node):
+        node = yield from self.generic_visit(node)
+        if 'propagate' not in self.passes:
+            return node
+        assignments = list(node.assignments)
+        body = node.expr
+        i = 0
+        while i < len(assignments):
+            attribute = assignments[i]
+            value = _DEFAULTS.get(attribute.type) if attribute.expr is None else attribute.expr
+            if _LITERAL_TYPES.get(value.__class__) == attribute.type:
+                # Substitute in the following bindings and the body
+                rest = node._replace(assignments=tuple(assignments[i + 1:]), expr=body)
+                substitution = _Substitution(attribute.ident.name, value)
+                rest = substitution.visit(rest)
+                if not substitution.assigned:
+                    self._count('propagate')
+                    assignments[i:] = rest.assignments
+                    body = rest.expr
+                    continue
+            i += 1
+        if not assignments:
+            return body
+        if len(assignments) == len(node.assignments):
+            return node
+        return node._replace(assignments=tuple(assignments), expr=body)
+
+
+class _Substitution(NodeTransformer):
+    """Replaces the free occurrences of a variable by a value.
+
+    Attributes:
+        assigned: Whether the variable is assigned, in which case the result
+            must not be used.
+
+    """
+
+    def __init__(self, name, value):
+        self.name = name
+        self.value = value
+        self.assigned = False
+
+    def visit_Ident(self, node):
+        return self.value if node.name == self.name else node
+
+    def visit_Assignment(self, node):
+        if node.ident.name == self.name:
+            self.assigned = True
+        expr = yield node.expr
+        return node if expr is node.expr else node._replace(expr=expr)
+
+    def visit_FunctionCall(self, node):
+        params = yield node.params
+        return node if params is node.params else node._replace(params=params)
+
+    def visit_MethodCall(self, node):
+        obj = yield node.object
+        params = yield node.method.params
+        if obj is node.object and params is node.method.params:
+            return node
+        return node._replace(object=obj, method=node.method._replace(params=params))
+
+    def visit_Let(self, node):
+        assignments = []
+        changed = shadowed = False
+        for attribute in node.assignments:
+            if not shadowed and attribute.expr is not None:
+                expr = yield attribute.expr
+                if expr is not attribute.expr:
+                    attribute = attribute._replace(expr=expr)
+                    changed = True
+            assignments.append(attribute)
+            shadowed = shadowed or attribute.ident.name == self.name
+        expr = node.expr if shadowed else (yield node.expr)
+        if not changed and expr is node.expr:
+            return node
+        return node._replace(assignments=tuple(assignments), expr=expr)
+
+    def visit_Case(self, node):
+        expr = yield node.expr
+        actions = []
+        for action in node.typeactions:
+            if action.ident.name != self.name:
+                branch = yield action.expr
+                if branch is not action.expr:
+                    action = action._replace(expr=branch)
+            actions.append(action)
+        if expr is node.expr and all(new is old for new, old in zip(actions, node.typeactions)):
+            return node
+        return node._replace(expr=expr, typeactions=tuple(actions))
+
+
+def optimize(program, passes=PASSES, table=None):
+    """Optimize a program, see :meth:`Optimizer.optimize`.
+
+    Returns:
+        The optimized AST and a dict of the statistics of the passes.
+
+    """
+    optimizer = Optimizer(passes)
+    return optimizer.optimize(program, table), optimizer.stats
@@ -1,10 +1,36 @@
+import collections
+import copy
+import itertools
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import ply.lex as lex
 import ply.yacc as yacc
 from . import lexer
 from . import ast
+from .diagnostics import SYNTAX, Diagnostics
+from .lexer import get_lexer
+from .symbols import program_symbols
 from .utils import print_ast
 
 tokens = lexer.tokens
 
+
+def _span(p, first=1, last=-1):
+    """Return the source span of the symbols ``first`` to ``last`` of a production.
+
+    Spans are only known if the parser tracks positions and the tokens have
+    an ``endlexpos``, see :meth:`Parser.parse`. Otherwise this returns `None`.
+
+    """
+    start = getattr(p.slice[first], 'lexpos', None)
+    end = getattr(p.slice[last], 'endlexpos', None)
+    if start is None or end is None:
+        return None
+    return start, end
+
 # Grammar definitions in BNF form
 
 precedence = (
@@ -21,21 +47,29 @@ precedence = (
 
 def p_program(p):
     """program : classes"""
-    p[0] = p[1]
+    p[0] = tuple(p[1])
 
 def p_classes(p):
     """classes : class
-               | class classes"""
+               | classes class"""
     if len(p) == 2:
-        p[0] = (p[1],)
+        p[0] = [p[1]]
     elif len(p) == 3:
-        p[0] = (p[1],) + p[2]
+        p[1].append(p[2])
+        p[0] = p[1]
     else:
         raise SyntaxError('Invalid number of symbols')
 
+def p_classes_error(p):
+    """classes : empty error ';'
+               | classes error ';'"""
+    # Skip the broken class, the error was recorded by Parser._syntax_error.
+    # PLY doesn't know the position of an error, so it never starts a rule.
+    p[0] = p[1] or []
+
 def p_class(p):
     """class : CLASS TYPE inheritance '{' features_opt '}' ';'"""
-    p[0] = ast.Type(name=p[2], inherits=p[3], features=p[5])
+    p[0] = ast.Type(name=p[2], inherits=p[3], features=p[5], span=_span(p, last=6))
 
 def p_inheritance(p):
     """inheritance : INHERITS TYPE
@@ -53,23 +87,30 @@ def p_features_opt(p):
     if p.slice[1].type == 'empty':
         p[0] = tuple()
     else:
-        p[0] = p[1]
+        p[0] = tuple(p[1])
 
 def p_features(p):
     """features : feature
-                | feature features"""
+                | features feature"""
     if len(p) == 2:
-        p[0] = (p[1],)
+        p[0] = [p[1]]
     elif len(p) == 3:
-        p[0] = (p[1],) + p[2]
+        p[1].append(p[2])
+        p[0] = p[1]
     else:
         raise SyntaxError('Invalid number of symbols')
 
+def p_features_error(p):
+    """features : empty error ';'
+                | features error ';'"""
+    p[0] = p[1] or []
+
 def p_feature(p):
     """feature : ID '(' formals_opt ')' ':' TYPE '{' expr '}' ';'
                | attr_def ';'"""
     if len(p) == 11:
-        p[0] = ast.Method(ident=ast.Ident(p[1]), type=p[6], formals=p[3], expr=p[8])
+        p[0] = ast.Method(ident=ast.Ident(p[1], span=_span(p, last=1)), type=p[6],
+                          formals=p[3], expr=p[8], span=_span(p, last=9))
     elif len(p) == 3:
         p[0] = p[1]
     else:
@@ -77,17 +118,19 @@ def p_feature(p):
 
 def p_attr_defs(p):
     """attr_defs : attr_def
-                 | attr_def ',' attr_defs"""
+                 | attr_defs ',' attr_def"""
     if len(p) == 2:
-        p[0] = (p[1],)
+        p[0] = [p[1]]
     elif len(p) == 4:
-        p[0] = (p[1],) + p[3]
+        p[1].append(p[3])
+        p[0] = p[1]
     else:
         raise SyntaxError('Invalid number of symbols')
 
 def p_attr_def(p):
     """attr_def : ID ':' TYPE assign_opt"""
-    p[0] = ast.Attribute(ident=ast.Ident(p[1]), type=p[3], expr=p[4])
+    p[0] = ast.Attribute(ident=ast.Ident(p[1], span=_span(p, last=1)), type=p[3], expr=p[4],
+                         span=_span(p, last=3 if p[4] is None else 4))
 
 def p_assign_opt(p):
     """assign_opt : assign
@@ -104,21 +147,22 @@ def p_formals_opt(p):
     if p.slice[1].type == 'empty':
         p[0] = tuple()
     else:
-        p[0] = p[1]
+        p[0] = tuple(p[1])
 
 def p_formals(p):
     """formals : formal
-               | formal ',' formals"""
+               | formals ',' formal"""
     if len(p) == 2:
-        p[0] = (p[1],)
+        p[0] = [p[1]]
     elif len(p) == 4:
-        p[0] = (p[1],) + p[3]
+        p[1].append(p[3])
+        p[0] = p[1]
     else:
         raise SyntaxError('Invalid number of symbols')
 
 def p_formal(p):
     """formal : ID ':' TYPE"""
-    p[0] = ast.Formal(ident=ast.Ident(p[1]), type=p[3])
+    p[0] = ast.Formal(ident=ast.Ident(p[1], span=_span(p, last=1)), type=p[3], span=_span(p))
 
 def p_params_opt(p):
     """params_opt : params
@@ -126,49 +170,59 @@ def p_params_opt(p):
     if p.slice[1].type == 'empty':
         p[0] = tuple()
     else:
-        p[0] = p[1]
+        p[0] = tuple(p[1])
 
 def p_params(p):
     """params : expr
-              | expr ',' params"""
+              | params ',' expr"""
     if len(p) == 2:
-        p[0] = (p[1],)
+        p[0] = [p[1]]
     elif len(p) == 4:
-        p[0] = (p[1],) + p[3]
+        p[1].append(p[3])
+        p[0] = p[1]
     else:
         raise SyntaxError('Invalid number of symbols')
 
 def p_block(p):
     """block : blockelements"""
-    p[0] = ast.Block(p[1])
+    p[0] = ast.Block(tuple(p[1]))
 
 def p_blockelements(p):
     """blockelements : expr ';'
-                     | expr ';' blockelements"""
+                     | blockelements expr ';'"""
     if len(p) == 3:
-        p[0] = (p[1],)
+        p[0] = [p[1]]
     elif len(p) == 4:
-        p[0] = (p[1],) + p[3]
+        p[1].append(p[2])
+        p[0] = p[1]
     else:
         raise SyntaxError('Invalid number of symbols')
 
+def p_blockelements_error(p):
+    """blockelements : empty error ';'
+                     | blockelements error ';'"""
+    p[0] = p[1] or []
+
 def p_typeactions(p):
     """typeactions : typeaction
-                   | typeaction typeactions"""
+                   | typeactions typeaction"""
     if len(p) == 2:
-        p[0] = (p[1],)
+        p[0] = [p[1]]
     elif len(p) == 3:
-        p[0] = (p[1],) + p[2]
+        p[1].append(p[2])
+        p[0] = p[1]
     else:
         raise SyntaxError('Invalid number of symbols')
 
 def p_typeaction(p):
     """typeaction : ID ':' TYPE ACTION expr ';'"""
-    p[0] = ast.TypeAction(ident=ast.Ident(p[1]), type=p[3], expr=p[5])
+    p[0] = ast.TypeAction(ident=ast.Ident(p[1], span=_span(p, last=1)), type=p[3], expr=p[5],
+                          span=_span(p, last=5))
 
 def p_function_call(p):
     """function_call : ID '(' params_opt ')'"""
-    p[0] = ast.FunctionCall(ident=ast.Ident(p[1]), params=p[3])
+    p[0] = ast.FunctionCall(ident=ast.Ident(p[1], span=_span(p, last=1)), params=p[3],
+                            span=_span(p))
 
 def p_targettype_opt(p):
     """targettype_opt : targettype
@@ -211,29 +265,33 @@ def p_expr(p):
 
     if first_token == 'ID':
         if second_token is None:
-            p[0] = ast.Ident(p[1])
+            p[0] = ast.Ident(p[1], span=_span(p))
         elif second_token == 'assign':
-            p[0] = ast.Assignment(ident=ast.Ident(p[1]), expr=p[2])
+            p[0] = ast.Assignment(ident=ast.Ident(p[1], span=_span(p, last=1)), expr=p[2],
+                                  span=_span(p))
     elif first_token == 'expr':
         if len(p) == 4 and third_token == 'expr':
-            p[0] = ast.BinaryOperation(operator=p[2], left=p[1], right=p[3])
+            p[0] = ast.BinaryOperation(operator=p[2], left=p[1], right=p[3], span=_span(p))
         elif third_token == '.':
-            p[0] = ast.MethodCall(object=p[1], targettype=p[2], method=p[4])
+            p[0] = ast.MethodCall(object=p[1], targettype=p[2], method=p[4], span=_span(p))
     elif first_token == 'function_call':
         p[0] = p[1]
     elif first_token == 'IF':
-        p[0] = ast.If(condition=p[2], true=p[4], false=p[6])
+        p[0] = ast.If(condition=p[2], true=p[4], false=p[6], span=_span(p))
     elif first_token == 'WHILE':
-        p[0] = ast.While(condition=p[2], action=p[4])
+        p[0] = ast.While(condition=p[2], action=p[4], span=_span(p))
     elif first_token == 'LET':
-        p[0] = ast.Let(assignments=p[2], expr=p[4])
+        p[0] = ast.Let(assignments=tuple(p[2]), expr=p[4], span=_span(p))
     elif first_token == 'CASE':
-        p[0] = ast.Case(expr=p[2], typeactions=p[4])
+        p[0] = ast.Case(expr=p[2], typeactions=tuple(p[4]), span=_span(p))
     elif first_token == 'NEW':
-        p[0] = ast.New(p[2])
+        p[0] = ast.New(p[2], span=_span(p))
     elif first_token in ['ISVOID', 'INT_COMPLEMENT', 'NOT']:
-        p[0] = ast.UnaryOperation(operator=p[1], right=p[2])
-    elif first_token in ['{', '(']:
+        p[0] = ast.UnaryOperation(operator=p[1], right=p[2], span=_span(p))
+    elif first_token == '{':
+        p[0] = p[2]
+        p[0].span = _span(p)
+    elif first_token == '(':
         p[0] = p[2]
     elif first_token in ['INTEGER', 'STRING', 'BOOL']:
         p[0] = p[1]
@@ -243,16 +301,218 @@ def p_empty(p):
     p[0] = None
 
 def p_error(p):
-    print('Syntax error in input at {!r}'.format(p))
+    # Syntax errors are recorded by Parser._syntax_error, which replaces this
+    # function. Parsers built directly from this module ignore them.
+    pass
+
 
+###### CREATE PARSER ######
 
-# Create parser
-yacc.yacc()
+PARSETAB = 'pycoolc.parsetab'
+
+_parser = None
+_parser_lock = threading.Lock()
+
+
+def get_parser(debug=False):
+    """Return the shared parser, building it on first use.
+
+    The LALR tables are loaded from the pregenerated ``parsetab`` module in
+    the package directory. If the grammar changed since the tables were
+    written, they are regenerated and written back there.
+
+    Args:
+        debug: If this is `True`, grammar warnings are reported on stderr and
+            the ``parser.out`` debug file is written to the package
+            directory. Defaults to `False`, in which case no debug files are
+            written and the parser is not cached.
+
+    Returns:
+        The ``ply.yacc.LRParser`` instance.
+
+    """
+    global _parser
+    if debug:
+        return yacc.yacc(module=sys.modules[__name__], tabmodule=PARSETAB,
+                         outputdir=lexer.TABLES_DIR, debug=True,
+                         debugfile=os.path.join(lexer.TABLES_DIR, 'parser.out'))
+    if _parser is None:
+        with _parser_lock:
+            if _parser is None:
+                _parser = yacc.yacc(module=sys.modules[__name__], tabmodule=PARSETAB,
+                                    outputdir=lexer.TABLES_DIR, debug=False,
+                                    errorlog=yacc.NullLogger())
+    return _parser
+
+
+class Parser(object):
+    """A reentrant cool parser.
+
+    Every instance owns a clone of the lexer and its own parser state, while
+    sharing the (read-only) tables. Different instances can therefore be used
+    from different threads at the same time. A single instance must not be
+    used by several threads concurrently.
+
+    Errors are recorded in a :class:`pycoolc.diagnostics.Diagnostics` object.
+    The grammar recovers from syntax errors at the next ``;`` terminating a
+    class, a feature or an expression in a block, so that a single pass
+    reports several errors. The broken parts are left out of the AST.
+
+    Args:
+        lexer: The lexer to use, e.g. a :class:`pycoolc.scanner.Scanner`.
+            Defaults to a clone of the PLY lexer.
+        stats: A :class:`pycoolc.stats.Stats` object to record the ``lex``
+            and ``parse`` phases in, and to count the tokens by type, the
+            reductions by production and the AST nodes by type. With
+            statistics, the whole source is tokenized before it is parsed.
+
+    """
+
+    def __init__(self, lexer=None, stats=None):
+        if lexer is None:
+            lexer = get_lexer().clone()
+        self.lexer = lexer
+        self.parser = copy.copy(get_parser())
+        self.parser.errorfunc = self._syntax_error
+        self.stats = stats
+        self.diagnostics = None
+        self.symbols = None
+        self._source = ''
+        if stats is not None:
+            stats.counters.setdefault('tokens', collections.Counter())
+            # Count the reductions with private copies of the productions
+            reductions = stats.counters.setdefault('reductions', collections.Counter())
+            productions = []
+            for production in self.parser.productions:
+                if production.callable is not None:
+                    production = copy.copy(production)
+                    production.callable = _counting(production.callable, production.str,
+                                                    reductions)
+                productions.append(production)
+            self.parser.productions = productions
+
+    def _token(self):
+        # PLY tokens don't know where they end, but the lexer does
+        token = self.lexer.token()
+        if token is not None:
+            token.endlexpos = self.lexer.lexpos
+        return token
+
+    def _syntax_error(self, token):
+        if token is None:
+            end = len(self._source)
+            recorded = self.diagnostics.error(SYNTAX, 'Syntax error at end of input', (end, end))
+        else:
+            text = self._source[token.lexpos:token.endlexpos]
+            if len(text) > 20:
+                text = text[:20] + '...'
+            recorded = self.diagnostics.error(SYNTAX, 'Syntax error at {!r}'.format(text),
+                                              (token.lexpos, token.endlexpos))
+        if not recorded:
+            raise _TooManyErrors()
+
+    def parse(self, source, diagnostics=None):
+        """Parse a cool program.
+
+        Positions are tracked, so that every node gets its source span. The
+        names are interned in a new :class:`pycoolc.symbols.SymbolTable`,
+        which is kept in the ``symbols`` attribute until the next parse.
+
+        Args:
+            source: The source code as a string.
+            diagnostics: The :class:`pycoolc.diagnostics.Diagnostics` to
+                record the errors in. Defaults to a new one, which is kept in
+                the ``diagnostics`` attribute until the next parse.
+
+        Returns:
+            The AST, or `None` if the input could not be parsed. If there are
+            errors, the AST may be incomplete.
+
+        """
+        self.diagnostics = self.lexer.diagnostics = (
+            Diagnostics() if diagnostics is None else diagnostics)
+        self.symbols = self.lexer.symbols = program_symbols()
+        self._source = source
+        self.lexer.lineno = 1
+        try:
+            if self.stats is not None:
+                return self._parse_with_stats(source)
+            tokenfunc = self._token if isinstance(self.lexer, lex.Lexer) else None
+            return self.parser.parse(source, lexer=self.lexer, tracking=True,
+                                     tokenfunc=tokenfunc)
+        except _TooManyErrors:
+            return None
+
+    def _parse_with_stats(self, source):
+        stats = self.stats
+        with stats.phase('lex'):
+            self.lexer.input(source)
+            token = self._token if isinstance(self.lexer, lex.Lexer) else self.lexer.token
+            tokens = list(iter(token, None))
+        stats.count('tokens', [token.type for token in tokens])
+        with stats.phase('parse'):
+            tokenfunc = itertools.chain(tokens, itertools.repeat(None)).__next__
+            tree = self.parser.parse(lexer=self.lexer, tracking=True, tokenfunc=tokenfunc)
+        if tree is not None:
+            stats.count_nodes(tree)
+        return tree
+
+
+class _TooManyErrors(Exception):
+    """Raised to stop parsing once the diagnostics are full."""
+
+
+def _counting(callable, name, counter):
+    """Wrap the function of a production to count its reductions."""
+    def reduce(p):
+        counter[name] += 1
+        callable(p)
+    return reduce
+
+
+_local = threading.local()
+
+
+def parse(source, diagnostics=None):
+    """Parse a cool program with a parser private to the calling thread.
+
+    Args:
+        source: The source code as a string.
+        diagnostics: The :class:`pycoolc.diagnostics.Diagnostics` to record
+            the errors in. Without it, the errors are dropped.
+
+    Returns:
+        The AST, or `None` if the input could not be parsed.
+
+    """
+    try:
+        parser = _local.parser
+    except AttributeError:
+        parser = _local.parser = Parser()
+    return parser.parse(source, diagnostics)
+
+
+def parse_many(sources, executor=None):
+    """Parse several cool programs concurrently.
+
+    Args:
+        sources: An iterable of source code strings.
+        executor: A ``concurrent.futures.Executor`` to run the parsers in.
+            Every worker thread uses its own :class:`Parser`. Defaults to a
+            temporary thread pool.
+
+    Returns:
+        A list with the AST of every source, in input order.
+
+    """
+    if executor is None:
+        with ThreadPoolExecutor(max_workers=os.cpu_count() or 1) as executor:
+            return list(executor.map(parse, sources))
+    return list(executor.map(parse, sources))
 
 
 if __name__ == '__main__':
 
-    import sys
     from pprint import pprint
 
     # Get file as argument
@@ -266,10 +526,22 @@ if __name__ == '__main__':
 
     sourcefile = sys.argv[1]
 
-    # Read and parse source file
+    # Read and parse source file, unless its AST is cached
+
+    from .cache import ASTCache
 
+    cache = ASTCache()
     with open(sourcefile, 'r') as source:
-        t = yacc.parse(source.read())
+        data = source.read()
+    t = cache.get(data)
+    if t is None:
+        # Sources with errors are not cached
+        diagnostics = Diagnostics()
+        t = parse(data, diagnostics)
+        for line in diagnostics.format(data):
+            print(line)
+        if t is not None and not diagnostics:
+            cache.put(data, t)
 
     # Print AST
 
@@ -0,0 +1,97 @@
+
+# /root/package/pycoolc/parsetab.py
+# This file is automatically generated. Do not edit.
+_tabversion = '3.2'
+
+_lr_method = 'LALR'
+
+_lr_signature = b'}\xcb\x1f*2Q\xd0\xed\x89\x1a\xbaV\xf7\x94\xb8o'
+    
+_lr_action_items = {'CLASS':([0,2,3,6,10,11,30,],[5,5,-2,-3,-5,-4,-6,]),'error':([0,2,3,4,6,10,11,15,18,19,20,24,29,30,31,32,60,90,92,116,131,132,133,141,],[-68,7,-2,8,-3,-5,-4,-68,25,26,-11,-12,-16,-6,-14,-13,-68,115,117,-33,-34,-36,-35,-15,]),'$end':([1,2,3,6,10,11,30,],[0,-1,-2,-3,-5,-4,-6,]),'TYPE':([5,13,28,39,47,56,76,140,],[9,16,38,46,65,85,103,143,]),';':([7,8,22,23,25,26,38,42,43,44,49,50,51,62,63,64,77,85,86,87,88,91,96,97,98,99,100,101,102,113,114,115,117,118,120,122,126,134,137,138,144,146,],[10,11,29,30,31,32,-68,-19,-20,-21,-22,-64,-46,-65,-66,-67,-44,-51,-52,-53,-54,116,-55,-56,-57,-58,-59,-60,-61,-62,131,132,133,-63,-45,-40,-49,141,-48,-50,-47,147,]),'INHERITS':([9,],[13,]),'{':([9,12,14,16,45,52,53,55,57,58,59,60,61,65,67,68,69,70,71,72,73,78,90,94,108,109,110,116,123,131,132,133,136,145,],[-68,15,-8,-7,60,60,60,60,60,60,60,60,60,94,60,60,60,60,60,60,60,60,60,60,60,60,60,-33,60,-34,-36,-35,60,60,]),'}':([15,17,18,19,20,24,29,31,32,49,50,51,62,63,64,77,85,86,87,88,89,90,96,97,98,99,100,101,102,113,116,118,119,120,122,126,131,132,133,137,138,141,144,],[-68,23,-9,-10,-11,-12,-16,-14,-13,-22,-64,-46,-65,-66,-67,-44,-51,-52,-53,-54,113,-32,-55,-56,-57,-58,-59,-60,-61,-62,-33,-63,134,-45,-40,-49,-34,-36,-35,-48,-50,-15,-47,]),'ID':([15,18,20,24,27,29,31,32,41,45,52,53,54,55,57,58,59,60,61,67,68,69,70,71,72,73,78,90,94,95,108,109,110,111,112,116,123,128,129,131,132,133,136,139,141,145,147,],[21,21,-11,-12,33,-16,-14,-13,33,50,50,50,83,50,50,50,50,50,50,50,50,50,50,50,50,50,50,50,50,121,50,50,50,83,130,-33,50,130,-37,-34,-36,-35,50,-38,-15,50,-39,]),'(':([21,45,50,52,53,55,57,58,59,60,61,67,68,69,70,71,72,73,78,90,94,108,109,110,116,121,123,131,132,133,136,145,],[27,61,78,61,61,61,61,61,61,61,61,61,61,61,61,61,61,61,61,61,61,61,61,61,-33,78,61,-34,-36,-35,61,61,]),':':([21,33,40,83,130,],[28,39,47,28,140,]),')':([27,34,35,36,37,46,48,49,50,51,62,63,64,77,78,85,86,87,88,93,96,97,98,99,100,101,102,104,105,106,107,113,118,120,122,126,135,137,138,144,],[-68,40,-23,-24,-25,-27,-26,-22,-64,-46,-65,-66,-67,-44,-68,-51,-52,-53,-54,118,-55,-56,-57,-58,-59,-60,-61,122,-28,-29,-30,-62,-63,-45,-40,-49,-31,-48,-50,-47,]),',':([35,37,38,42,43,44,46,48,49,50,51,62,63,64,77,81,82,85,86,87,88,96,97,98,99,100,101,102,105,107,113,118,120,122,126,127,135,137,138,144,],[41,-25,-68,-19,-20,-21,-27,-26,-22,-64,-46,-65,-66,-67,-44,111,-17,-51,-52,-53,-54,-55,-56,-57,-58,-59,-60,-61,123,-30,-62,-63,-45,-40,-49,-18,-31,-48,-50,-47,]),'ASSIGN':([38,50,],[45,45,]),'IN':([38,42,43,44,49,50,51,62,63,64,77,81,82,85,86,87,88,96,97,98,99,100,101,102,113,118,120,122,126,127,137,138,144,],[-68,-19,-20,-21,-22,-64,-46,-65,-66,-67,-44,110,-17,-51,-52,-53,-54,-55,-56,-57,-58,-59,-60,-61,-62,-63,-45,-40,-49,-18,-48,-50,-47,]),'IF':([45,52,53,55,57,58,59,60,61,67,68,69,70,71,72,73,78,90,94,108,109,110,116,123,131,132,133,136,145,],[52,52,52,52,52,52,52,52,52,52,52,52,52,52,52,52,52,52,52,52,52,52,-33,52,-34,-36,-35,52,52,]),'WHILE':([45,52,53,55,57,58,59,60,61,67,68,69,70,71,72,73,78,90,94,108,109,110,116,123,131,132,133,136,145,],[53,53,53,53,53,53,53,53,53,53,53,53,53,53,53,53,53,53,53,53,53,53,-33,53,-34,-36,-35,53,53,]),'LET':([45,52,53,55,57,58,59,60,61,67,68,69,70,71,72,73,78,90,94,108,109,110,116,123,131,132,133,136,145,],[54,54,54,54,54,54,54,54,54,54,54,54,54,54,54,54,54,54,54,54,54,54,-33,54,-34,-36,-35,54,54,]),'CASE':([45,52,53,55,57,58,59,60,61,67,68,69,70,71,72,73,78,90,94,108,109,110,116,123,131,132,133,136,145,],[55,55,55,55,55,55,55,55,55,55,55,55,55,55,55,55,55,55,55,55,55,55,-33,55,-34,-36,-35,55,55,]),'NEW':([45,52,53,55,57,58,59,60,61,67,68,69,70,71,72,73,78,90,94,108,109,110,116,123,131,132,133,136,145,],[56,56,56,56,56,56,56,56,56,56,56,56,56,56,56,56,56,56,56,56,56,56,-33,56,-34,-36,-35,56,56,]),'INT_COMPLEMENT':([45,52,53,55,57,58,59,60,61,67,68,69,70,71,72,73,78,90,94,108,109,110,116,123,131,132,133,136,145,],[57,57,57,57,57,57,57,57,57,57,57,57,57,57,57,57,57,57,57,57,57,57,-33,57,-34,-36,-35,57,57,]),'NOT':([45,52,53,55,57,58,59,60,61,67,68,69,70,71,72,73,78,90,94,108,109,110,116,123,131,132,133,136,145,],[58,58,58,58,58,58,58,58,58,58,58,58,58,58,58,58,58,58,58,58,58,58,-33,58,-34,-36,-35,58,58,]),'ISVOID':([45,52,53,55,57,58,59,60,61,67,68,69,70,71,72,73,78,90,94,108,109,110,116,123,131,132,133,136,145,],[59,59,59,59,59,59,59,59,59,59,59,59,59,59,59,59,59,59,59,59,59,59,-33,59,-34,-36,-35,59,59,]),'INTEGER':([45,52,53,55,57,58,59,60,61,67,68,69,70,71,72,73,78,90,94,108,109,110,116,123,131,132,133,136,145,],[62,62,62,62,62,62,62,62,62,62,62,62,62,62,62,62,62,62,62,62,62,62,-33,62,-34,-36,-35,62,62,]),'STRING':([45,52,53,55,57,58,59,60,61,67,68,69,70,71,72,73,78,90,94,108,109,110,116,123,131,132,133,136,145,],[63,63,63,63,63,63,63,63,63,63,63,63,63,63,63,63,63,63,63,63,63,63,-33,63,-34,-36,-35,63,63,]),'BOOL':([45,52,53,55,57,58,59,60,61,67,68,69,70,71,72,73,78,90,94,108,109,110,116,123,131,132,133,136,145,],[64,64,64,64,64,64,64,64,64,64,64,64,64,64,64,64,64,64,64,64,64,64,-33,64,-34,-36,-35,64,64,]),'+':([49,50,51,62,63,64,77,79,80,84,85,86,87,88,91,93,96,97,98,99,100,101,102,107,113,114,118,119,120,122,124,125,126,135,137,138,142,144,146,],[67,-64,-46,-65,-66,-67,-44,67,67,67,-51,-52,67,-54,67,67,-55,-56,-57,-58,67,67,67,67,-62,67,-63,67,-45,-40,67,67,67,67,-48,-50,67,-47,67,]),'-':([49,50,51,62,63,64,77,79,80,84,85,86,87,88,91,93,96,97,98,99,100,101,102,107,113,114,118,119,120,122,124,125,126,135,137,138,142,144,146,],[68,-64,-46,-65,-66,-67,-44,68,68,68,-51,-52,68,-54,68,68,-55,-56,-57,-58,68,68,68,68,-62,68,-63,68,-45,-40,68,68,68,68,-48,-50,68,-47,68,]),'*':([49,50,51,62,63,64,77,79,80,84,85,86,87,88,91,93,96,97,98,99,100,101,102,107,113,114,118,119,120,122,124,125,126,135,137,138,142,144,146,],[69,-64,-46,-65,-66,-67,-44,69,69,69,-51,-52,69,-54,69,69,69,69,-57,-58,69,69,69,69,-62,69,-63,69,-45,-40,69,69,69,69,-48,-50,69,-47,69,]),'/':([49,50,51,62,63,64,77,79,80,84,85,86,87,88,91,93,96,97,98,99,100,101,102,107,113,114,118,119,120,122,124,125,126,135,137,138,142,144,146,],[70,-64,-46,-65,-66,-67,-44,70,70,70,-51,-52,70,-54,70,70,70,70,-57,-58,70,70,70,70,-62,70,-63,70,-45,-40,70,70,70,70,-48,-50,70,-47,70,]),'LESS':([49,50,51,62,63,64,77,79,80,84,85,86,87,88,91,93,96,97,98,99,100,101,102,107,113,114,118,119,120,122,124,125,126,135,137,138,142,144,146,],[71,-64,-46,-65,-66,-67,-44,71,71,71,-51,-52,71,-54,71,71,-55,-56,-57,-58,None,None,None,71,-62,71,-63,71,-45,-40,71,71,71,71,-48,-50,71,-47,71,]),'LESSEQUAL':([49,50,51,62,63,64,77,79,80,84,85,86,87,88,91,93,96,97,98,99,100,101,102,107,113,114,118,119,120,122,124,125,126,135,137,138,142,144,146,],[72,-64,-46,-65,-66,-67,-44,72,72,72,-51,-52,72,-54,72,72,-55,-56,-57,-58,None,None,None,72,-62,72,-63,72,-45,-40,72,72,72,72,-48,-50,72,-47,72,]),'EQUAL':([49,50,51,62,63,64,77,79,80,84,85,86,87,88,91,93,96,97,98,99,100,101,102,107,113,114,118,119,120,122,124,125,126,135,137,138,142,144,146,],[73,-64,-46,-65,-66,-67,-44,73,73,73,-51,-52,73,-54,73,73,-55,-56,-57,-58,None,None,None,73,-62,73,-63,73,-45,-40,73,73,73,73,-48,-50,73,-47,73,]),'@':([49,50,51,62,63,64,77,79,80,84,85,86,87,88,91,93,96,97,98,99,100,101,102,107,113,114,118,119,120,122,124,125,126,135,137,138,142,144,146,],[76,-64,-46,-65,-66,-67,-44,76,76,76,-51,76,76,76,76,76,76,76,76,76,76,76,76,76,-62,76,-63,76,-45,-40,76,76,76,76,-48,-50,76,-47,76,]),'.':([49,50,51,62,63,64,66,74,75,77,79,80,84,85,86,87,88,91,93,96,97,98,99,100,101,102,103,107,113,114,118,119,120,122,124,125,126,135,137,138,142,144,146,],[-22,-64,-46,-65,-66,-67,95,-41,-42,-44,-68,-68,-68,-51,-52,-53,-54,-68,-68,-55,-56,-57,-58,-59,-60,-61,-43,-68,-62,-68,-63,-68,-45,-40,-68,-68,-49,-68,-48,-50,-68,-47,-68,]),'THEN':([49,50,51,62,63,64,77,79,85,86,87,88,96,97,98,99,100,101,102,113,118,120,122,126,137,138,144,],[-22,-64,-46,-65,-66,-67,-44,108,-51,-52,-53,-54,-55,-56,-57,-58,-59,-60,-61,-62,-63,-45,-40,-49,-48,-50,-47,]),'LOOP':([49,50,51,62,63,64,77,80,85,86,87,88,96,97,98,99,100,101,102,113,118,120,122,126,137,138,144,],[-22,-64,-46,-65,-66,-67,-44,109,-51,-52,-53,-54,-55,-56,-57,-58,-59,-60,-61,-62,-63,-45,-40,-49,-48,-50,-47,]),'OF':([49,50,51,62,63,64,77,84,85,86,87,88,96,97,98,99,100,101,102,113,118,120,122,126,137,138,144,],[-22,-64,-46,-65,-66,-67,-44,112,-51,-52,-53,-54,-55,-56,-57,-58,-59,-60,-61,-62,-63,-45,-40,-49,-48,-50,-47,]),'ELSE':([49,50,51,62,63,64,77,85,86,87,88,96,97,98,99,100,101,102,113,118,120,122,124,126,137,138,144,],[-22,-64,-46,-65,-66,-67,-44,-51,-52,-53,-54,-55,-56,-57,-58,-59,-60,-61,-62,-63,-45,-40,136,-49,-48,-50,-47,]),'POOL':([49,50,51,62,63,64,77,85,86,87,88,96,97,98,99,100,101,102,113,118,120,122,125,126,137,138,144,],[-22,-64,-46,-65,-66,-67,-44,-51,-52,-53,-54,-55,-56,-57,-58,-59,-60,-61,-62,-63,-45,-40,137,-49,-48,-50,-47,]),'FI':([49,50,51,62,63,64,77,85,86,87,88,96,97,98,99,100,101,102,113,118,120,122,126,137,138,142,144,],[-22,-64,-46,-65,-66,-67,-44,-51,-52,-53,-54,-55,-56,-57,-58,-59,-60,-61,-62,-63,-45,-40,-49,-48,-50,144,-47,]),'ESAC':([128,129,139,147,],[138,-37,-38,-39,]),'ACTION':([143,],[145,]),}
+
+_lr_action = { }
+for _k, _v in _lr_action_items.items():
+   for _x,_y in zip(_v[0],_v[1]):
+      if not _x in _lr_action:  _lr_action[_x] = { }
+      _lr_action[_x][_k] = _y
+del _lr_action_items
+
+_lr_goto_items = {'program':([0,],[1,]),'classes':([0,],[2,]),'class':([0,2,],[3,6,]),'empty':([0,9,15,27,38,49,60,78,79,80,84,86,87,88,91,93,96,97,98,99,100,101,102,107,114,119,124,125,126,135,142,146,],[4,14,19,36,44,75,92,106,75,75,75,75,75,75,75,75,75,75,75,75,75,75,75,75,75,75,75,75,75,75,75,75,]),'inheritance':([9,],[12,]),'features_opt':([15,],[17,]),'features':([15,],[18,]),'feature':([15,18,],[20,24,]),'attr_def':([15,18,54,111,],[22,22,82,127,]),'formals_opt':([27,],[34,]),'formals':([27,],[35,]),'formal':([27,41,],[37,48,]),'assign_opt':([38,],[42,]),'assign':([38,50,],[43,77,]),'expr':([45,52,53,55,57,58,59,60,61,67,68,69,70,71,72,73,78,90,94,108,109,110,123,136,145,],[49,79,80,84,86,87,88,91,93,96,97,98,99,100,101,102,107,114,119,124,125,126,135,142,146,]),'function_call':([45,52,53,55,57,58,59,60,61,67,68,69,70,71,72,73,78,90,94,95,108,109,110,123,136,145,],[51,51,51,51,51,51,51,51,51,51,51,51,51,51,51,51,51,51,51,120,51,51,51,51,51,51,]),'targettype_opt':([49,79,80,84,86,87,88,91,93,96,97,98,99,100,101,102,107,114,119,124,125,126,135,142,146,],[66,66,66,66,66,66,66,66,66,66,66,66,66,66,66,66,66,66,66,66,66,66,66,66,66,]),'targettype':([49,79,80,84,86,87,88,91,93,96,97,98,99,100,101,102,107,114,119,124,125,126,135,142,146,],[74,74,74,74,74,74,74,74,74,74,74,74,74,74,74,74,74,74,74,74,74,74,74,74,74,]),'attr_defs':([54,],[81,]),'block':([60,],[89,]),'blockelements':([60,],[90,]),'params_opt':([78,],[104,]),'params':([78,],[105,]),'typeactions':([112,],[128,]),'typeaction':([112,128,],[129,139,]),}
+
+_lr_goto = { }
+for _k, _v in _lr_goto_items.items():
+   for _x,_y in zip(_v[0],_v[1]):
+       if not _x in _lr_goto: _lr_goto[_x] = { }
+       _lr_goto[_x][_k] = _y
+del _lr_goto_items
+_lr_productions = [
+  ("S' -> program","S'",1,None,None,None),
+  ('program -> classes','program',1,'p_program','/root/package/pycoolc/parser.py',48),
+  ('classes -> class','classes',1,'p_classes','/root/package/pycoolc/parser.py',52),
+  ('classes -> classes class','classes',2,'p_classes','/root/package/pycoolc/parser.py',53),
+  ('classes -> empty error ;','classes',3,'p_classes_error','/root/package/pycoolc/parser.py',63),
+  ('classes -> classes error ;','classes',3,'p_classes_error','/root/package/pycoolc/parser.py',64),
+  ('class -> CLASS TYPE inheritance { features_opt } ;','class',7,'p_class','/root/package/pycoolc/parser.py',70),
+  ('inheritance -> INHERITS TYPE','inheritance',2,'p_inheritance','/root/package/pycoolc/parser.py',74),
+  ('inheritance -> empty','inheritance',1,'p_inheritance','/root/package/pycoolc/parser.py',75),
+  ('features_opt -> features','features_opt',1,'p_features_opt','/root/package/pycoolc/parser.py',84),
+  ('features_opt -> empty','features_opt',1,'p_features_opt','/root/package/pycoolc/parser.py',85),
+  ('features -> feature','features',1,'p_features','/root/package/pycoolc/parser.py',92),
+  ('features -> features feature','features',2,'p_features','/root/package/pycoolc/parser.py',93),
+  ('features -> empty error ;','features',3,'p_features_error','/root/package/pycoolc/parser.py',103),
+  ('features -> features error ;','features',3,'p_features_error','/root/package/pycoolc/parser.py',104),
+  ('feature -> ID ( formals_opt ) : TYPE { expr } ;','feature',10,'p_feature','/root/package/pycoolc/parser.py',108),
+  ('feature -> attr_def ;','feature',2,'p_feature','/root/package/pycoolc/parser.py',109),
+  ('attr_defs -> attr_def','attr_defs',1,'p_attr_defs','/root/package/pycoolc/parser.py',119),
+  ('attr_defs -> attr_defs , attr_def','attr_defs',3,'p_attr_defs','/root/package/pycoolc/parser.py',120),
+  ('attr_def -> ID : TYPE assign_opt','attr_def',4,'p_attr_def','/root/package/pycoolc/parser.py',130),
+  ('assign_opt -> assign','assign_opt',1,'p_assign_opt','/root/package/pycoolc/parser.py',135),
+  ('assign_opt -> empty','assign_opt',1,'p_assign_opt','/root/package/pycoolc/parser.py',136),
+  ('assign -> ASSIGN expr','assign',2,'p_assign','/root/package/pycoolc/parser.py',140),
+  ('formals_opt -> formals','formals_opt',1,'p_formals_opt','/root/package/pycoolc/parser.py',144),
+  ('formals_opt -> empty','formals_opt',1,'p_formals_opt','/root/package/pycoolc/parser.py',145),
+  ('formals -> formal','formals',1,'p_formals','/root/package/pycoolc/parser.py',152),
+  ('formals -> formals , formal','formals',3,'p_formals','/root/package/pycoolc/parser.py',153),
+  ('formal -> ID : TYPE','formal',3,'p_formal','/root/package/pycoolc/parser.py',163),
+  ('params_opt -> params','params_opt',1,'p_params_opt','/root/package/pycoolc/parser.py',167),
+  ('params_opt -> empty','params_opt',1,'p_params_opt','/root/package/pycoolc/parser.py',168),
+  ('params -> expr','params',1,'p_params','/root/package/pycoolc/parser.py',175),
+  ('params -> params , expr','params',3,'p_params','/root/package/pycoolc/parser.py',176),
+  ('block -> blockelements','block',1,'p_block','/root/package/pycoolc/parser.py',186),
+  ('blockelements -> expr ;','blockelements',2,'p_blockelements','/root/package/pycoolc/parser.py',190),
+  ('blockelements -> blockelements expr ;','blockelements',3,'p_blockelements','/root/package/pycoolc/parser.py',191),
+  ('blockelements -> empty error ;','blockelements',3,'p_blockelements_error','/root/package/pycoolc/parser.py',201),
+  ('blockelements -> blockelements error ;','blockelements',3,'p_blockelements_error','/root/package/pycoolc/parser.py',202),
+  ('typeactions -> typeaction','typeactions',1,'p_typeactions','/root/package/pycoolc/parser.py',206),
+  ('typeactions -> typeactions typeaction','typeactions',2,'p_typeactions','/root/package/pycoolc/parser.py',207),
+  ('typeaction -> ID : TYPE ACTION expr ;','typeaction',6,'p_typeaction','/root/package/pycoolc/parser.py',217),
+  ('function_call -> ID ( params_opt )','function_call',4,'p_function_call','/root/package/pycoolc/parser.py',222),
+  ('targettype_opt -> targettype','targettype_opt',1,'p_targettype_opt','/root/package/pycoolc/parser.py',227),
+  ('targettype_opt -> empty','targettype_opt',1,'p_targettype_opt','/root/package/pycoolc/parser.py',228),
+  ('targettype -> @ TYPE','targettype',2,'p_targettype','/root/package/pycoolc/parser.py',232),
+  ('expr -> ID assign','expr',2,'p_expr','/root/package/pycoolc/parser.py',236),
+  ('expr -> expr targettype_opt . function_call','expr',4,'p_expr','/root/package/pycoolc/parser.py',237),
+  ('expr -> function_call','expr',1,'p_expr','/root/package/pycoolc/parser.py',238),
+  ('expr -> IF expr THEN expr ELSE expr FI','expr',7,'p_expr','/root/package/pycoolc/parser.py',239),
+  ('expr -> WHILE expr LOOP expr POOL','expr',5,'p_expr','/root/package/pycoolc/parser.py',240),
+  ('expr -> LET attr_defs IN expr','expr',4,'p_expr','/root/package/pycoolc/parser.py',241),
+  ('expr -> CASE expr OF typeactions ESAC','expr',5,'p_expr','/root/package/pycoolc/parser.py',242),
+  ('expr -> NEW TYPE','expr',2,'p_expr','/root/package/pycoolc/parser.py',243),
+  ('expr -> INT_COMPLEMENT expr','expr',2,'p_expr','/root/package/pycoolc/parser.py',244),
+  ('expr -> NOT expr','expr',2,'p_expr','/root/package/pycoolc/parser.py',245),
+  ('expr -> ISVOID expr','expr',2,'p_expr','/root/package/pycoolc/parser.py',246),
+  ('expr -> expr + expr','expr',3,'p_expr','/root/package/pycoolc/parser.py',247),
+  ('expr -> expr - expr','expr',3,'p_expr','/root/package/pycoolc/parser.py',248),
+  ('expr -> expr * expr','expr',3,'p_expr','/root/package/pycoolc/parser.py',249),
+  ('expr -> expr / expr','expr',3,'p_expr','/root/package/pycoolc/parser.py',250),
+  ('expr -> expr LESS expr','expr',3,'p_expr','/root/package/pycoolc/parser.py',251),
+  ('expr -> expr LESSEQUAL expr','expr',3,'p_expr','/root/package/pycoolc/parser.py',252),
+  ('expr -> expr EQUAL expr','expr',3,'p_expr','/root/package/pycoolc/parser.py',253),
+  ('expr -> { block }','expr',3,'p_expr','/root/package/pycoolc/parser.py',254),
+  ('expr -> ( expr )','expr',3,'p_expr','/root/package/pycoolc/parser.py',255),
+  ('expr -> ID','expr',1,'p_expr','/root/package/pycoolc/parser.py',256),
+  ('expr -> INTEGER','expr',1,'p_expr','/root/package/pycoolc/parser.py',257),
+  ('expr -> STRING','expr',1,'p_expr','/root/package/pycoolc/parser.py',258),
+  ('expr -> BOOL','expr',1,'p_expr','/root/package/pycoolc/parser.py',259),
+  ('empty -> <empty>','empty',0,'p_empty','/root/package/pycoolc/parser.py',299),
+]
@@ -0,0 +1,384 @@
+"""
+The runtime support shared by the execution engines.
+
+Values of the basic classes are represented by native Python values: ``Int``
+by `int` (wrapped to 32 bits), ``Bool`` by `bool`, ``String`` by `str` and
+void by `None`. Objects of all other classes are :class:`Instance`\\ s,
+storing their attributes in a list of fields indexed by slot number.
+
+A :class:`Class` is the runtime counterpart of a class in the
+:class:`pycoolc.semant.ClassTable`. Its layout numbers the attributes
+with the inherited attributes first, so an attribute has the same slot in
+all subclasses, and its vtable holds the methods by method number, which
+is the same for a method and its overrides. The execution engines fill in
+the vtable with callables taking the receiver and a list of arguments, and
+the ``initializers``, callables initializing the attributes of a new
+object. The bytecode VM stores its functions there instead and calls them
+itself. The methods of the basic classes are implemented by
+:class:`Runtime`.
+
+Engines looking up methods by name at every call can keep an
+:class:`InlineCache` per call site, created by :meth:`Runtime.inline_cache`.
+
+"""
+import re
+import sys
+
+from .semant import BASIC_CLASS_NAMES, BOOL, INT, STRING
+
+
+INT_MIN = -2 ** 31
+INT_MAX = 2 ** 31 - 1
+
+
+class ExecutionError(Exception):
+    """A runtime error of a cool program, like a dispatch to void.
+
+    Args:
+        message: The description of the error.
+        span: The ``(start, end)`` offsets of the expression raising the
+            error, or `None`.
+
+    """
+
+    def __init__(self, message, span=None):
+        super().__init__(message)
+        self.message = message
+        self.span = span
+
+    def __reduce__(self):
+        return self.__class__, (self.message, self.span)
+
+
+class Abort(Exception):
+    """Raised when a program calls ``abort()``."""
+
+
+###### VALUES ######
+
+def int32(value):
+    """Wrap an integer to the range of 32 bit two's complement integers."""
+    return ((value - INT_MIN) & 0xFFFFFFFF) + INT_MIN
+
+
+def divide(left, right, span=None):
+    """Divide two Ints, rounding towards zero.
+
+    Raises:
+        ExecutionError: If ``right`` is zero.
+
+    """
+    if right == 0:
+        raise ExecutionError('Division by zero', span)
+    quotient = abs(left) // abs(right)
+    return int32(quotient if (left < 0) == (right < 0) else -quotient)
+
+
+_ESCAPES = {'b': '\b', 't': '\t', 'n': '\n', 'f': '\f'}
+_ESCAPE_RE = re.compile(r'\\(.)', re.DOTALL)
+
+
+def unescape(string):
+    """Return the value of a string literal as written in the source.
+
+    ``\\b``, ``\\t``, ``\\n`` and ``\\f`` are the usual control characters,
+    a backslash followed by any other character (including a newline) stands
+    for that character.
+
+    """
+    if '\\' not in string:
+        return string
+    return _ESCAPE_RE.sub(lambda match: _ESCAPES.get(match.group(1), match.group(1)), string)
+
+
+def default(type):
+    """Return the default value of an attribute or variable of ``type``."""
+    if type == INT:
+        return 0
+    if type == STRING:
+        return ''
+    if type == BOOL:
+        return False
+    return None
+
+
+def equal(left, right):
+    """The ``=`` operator: Equality of basic values, identity of objects."""
+    if left is right:
+        return True
+    return left.__class__ is right.__class__ and left.__class__ in _BASIC_TYPES and left == right
+
+
+_BASIC_TYPES = {int: INT, bool: BOOL, str: STRING}
+
+
+###### CLASSES AND OBJECTS ######
+
+class Class(object):
+    """A class at runtime.
+
+    Args:
+        name: The name of the class.
+        tag: The tag of the class in the class table.
+        ancestors: The names of the ancestors from ``Object`` to the class.
+        defaults: The default values of the attributes, by slot number.
+        numbers: A dict mapping method names to their method numbers.
+        slots: A dict mapping attribute names to their slot numbers, if they
+            are known.
+        info: The :class:`pycoolc.semant.ClassInfo` of the class, if there
+            is one.
+
+    Attributes:
+        vtable: The implementations of the methods, by method number.
+        initializers: The attribute initializers to run on new objects, in
+            order.
+
+    """
+
+    __slots__ = ('name', 'tag', 'info', 'ancestors', 'slots', 'defaults', 'numbers', 'vtable',
+                 'initializers')
+
+    def __init__(self, name, tag, ancestors, defaults, numbers, slots=None, info=None):
+        self.name = name
+        self.tag = tag
+        self.info = info
+        self.ancestors = ancestors
+        self.slots = {} if slots is None else slots
+        self.defaults = defaults
+        self.numbers = numbers
+        self.vtable = [None] * len(numbers)
+        self.initializers = []
+
+    @classmethod
+    def from_info(cls, info):
+        """Create the class of a :class:`pycoolc.semant.ClassInfo`."""
+        defaults = [None] * len(info.attributes)
+        for attribute in info.attributes.values():
+            defaults[attribute.index] = default(attribute.type)
+        return cls(info.name, info.tag, info.ancestors, defaults,
+                   dict((name, method.index) for name, method in info.methods.items()),
+                   dict((name, attribute.index) for name, attribute in info.attributes.items()),
+                   info)
+
+    def lookup(self, name):
+        """Return the implementation of a method by name."""
+        return self.vtable[self.numbers[name]]
+
+    def __repr__(self):
+        return '<Class {}>'.format(self.name)
+
+
+class Instance(object):
+    """An object of a class other than ``Int``, ``Bool`` and ``String``.
+
+    Attributes:
+        cls: The :class:`Class` of the object.
+        fields: The values of the attributes, by slot number.
+
+    """
+
+    __slots__ = ('cls', 'fields')
+
+    def __init__(self, cls, fields):
+        self.cls = cls
+        self.fields = fields
+
+    def __repr__(self):
+        return '<{} object>'.format(self.cls.name)
+
+
+# The number of receiver classes an inline cache remembers before it becomes
+# megamorphic and stops caching
+POLYMORPHIC_LIMIT = 4
+
+
+class InlineCache(object):
+    """The methods called at a dynamic dispatch call site, by receiver class.
+
+    The receiver classes are keyed by the :class:`Class` of an
+    :class:`Instance` and by the Python type of an unboxed value. The first
+    class seen at the call site is stored in ``key`` and ``method``. Up to
+    :data:`POLYMORPHIC_LIMIT` classes are stored in ``entries``, other
+    classes are looked up on every call. Callers test ``key`` and then
+    ``entries`` themselves, optionally counting the hits, and call :meth:`lookup` on a
+    miss.
+
+    Args:
+        name: The name of the method called.
+        basic: A dict mapping the Python types of unboxed values to their
+            :class:`Class`.
+
+    Attributes:
+        key: The first receiver class seen, or `None`.
+        method: The method of ``key``.
+        entries: A dict mapping the receiver classes to their methods.
+        hits: The number of calls finding their method in the cache, if
+            the caller counts them.
+        misses: The number of calls looking up their method.
+
+    """
+
+    __slots__ = ('name', 'basic', 'key', 'method', 'entries', 'megamorphic', 'hits', 'misses')
+
+    def __init__(self, name, basic):
+        self.name = name
+        self.basic = basic
+        self.key = self.method = None
+        self.entries = {}
+        self.megamorphic = False
+        self.hits = self.misses = 0
+
+    def lookup(self, key):
+        """Look up the method for a receiver class missing in the cache."""
+        self.misses += 1
+        method = self.basic.get(key, key).lookup(self.name)
+        if self.key is None:
+            self.key = key
+            self.method = method
+        if len(self.entries) < POLYMORPHIC_LIMIT:
+            self.entries[key] = method
+        else:
+            self.megamorphic = True
+        return method
+
+    @property
+    def state(self):
+        """``'empty'``, ``'monomorphic'``, ``'polymorphic'`` or ``'megamorphic'``."""
+        if self.key is None:
+            return 'empty'
+        if self.megamorphic:
+            return 'megamorphic'
+        return 'monomorphic' if len(self.entries) == 1 else 'polymorphic'
+
+
+class Runtime(object):
+    """The classes of a program and the methods of the basic classes.
+
+    Args:
+        table: The :class:`pycoolc.semant.ClassTable` of the program. The
+            vtables get the methods of the basic classes.
+        stdin: The file read by ``in_string()`` and ``in_int()``. Defaults to
+            ``sys.stdin``.
+        stdout: The file written by ``out_string()`` and ``out_int()``.
+            Defaults to ``sys.stdout``.
+        classes: The :class:`Class`\\ es of a program compiled without a
+            class table, instead of ``table``. Their vtables are left to the
+            caller.
+
+    Attributes:
+        classes: A dict mapping the class names to their :class:`Class`.
+        basic: A dict mapping the Python types of unboxed values to their
+            :class:`Class`.
+        caches: A dict mapping method names to the :class:`InlineCache`\\ s
+            of their call sites.
+
+    """
+
+    def __init__(self, table=None, stdin=None, stdout=None, classes=None):
+        self.table = table
+        self.caches = {}
+        self.stdin = stdin or sys.stdin
+        self.stdout = stdout or sys.stdout
+        if classes is None:
+            classes = [Class.from_info(info) for info in table]
+        self.classes = dict((cls.name, cls) for cls in classes)
+        self.basic = dict((type, self.classes[name]) for type, name in _BASIC_TYPES.items())
+        if table is None:
+            return
+        builtins = {}
+        for cls in self.classes.values():
+            for name, method in cls.info.methods.items():
+                if method.owner in BASIC_CLASS_NAMES:
+                    if name not in builtins:
+                        builtins[name] = self.builtin(name)
+                    cls.vtable[method.index] = builtins[name]
+
+    def basic_method(self, name):
+        """Return a method of a basic class, as a function of the receiver and
+        the arguments."""
+        return getattr(self, '_' + name)
+
+    def builtin(self, name):
+        """Return a method of a basic class, as a function of receiver and a
+        list of arguments."""
+        function = self.basic_method(name)
+        return lambda receiver, args: function(receiver, *args)
+
+    def inline_cache(self, name):
+        """Return a new :class:`InlineCache` for a call site of a method."""
+        cache = InlineCache(name, self.basic)
+        self.caches.setdefault(name, []).append(cache)
+        return cache
+
+    def cache_statistics(self):
+        """Return a dict of the hits and misses of all inline caches and the
+        number of call sites in every state."""
+        statistics = dict.fromkeys(['hits', 'misses', 'empty', 'monomorphic', 'polymorphic',
+                                    'megamorphic'], 0)
+        for caches in self.caches.values():
+            for cache in caches:
+                statistics['hits'] += cache.hits
+                statistics['misses'] += cache.misses
+                statistics[cache.state] += 1
+        return statistics
+
+    def class_of(self, value):
+        """Return the :class:`Class` of a value, which must not be void."""
+        cls = self.basic.get(value.__class__)
+        return value.cls if cls is None else cls
+
+    def new(self, cls):
+        """Create a new object of a :class:`Class` and initialize its attributes."""
+        if cls.name in _UNBOXED_DEFAULTS:
+            return _UNBOXED_DEFAULTS[cls.name]
+        obj = Instance(cls, list(cls.defaults))
+        for initializer in cls.initializers:
+            initializer(obj)
+        return obj
+
+    ###### BASIC METHODS ######
+
+    def _abort(self, receiver):
+        self.stdout.write('Abort called from class {}\n'.format(self.class_of(receiver).name))
+        raise Abort()
+
+    def _type_name(self, receiver):
+        return self.class_of(receiver).name
+
+    def _copy(self, receiver):
+        if isinstance(receiver, Instance):
+            return Instance(receiver.cls, list(receiver.fields))
+        return receiver
+
+    def _out_string(self, receiver, x):
+        self.stdout.write(x)
+        return receiver
+
+    def _out_int(self, receiver, x):
+        self.stdout.write(str(x))
+        return receiver
+
+    def _in_string(self, receiver):
+        line = self.stdin.readline()
+        return line[:-1] if line.endswith('\n') else line
+
+    def _in_int(self, receiver):
+        try:
+            value = int(self.stdin.readline().strip())
+        except ValueError:
+            return 0
+        return value if INT_MIN <= value <= INT_MAX else 0
+
+    def _length(self, receiver):
+        return len(receiver)
+
+    def _concat(self, receiver, s):
+        return receiver + s
+
+    def _substr(self, receiver, i, l):
+        if i < 0 or l < 0 or i + l > len(receiver):
+            raise ExecutionError('Substring out of range')
+        return receiver[i:i + l]
+
+
+_UNBOXED_DEFAULTS = {INT: 0, BOOL: False, STRING: ''}
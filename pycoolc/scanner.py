@@ -0,0 +1,461 @@
+"""
+A fast scanner producing the same token stream as :mod:`pycoolc.lexer`.
+
+Instead of calling a rule function and allocating a ``LexToken`` for every
+token, the scanner runs a single compiled regular expression over the input
+and maps the matched group to an integer token kind. Value conversion and
+keyword lookup are done inline.
+
+The master regular expression is derived from the PLY lexer, so both
+backends always agree on the token rules and their precedence.
+
+"""
+import functools
+import re
+from array import array
+from bisect import bisect_right
+
+from . import lexer
+from .symbols import program_symbols
+
+
+###### TOKEN KINDS ######
+
+# Token kinds are indexes into this tuple, which contains the PLY token types
+TOKEN_TYPES = tuple(lexer.tokens) + tuple(lexer.literals)
+
+KIND = dict((type_, kind) for kind, type_ in enumerate(TOKEN_TYPES))
+
+_ID_KINDS = dict((word, KIND[type_]) for word, type_ in lexer.reserved.items())
+
+
+###### MASTER REGEX ######
+
+# Actions, chosen by the matched group of the master regex
+_SKIP, _NEWLINE, _COMMENT, _TEXT, _LITERAL, _INTEGER, _STRING, _BOOL, _ID, _TYPE, _ERROR = range(11)
+
+_RULE_ACTIONS = {
+    't_INTEGER': _INTEGER,
+    't_STRING': _STRING,
+    't_BOOL': _BOOL,
+    't_COMMENT': _COMMENT,
+    't_ID': _ID,
+    't_TYPE': _TYPE,
+    't_newline': _NEWLINE,
+}
+
+_table = None
+
+
+def _get_table():
+    """Return the compiled master regex and the per group actions and kinds.
+
+    The table is built on first use from the rules of the PLY lexer. Ignored
+    characters in front of a token are consumed by the same match (PLY skips
+    them before matching), literals and a catch-all error group are tried
+    after the rules. The error group matches a whole run of illegal characters,
+    like the PLY lexer skips them. Trailing ignored characters produce a final
+    empty match.
+
+    """
+    global _table
+    if _table is None:
+        ply_lexer = lexer.get_lexer()
+        ignore = ''.join(re.escape(char) for char in ply_lexer.lexignore)
+        literals = ''.join(re.escape(char) for char in ply_lexer.lexliterals)
+        pattern = '[{}]*(?:{})'.format(ignore, '|'.join(
+            ply_lexer.lexretext +
+            ['(?P<_literal>[{}])'.format(literals), r'(?P<_error>[\s\S]{}*)'.format(lexer.illegal),
+             r'(?P<_ignore>\Z)']
+        ))
+        regex = re.compile(pattern, re.VERBOSE | ply_lexer.lexreflags)
+        actions = [None] * (regex.groups + 1)
+        kinds = [None] * (regex.groups + 1)
+        for name, index in regex.groupindex.items():
+            if name == '_ignore':
+                actions[index] = _SKIP
+            elif name == '_literal':
+                actions[index] = _LITERAL
+            elif name == '_error':
+                actions[index] = _ERROR
+            else:
+                actions[index] = _RULE_ACTIONS.get(name, _TEXT)
+                kinds[index] = KIND.get(name[2:])
+        _table = regex, actions, kinds
+    return _table
+
+
+# Prefixes of tokens which are only decided by text further ahead: unterminated
+# strings and comments reaching the end of the buffer.
+_PARTIAL = re.compile(r'"[^\0\n"]*(?:\\\n[^\0\n"]*)*\\?\Z|--[^\n]*\Z|\(\*[^(*)]*\*?\Z')
+
+
+###### SCANNING ######
+
+def _scan(buf, symbols, base=0, final=True, diagnostics=None):
+    """Tokenize a buffer, see :func:`scan`.
+
+    Args:
+        buf: The text to scan.
+        symbols: The :class:`pycoolc.symbols.SymbolTable` to intern the
+            names in.
+        base: The position of ``buf`` in the whole source.
+        final: Whether ``buf`` extends to the end of the source. If not,
+            scanning stops in front of the first match that more text could
+            change: one reaching the end of the buffer, or an unterminated
+            string or comment.
+        diagnostics: The :class:`pycoolc.diagnostics.Diagnostics` to record
+            illegal characters in. Scanning stops once it is full.
+
+    Returns:
+        The position in ``buf`` up to which the text was consumed.
+
+    """
+    regex, actions, kinds = _get_table()
+    id_kinds = _ID_KINDS
+    id_kind = KIND['ID']
+    literal_kinds = KIND
+    partial = _PARTIAL.match
+    intern = symbols.intern
+    end = len(buf)
+    for match in regex.finditer(buf):
+        group = match.lastindex
+        action = actions[group]
+        if not final:
+            start = match.start(group)
+            if match.end() == end or (
+                    (action == _ERROR or action == _LITERAL) and
+                    buf[start] in '"(-' and partial(buf, start)):
+                return match.start()
+        if action <= _COMMENT:
+            continue
+        value = match.group(group)
+        if action == _ID:
+            kind = id_kinds.get(value.lower(), id_kind)
+            yield kind, intern(value) if kind == id_kind else value, base + match.start(group)
+        elif action == _TYPE:
+            yield kinds[group], intern(value), base + match.start(group)
+        elif action == _TEXT:
+            yield kinds[group], value, base + match.start(group)
+        elif action == _LITERAL:
+            yield literal_kinds[value], value, base + match.start(group)
+        elif action == _INTEGER:
+            yield kinds[group], int(value), base + match.start(group)
+        elif action == _STRING:
+            yield kinds[group], value[1:-1], base + match.start(group)
+        elif action == _BOOL:
+            yield kinds[group], value == 'true', base + match.start(group)
+        elif diagnostics is not None and not diagnostics.illegal(value,
+                                                                 base + match.start(group)):
+            break
+    return end
+
+
+def scan(data, diagnostics=None, symbols=None):
+    """Tokenize a string.
+
+    Args:
+        data: The source code.
+        diagnostics: The :class:`pycoolc.diagnostics.Diagnostics` to record
+            illegal characters in. Without it, they are skipped silently.
+        symbols: The :class:`pycoolc.symbols.SymbolTable` to intern the
+            names in. Defaults to a new one.
+
+    Yields:
+        A ``(kind, value, lexpos)`` tuple per token, where ``kind`` is an index
+        into :data:`TOKEN_TYPES`. Values are converted like in the PLY lexer.
+
+    """
+    if symbols is None:
+        symbols = program_symbols()
+    return _scan(data, symbols, diagnostics=diagnostics)
+
+
+def tokenize(source, chunk_size=65536, diagnostics=None, symbols=None):
+    """Tokenize a file in bounded memory.
+
+    The file is read in chunks and only the unconsumed tail of a chunk is
+    kept. A match is deferred to the next chunk whenever more text could
+    change it: if it reaches the end of the buffer, or if it starts an
+    unterminated string or comment. Memory use is therefore bounded by the
+    chunk size and the longest token, not by the size of the file.
+
+    Args:
+        source: A path or a file object opened in text mode.
+        chunk_size: Number of characters to read at once. Defaults to 64k.
+        diagnostics: The :class:`pycoolc.diagnostics.Diagnostics` to record
+            illegal characters in.
+        symbols: The :class:`pycoolc.symbols.SymbolTable` to intern the
+            names in. Defaults to a new one.
+
+    Yields:
+        The same ``(kind, value, lexpos)`` tuples as :func:`scan`.
+
+    """
+    if isinstance(source, (str, bytes)) or not hasattr(source, 'read'):
+        with open(source, 'r') as fileobj:
+            for token in tokenize(fileobj, chunk_size, diagnostics, symbols):
+                yield token
+        return
+
+    if symbols is None:
+        symbols = program_symbols()
+    buf = ''
+    base = 0  # Position of buf in the file
+    size = chunk_size
+    eof = False
+    while not eof:
+        chunk = source.read(size)
+        eof = not chunk
+        buf += chunk
+        pos = yield from _scan(buf, symbols, base, eof, diagnostics)
+        if diagnostics is not None and diagnostics.full:
+            return
+        # Read more at once while a single token spans several chunks, to
+        # avoid copying the pending text over and over again
+        size = size * 2 if pos == 0 else chunk_size
+        buf = buf[pos:]
+        base += pos
+
+
+###### TOKEN OBJECTS ######
+
+class Token(object):
+    """A token with the attributes the PLY parser expects from ``LexToken``.
+
+    Tokens also know their ``endlexpos``, which the parser uses for the
+    source spans of the nodes.
+
+    """
+
+    __slots__ = ('type', 'value', 'lineno', 'lexpos', 'endlexpos', 'lexer')
+
+    def __init__(self, type, value, lineno, lexpos, endlexpos):
+        self.type = type
+        self.value = value
+        self.lineno = lineno
+        self.lexpos = lexpos
+        self.endlexpos = endlexpos
+
+    def __repr__(self):
+        return 'LexToken({},{!r},{:d},{:d})'.format(self.type, self.value, self.lineno, self.lexpos)
+
+
+class Scanner(object):
+    """Lexer interface to :func:`scan`, usable as ``lexer`` for the PLY parser.
+
+    Example::
+
+        >>> from pycoolc.parser import Parser
+        >>> Parser(lexer=Scanner()).parse('class Main {};')
+        (Type(name='Main', inherits=None, features=()),)
+
+    Attributes:
+        diagnostics: The :class:`pycoolc.diagnostics.Diagnostics` to record
+            illegal characters in, set by the parser. Without it, they are
+            skipped silently.
+        symbols: The :class:`pycoolc.symbols.SymbolTable` to intern the
+            names in, set by the parser. Without it, every input gets a new
+            one.
+
+    """
+
+    diagnostics = None
+    symbols = None
+
+    def __init__(self):
+        self.input('')
+
+    def input(self, data):
+        self.lexdata = data
+        self.lineno = 1
+        self.lexpos = 0
+        self._tokens = self._generate(data)
+        # Bypass a Python level method call for every token
+        self.token = functools.partial(next, self._tokens, None)
+
+    def clone(self):
+        return Scanner()
+
+    def __iter__(self):
+        return self._tokens
+
+    def _generate(self, data):
+        # This is scan() creating tokens directly, without the extra generator
+        regex, actions, kinds = _get_table()
+        types = [TOKEN_TYPES[kind] if kind is not None else None for kind in kinds]
+        id_types = lexer.reserved
+        diagnostics = self.diagnostics
+        intern = (program_symbols() if self.symbols is None else self.symbols).intern
+        lineno = self.lineno
+        for match in regex.finditer(data):
+            group = match.lastindex
+            action = actions[group]
+            if action == _SKIP:
+                continue
+            start, end = match.span(group)
+            value = data[start:end]
+            # Only needed by the parser for empty productions
+            self.lexpos = end
+            if action == _ID:
+                type_ = id_types.get(value.lower(), 'ID')
+                yield Token(type_, intern(value) if type_ == 'ID' else value, lineno, start, end)
+            elif action == _TYPE:
+                yield Token(types[group], intern(value), lineno, start, end)
+            elif action == _TEXT:
+                yield Token(types[group], value, lineno, start, end)
+            elif action == _LITERAL:
+                yield Token(value, value, lineno, start, end)
+            elif action == _NEWLINE:
+                lineno += len(value)
+            elif action == _INTEGER:
+                yield Token(types[group], int(value), lineno, start, end)
+            elif action == _STRING:
+                yield Token(types[group], value[1:-1], lineno, start, end)
+                lineno += value.count('\n')
+            elif action == _BOOL:
+                yield Token(types[group], value == 'true', lineno, start, end)
+            elif action == _COMMENT:
+                lineno += value.count('\n')
+            elif diagnostics is not None and not diagnostics.illegal(value, start):
+                return
+
+
+###### TOKEN BUFFER ######
+
+class TokenBuffer(object):
+    """Compact storage of all tokens of a source.
+
+    Tokens are stored as struct-of-arrays: a kind, start offset and length per
+    token in ``array`` columns, with values converted only when requested.
+    The offsets of all line starts are kept as well, so that line and column
+    of any position are found by bisection.
+
+    A buffer also works as ``lexer`` for the PLY parser: :meth:`input` fills
+    it and :meth:`token` materializes the tokens one after the other.
+
+    Attributes:
+        data: The source code.
+        kinds: Token kinds, indexes into :data:`TOKEN_TYPES`.
+        starts: Token start offsets.
+        lengths: Token lengths.
+        line_starts: Offsets of the first character of every line.
+        diagnostics: The :class:`pycoolc.diagnostics.Diagnostics` to record
+            illegal characters in, when the buffer is filled.
+        symbols: The :class:`pycoolc.symbols.SymbolTable` to intern the
+            names in, set by the parser. Without it, every input gets a new
+            one.
+
+    """
+
+    diagnostics = None
+    symbols = None
+
+    def __init__(self, data=''):
+        self.input(data)
+
+    def input(self, data):
+        """Tokenize ``data`` into the buffer, replacing its previous content."""
+        regex, actions, kinds = _get_table()
+        id_kinds = _ID_KINDS
+        id_kind = KIND['ID']
+        literal_kinds = KIND
+        diagnostics = self.diagnostics
+        token_kinds = array('B')
+        starts = array('q')
+        lengths = array('q')
+        add_kind, add_start, add_length = token_kinds.append, starts.append, lengths.append
+        for match in regex.finditer(data):
+            group = match.lastindex
+            action = actions[group]
+            if action <= _COMMENT:
+                continue
+            start, end = match.span(group)
+            if action == _ID:
+                add_kind(id_kinds.get(data[start:end].lower(), id_kind))
+            elif action == _LITERAL:
+                add_kind(literal_kinds[data[start]])
+            elif action == _ERROR:
+                if diagnostics is not None and not diagnostics.illegal(data[start:end], start):
+                    break
+                continue
+            else:
+                add_kind(kinds[group])
+            add_start(start)
+            add_length(end - start)
+
+        line_starts = array('q', [0])
+        find = data.find
+        pos = find('\n')
+        while pos >= 0:
+            line_starts.append(pos + 1)
+            pos = find('\n', pos + 1)
+
+        self.data = self.lexdata = data
+        self._intern = (program_symbols() if self.symbols is None else self.symbols).intern
+        self.kinds = token_kinds
+        self.starts = starts
+        self.lengths = lengths
+        self.line_starts = line_starts
+        self.lineno = 1
+        self.lexpos = 0
+        self._next = 0
+        self._line = 1
+
+    def __len__(self):
+        return len(self.kinds)
+
+    def __bool__(self):
+        # The PLY parser replaces a false lexer by its global one
+        return True
+
+    def type(self, index):
+        """Return the PLY token type of the token at ``index``."""
+        return TOKEN_TYPES[self.kinds[index]]
+
+    def text(self, index):
+        """Return the source text of the token at ``index``."""
+        start = self.starts[index]
+        return self.data[start:start + self.lengths[index]]
+
+    def value(self, index):
+        """Return the value of the token at ``index``, as the lexer would."""
+        text = self.text(index)
+        kind = TOKEN_TYPES[self.kinds[index]]
+        if kind == 'INTEGER':
+            return int(text)
+        if kind == 'STRING':
+            return text[1:-1]
+        if kind == 'BOOL':
+            return text == 'true'
+        if kind == 'ID' or kind == 'TYPE':
+            return self._intern(text)
+        return text
+
+    def position(self, offset):
+        """Return the 1-based ``(line, column)`` of a source offset."""
+        line = bisect_right(self.line_starts, offset)
+        return line, offset - self.line_starts[line - 1] + 1
+
+    def line(self, index):
+        """Return the line of the token at ``index``."""
+        return bisect_right(self.line_starts, self.starts[index])
+
+    def token(self):
+        """Return the next token as a :class:`Token`, or `None` at the end."""
+        index = self._next
+        if index >= len(self.kinds):
+            return None
+        self._next = index + 1
+        start = self.starts[index]
+        # Tokens are requested in order, so the line only ever moves forward
+        line_starts = self.line_starts
+        line = self._line
+        while line < len(line_starts) and line_starts[line] <= start:
+            line += 1
+        self._line = self.lineno = line
+        self.lexpos = end = start + self.lengths[index]
+        return Token(TOKEN_TYPES[self.kinds[index]], self.value(index), line, start, end)
+
+    def clone(self):
+        return TokenBuffer()
@@ -0,0 +1,380 @@
+"""
+Semantic analysis: the class hierarchy of a program.
+
+:class:`ClassTable` builds the inheritance graph of a program once, including
+the basic classes ``Object``, ``IO``, ``Int``, ``String`` and ``Bool``, and
+checks it for undefined, redefined and cyclic classes. Every class then gets
+flattened tables of all its attributes and methods, including the inherited
+ones, so looking up the method of a call is a single dictionary lookup
+instead of a walk up the inheritance chain.
+
+The chain of ancestors of every class is stored as a tuple from ``Object``
+down to the class itself. Because two such chains share exactly the prefix of
+common ancestors, the least common ancestor of two classes (the type of an
+``if`` or ``case``) is found by a binary search over the shorter chain.
+
+Example::
+
+    >>> table = ClassTable(parse('class A {}; class B inherits A {}; class C inherits A {};'))
+    >>> table.join('B', 'C')
+    'A'
+    >>> table.method('B', 'type_name').owner
+    'Object'
+
+"""
+from collections import namedtuple
+
+from . import ast
+from .symbols import intern
+
+
+class SemanticError(Exception):
+    """A semantic error in a program.
+
+    Args:
+        message: The description of the error.
+        span: The ``(start, end)`` offsets of the offending code, or `None`.
+
+    """
+
+    def __init__(self, message, span=None):
+        super().__init__(message)
+        self.message = message
+        self.span = span
+
+    def __reduce__(self):
+        return self.__class__, (self.message, self.span)
+
+
+OBJECT = intern('Object')
+IO = intern('IO')
+INT = intern('Int')
+STRING = intern('String')
+BOOL = intern('Bool')
+SELF_TYPE = intern('SELF_TYPE')
+SELF = intern('self')
+MAIN = intern('Main')
+MAIN_METHOD = intern('main')
+
+# Classes that cannot be inherited from
+FINAL_CLASSES = frozenset([INT, STRING, BOOL, SELF_TYPE])
+
+
+def _method(name, formals, type):
+    formals = tuple(ast.Formal(ast.Ident(intern(ident)), intern(formal_type))
+                    for ident, formal_type in formals)
+    return ast.Method(ast.Ident(intern(name)), intern(type), formals, None)
+
+
+# The basic classes. Their methods are implemented by the runtime, so they
+# have no body.
+BASIC_CLASSES = (
+    ast.Type(OBJECT, None, (
+        _method('abort', [], 'Object'),
+        _method('type_name', [], 'String'),
+        _method('copy', [], 'SELF_TYPE'),
+    )),
+    ast.Type(IO, OBJECT, (
+        _method('out_string', [('x', 'String')], 'SELF_TYPE'),
+        _method('out_int', [('x', 'Int')], 'SELF_TYPE'),
+        _method('in_string', [], 'String'),
+        _method('in_int', [], 'Int'),
+    )),
+    ast.Type(INT, OBJECT, ()),
+    ast.Type(STRING, OBJECT, (
+        _method('length', [], 'Int'),
+        _method('concat', [('s', 'String')], 'String'),
+        _method('substr', [('i', 'Int'), ('l', 'Int')], 'String'),
+    )),
+    ast.Type(BOOL, OBJECT, ()),
+)
+
+BASIC_CLASS_NAMES = frozenset(cls.name for cls in BASIC_CLASSES)
+
+
+AttributeInfo = namedtuple('AttributeInfo', 'name owner type node index')
+AttributeInfo.__doc__ = """An attribute of a class.
+
+``owner`` is the name of the class declaring it and ``index`` its position in
+the attributes of the class, with the inherited attributes first.
+"""
+
+MethodInfo = namedtuple('MethodInfo', 'name owner types type node index')
+MethodInfo.__doc__ = """A method of a class.
+
+``owner`` is the name of the class defining the implementation, ``types`` are
+the types of the formal parameters and ``type`` the return type. ``index`` is
+the position of the method in the methods of the class, with the inherited
+methods first. An overriding method keeps the index of the method it
+overrides.
+"""
+
+
+def join_chains(chain, other):
+    """Return the last common element of two chains of ancestors.
+
+    Both chains start with ``Object`` and share exactly the common ancestors,
+    so the last one is found by a binary search.
+
+    """
+    low, high = 0, min(len(chain), len(other))
+    while high - low > 1:
+        middle = (low + high) // 2
+        if chain[middle] == other[middle]:
+            low = middle
+        else:
+            high = middle
+    return chain[low]
+
+
+class ClassInfo(object):
+    """A class of the program and its flattened features.
+
+    Attributes:
+        name: The name of the class.
+        parent: The name of the parent class, `None` for ``Object``.
+        node: The :class:`pycoolc.ast.Type` node.
+        tag: The position of the class in :attr:`ClassTable.classes`.
+        depth: The number of ancestors, ``0`` for ``Object``.
+        preorder: The number of the class in a preorder walk of the class
+            tree from ``Object``.
+        postorder: The number of the class in a postorder walk. A class
+            conforms to another one if it has a greater or equal preorder
+            and a smaller or equal postorder number.
+        ancestors: The names of the ancestors from ``Object`` down to the
+            class itself.
+        children: The names of the direct subclasses, in program order.
+        attributes: A dict of the :class:`AttributeInfo` of every attribute,
+            with the inherited attributes first.
+        methods: A dict of the :class:`MethodInfo` of every method, with the
+            inherited methods first.
+
+    """
+
+    __slots__ = ('name', 'parent', 'node', 'tag', 'depth', 'preorder', 'postorder', 'ancestors',
+                 'children', 'attributes', 'methods')
+
+    def __init__(self, node, parent, tag):
+        self.name = node.name
+        self.parent = parent
+        self.node = node
+        self.tag = tag
+        self.depth = 0
+        self.preorder = self.postorder = None
+        self.ancestors = ()
+        self.children = []
+        self.attributes = {}
+        self.methods = {}
+
+    @property
+    def basic(self):
+        """Whether this is one of the basic classes."""
+        return self.tag < len(BASIC_CLASSES)
+
+    def __repr__(self):
+        return 'ClassInfo(name={!r}, parent={!r})'.format(self.name, self.parent)
+
+
+class ClassTable(object):
+    """The class hierarchy of a program.
+
+    Args:
+        program: The AST of the program, a tuple of
+            :class:`pycoolc.ast.Type` nodes.
+
+    Raises:
+        SemanticError: If a class is defined twice, inherits from an
+            undefined or basic class other than ``Object`` and ``IO``, is part
+            of an inheritance cycle, redefines an attribute or method, or
+            overrides a method with a different signature.
+
+    """
+
+    def __init__(self, program):
+        self.classes = []
+        self._classes = {}
+        for node in BASIC_CLASSES:
+            self._add(node, node.inherits)
+        for node in program:
+            if node.name in self._classes:
+                if node.name in BASIC_CLASS_NAMES:
+                    raise SemanticError('Redefinition of basic class {}'.format(node.name),
+                                        node.span)
+                raise SemanticError('Class {} is defined more than once'.format(node.name),
+                                    node.span)
+            if node.name == SELF_TYPE:
+                raise SemanticError('Invalid class name SELF_TYPE', node.span)
+            self._add(node, node.inherits or OBJECT)
+        self._link()
+        self._flatten()
+
+    def _add(self, node, parent):
+        info = ClassInfo(node, parent, len(self.classes))
+        self.classes.append(info)
+        self._classes[info.name] = info
+
+    def _link(self):
+        """Connect the classes to their parents and check for cycles."""
+        for info in self.classes:
+            if info.parent is None:
+                continue
+            if info.parent in FINAL_CLASSES:
+                raise SemanticError('Class {} cannot inherit from {}'.format(
+                    info.name, info.parent), info.node.span)
+            parent = self._classes.get(info.parent)
+            if parent is None:
+                raise SemanticError('Class {} inherits from undefined class {}'.format(
+                    info.name, info.parent), info.node.span)
+            parent.children.append(info.name)
+
+        # Classes that cannot be reached from Object are part of a cycle or
+        # inherit from one
+        order = self._preorder()
+        if len(order) < len(self.classes):
+            reached = set(order)
+            info = next(info for info in self.classes if info.name not in reached)
+            seen = {}
+            while info.name not in seen:
+                seen[info.name] = len(seen)
+                info = self._classes[info.parent]
+            cycle = list(seen)[seen[info.name]:]
+            raise SemanticError('Inheritance cycle: {}'.format(
+                ' -> '.join(cycle + [info.name])), info.node.span)
+        self.order = order
+        self._number()
+
+    def _preorder(self):
+        """Return the names of the classes reachable from ``Object``, in preorder."""
+        order = []
+        stack = [OBJECT]
+        while stack:
+            name = stack.pop()
+            order.append(name)
+            stack.extend(reversed(self._classes[name].children))
+        return order
+
+    def _number(self):
+        """Number the classes in preorder and postorder."""
+        postorder = 0
+        # Pairs of a class and whether its children have been numbered
+        stack = [(self._classes[OBJECT], False)]
+        for preorder, name in enumerate(self.order):
+            self._classes[name].preorder = preorder
+        while stack:
+            info, done = stack.pop()
+            if done:
+                info.postorder = postorder
+                postorder += 1
+            else:
+                stack.append((info, True))
+                stack.extend((self._classes[name], False) for name in reversed(info.children))
+
+    def _flatten(self):
+        """Compute the ancestors and features of every class, parents first."""
+        for name in self.order:
+            info = self._classes[name]
+            if info.parent is None:
+                attributes, methods, ancestors = {}, {}, ()
+            else:
+                parent = self._classes[info.parent]
+                attributes, methods = dict(parent.attributes), dict(parent.methods)
+                ancestors = parent.ancestors
+            info.ancestors = ancestors + (name,)
+            info.depth = len(ancestors)
+
+            defined = set()
+            for feature in info.node.features:
+                ident = feature.ident.name
+                if ident in defined:
+                    raise SemanticError('{} is defined more than once in class {}'.format(
+                        ident, name), feature.span)
+                defined.add(ident)
+                if isinstance(feature, ast.Attribute):
+                    if ident == SELF:
+                        raise SemanticError("'self' cannot be the name of an attribute",
+                                            feature.span)
+                    if ident in attributes:
+                        raise SemanticError('Attribute {} of class {} is already defined in '
+                                            'class {}'.format(ident, name,
+                                                              attributes[ident].owner),
+                                            feature.span)
+                    attributes[ident] = AttributeInfo(ident, name, feature.type, feature,
+                                                      len(attributes))
+                else:
+                    types = tuple(formal.type for formal in feature.formals)
+                    inherited = methods.get(ident)
+                    if inherited is None:
+                        index = len(methods)
+                    else:
+                        if inherited.types != types or inherited.type != feature.type:
+                            raise SemanticError('Method {} of class {} overrides {}.{} with '
+                                                'a different signature'.format(
+                                                    ident, name, inherited.owner, ident),
+                                                feature.span)
+                        index = inherited.index
+                    methods[ident] = MethodInfo(ident, name, types, feature.type, feature, index)
+            info.attributes = attributes
+            info.methods = methods
+
+    def __getitem__(self, name):
+        """Return the :class:`ClassInfo` of the class ``name``."""
+        return self._classes[name]
+
+    def __contains__(self, name):
+        return name in self._classes
+
+    def __iter__(self):
+        return iter(self.classes)
+
+    def __len__(self):
+        return len(self.classes)
+
+    def method(self, cls, name):
+        """Return the :class:`MethodInfo` of method ``name`` of class ``cls``, or `None`."""
+        return self._classes[cls].methods.get(name)
+
+    def attribute(self, cls, name):
+        """Return the :class:`AttributeInfo` of attribute ``name`` of class ``cls``, or `None`."""
+        return self._classes[cls].attributes.get(name)
+
+    def conforms(self, cls, other):
+        """Return whether class ``cls`` is ``other`` or a subclass of it."""
+        cls, other = self._classes[cls], self._classes[other]
+        return other.preorder <= cls.preorder and cls.postorder <= other.postorder
+
+    def case_table(self, types):
+        """Return the branches a ``case`` expression selects for every class.
+
+        Args:
+            types: The types of the branches.
+
+        Returns:
+            A list indexed by class tag of the index in ``types`` of the
+            most specific type the class conforms to, or `None` if it
+            conforms to none of them.
+
+        """
+        branches = dict((type, i) for i, type in enumerate(types))
+        selected = [None] * len(self.classes)
+        # Parents come before their children in preorder
+        for name in self.order:
+            info = self._classes[name]
+            if name in branches:
+                selected[info.tag] = branches[name]
+            elif info.parent is not None:
+                selected[info.tag] = selected[self._classes[info.parent].tag]
+        return selected
+
+    def join(self, a, b):
+        """Return the least common ancestor of the classes ``a`` and ``b``."""
+        if a == b:
+            return a
+        return join_chains(self._classes[a].ancestors, self._classes[b].ancestors)
+
+    def join_all(self, classes):
+        """Return the least common ancestor of one or more classes."""
+        classes = iter(classes)
+        result = next(classes)
+        for cls in classes:
+            result = self.join(result, cls)
+        return result
@@ -0,0 +1,162 @@
+"""
+A compact binary serialization of the AST.
+
+The tree is flattened into a postorder program for a small stack machine:
+a byte array of opcodes, the lengths of the tuples, the starts and lengths
+of the node spans and a list of the leaf values (names, constants and
+`None`). The parts are stored with :mod:`marshal`, which writes repeated
+name strings only once, since they are interned (see :mod:`pycoolc.symbols`),
+and compressed with :mod:`zlib`.
+
+Both directions work without recursion, so trees of any depth can be
+stored, and loading is a single loop over the opcodes.
+
+"""
+import marshal
+import zlib
+from array import array
+
+from . import ast
+
+
+FORMAT_VERSION = 2
+
+MAGIC = b'PYCOOLAST'
+
+# Opcodes below len(NODE_TYPES) build a node of that type from the topmost
+# values on the stack
+NODE_TYPES = tuple(sorted(
+    (cls for cls in vars(ast).values()
+     if isinstance(cls, type) and issubclass(cls, ast.Node) and cls is not ast.Node),
+    key=lambda cls: cls.__name__))
+
+_CODES = dict((cls, code) for code, cls in enumerate(NODE_TYPES))
+
+# Push the next leaf value
+LEAF = len(NODE_TYPES)
+# Build a tuple from the topmost values, taking the next tuple length
+TUPLE = LEAF + 1
+
+_LEAF_TYPES = (str, int, bool, type(None))
+
+_NO_SPAN = -1
+
+
+def dumps(tree):
+    """Serialize an AST.
+
+    Args:
+        tree: The AST, made of nodes, tuples, strings, integers, booleans
+            and `None`.
+
+    Returns:
+        The serialized tree as `bytes`.
+
+    Raises:
+        TypeError: If the tree contains other objects.
+
+    """
+    codes = array('B')
+    lengths = array('I')
+    spans = array('q')
+    values = []
+    stack = [(tree, False)]
+    while stack:
+        obj, built = stack.pop()
+        if built:
+            if isinstance(obj, ast.Node):
+                codes.append(_CODES[obj.__class__])
+                if obj._start is None:
+                    spans.extend((_NO_SPAN, 0))
+                else:
+                    spans.extend((obj._start, obj._length))
+            else:
+                codes.append(TUPLE)
+                lengths.append(len(obj))
+        elif isinstance(obj, ast.Node) or type(obj) is tuple:
+            # Children are pushed in reverse, so that they are built in order
+            stack.append((obj, True))
+            stack.extend((child, False) for child in reversed(tuple(obj)))
+        elif isinstance(obj, _LEAF_TYPES):
+            codes.append(LEAF)
+            values.append(obj)
+        else:
+            raise TypeError('Cannot serialize {!r} in an AST'.format(obj))
+    payload = marshal.dumps(
+        (FORMAT_VERSION, codes.tobytes(), lengths.tobytes(), spans.tobytes(), values))
+    return MAGIC + zlib.compress(payload, 1)
+
+
+def loads(data):
+    """Deserialize an AST written by :func:`dumps`.
+
+    Args:
+        data: The serialized tree.
+
+    Returns:
+        The AST.
+
+    Raises:
+        ValueError: If ``data`` is not a serialized tree of this format
+            version.
+
+    """
+    if not data.startswith(MAGIC):
+        raise ValueError('Not a serialized AST')
+    try:
+        payload = zlib.decompress(data[len(MAGIC):])
+        version, codes, length_bytes, span_bytes, values = marshal.loads(payload)
+    except (zlib.error, EOFError, TypeError, ValueError):
+        raise ValueError('Corrupt serialized AST')
+    if version != FORMAT_VERSION:
+        raise ValueError('Unsupported AST format version {}'.format(version))
+    # A payload which decompresses can still be truncated or crafted
+    try:
+        return _build(codes, length_bytes, span_bytes, values)
+    except (IndexError, StopIteration, TypeError, ValueError):
+        raise ValueError('Corrupt serialized AST')
+
+
+def _build(codes, length_bytes, span_bytes, values):
+    """Run the program of a serialized tree, returning the tree."""
+    lengths = array('I')
+    lengths.frombytes(length_bytes)
+    spans = array('q')
+    spans.frombytes(span_bytes)
+
+    node_types = NODE_TYPES
+    arities = [len(cls._fields) for cls in NODE_TYPES]
+    next_value = iter(values).__next__
+    next_length = iter(lengths).__next__
+    next_span = iter(spans).__next__
+    stack = []
+    push = stack.append
+    pop = stack.pop
+    for code in codes:
+        if code == LEAF:
+            push(next_value())
+        elif code == TUPLE:
+            length = next_length()
+            if length:
+                obj = tuple(stack[-length:])
+                del stack[-length:]
+            else:
+                obj = ()
+            push(obj)
+        else:
+            arity = arities[code]
+            if arity == 1:
+                obj = node_types[code](pop())
+            elif arity == 2:
+                second = pop()
+                obj = node_types[code](pop(), second)
+            else:
+                obj = node_types[code](*stack[-arity:])
+                del stack[-arity:]
+            start, length = next_span(), next_span()
+            if start != _NO_SPAN:
+                obj._start, obj._length = start, length
+            push(obj)
+    if len(stack) != 1:
+        raise ValueError('Unbalanced stack')
+    return stack[0]
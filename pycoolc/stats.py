@@ -0,0 +1,185 @@
+"""
+Timers and counters of the compiler phases.
+
+A :class:`Stats` object is passed to the parts of the compiler which should
+be measured, e.g. ``Parser(stats=stats)``. Code which gets no ``Stats``
+object runs without any instrumentation, so the statistics cost nothing
+unless they are requested.
+
+Example::
+
+    >>> stats = Stats()
+    >>> tree = Parser(stats=stats).parse(source)
+    >>> with stats.phase('typecheck'):
+    ...     errors = check(tree)
+    >>> print(stats.format())
+
+"""
+import contextlib
+import time
+import tracemalloc
+from collections import Counter
+
+from .ast import Node
+from .visitor import children
+
+
+class Phase(object):
+    """The measurements of a phase, summed over all its runs.
+
+    Attributes:
+        calls: The number of runs.
+        wall: The wall clock time in seconds.
+        cpu: The CPU time of the process in seconds.
+        peak: The largest amount of memory allocated during a run, in bytes,
+            or `None` if memory is not traced.
+
+    """
+
+    __slots__ = ('calls', 'wall', 'cpu', 'peak')
+
+    def __init__(self):
+        self.calls = 0
+        self.wall = self.cpu = 0.0
+        self.peak = None
+
+    def add(self, calls, wall, cpu, peak):
+        self.calls += calls
+        self.wall += wall
+        self.cpu += cpu
+        if peak is not None:
+            self.peak = peak if self.peak is None else max(self.peak, peak)
+
+    def to_dict(self):
+        return {'calls': self.calls, 'wall': self.wall, 'cpu': self.cpu, 'peak': self.peak}
+
+
+class Stats(object):
+    """Collects the timers and counters of the compiler phases.
+
+    Statistics from several processes can be combined with :meth:`merge`,
+    ``Stats`` objects can be pickled.
+
+    Args:
+        memory: Whether to trace the peak memory of every phase with
+            ``tracemalloc``. Tracing makes the phases several times slower.
+
+    Attributes:
+        phases: A dict mapping the phase names to their :class:`Phase`, in
+            the order they first ran.
+        counters: A dict mapping counter names like ``'tokens'`` to a
+            ``collections.Counter``.
+        traced_peak: The peak memory in bytes the caller's ``tracemalloc``
+            would report without the phases, which reset it, or `None` if
+            the caller wasn't tracing. Tracing started by the phases is
+            stopped when the outermost one ends.
+
+    """
+
+    def __init__(self, memory=True):
+        self.memory = memory
+        self.phases = {}
+        self.counters = {}
+        # The allocated memory at the start of the running phases, and the
+        # peaks of the outer phases before an inner one reset the peak
+        self._running = []
+        # Whether the outermost running phase started tracemalloc
+        self._started = False
+        self.traced_peak = None
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        """Return a context manager measuring a run of a phase.
+
+        Phases may be nested, the time and memory of an inner phase are
+        included in the outer one.
+
+        """
+        if self.memory:
+            self._start_tracing()
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+            peak = self._stop_tracing() if self.memory else None
+            self.phases.setdefault(name, Phase()).add(1, wall, cpu, peak)
+
+    def _start_tracing(self):
+        if not self._running:
+            self._started = not tracemalloc.is_tracing()
+            if self._started:
+                tracemalloc.start()
+        current, peak = tracemalloc.get_traced_memory()
+        if self._running:
+            outer = self._running[-1]
+            outer[1] = max(outer[1], peak)
+        elif not self._started:
+            self.traced_peak = max(self.traced_peak or 0, peak)
+        tracemalloc.reset_peak()
+        self._running.append([current, current])
+
+    def _stop_tracing(self):
+        start, peak = self._running.pop()
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        if self._running:
+            outer = self._running[-1]
+            outer[1] = max(outer[1], peak)
+        elif self._started:
+            tracemalloc.stop()
+        else:
+            self.traced_peak = max(self.traced_peak, peak)
+        return peak - start
+
+    def count(self, name, keys):
+        """Count every key of the iterable ``keys`` in the counter ``name``."""
+        self.counters.setdefault(name, Counter()).update(keys)
+
+    def count_nodes(self, tree):
+        """Count the AST nodes of ``tree`` by type in the ``'nodes'`` counter."""
+        counter = self.counters.setdefault('nodes', Counter())
+        stack = [tree]
+        while stack:
+            tree = stack.pop()
+            if isinstance(tree, Node):
+                counter[tree.__class__.__name__] += 1
+            stack.extend(children(tree))
+
+    def merge(self, other):
+        """Add the statistics of another ``Stats`` object to this one."""
+        for name, phase in other.phases.items():
+            self.phases.setdefault(name, Phase()).add(phase.calls, phase.wall, phase.cpu,
+                                                      phase.peak)
+        for name, counter in other.counters.items():
+            self.counters.setdefault(name, Counter()).update(counter)
+
+    def to_dict(self):
+        """Return the statistics as a dict which can be serialized as JSON."""
+        return {
+            'phases': dict((name, phase.to_dict()) for name, phase in self.phases.items()),
+            'counters': dict((name, dict(counter.most_common()))
+                             for name, counter in self.counters.items()),
+        }
+
+    def format(self, limit=10):
+        """Return the statistics as a human readable table.
+
+        Args:
+            limit: The number of most common keys shown for every counter.
+
+        """
+        lines = ['{:<12} {:>7} {:>11} {:>11} {:>11}'.format('phase', 'calls', 'wall [ms]',
+                                                           'cpu [ms]', 'peak [KiB]')]
+        for name, phase in self.phases.items():
+            peak = '-' if phase.peak is None else '{:,.0f}'.format(phase.peak / 1024)
+            lines.append('{:<12} {:>7,} {:>11.2f} {:>11.2f} {:>11}'.format(
+                name, phase.calls, phase.wall * 1e3, phase.cpu * 1e3, peak))
+        for name, counter in self.counters.items():
+            lines.append('')
+            lines.append('{}: {:,} total, {:,} kinds'.format(name, sum(counter.values()),
+                                                            len(counter)))
+            for key, value in counter.most_common(limit):
+                lines.append('  {:>10,}  {}'.format(value, key))
+            if len(counter) > limit:
+                lines.append('  {:>10}  ({} more)'.format('...', len(counter) - limit))
+        return '\n'.join(lines)
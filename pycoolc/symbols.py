@@ -0,0 +1,96 @@
+"""
+Interning of identifiers and type names.
+
+The lexers intern every ``ID`` and ``TYPE`` token through a
+:class:`SymbolTable`, so that all occurrences of a name in the AST are the
+very same string object. Dictionary lookups in later passes therefore hit
+the identity fast path, without hashing or comparing the characters.
+
+Every parse gets a table of its own from :func:`program_symbols`, see
+:meth:`pycoolc.parser.Parser.parse`, which is dropped together with the
+tree, so a long running process doesn't keep the names of every program
+it ever parsed. The tables all start with the :data:`BUILTINS`, so the
+builtin names are the same objects in every tree and in the shared
+:data:`symbols` table, which holds the names the compiler itself refers
+to.
+
+Every symbol also gets a small integer id, usable as an index into lists or
+arrays instead of a dictionary key. The names of the builtin classes and
+methods have the same ids in all tables, all other ids are only stable
+within a table.
+
+"""
+import threading
+
+
+# Names of the basic classes, their methods and other names the compiler
+# refers to, in the order of their ids
+BUILTINS = (
+    'Object', 'IO', 'Int', 'String', 'Bool', 'SELF_TYPE', 'self',
+    'abort', 'type_name', 'copy',
+    'out_string', 'out_int', 'in_string', 'in_int',
+    'length', 'concat', 'substr',
+    'Main', 'main',
+)
+
+
+class SymbolTable(object):
+    """A table mapping names to canonical strings and integer ids.
+
+    Args:
+        names: Names to intern up front, getting the ids ``0`` to ``n - 1``.
+
+    """
+
+    def __init__(self, names=()):
+        self._strings = {}
+        self._ids = {}
+        self._names = []
+        self._lock = threading.Lock()
+        for name in names:
+            self.intern(name)
+
+    def intern(self, name):
+        """Return the canonical string for ``name``, adding it if necessary."""
+        try:
+            return self._strings[name]
+        except KeyError:
+            pass
+        with self._lock:
+            if name not in self._strings:
+                canonical = name
+                self._ids[canonical] = len(self._names)
+                self._names.append(canonical)
+                self._strings[canonical] = canonical
+            return self._strings[name]
+
+    def id(self, name):
+        """Return the integer id of ``name``, adding it if necessary."""
+        try:
+            return self._ids[name]
+        except KeyError:
+            return self._ids[self.intern(name)]
+
+    def name(self, id):
+        """Return the canonical string with the integer id ``id``."""
+        return self._names[id]
+
+    def __contains__(self, name):
+        return name in self._strings
+
+    def __len__(self):
+        return len(self._names)
+
+    def __iter__(self):
+        return iter(self._names)
+
+
+def program_symbols():
+    """Return a new table for the names of a program, starting with the builtins."""
+    return SymbolTable(BUILTINS)
+
+
+# The names the compiler refers to, the lexers don't add to it
+symbols = SymbolTable(BUILTINS)
+
+intern = symbols.intern
@@ -0,0 +1,513 @@
+"""
+Type checking of cool programs.
+
+Checking a program has two steps. First, the class hierarchy is built with
+:class:`pycoolc.semant.ClassTable` and condensed into an
+:class:`Environment`: the types of all attributes and the signatures of all
+methods of every class, and the ancestors needed for conformance tests and
+joins. The environment is never changed afterwards.
+
+Given the environment, every class can be checked on its own. With more than
+one job, :func:`check` hands the environment and the program to every worker
+of a process pool once, in the pool initializer, and then only sends ranges
+of class indexes. With the ``fork`` start method the workers simply inherit
+both, otherwise the program is sent in the compact format of
+:mod:`pycoolc.serialize`, which is faster than pickling and not limited by
+the depth of the tree. The diagnostics of the ranges are merged in
+program order, so the result does not depend on the number of jobs or on the
+scheduling of the workers.
+
+Example::
+
+    >>> errors = check(parse('class Main { main() : Int { true }; };'))
+    >>> errors[0].message
+    'Inferred return type Bool of method main does not conform to declared return type Int'
+
+"""
+import multiprocessing
+import os
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+from . import ast, serialize
+from .semant import BOOL, INT, MAIN, MAIN_METHOD, OBJECT, SELF, SELF_TYPE, STRING, ClassTable, \
+        SemanticError, join_chains
+from .visitor import NodeVisitor
+
+
+COMPARISON_OPERATORS = frozenset(['<', '<='])
+
+# Classes whose objects can only be compared with objects of the same class
+BASIC_VALUE_CLASSES = frozenset([INT, STRING, BOOL])
+
+
+Signature = namedtuple('Signature', 'owner types type')
+Signature.__doc__ = """The signature of a method defined in class ``owner``."""
+
+
+class Environment(object):
+    """The global typing environment of a program.
+
+    Contains everything needed to check a class besides its own AST, without
+    any AST nodes, so that it is cheap to send to other processes. Undefined
+    types of attributes, method results and formal parameters are replaced
+    by ``Object``, the :class:`TypeChecker` reports them where they are
+    declared.
+
+    Args:
+        table: The :class:`pycoolc.semant.ClassTable` of the program.
+
+    Attributes:
+        attributes: A dict mapping every class to a dict of the types of all
+            its attributes.
+        methods: A dict mapping every class to a dict of the
+            :class:`Signature` of all its methods.
+
+    """
+
+    __slots__ = ('attributes', 'methods', '_ancestors', '_intervals')
+
+    def __init__(self, table):
+        self.attributes = {}
+        self.methods = {}
+        self._ancestors = {}
+        self._intervals = {}
+        signatures = {}
+        classes = set(info.name for info in table)
+        for info in table:
+            self.attributes[info.name] = dict(
+                (name, _defined(attribute.type, classes))
+                for name, attribute in info.attributes.items())
+            methods = self.methods[info.name] = {}
+            for name, method in info.methods.items():
+                # Inherited methods share the signature object
+                key = method.owner, name
+                if key not in signatures:
+                    types = tuple(_defined(type, classes, self_type=False)
+                                  for type in method.types)
+                    signatures[key] = Signature(method.owner, types,
+                                                _defined(method.type, classes))
+                methods[name] = signatures[key]
+            self._ancestors[info.name] = info.ancestors
+            self._intervals[info.name] = info.preorder, info.postorder
+
+    def __contains__(self, cls):
+        return cls in self._ancestors
+
+    def conforms(self, cls, other):
+        """Return whether class ``cls`` is ``other`` or a subclass of it.
+
+        Undefined classes only conform to ``Object``.
+
+        """
+        interval = self._intervals.get(cls)
+        other_interval = self._intervals.get(other)
+        if interval is None or other_interval is None:
+            return other == OBJECT
+        return other_interval[0] <= interval[0] and interval[1] <= other_interval[1]
+
+    def join(self, a, b):
+        """Return the least common ancestor of the classes ``a`` and ``b``."""
+        if a == b:
+            return a
+        if a not in self._ancestors or b not in self._ancestors:
+            return OBJECT
+        return join_chains(self._ancestors[a], self._ancestors[b])
+
+
+def _defined(type, classes, self_type=True):
+    """Return a declared type, or ``Object`` if it is undefined."""
+    if type in classes or (type == SELF_TYPE and self_type):
+        return type
+    return OBJECT
+
+
+class TypeChecker(NodeVisitor):
+    """Checks the classes of a program against an :class:`Environment`.
+
+    Visiting an expression returns its static type, which is ``SELF_TYPE``
+    for the type of ``self``. After an error, the type of the offending
+    expression is assumed to be ``Object``.
+
+    Args:
+        environment: The :class:`Environment` of the program.
+        annotations: An optional dict to store static types needed by code
+            generators in. For every ``MethodCall`` node, the class whose
+            method is called is stored under ``id(node)``, for every ``=``
+            operation the pair of the operand types, for every ``isvoid``
+            the type of the operand and for every ``If`` the types of both
+            branches and of the whole expression.
+
+    """
+
+    def __init__(self, environment, annotations=None):
+        self.environment = environment
+        self.annotations = annotations
+        self.errors = []
+        self.cls = None
+        self.scope = {}
+
+    def check_class(self, node):
+        """Check a class.
+
+        Args:
+            node: The :class:`pycoolc.ast.Type` node of the class.
+
+        Returns:
+            A list of the :class:`pycoolc.semant.SemanticError`\\ s found.
+
+        """
+        self.errors = []
+        self.cls = node.name
+        for feature in node.features:
+            self.scope = {}
+            if isinstance(feature, ast.Attribute):
+                self._check_attribute(feature)
+            else:
+                self._check_method(feature)
+        return self.errors
+
+    ###### HELPERS ######
+
+    def error(self, message, node):
+        self.errors.append(SemanticError(message, node.span))
+
+    def _declared(self, type, node, self_type=True):
+        """Return a declared type, or ``Object`` if it is undefined."""
+        if type == SELF_TYPE and self_type:
+            return type
+        if type not in self.environment or type == SELF_TYPE:
+            self.error('Undefined type {}'.format(type), node)
+            return OBJECT
+        return type
+
+    def _conforms(self, type, other):
+        if type == SELF_TYPE:
+            if other == SELF_TYPE:
+                return True
+            type = self.cls
+        elif other == SELF_TYPE:
+            return False
+        return self.environment.conforms(type, other)
+
+    def _join(self, a, b):
+        if a == b:
+            return a
+        if a == SELF_TYPE:
+            a = self.cls
+        if b == SELF_TYPE:
+            b = self.cls
+        return self.environment.join(a, b)
+
+    def _bind(self, name, type, node):
+        """Bind a name in the current scope, returning the previous binding."""
+        if name == SELF:
+            self.error("'self' cannot be bound", node)
+        previous = self.scope.get(name)
+        self.scope[name] = type
+        return previous
+
+    def _unbind(self, name, previous):
+        if previous is None:
+            del self.scope[name]
+        else:
+            self.scope[name] = previous
+
+    ###### FEATURES ######
+
+    def _check_attribute(self, node):
+        type = self._declared(node.type, node)
+        if node.expr is not None:
+            value = self.visit(node.expr)
+            if not self._conforms(value, type):
+                self.error('Type {} of the initialization of attribute {} does not conform '
+                           'to declared type {}'.format(value, node.ident.name, type), node)
+
+    def _check_method(self, node):
+        for formal in node.formals:
+            name = formal.ident.name
+            if name == SELF:
+                self.error("'self' cannot be the name of a formal parameter", formal)
+                continue
+            if name in self.scope:
+                self.error('Formal parameter {} is defined more than once'.format(name), formal)
+            self.scope[name] = self._declared(formal.type, formal, self_type=False)
+        type = self._declared(node.type, node)
+        value = self.visit(node.expr)
+        if not self._conforms(value, type):
+            self.error('Inferred return type {} of method {} does not conform to declared '
+                       'return type {}'.format(value, node.ident.name, type), node)
+
+    ###### EXPRESSIONS ######
+
+    def visit_int(self, value):
+        return INT
+
+    def visit_str(self, value):
+        return STRING
+
+    def visit_bool(self, value):
+        return BOOL
+
+    def visit_Ident(self, node):
+        name = node.name
+        if name == SELF:
+            return SELF_TYPE
+        type = self.scope.get(name) or self.environment.attributes[self.cls].get(name)
+        if type is None:
+            self.error('Undeclared identifier {}'.format(name), node)
+            return OBJECT
+        return type
+
+    def visit_Assignment(self, node):
+        name = node.ident.name
+        value = yield node.expr
+        if name == SELF:
+            self.error("Cannot assign to 'self'", node)
+            return value
+        type = self.scope.get(name) or self.environment.attributes[self.cls].get(name)
+        if type is None:
+            self.error('Assignment to undeclared identifier {}'.format(name), node)
+        elif not self._conforms(value, type):
+            self.error('Type {} of assigned expression does not conform to declared type {} '
+                       'of identifier {}'.format(value, type, name), node)
+        return value
+
+    def visit_Block(self, node):
+        type = OBJECT
+        for element in node.elements:
+            type = yield element
+        return type
+
+    def visit_If(self, node):
+        condition = yield node.condition
+        if condition != BOOL:
+            self.error('Condition of if has type {} instead of Bool'.format(condition), node)
+        true = yield node.true
+        false = yield node.false
+        type = self._join(true, false)
+        if self.annotations is not None:
+            self.annotations[id(node)] = true, false, type
+        return type
+
+    def visit_While(self, node):
+        condition = yield node.condition
+        if condition != BOOL:
+            self.error('Condition of while has type {} instead of Bool'.format(condition), node)
+        yield node.action
+        return OBJECT
+
+    def visit_Let(self, node):
+        bindings = []
+        for attribute in node.assignments:
+            type = self._declared(attribute.type, attribute)
+            if attribute.expr is not None:
+                value = yield attribute.expr
+                if not self._conforms(value, type):
+                    self.error('Type {} of the initialization of {} does not conform to '
+                               'declared type {}'.format(value, attribute.ident.name, type),
+                               attribute)
+            name = attribute.ident.name
+            bindings.append((name, self._bind(name, type, attribute)))
+        type = yield node.expr
+        for name, previous in reversed(bindings):
+            self._unbind(name, previous)
+        return type
+
+    def visit_Case(self, node):
+        yield node.expr
+        types = []
+        seen = set()
+        for action in node.typeactions:
+            declared = self._declared(action.type, action, self_type=False)
+            if action.type in seen:
+                self.error('Duplicate branch {} in case'.format(action.type), action)
+            seen.add(action.type)
+            name = action.ident.name
+            previous = self._bind(name, declared, action)
+            types.append((yield action.expr))
+            self._unbind(name, previous)
+        type = types[0]
+        for other in types[1:]:
+            type = self._join(type, other)
+        return type
+
+    def visit_New(self, node):
+        return self._declared(node.type, node)
+
+    def visit_UnaryOperation(self, node):
+        type = yield node.right
+        operator = node.operator.lower()
+        if operator == 'isvoid':
+            if self.annotations is not None:
+                self.annotations[id(node)] = type
+            return BOOL
+        expected, result = (INT, INT) if operator == '~' else (BOOL, BOOL)
+        if type != expected:
+            self.error('Argument of {} has type {} instead of {}'.format(
+                operator, type, expected), node)
+        return result
+
+    def visit_BinaryOperation(self, node):
+        left = yield node.left
+        right = yield node.right
+        operator = node.operator
+        if operator == '=':
+            if self.annotations is not None:
+                self.annotations[id(node)] = left, right
+            if (left in BASIC_VALUE_CLASSES or right in BASIC_VALUE_CLASSES) and left != right:
+                self.error('Illegal comparison of {} and {}'.format(left, right), node)
+            return BOOL
+        if left != INT or right != INT:
+            self.error('Non-Int arguments: {} {} {}'.format(left, operator, right), node)
+        return BOOL if operator in COMPARISON_OPERATORS else INT
+
+    def visit_FunctionCall(self, node):
+        types = []
+        for param in node.params:
+            types.append((yield param))
+        return self._dispatch(node, self.cls, SELF_TYPE, types)
+
+    def visit_MethodCall(self, node):
+        receiver = yield node.object
+        call = node.method
+        types = []
+        for param in call.params:
+            types.append((yield param))
+        if node.targettype is None:
+            cls = self.cls if receiver == SELF_TYPE else receiver
+        else:
+            cls = self._declared(node.targettype, node, self_type=False)
+            if not self._conforms(receiver, cls):
+                self.error('Expression type {} does not conform to declared static dispatch '
+                           'type {}'.format(receiver, cls), node)
+        if self.annotations is not None:
+            self.annotations[id(node)] = cls
+        return self._dispatch(call, cls, receiver, types)
+
+    def _dispatch(self, call, cls, receiver, types):
+        """Check a call of a method of ``cls`` and return its type."""
+        name = call.ident.name
+        methods = self.environment.methods.get(cls)
+        signature = None if methods is None else methods.get(name)
+        if signature is None:
+            self.error('Dispatch to undefined method {} of class {}'.format(name, cls), call)
+            return OBJECT
+        if len(types) != len(signature.types):
+            self.error('Method {} called with {} arguments instead of {}'.format(
+                name, len(types), len(signature.types)), call)
+        else:
+            for i, (type, formal) in enumerate(zip(types, signature.types)):
+                if not self._conforms(type, formal):
+                    self.error('Argument {} of the call of method {} has type {} instead of {}'
+                               .format(i + 1, name, type, formal), call)
+        return receiver if signature.type == SELF_TYPE else signature.type
+
+
+###### PROGRAMS ######
+
+def check_main(table):
+    """Check that the program has a ``Main`` class with a ``main()`` method.
+
+    Returns:
+        A list of :class:`pycoolc.semant.SemanticError`\\ s.
+
+    """
+    if MAIN not in table:
+        return [SemanticError('Class Main is not defined')]
+    method = table.method(MAIN, MAIN_METHOD)
+    if method is None:
+        return [SemanticError('Class Main has no method main', table[MAIN].node.span)]
+    if method.types:
+        return [SemanticError('Method main of class Main must not take arguments',
+                              method.node.span)]
+    return []
+
+
+def check_classes(environment, classes):
+    """Check classes, returning a list of the errors found in all of them."""
+    checker = TypeChecker(environment)
+    errors = []
+    for node in classes:
+        errors.extend(checker.check_class(node))
+    return errors
+
+
+def annotate(program, table):
+    """Check a program and record the static types needed to compile it.
+
+    Args:
+        program: The AST of the program.
+        table: The :class:`pycoolc.semant.ClassTable` of the program.
+
+    Returns:
+        A dict of the annotations of the nodes, see :class:`TypeChecker`.
+
+    Raises:
+        pycoolc.semant.SemanticError: The first error found in the program.
+
+    """
+    annotations = {}
+    checker = TypeChecker(Environment(table), annotations)
+    errors = check_main(table)
+    for node in program:
+        errors.extend(checker.check_class(node))
+    if errors:
+        raise errors[0]
+    return annotations
+
+
+_environment = None
+_program = None
+
+
+def _init_worker(environment, program):
+    global _environment, _program
+    _environment = environment
+    _program = serialize.loads(program) if isinstance(program, bytes) else program
+
+
+def _check_range(bounds):
+    start, stop = bounds
+    return check_classes(_environment, _program[start:stop])
+
+
+def check(program, jobs=1, chunksize=None):
+    """Type check a program.
+
+    Args:
+        program: The AST of the program.
+        jobs: The number of worker processes to check the classes in. With a
+            single job, everything runs in the current process. Starting the
+            workers takes a while, so this is only worth it for programs with
+            many classes.
+        chunksize: The number of classes checked per task. Defaults to a
+            number giving every worker several tasks.
+
+    Returns:
+        A list of :class:`pycoolc.semant.SemanticError`\\ s, in program order.
+        Errors in the class hierarchy stop the checking, so there is at most
+        one of those.
+
+    """
+    try:
+        table = ClassTable(program)
+    except SemanticError as e:
+        return [e]
+    environment = Environment(table)
+    errors = check_main(table)
+    jobs = jobs or os.cpu_count() or 1
+    if jobs == 1 or len(program) < 2:
+        errors.extend(check_classes(environment, program))
+        return errors
+    chunksize = chunksize or max(1, len(program) // (jobs * 4))
+    bounds = [(start, min(start + chunksize, len(program)))
+              for start in range(0, len(program), chunksize)]
+    context = multiprocessing.get_context()
+    if context.get_start_method() != 'fork':
+        program = serialize.dumps(program)
+    with ProcessPoolExecutor(max_workers=jobs, mp_context=context, initializer=_init_worker,
+                             initargs=(environment, program)) as executor:
+        for result in executor.map(_check_range, bounds):
+            errors.extend(result)
+    return errors
@@ -1,3 +1,9 @@
+import sys
+
+from .ast import Node
+from .visitor import NodeVisitor
+
+
 def indent(string, level=1, lstrip_first=False):
     """Multiline string indent.
     
@@ -24,42 +30,81 @@ def is_namedtuple(x):
     return isinstance(x, tuple) and hasattr(x, '_fields')
 
 
-def print_ast(tree, level=0, inline=False):
-    """Recursive function to print the AST.
-    
-    Args:
-        tree: An abstract syntax tree consisting of tuples, namedtuples and other objects.
-        level: The indent level, used for the recursive calls.
-        inline: Whether or not to indent the first line.
-        
-    Returns:
-        Nothing. The AST is printed directly to stdout.
-        
-    """
+def is_node(x):
+    """Return whether ``x`` is an AST node or another namedtuple."""
+    return isinstance(x, Node) or is_namedtuple(x)
 
-    if is_namedtuple(tree):
 
-        print(indent('{0.__class__.__name__}('.format(tree), level, inline))
-        for key, value in tree._asdict().items():
-            print(indent(key + '=', level + 1), end='')
-            print_ast(value, level + 1, True)
-        print(indent(')', level))
+class _ASTPrinter(NodeVisitor):
+    """Writes the lines of :func:`print_ast`, buffering them in chunks."""
 
-    elif isinstance(tree, (tuple, list)):
+    BUFFER_SIZE = 1024
 
-        if isinstance(tree, tuple):
-            braces = '()'
-        else:
-            braces = '[]'
+    def __init__(self, file, level, inline):
+        self.file = file
+        self.level = level
+        self.inline = inline
+        self.buffer = []
+
+    def write(self, text):
+        self.buffer.append(text)
+        if len(self.buffer) >= self.BUFFER_SIZE:
+            self.flush()
+
+    def flush(self):
+        self.file.write(''.join(self.buffer))
+        del self.buffer[:]
+
+    def generic_visit(self, tree):
+        level = self.level
+        prefix = '' if self.inline else level * '  '
+
+        if is_node(tree):
+
+            self.write('{}{}(\n'.format(prefix, tree.__class__.__name__))
+            for key, value in tree._asdict().items():
+                self.write('{}{}='.format((level + 1) * '  ', key))
+                self.level, self.inline = level + 1, True
+                yield value
+            self.write('{})\n'.format(level * '  '))
+
+        elif isinstance(tree, (tuple, list)):
+
+            if isinstance(tree, tuple):
+                braces = '()'
+            else:
+                braces = '[]'
+
+            if len(tree) == 0:
+                self.write(braces + '\n')
+            else:
+                self.write(prefix + braces[0] + '\n')
+                for obj in tree:
+                    self.level, self.inline = level + 1, False
+                    yield obj
+                self.write(level * '  ' + braces[1] + '\n')
 
-        if len(tree) == 0:
-            print(braces)
         else:
-            print(indent(braces[0], level, inline))
-            for obj in tree:
-                print_ast(obj, level + 1)
-            print(indent(braces[1], level))
 
-    else:
+            self.write(indent(repr(tree), level, self.inline) + '\n')
+
+
+def print_ast(tree, level=0, inline=False, file=None):
+    """Print the AST.
+
+    The tree is walked without recursion, so it may be nested arbitrarily
+    deep, and the output is written in large chunks.
 
-        print(indent(repr(tree), level, inline))
+    Args:
+        tree: An abstract syntax tree consisting of nodes, tuples, namedtuples and other objects.
+        level: The indent level of the tree. Defaults to 0.
+        inline: Whether or not to indent the first line.
+        file: The file object to write to. Defaults to ``sys.stdout``.
+
+    Returns:
+        Nothing. The AST is written to ``file``.
+
+    """
+    printer = _ASTPrinter(sys.stdout if file is None else file, level, inline)
+    printer.visit(tree)
+    printer.flush()
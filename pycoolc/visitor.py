@@ -0,0 +1,133 @@
+"""
+Visitors and transformers for the AST, working on trees of any depth.
+
+Like ``ast.NodeVisitor`` of the standard library, :class:`NodeVisitor` calls
+a ``visit_<classname>`` method for every node, or :meth:`~NodeVisitor.generic_visit`
+if there is none. Instead of recursing, visitor methods which need the
+results of children are generators: they ``yield`` a child and get the
+result of visiting it back, and ``return`` their own result. The children
+are visited by :meth:`NodeVisitor.visit` using an explicit stack, so the
+depth of the tree is not limited by the Python recursion limit.
+
+Example::
+
+    class Depth(NodeVisitor):
+
+        def generic_visit(self, node):
+            depth = 0
+            for child in children(node):
+                depth = max(depth, (yield child))
+            return depth + 1
+
+        def visit_int(self, node):
+            return 0
+
+Visitor methods may also be plain functions returning a result directly.
+
+"""
+from types import GeneratorType
+
+from .ast import Node
+
+
+def children(tree):
+    """Return the direct children of ``tree`` that the visitors descend into.
+
+    These are the fields of a node and the elements of a tuple or list
+    which are nodes, tuples or lists themselves. Names and constants are
+    not visited by :meth:`NodeVisitor.generic_visit`.
+
+    """
+    if not isinstance(tree, (Node, tuple, list)):
+        return []
+    return [value for value in tree if isinstance(value, (Node, tuple, list))]
+
+
+class NodeVisitor(object):
+    """Walks the AST and calls a visitor method for every node found.
+
+    The visitor method for an object is ``visit_`` followed by the name of its
+    class, e.g. ``visit_If``, ``visit_tuple`` or ``visit_int``. Objects
+    without a visitor method are passed to :meth:`generic_visit`.
+
+    """
+
+    def visit(self, tree):
+        """Visit a tree.
+
+        Args:
+            tree: A node, tuple or any other value of the AST.
+
+        Returns:
+            The result of the visitor method for ``tree``.
+
+        """
+        if '_methods' not in self.__dict__:
+            self._methods = {}
+        value = self._call(tree)
+        if not isinstance(value, GeneratorType):
+            return value
+        stack = [value]
+        value = None
+        while stack:
+            try:
+                child = stack[-1].send(value)
+            except StopIteration as stop:
+                stack.pop()
+                value = stop.value
+                continue
+            value = self._call(child)
+            if isinstance(value, GeneratorType):
+                stack.append(value)
+                value = None
+        return value
+
+    def _call(self, tree):
+        # Look up the visitor method once per class
+        try:
+            method = self._methods[tree.__class__]
+        except KeyError:
+            method = getattr(self, 'visit_' + tree.__class__.__name__, self.generic_visit)
+            self._methods[tree.__class__] = method
+        return method(tree)
+
+    def generic_visit(self, tree):
+        """Visit all children of ``tree``, see :func:`children`."""
+        for child in children(tree):
+            yield child
+
+
+class NodeTransformer(NodeVisitor):
+    """A :class:`NodeVisitor` that replaces the visited nodes.
+
+    The result of a visitor method replaces the visited object. For elements
+    of tuples and lists, a result of `None` removes the element. Unchanged
+    nodes and tuples are kept, changed nodes are copied with
+    ``_replace()``, so they keep their span.
+
+    """
+
+    def generic_visit(self, tree):
+        """Transform all children of ``tree`` and return the updated tree."""
+        if isinstance(tree, Node):
+            changes = {}
+            for name, value in zip(tree._fields, tree):
+                if isinstance(value, (Node, tuple, list)):
+                    new = yield value
+                    if new is not value:
+                        changes[name] = new
+            return tree._replace(**changes) if changes else tree
+        if isinstance(tree, (tuple, list)):
+            values = []
+            changed = False
+            for value in tree:
+                if isinstance(value, (Node, tuple, list)):
+                    new = yield value
+                    if new is not value:
+                        changed = True
+                        if new is None:
+                            continue
+                    value = new
+                values.append(value)
+            return tree.__class__(values) if changed else tree
+        return tree
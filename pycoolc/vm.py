@@ -0,0 +1,326 @@
+"""
+A virtual machine running the bytecode of :mod:`pycoolc.bytecode`.
+
+A program runs in a single loop in :meth:`VM.execute`, dispatching the
+instructions and testing the most frequent opcodes first. Every call of a
+bytecode function gets a new frame, a list of registers, and the frame of
+the caller is pushed onto a stack of frames in the heap instead of the
+Python stack, so the depth of the recursion is only limited by memory, or
+by ``max_depth``. Tail calls reuse the frame of the caller, so tail
+recursive methods run in constant space.
+
+Values, classes and the methods of the basic classes are those of
+:mod:`pycoolc.runtime`: ``Int``, ``Bool`` and ``String`` are native Python
+values, void is `None`. Objects of other classes are
+:class:`pycoolc.runtime.Instance`\\ s storing their attributes in a list
+indexed like the attributes of the class. The vtables and initializers of
+the :class:`pycoolc.runtime.Class`\\ es hold the bytecode functions, which
+the VM runs itself.
+
+Usage::
+
+    python3 -m pycoolc.vm [--disassemble] path/to/sourcefile.cl
+
+Example::
+
+    >>> VM.compile(parse('class Main { main() : Int { 6 * 7 }; };')).run()
+    42
+
+"""
+import sys
+
+from .bytecode import ADD, CALL, CASE, DIV, EQ, GETATTR, ISVOID, JUMP, JUMPF, LE, LOADI, \
+        LOADK, LT, MOVE, MUL, NEG, NEW, NEWSELF, NOT, RETURN, SCALL, SETATTR, SUB, TAILCALL, \
+        TAILSCALL, Function, compile_program
+from .runtime import INT_MAX, INT_MIN, Abort, Class, ExecutionError, Instance, Runtime, \
+        divide, int32
+
+# The default limit of active frames, to stop infinite recursion long before
+# the memory runs out
+MAX_DEPTH = 1000000
+
+
+class VM(object):
+    """Runs a compiled program.
+
+    Args:
+        program: A :class:`pycoolc.bytecode.Program`.
+        stdin: The input of the program. Defaults to ``sys.stdin``.
+        stdout: The output of the program. Defaults to ``sys.stdout``.
+        max_depth: The maximum number of active frames, or `None` for no
+            limit.
+
+    Attributes:
+        runtime: The :class:`pycoolc.runtime.Runtime` of the program.
+        classes: The :class:`pycoolc.runtime.Class`\\ es, indexed by tag.
+
+    """
+
+    def __init__(self, program, stdin=None, stdout=None, max_depth=MAX_DEPTH):
+        self.program = program
+        self.max_depth = float('inf') if max_depth is None else max_depth
+        functions = program.functions
+        self.classes = []
+        for tag, layout in enumerate(program.classes):
+            numbers = dict((functions[method].name if method.__class__ is int else method, i)
+                           for i, method in enumerate(layout.methods))
+            cls = Class(layout.name, tag, layout.ancestors, layout.defaults, numbers)
+            cls.initializers = [functions[i] for i in layout.initializers]
+            self.classes.append(cls)
+        self.runtime = Runtime(stdin=stdin, stdout=stdout, classes=self.classes)
+        for cls, layout in zip(self.classes, program.classes):
+            cls.vtable = [functions[method] if method.__class__ is int
+                          else self.runtime.basic_method(method) for method in layout.methods]
+        self.basic = self.runtime.basic
+
+    @classmethod
+    def compile(cls, program, table=None, stdin=None, stdout=None, max_depth=MAX_DEPTH):
+        """Compile the AST of a program and return a VM running it.
+
+        Raises:
+            pycoolc.semant.SemanticError: If the program is not type correct.
+
+        """
+        return cls(compile_program(program, table), stdin, stdout, max_depth)
+
+    def run(self):
+        """Run the program, calling ``main()`` on a new ``Main`` object.
+
+        Returns:
+            The result of ``main()``.
+
+        Raises:
+            pycoolc.runtime.ExecutionError: On a runtime error.
+            pycoolc.runtime.Abort: If the program called ``abort()``.
+
+        """
+        main = self.new(self.classes[self.program.main])
+        function = main.cls.vtable[self.program.main_method]
+        return self.execute(function, [main] + function.padding)
+
+    def new(self, cls):
+        """Create a new object of a :class:`Class` and initialize its attributes."""
+        obj = Instance(cls, list(cls.defaults))
+        for initializer in cls.initializers:
+            self.execute(initializer, [obj] + initializer.padding)
+        return obj
+
+    def execute(self, function, registers):
+        """Run a function.
+
+        Calls of bytecode functions do not recurse: the frame of the caller
+        is saved on a stack in the heap and restored when the callee
+        returns. Tail calls replace the frame of the caller.
+
+        Args:
+            function: The :class:`pycoolc.bytecode.Function`.
+            registers: The frame: ``self``, the arguments and a `None` for
+                every other register.
+
+        Returns:
+            The return value of the function.
+
+        Raises:
+            pycoolc.runtime.ExecutionError: On a runtime error, or if more
+                than ``max_depth`` frames are active.
+
+        """
+        code = function.instructions
+        constants = self.program.constants
+        max_depth = self.max_depth
+        basic = self.basic
+        # The saved frames of the callers: code, registers, fields, the
+        # position to continue at and the register receiving the result,
+        # or -1 to discard it
+        stack = []
+        r = registers
+        fields = r[0].fields
+        pc = 0
+        while True:
+            op = code[pc]
+            if op == GETATTR:
+                r[code[pc + 1]] = fields[code[pc + 2]]
+                pc += 3
+            elif op == LOADI:
+                r[code[pc + 1]] = code[pc + 2]
+                pc += 3
+            elif op == CALL or op == SCALL or op == TAILCALL or op == TAILSCALL:
+                if op == CALL or op == TAILCALL:
+                    first = pc + 5 if op == CALL else pc + 4
+                    receiver = r[code[first]]
+                    if receiver is None:
+                        raise ExecutionError('Dispatch to void',
+                                             self.program.spans[code[first - 2]])
+                    if receiver.__class__ is Instance:
+                        method = receiver.cls.vtable[code[first - 3]]
+                    else:
+                        method = basic[receiver.__class__].vtable[code[first - 3]]
+                else:
+                    first = pc + 6 if op == SCALL else pc + 5
+                    receiver = r[code[first]]
+                    if receiver is None:
+                        raise ExecutionError('Dispatch to void',
+                                             self.program.spans[code[first - 2]])
+                    method = self.classes[code[first - 4]].vtable[code[first - 3]]
+                end = first + code[first - 1]
+                args = [r[i] for i in code[first:end]]
+                if method.__class__ is Function:
+                    if op == CALL or op == SCALL:
+                        if len(stack) >= max_depth:
+                            raise ExecutionError('Stack overflow',
+                                                 self.program.spans[code[first - 2]])
+                        stack.append((code, r, fields, end, code[pc + 1]))
+                    code = method.instructions
+                    r = args + method.padding
+                    fields = receiver.fields
+                    pc = 0
+                elif op == CALL or op == SCALL:
+                    r[code[pc + 1]] = method(*args)
+                    pc = end
+                else:
+                    value = method(*args)
+                    if not stack:
+                        return value
+                    code, r, fields, pc, target = stack.pop()
+                    if target >= 0:
+                        r[target] = value
+            elif op == JUMPF:
+                if r[code[pc + 1]]:
+                    pc += 3
+                else:
+                    pc = code[pc + 2]
+            elif op == MOVE:
+                r[code[pc + 1]] = r[code[pc + 2]]
+                pc += 3
+            elif op == ADD:
+                value = r[code[pc + 2]] + r[code[pc + 3]]
+                r[code[pc + 1]] = value if INT_MIN <= value <= INT_MAX else int32(value)
+                pc += 4
+            elif op == SUB:
+                value = r[code[pc + 2]] - r[code[pc + 3]]
+                r[code[pc + 1]] = value if INT_MIN <= value <= INT_MAX else int32(value)
+                pc += 4
+            elif op == LT:
+                r[code[pc + 1]] = r[code[pc + 2]] < r[code[pc + 3]]
+                pc += 4
+            elif op == JUMP:
+                pc = code[pc + 1]
+            elif op == RETURN:
+                value = r[code[pc + 1]]
+                if not stack:
+                    return value
+                code, r, fields, pc, target = stack.pop()
+                if target >= 0:
+                    r[target] = value
+            elif op == LOADK:
+                r[code[pc + 1]] = constants[code[pc + 2]]
+                pc += 3
+            elif op == SETATTR:
+                fields[code[pc + 1]] = r[code[pc + 2]]
+                pc += 3
+            elif op == EQ:
+                left = r[code[pc + 2]]
+                right = r[code[pc + 3]]
+                r[code[pc + 1]] = left is right or (
+                    left.__class__ is right.__class__ and left.__class__ in basic and
+                    left == right)
+                pc += 4
+            elif op == LE:
+                r[code[pc + 1]] = r[code[pc + 2]] <= r[code[pc + 3]]
+                pc += 4
+            elif op == MUL:
+                value = r[code[pc + 2]] * r[code[pc + 3]]
+                r[code[pc + 1]] = value if INT_MIN <= value <= INT_MAX else int32(value)
+                pc += 4
+            elif op == DIV:
+                r[code[pc + 1]] = divide(r[code[pc + 2]], r[code[pc + 3]],
+                                         self.program.spans[code[pc + 4]])
+                pc += 5
+            elif op == NOT:
+                r[code[pc + 1]] = not r[code[pc + 2]]
+                pc += 3
+            elif op == NEG:
+                value = -r[code[pc + 2]]
+                r[code[pc + 1]] = value if value <= INT_MAX else INT_MIN
+                pc += 3
+            elif op == ISVOID:
+                r[code[pc + 1]] = r[code[pc + 2]] is None
+                pc += 3
+            elif op == NEW or op == NEWSELF:
+                if op == NEW:
+                    cls = self.classes[code[pc + 2]]
+                    next_pc = pc + 3
+                else:
+                    cls = r[0].cls
+                    next_pc = pc + 2
+                obj = Instance(cls, list(cls.defaults))
+                r[code[pc + 1]] = obj
+                pc = next_pc
+                if cls.initializers:
+                    # Run the initializers in frames of their own, ancestors
+                    # first, before continuing with the object in its register
+                    if len(stack) >= max_depth:
+                        raise ExecutionError('Stack overflow')
+                    stack.append((code, r, fields, pc, -1))
+                    for initializer in reversed(cls.initializers[1:]):
+                        stack.append((initializer.instructions, [obj] + initializer.padding,
+                                      obj.fields, 0, -1))
+                    initializer = cls.initializers[0]
+                    code = initializer.instructions
+                    r = [obj] + initializer.padding
+                    fields = obj.fields
+                    pc = 0
+            elif op == CASE:
+                value = r[code[pc + 1]]
+                if value is None:
+                    raise ExecutionError('Case on void', self.program.spans[code[pc + 3]])
+                cls = value.cls if value.__class__ is Instance else basic[value.__class__]
+                target = constants[code[pc + 2]][cls.tag]
+                if target < 0:
+                    raise ExecutionError('No case branch matches class {}'.format(cls.name),
+                                         self.program.spans[code[pc + 3]])
+                pc = target
+            else:
+                raise ValueError('Invalid opcode {} at {}'.format(op, pc))
+
+
+def main(argv=None):
+    from .bytecode import disassemble
+    from .diagnostics import Diagnostics
+    from .parser import parse
+    from .semant import SemanticError
+
+    argv = sys.argv[1:] if argv is None else argv
+    show = '--disassemble' in argv
+    paths = [arg for arg in argv if arg != '--disassemble']
+    if len(paths) != 1:
+        print('You need to specify a cool source file to run.', file=sys.stderr)
+        return 1
+    with open(paths[0], 'r') as source:
+        data = source.read()
+    diagnostics = Diagnostics()
+    program = parse(data, diagnostics)
+    for line in diagnostics.format(data):
+        print(line, file=sys.stderr)
+    if program is None or diagnostics:
+        return 1
+    try:
+        compiled = compile_program(program)
+    except SemanticError as e:
+        print(e.message, file=sys.stderr)
+        return 1
+    if show:
+        print(disassemble(compiled))
+        return 0
+    try:
+        VM(compiled).run()
+    except Abort:
+        return 1
+    except ExecutionError as e:
+        print('Runtime error: {}'.format(e.message), file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
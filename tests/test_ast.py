@@ -0,0 +1,117 @@
+"""
+This module contains tests for the AST nodes and their source spans.
+"""
+import contextlib
+import io
+import pickle
+
+from nose.tools import assert_equal, assert_is_none, assert_not_equal, assert_raises
+
+from pycoolc import ast
+from pycoolc.parser import Parser
+from pycoolc.scanner import Scanner, TokenBuffer
+from pycoolc.utils import print_ast
+
+
+SOURCE = '''class Main inherits IO {
+  x : Int <- 1 + 2;
+  main(a : Int) : Object { {
+    out_int(x);
+    (new Main).main(a);
+  } };
+};
+'''
+
+
+def spans(tree):
+    """Return the source text of every node in ``tree``, in preorder."""
+    out = []
+    stack = [tree]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, ast.Node):
+            start, end = node.span
+            out.append((node.__class__.__name__, SOURCE[start:end]))
+            stack.extend(reversed(tuple(node)))
+        elif isinstance(node, tuple):
+            stack.extend(reversed(node))
+    return out
+
+
+class TestNode:
+
+    def test_namedtuple_compatibility(self):
+        node = ast.Attribute(ident=ast.Ident('x'), type='Int', expr=None)
+        assert_equal(node._fields, ('ident', 'type', 'expr'))
+        assert_equal(node._asdict(), {'ident': ast.Ident('x'), 'type': 'Int', 'expr': None})
+        assert_equal(tuple(node), (ast.Ident('x'), 'Int', None))
+        assert_equal(node[1], 'Int')
+        assert_equal(len(node), 3)
+        assert_equal(repr(node), "Attribute(ident=Ident(name='x'), type='Int', expr=None)")
+
+    def test_equality_ignores_span(self):
+        assert_equal(ast.Ident('x', span=(0, 1)), ast.Ident('x'))
+        assert_not_equal(ast.Ident('x'), ast.Ident('y'))
+        assert_not_equal(ast.New('x'), ast.Ident('x'))
+
+    def test_span(self):
+        assert_is_none(ast.Ident('x').span)
+        node = ast.Ident('x', span=(3, 70000))
+        assert_equal(node.span, (3, 70000))
+        node.span = (5, 6)
+        assert_equal(node.span, (5, 6))
+        assert_equal(node._replace(name='y').span, (5, 6))
+        # Offsets beyond 32 bits
+        node.span = (2 ** 40, 2 ** 40 + 3)
+        assert_equal(node.span, (2 ** 40, 2 ** 40 + 3))
+        node.span = None
+        assert_is_none(node.span)
+
+    def test_unhashable(self):
+        # Nodes are mutable, so they can't be dict keys by value
+        assert_raises(TypeError, hash, ast.Ident('x'))
+
+    def test_pickle(self):
+        node = ast.Block((ast.Ident('x', span=(1, 2)), 42), span=(0, 5))
+        copy = pickle.loads(pickle.dumps(node))
+        assert_equal(copy, node)
+        assert_equal(copy.span, (0, 5))
+        assert_equal(copy.elements[0].span, (1, 2))
+
+    def test_print_ast(self):
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            print_ast(ast.New('Main'))
+        assert_equal(out.getvalue(), "New(\n  type='Main'\n)\n")
+
+
+class TestSpans:
+
+    expected = [
+        ('Type', SOURCE[:-2]),
+        ('Attribute', 'x : Int <- 1 + 2'),
+        ('Ident', 'x'),
+        ('BinaryOperation', '1 + 2'),
+        ('Method', SOURCE[SOURCE.index('main('):-5]),
+        ('Ident', 'main'),
+        ('Formal', 'a : Int'),
+        ('Ident', 'a'),
+        ('Block', SOURCE[SOURCE.index('{\n    out'):-7]),
+        ('FunctionCall', 'out_int(x)'),
+        ('Ident', 'out_int'),
+        ('Ident', 'x'),
+        ('MethodCall', '(new Main).main(a)'),
+        ('New', 'new Main'),
+        ('FunctionCall', 'main(a)'),
+        ('Ident', 'main'),
+        ('Ident', 'a'),
+    ]
+
+    def test_lexer(self):
+        assert_equal(spans(Parser().parse(SOURCE)), self.expected)
+
+    def test_scanner(self):
+        assert_equal(spans(Parser(lexer=Scanner()).parse(SOURCE)), self.expected)
+
+    def test_token_buffer(self):
+        assert_equal(spans(Parser(lexer=TokenBuffer()).parse(SOURCE)), self.expected)
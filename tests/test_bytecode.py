@@ -0,0 +1,120 @@
+"""
+This module contains tests for the bytecode compiler and its serialization.
+
+The semantics are tested together with the other execution engines in
+``test_interpreter``.
+"""
+import io
+
+from nose.tools import assert_equal, assert_in, assert_is, assert_raises
+
+from pycoolc.bytecode import ADD, CALL, LOADI, RETURN, SCALL, TAILCALL, Program, \
+        compile_program, disassemble, instructions, tail_calls
+from pycoolc.parser import parse
+from pycoolc.runtime import ExecutionError
+from pycoolc.vm import VM
+
+
+SOURCE = '''class Main inherits IO {
+  count : Int;
+  main() : Object { let i : Int <- 0 in {
+    while i < 3 loop { i <- i + 1; count <- count + i; } pool;
+    out_int(count);
+  } };
+};'''
+
+
+def function(program, name):
+    for function in program.functions:
+        if function.name == name:
+            return function
+
+
+class TestCompiler:
+
+    def test_registers(self):
+        program = compile_program(parse('class Main { f(x : Int) : Int { x + 2 }; '
+                                        'main() : Int { f(1) }; };'))
+        code = function(program, 'f').code
+        assert_equal([(opcode, operands) for pc, opcode, operands in instructions(code)],
+                     [(LOADI, [2, 2]), (ADD, [2, 1, 2]), (RETURN, [2])])
+
+    def test_assignment(self):
+        # The sum is written into the register of the variable directly
+        code = function(compile_program(parse(SOURCE)), 'main').code
+        assert_in([ADD, 1, 1, 2], [[opcode] + operands
+                                   for pc, opcode, operands in instructions(code)])
+
+    def test_disassemble(self):
+        listing = disassemble(compile_program(parse(SOURCE)))
+        assert_in('function 0 Main.main (params 0, registers 3)', listing)
+        assert_in('GETATTR  r2, @0', listing)
+        # out_int() is called in tail position
+        assert_in('TAILCALL #4, r0, r2', listing)
+
+    def test_tail_calls(self):
+        program = parse('''class Main {
+          f(n : Int) : Int { if n = 0 then g(0) else { g(1); let x : Int in f(n - 1); } fi };
+          g(n : Int) : Int { case n of i : Int => (self@Main.f(n)) + 1; o : Object => g(n); esac };
+          main() : Int { f(3) };
+        };''')
+        f, g, main = program[0].features
+        calls = tail_calls(f.expr)
+        assert_equal(len(calls), 2)
+        assert_in(id(f.expr.true), calls)
+        assert_equal(len(tail_calls(g.expr)), 1)
+        opcodes = [[opcode for pc, opcode, operands in instructions(function.code)]
+                   for function in compile_program(program).functions]
+        assert_equal([ops.count(TAILCALL) for ops in opcodes], [2, 1, 1])
+        assert_equal([ops.count(CALL) for ops in opcodes], [1, 0, 0])
+        assert_equal([ops.count(SCALL) for ops in opcodes], [0, 1, 0])
+
+
+class TestProgram:
+
+    def test_serialize(self):
+        program = compile_program(parse(SOURCE))
+        loaded = Program.loads(program.dumps())
+        assert_equal(disassemble(loaded), disassemble(program))
+        stdout = io.StringIO()
+        VM(loaded, stdout=stdout).run()
+        assert_equal(stdout.getvalue(), '6')
+
+    def test_corrupt(self):
+        with assert_raises(ValueError):
+            Program.loads(b'garbage')
+
+    def test_runtime_classes(self):
+        vm = VM(compile_program(parse(SOURCE)))
+        main = vm.runtime.classes['Main']
+        assert_is(vm.classes[main.tag], main)
+        assert_equal(main.ancestors, ('Object', 'IO', 'Main'))
+        assert_equal(main.lookup('main').name, 'main')
+        assert_equal(vm.runtime.class_of('a'), vm.runtime.classes['String'])
+
+
+class TestFrames:
+
+    def run(self, body, **options):
+        source = ('class Main { sum(n : Int) : Int { if n = 0 then 0 else n + sum(n - 1) fi }; '
+                  'count(n : Int, acc : Int) : Int { '
+                  'if n = 0 then acc else count(n - 1, acc + n) fi }; '
+                  'main() : Int { ' + body + ' }; };')
+        return VM.compile(parse(source), **options).run()
+
+    def test_deep_recursion(self):
+        assert_equal(self.run('sum(100000)'), 5000050000 % 2 ** 32)
+
+    def test_tail_recursion(self):
+        assert_equal(self.run('count(100000, 0)', max_depth=1), 5000050000 % 2 ** 32)
+
+    def test_stack_overflow(self):
+        with assert_raises(ExecutionError) as context:
+            self.run('sum(100)', max_depth=50)
+        assert_equal(context.exception.message, 'Stack overflow')
+
+    def test_initializers(self):
+        source = ('''class A { x : Int <- f(); f() : Int { 1 }; };
+                     class B inherits A { y : Int <- x + 1; get() : Int { x + y }; };
+                     class Main { main() : Int { ((new B).get()) + ((new B).get()) }; };''')
+        assert_equal(VM.compile(parse(source)).run(), 6)
@@ -0,0 +1,79 @@
+"""
+This module contains tests for the on-disk AST cache.
+"""
+import marshal
+import os
+import shutil
+import tempfile
+import zlib
+
+from nose.tools import assert_equal, assert_false, assert_is_none, assert_not_equal, assert_true
+
+from pycoolc import cli, serialize
+from pycoolc.cache import ASTCache
+from pycoolc.parser import parse
+
+
+SOURCE = 'class Main { x : Int <- 42; };'
+
+
+class TestASTCache:
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.cache = ASTCache(self.directory)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_miss(self):
+        assert_is_none(self.cache.get(SOURCE))
+
+    def test_hit(self):
+        tree = parse(SOURCE)
+        assert_true(self.cache.put(SOURCE, tree))
+        out = self.cache.get(SOURCE)
+        assert_equal(out, tree)
+        assert_equal(out[0].features[0].span, tree[0].features[0].span)
+
+    def test_key(self):
+        assert_equal(self.cache.key(SOURCE), self.cache.key(SOURCE))
+        assert_not_equal(self.cache.key(SOURCE), self.cache.key(SOURCE + ' '))
+        self.cache.put(SOURCE, parse(SOURCE))
+        assert_is_none(self.cache.get(SOURCE + ' '))
+
+    def test_corrupt(self):
+        self.cache.put(SOURCE, parse(SOURCE))
+        # A node without its children, the payload itself is intact
+        crafted = serialize.MAGIC + zlib.compress(marshal.dumps(
+            (serialize.FORMAT_VERSION, bytes([0]), b'', b'', [])))
+        for data in [b'garbage', crafted]:
+            with open(self.cache.path(self.cache.key(SOURCE)), 'wb') as entry:
+                entry.write(data)
+            assert_is_none(self.cache.get(SOURCE))
+
+    def test_unwritable(self):
+        path = os.path.join(self.directory, 'file')
+        open(path, 'w').close()
+        assert_false(ASTCache(path).put(SOURCE, parse(SOURCE)))
+
+    def test_clear(self):
+        self.cache.put(SOURCE, parse(SOURCE))
+        self.cache.clear()
+        assert_is_none(self.cache.get(SOURCE))
+
+    def test_compile_file(self):
+        os.environ['PYCOOLC_CACHE_DIR'] = self.directory
+        try:
+            path = os.path.join(self.directory, 'main.cl')
+            with open(path, 'w') as source:
+                source.write(SOURCE)
+            first, = cli.run([path], jobs=1, cache=True)
+            second, = cli.run([path], jobs=1, cache=True, show_ast=True)
+        finally:
+            del os.environ['PYCOOLC_CACHE_DIR']
+        assert_true(first.ok)
+        assert_false(first.cached)
+        assert_true(second.ok)
+        assert_true(second.cached)
+        assert_true(second.ast.startswith('(\n  Type(\n'))
@@ -0,0 +1,69 @@
+"""
+This module contains tests for the batch compilation command line interface.
+"""
+import os
+import tempfile
+import time
+from unittest import mock
+
+from nose.tools import assert_equal, assert_true
+
+from pycoolc import cli
+
+
+EXAMPLES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'examples')
+
+
+class TestCli:
+
+    def setUp(self):
+        self.paths = cli.find_sources([EXAMPLES])
+
+    def test_find_sources(self):
+        names = [os.path.basename(path) for path in self.paths]
+        assert_equal(names, sorted(name for name in os.listdir(EXAMPLES) if name.endswith('.cl')))
+
+    def test_ordered(self):
+        results = list(cli.run(self.paths, jobs=2, ordered=True))
+        assert_equal([result.path for result in results], self.paths)
+
+    def test_unordered(self):
+        results = list(cli.run(self.paths, jobs=2))
+        assert_equal(sorted(result.path for result in results), self.paths)
+
+    def test_result(self):
+        path = os.path.join(EXAMPLES, 'simple.cl')
+        result, = cli.run([path], jobs=1, show_ast=True)
+        assert_true(result.ok)
+        assert_equal(result.diagnostics, [])
+        assert_true(result.ast.startswith('(\n  Type(\n'))
+
+    def test_stats(self):
+        path = os.path.join(EXAMPLES, 'simple.cl')
+        result, = cli.run([path], jobs=2, check=True, stats=True)
+        assert_equal(list(result.stats.phases), ['read', 'lex', 'parse', 'typecheck'])
+        assert_true(result.stats.counters['tokens'])
+        result, = cli.run([path], jobs=1)
+        assert_equal(result.stats, None)
+
+    def test_elapsed(self):
+        # The compile time includes building the AST text
+        def print_ast(tree, file):
+            time.sleep(0.05)
+        path = os.path.join(EXAMPLES, 'simple.cl')
+        with mock.patch.object(cli, 'print_ast', print_ast):
+            result = cli.compile_file(path, show_ast=True)
+        assert_true(result.elapsed >= 0.05)
+
+    def test_errors(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'broken.cl')
+            with open(path, 'w') as source:
+                source.write('class A {\n  x : Int <- ;\n  y : Int <- $$$ ;\n};\n')
+            result, = cli.run([path], jobs=1, scanner=True)
+            assert_equal(result.diagnostics, ["Line 2: Syntax error at ';'",
+                                              "Line 3: Illegal characters '$$$'",
+                                              "Line 3: Syntax error at ';'"])
+            result, = cli.run([path], jobs=1, max_errors=1)
+            assert_equal(result.diagnostics, ["Line 2: Syntax error at ';'",
+                                              'Too many errors, giving up'])
@@ -0,0 +1,96 @@
+"""
+This module contains tests for the Python code generator.
+
+The semantics are tested together with the other execution engines in
+``test_interpreter``.
+"""
+import io
+import shutil
+import tempfile
+import warnings
+
+from nose.tools import assert_equal, assert_in, assert_is_none, assert_is_not_none, \
+        assert_raises
+
+from pycoolc.codegen import CodeCache, PythonProgram, generate
+from pycoolc.parser import parse
+from pycoolc.runtime import ExecutionError
+from pycoolc.semant import SemanticError
+
+
+SOURCE = 'class Main inherits IO { main() : Object { out_int(6 * 7) }; };'
+
+
+def run(source):
+    return PythonProgram.compile(parse(source), stdout=io.StringIO()).run()
+
+
+class TestGenerator:
+
+    def test_classes(self):
+        source = generate(parse('class A { x : Int; }; class B inherits A { y : A; }; ' +
+                                SOURCE))
+        assert_in("class C_B(C_A):\n    __slots__ = ('a_y',)", source)
+        assert_in('self.a_x = 0\n        self.a_y = None', source)
+
+    def test_long_expressions(self):
+        assert_equal(run('class Main { main() : Int { ' + ' + '.join(['1'] * 500) + ' }; };'),
+                     500)
+        nested = '(' * 150 + '1' + ' + 1)' * 150
+        assert_equal(run('class Main { main() : Int { ' + nested + ' }; };'), 151)
+
+    def test_isvoid_literal(self):
+        with warnings.catch_warnings():
+            warnings.simplefilter('error')
+            assert_equal(run('class Main { main() : Bool { isvoid 3 = isvoid "a" }; };'), True)
+            # The operand is still evaluated
+            assert_equal(run('class Main { x : Int; main() : Int { '
+                             '{ isvoid (x <- 2 * 3 + x); x; } }; };'), 6)
+
+    def test_errors(self):
+        with assert_raises(SemanticError) as context:
+            generate(parse('class Main { main() : Int { "a" }; };'))
+        assert_equal(context.exception.message,
+                     'Inferred return type String of method main does not conform to declared '
+                     'return type Int')
+
+    def test_dispatch_to_void(self):
+        for receiver in ['a', '(new A).g()', 'f()']:
+            source = ('class A { g() : A { a }; a : A; }; class Main { a : A; f() : A { a }; '
+                      'main() : Object { ' + receiver + '.g() }; };')
+            with assert_raises(ExecutionError) as context:
+                run(source)
+            assert_equal(context.exception.message, 'Dispatch to void')
+            start, end = context.exception.span
+            assert_equal(source[start:end], receiver + '.g()')
+        # Receivers that are never void are not checked
+        assert_equal(run('class A { g() : Int { 1 }; }; class Main { a : A <- new A; '
+                         'main() : Int { { a.g(); (new A).g(); } }; };'), 1)
+
+
+
+class TestCodeCache:
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.cache = CodeCache(self.directory)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_load(self):
+        assert_is_none(self.cache.get(SOURCE))
+        stdout = io.StringIO()
+        PythonProgram.load(SOURCE, self.cache, stdout=stdout).run()
+        assert_is_not_none(self.cache.get(SOURCE))
+        PythonProgram.load(SOURCE, self.cache, stdout=stdout).run()
+        assert_equal(stdout.getvalue(), '4242')
+
+    def test_corrupt(self):
+        PythonProgram.load(SOURCE, self.cache)
+        with open(self.cache.path(self.cache.key(SOURCE)), 'wb') as entry:
+            entry.write(b'garbage')
+        assert_is_none(self.cache.get(SOURCE))
+
+    def test_unparsable(self):
+        assert_is_none(PythonProgram.load('class {', self.cache))
@@ -0,0 +1,119 @@
+"""
+This module contains tests for the error reporting of the lexers and the parser.
+"""
+import contextlib
+import io
+
+from nose.tools import assert_equal, assert_false, assert_is_none, assert_true
+
+from pycoolc.diagnostics import FATAL, LEXICAL, SYNTAX, Diagnostic, Diagnostics
+from pycoolc.parser import Parser
+from pycoolc.scanner import Scanner, TokenBuffer
+
+
+def lexers():
+    return [None, Scanner(), TokenBuffer()]
+
+
+class TestDiagnostics:
+
+    def test_coalesce(self):
+        diagnostics = Diagnostics()
+        assert_true(diagnostics.illegal('$', 3))
+        assert_true(diagnostics.illegal('%^', 4))
+        assert_true(diagnostics.illegal('!', 7))
+        assert_equal(diagnostics.errors, [
+            Diagnostic(LEXICAL, "Illegal characters '$%^'", (3, 6)),
+            Diagnostic(LEXICAL, "Illegal character '!'", (7, 8)),
+        ])
+
+    def test_long_run(self):
+        diagnostics = Diagnostics()
+        diagnostics.illegal('\x00' * 15, 0)
+        diagnostics.illegal('\x01' * 15, 15)
+        diagnostics.illegal("'", 30)
+        error, = diagnostics.errors
+        assert_equal(error.message, "Illegal characters '{}{}...'".format('\\x00' * 15,
+                                                                          '\\x01' * 5))
+        assert_equal(error.span, (0, 31))
+
+    def test_limit(self):
+        diagnostics = Diagnostics(limit=2)
+        assert_true(diagnostics.error(SYNTAX, 'a', (0, 1)))
+        assert_true(diagnostics.error(SYNTAX, 'b', (1, 2)))
+        assert_false(diagnostics.full)
+        assert_false(diagnostics.error(SYNTAX, 'c', (2, 3)))
+        assert_false(diagnostics.illegal('$', 4))
+        assert_true(diagnostics.full)
+        assert_equal([error.kind for error in diagnostics], [SYNTAX, SYNTAX, FATAL])
+
+    def test_format(self):
+        diagnostics = Diagnostics(limit=1)
+        diagnostics.error(SYNTAX, 'Syntax error', (4, 5))
+        diagnostics.error(SYNTAX, 'Syntax error', (6, 7))
+        assert_equal(diagnostics.format('a\nb\nc\n'),
+                     ['Line 3: Syntax error', 'Too many errors, giving up'])
+
+
+class TestParser:
+
+    def test_garbage(self):
+        source = 'class A {};\n' + '\x00\x01$%^' * 1000 + '\nclass B {};'
+        for lexer in lexers():
+            diagnostics = Diagnostics()
+            tree = Parser(lexer=lexer).parse(source, diagnostics)
+            assert_equal([cls.name for cls in tree], ['A', 'B'])
+            error, = diagnostics.errors
+            assert_equal(error.kind, LEXICAL)
+            assert_equal(error.span, (12, 5012))
+
+    def test_limit(self):
+        source = 'class A { x : Int <- 1 $ + 2 # + 3 ! + 4 ? ; };'
+        for lexer in lexers():
+            diagnostics = Diagnostics(limit=2)
+            Parser(lexer=lexer).parse(source, diagnostics)
+            assert_equal([error.message for error in diagnostics], [
+                "Illegal character '$'",
+                "Illegal character '#'",
+                'Too many errors, giving up',
+            ])
+
+    def test_syntax_limit(self):
+        source = ' '.join('class A{} {{ x : Int <- ; }};'.format(i) for i in range(10))
+        diagnostics = Diagnostics(limit=3)
+        assert_is_none(Parser().parse(source, diagnostics))
+        assert_equal([error.kind for error in diagnostics], [SYNTAX] * 3 + [FATAL])
+
+    def test_recovery(self):
+        source = '\n'.join([
+            'class A {',
+            '  x : Int <- ;',
+            '  f() : Int { { 1; 2 + ; 3; } };',
+            '  g() : Int { 4 };',
+            '};',
+            'class B inherits { };',
+            'class C { };',
+        ])
+        for lexer in lexers():
+            diagnostics = Diagnostics()
+            tree = Parser(lexer=lexer).parse(source, diagnostics)
+            assert_equal([(cls.name, len(cls.features)) for cls in tree], [('A', 2), ('C', 0)])
+            assert_equal(diagnostics.format(source), [
+                "Line 2: Syntax error at ';'",
+                "Line 3: Syntax error at ';'",
+                "Line 6: Syntax error at '{'",
+            ])
+
+    def test_end_of_input(self):
+        diagnostics = Diagnostics()
+        Parser().parse('class A {', diagnostics)
+        assert_equal(diagnostics.errors,
+                     [Diagnostic(SYNTAX, 'Syntax error at end of input', (9, 9))])
+
+    def test_silent(self):
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out), contextlib.redirect_stderr(out):
+            for lexer in lexers():
+                Parser(lexer=lexer).parse('class A { x : Int <- $ ; }; class', Diagnostics())
+                Parser(lexer=lexer).parse('class A { x : Int <- $ ; }; class')
+        assert_equal(out.getvalue(), '')
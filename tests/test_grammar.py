@@ -8,7 +8,9 @@ from pycoolc.parser import *
 
 def get_parser(start):
     """Return a customized parser."""
-    return yacc.yacc(start=start, errorlog=yacc.NullLogger()).parse
+    lexer.get_lexer()
+    return yacc.yacc(start=start, debug=False, write_tables=False,
+                     errorlog=yacc.NullLogger()).parse
 
 
 class TestProgram:
@@ -252,6 +254,12 @@ class TestExpression:
         expected = ast.Block((1, 'bacon', 3))
         assert_equal(out, expected)
 
+    def test_block_long(self):
+        src = '{ ' + ' '.join('{};'.format(i) for i in range(5000)) + ' }'
+        out = yacc.parse(src)
+        expected = ast.Block(tuple(range(5000)))
+        assert_equal(out, expected)
+
     def test_let_basic(self):
         src = 'let x : Int in x'
         out = yacc.parse(src)
@@ -0,0 +1,143 @@
+"""
+This module contains tests for incremental reparsing, which must always give
+the same result as a full parse of the edited source.
+"""
+import random
+
+from nose.tools import assert_equal, assert_is, assert_is_not
+
+from pycoolc import ast
+from pycoolc.diagnostics import Diagnostics
+from pycoolc.incremental import Edit, apply_edit, reparse
+from pycoolc.parser import parse
+
+
+SOURCE = ''.join(
+    'class C{0} inherits IO {{\n'
+    '  x : Int <- {0};\n'
+    '  f(a : Int) : Int {{ {{ out_int(a + x); (* comment *) a; }} }};\n'
+    '}};\n'.format(i) for i in range(5))
+
+
+def spans(tree):
+    """Return the spans of all nodes in ``tree``, in preorder."""
+    out = []
+    stack = [tree]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, ast.Node):
+            out.append(node.span)
+        if isinstance(node, (ast.Node, tuple)):
+            stack.extend(reversed(tuple(node)))
+    return out
+
+
+class TestReparse:
+
+    def check(self, edit, source=SOURCE):
+        tree = parse(source)
+        new_source, new_tree = reparse(source, tree, edit)
+        assert_equal(new_source, apply_edit(source, edit))
+        expected = parse(new_source)
+        assert_equal(new_tree, expected)
+        if expected is not None:
+            assert_equal(spans(new_tree), spans(expected))
+        return tree, new_tree
+
+    def find(self, text, index=0):
+        pos = -1
+        for _ in range(index + 1):
+            pos = SOURCE.index(text, pos + 1)
+        return pos
+
+    def test_method_body(self):
+        pos = self.find('a + x', 2)
+        old, new = self.check(Edit(pos, pos + 5, 'a * x - 1'))
+        for i in (0, 1, 3, 4):
+            assert_is(new[i], old[i])
+        assert_is_not(new[2], old[2])
+
+    def test_same_length(self):
+        pos = self.find('<- 3')
+        old, new = self.check(Edit(pos + 3, pos + 4, '7'))
+        assert_equal(new[3].features[0].expr, 7)
+        assert_is(new[4], old[4])
+
+    def test_insert_class(self):
+        pos = self.find('class C2')
+        old, new = self.check(Edit(pos, pos, 'class New {};\n'))
+        assert_equal(len(new), 6)
+        assert_is(new[1], old[1])
+        assert_is(new[3], old[2])
+
+    def test_delete_class(self):
+        start, end = self.find('class C1'), self.find('class C2')
+        old, new = self.check(Edit(start, end, ''))
+        assert_equal(len(new), 4)
+        assert_is(new[1], old[2])
+
+    def test_delete_everything(self):
+        self.check(Edit(0, len(SOURCE), '  '))
+
+    def test_append(self):
+        old, new = self.check(Edit(len(SOURCE), len(SOURCE), 'class Z {};'))
+        assert_is(new[4], old[4])
+
+    def test_open_comment(self):
+        # Comments out the following classes, so they must not be reused
+        pos = self.find('class C2')
+        self.check(Edit(pos, pos, '(* '))
+
+    def test_join_tokens(self):
+        pos = self.find('class C3')
+        self.check(Edit(pos - 2, pos, 'x'))
+
+    def test_syntax_error(self):
+        pos = self.find('a + x')
+        edit = Edit(pos, pos + 1, '+')
+        self.check(edit)
+        # Errors are reported once, like by a full parse
+        diagnostics = Diagnostics()
+        reparse(SOURCE, parse(SOURCE), edit, diagnostics=diagnostics)
+        expected = Diagnostics()
+        parse(apply_edit(SOURCE, edit), expected)
+        assert_equal(len(expected), 1)
+        assert_equal(diagnostics.errors, expected.errors)
+
+    def test_after_error(self):
+        source = 'class A { x : Int <- ; y : Int; }; class B { z : Int; };'
+        previous = Diagnostics()
+        tree = parse(source, previous)
+        assert_equal(len(previous), 1)
+        pos = source.index('z')
+        diagnostics = Diagnostics()
+        new_source, new_tree = reparse(source, tree, Edit(pos, pos + 1, 'w'),
+                                       diagnostics=diagnostics, previous=previous)
+        expected = Diagnostics()
+        assert_equal(new_tree, parse(new_source, expected))
+        assert_equal([error.message for error in diagnostics], ["Syntax error at ';'"])
+        assert_equal(diagnostics.errors, expected.errors)
+
+    def test_without_tree(self):
+        new_source, new_tree = reparse('class A {', None, Edit(9, 9, '};'))
+        assert_equal(new_tree, parse('class A {};'))
+
+    def test_random_edits(self):
+        rng = random.Random(42)
+        pieces = ['', ' ', ';', '}', '{', '};', 'class', 'class Q {};', 'x', '1 + ', '(*', '*)', '"']
+        source = SOURCE
+        tree = parse(source)
+        diagnostics = Diagnostics()
+        for _ in range(200):
+            start = rng.randrange(len(source) + 1)
+            end = min(len(source), start + rng.choice([0, 0, 1, 3, 20]))
+            edit = Edit(start, end, rng.choice(pieces))
+            previous, diagnostics = diagnostics, Diagnostics()
+            source, tree = reparse(source, tree, edit, diagnostics=diagnostics,
+                                   previous=previous)
+            expected_diagnostics = Diagnostics()
+            expected = parse(source, expected_diagnostics)
+            assert_equal(tree, expected)
+            assert_equal(diagnostics.errors, expected_diagnostics.errors)
+            if tree is not None:
+                assert_equal(spans(tree), spans(expected))
@@ -0,0 +1,286 @@
+"""
+This module contains tests for the execution engines.
+
+Every test runs with the closure compiling interpreter, the tree-walking
+reference evaluator, the Python code generator and the bytecode VM, and
+with the VM on the optimized program.
+"""
+import io
+import os
+
+from nose.tools import assert_equal, assert_raises
+
+from pycoolc.codegen import PythonProgram
+from pycoolc.evaluator import Evaluator
+from pycoolc.interpreter import Interpreter
+from pycoolc.optimize import optimize
+from pycoolc.parser import parse
+from pycoolc.runtime import Abort, ExecutionError, Runtime, divide, int32, unescape
+from pycoolc.semant import ClassTable
+from pycoolc.typecheck import check
+from pycoolc.vm import VM
+
+
+EXAMPLES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'examples')
+
+
+def main(body, classes=''):
+    return classes + 'class Main inherits IO { main() : Object { ' + body + ' }; };'
+
+
+class TestInterpreter:
+
+    engine = Interpreter
+
+    def run(self, source, stdin=''):
+        program = parse(source)
+        assert_equal([error.message for error in check(program)], [])
+        stdout = io.StringIO()
+        result = self.engine(program, stdin=io.StringIO(stdin), stdout=stdout).run()
+        return result, stdout.getvalue()
+
+    def output(self, source, stdin=''):
+        return self.run(source, stdin)[1]
+
+    def test_factorial(self):
+        with open(os.path.join(EXAMPLES, 'factorial.cl')) as source:
+            output = self.output(source.read(), '10\n')
+        assert_equal(output, 'Enter an integer greater-than or equal-to 0: '
+                             'The factorial of 10 is 3628800')
+
+    def test_arithmetic(self):
+        assert_equal(self.run(main('1 + 2 * 3 - 8 / 3'))[0], 5)
+        assert_equal(self.run(main('~7 / 2'))[0], -3)
+        assert_equal(self.run(main('2147483647 + 1'))[0], -2147483648)
+        assert_equal(self.run(main('65536 * 65536 + 3'))[0], 3)
+        assert_equal(self.run(main('~(~2147483647 - 1)'))[0], -2147483648)
+        assert_equal(self.run(main('{ 1 < 2; }'))[0], True)
+        assert_equal(self.run(main('not 2 <= 1'))[0], True)
+
+    def test_equality(self):
+        classes = 'class A {};'
+        assert_equal(self.run(main('"ab" = ("a".concat("b"))'))[0], True)
+        assert_equal(self.run(main('let a : A <- new A in a = a', classes))[0], True)
+        assert_equal(self.run(main('new A = new A', classes))[0], False)
+        assert_equal(self.run(main('let a : A in isvoid a', classes))[0], True)
+
+    def test_strings(self):
+        assert_equal(self.output(main(r'out_string("a\tb\n\c\\")')), 'a\tb\nc\\')
+        assert_equal(self.run(main('"hello".substr(1, 3).length()'))[0], 3)
+        assert_equal(self.run(main('"hello".substr(1, 3).type_name()'))[0], 'String')
+
+    def test_io(self):
+        source = main('{ out_string(in_string().concat("!")); out_int(in_int() + 1); '
+                      'out_int(in_int()); }')
+        assert_equal(self.output(source, 'hi\n41\nfoo\n'), 'hi!420')
+
+    def test_let(self):
+        source = main('let x : Int <- 1, y : Int <- x + 1, s : String in '
+                      '{ let x : Int <- x + y in y <- x * 10; out_int(x); out_int(y); '
+                      'out_string(s.concat("|")); }')
+        assert_equal(self.output(source), '130|')
+
+    def test_while(self):
+        source = main('let i : Int <- 0, s : String <- "" in '
+                      '{ while i < 5 loop { s <- (s.concat(i.type_name().substr(0, 1))); '
+                      'i <- i + 1; } pool; s; }')
+        assert_equal(self.run(source)[0], 'IIIII')
+
+    def test_objects(self):
+        classes = '''class Counter {
+          n : Int <- 10;
+          step : Int <- n + 1;
+          inc() : SELF_TYPE { { n <- n + step; self; } };
+          get() : Int { n };
+          clone() : SELF_TYPE { new SELF_TYPE };
+        };
+        class Sub inherits Counter {
+          get() : Int { n * 2 };
+        };'''
+        source = main('let c : Counter <- new Sub, d : Counter <- (c.copy()) in '
+                      '{ c.inc().inc(); out_int(c.get()); out_int(d.get()); '
+                      'out_int(c@Counter.get()); out_string(c.clone().type_name()); }', classes)
+        assert_equal(self.output(source), '64' + '20' + '32' + 'Sub')
+
+    def test_case(self):
+        classes = 'class A {}; class B inherits A {}; class C inherits B {};'
+        source = main('''{
+          out_string(case new C of a : A => "A"; b : B => "B"; o : Object => "O"; esac);
+          out_string(case new A of a : A => "A"; b : B => "B"; o : Object => "O"; esac);
+          out_string(case 3 of i : Int => i.type_name(); o : Object => "O"; esac);
+          out_string(case self of a : A => "A"; io : IO => "IO"; esac);
+        }''', classes)
+        assert_equal(self.output(source), 'BAIntIO')
+
+    def test_case_many_branches(self):
+        classes = 'class C0 {};' + ''.join(
+            'class C{} inherits C{} {{}};'.format(i, i - 1) for i in range(1, 12))
+        classes += 'class Make {{ make(i : Int) : Object {{ {} new C11 {} }}; }};'.format(
+            ' '.join('if i = {0} then new C{0} else'.format(i) for i in range(11)), 'fi ' * 11)
+        branches = ' '.join('c{0} : C{0} => {0};'.format(i) for i in range(3, 12, 3))
+        source = main('let i : Int <- 0 in while i < 12 loop {{ '
+                      'out_int(case ((new Make).make(i)) of {} o : Object => 0; esac); '
+                      'i <- i + 1; }} pool'.format(branches), classes)
+        assert_equal(self.output(source), '000333666999')
+
+    def test_evaluation_order(self):
+        # The arguments are evaluated before the receiver
+        source = '''class A {
+          n : Int;
+          set(m : Int) : A { { n <- m; self; } };
+          get() : Int { n };
+        };
+        class Main {
+          a : A <- ((new A).set(1));
+          swap() : Int { { a <- ((new A).set(2)); 0; } };
+          main() : Int { let old : A <- a in { a.set(swap()); (old.get()) * 10 + (a.get()); } };
+        };'''
+        assert_equal(self.run(source)[0], 10)
+        source = source.replace('let old : A <- a in { a.set(swap());',
+                                'let old : A <- a, b : A <- a in { b.set(use(b <- new A));')
+        source = source.replace('(a.get())', '(b.get())')
+        source = source.replace('main()', 'use(b : A) : Int { 7 }; main()')
+        assert_equal(self.run(source)[0], 17)
+        assert_equal(self.run(main('let x : Int <- 1 in x + (x <- 5) * x'))[0], 26)
+
+    def test_initialization_order(self):
+        classes = '''class A inherits IO {
+          a : Int <- { out_string("a"); 1; };
+        };
+        class B inherits A {
+          b : Int <- { out_string("b"); a + 1; };
+          get() : Int { b };
+        };'''
+        assert_equal(self.run(main('(new B).get()', classes)), (2, 'ab'))
+
+    def test_errors(self):
+        with assert_raises(ExecutionError) as context:
+            self.run(main('let a : IO in a.out_int(1)'))
+        assert_equal(context.exception.message, 'Dispatch to void')
+        with assert_raises(ExecutionError) as context:
+            self.run(main('1 / 0'))
+        assert_equal(context.exception.message, 'Division by zero')
+        with assert_raises(ExecutionError) as context:
+            self.run(main('case 1 of s : String => s; esac'))
+        assert_equal(context.exception.message, 'No case branch matches class Int')
+        with assert_raises(ExecutionError) as context:
+            self.run(main('"abc".substr(2, 2)'))
+        assert_equal(context.exception.message, 'Substring out of range')
+
+    def test_abort(self):
+        stdout = io.StringIO()
+        program = parse(main('{ out_string("x"); abort(); out_string("y"); }'))
+        with assert_raises(Abort):
+            self.engine(program, stdout=stdout).run()
+        assert_equal(stdout.getvalue(), 'xAbort called from class Main\n')
+
+    def test_recursion(self):
+        source = main('sum(100)').replace(
+            'main()', 'sum(n : Int) : Int { if n = 0 then 0 else n + sum(n - 1) fi }; main()')
+        assert_equal(self.run(source)[0], 5050)
+
+
+class TestUncached(TestInterpreter):
+
+    @staticmethod
+    def engine(program, stdin=None, stdout=None):
+        return Interpreter(program, stdin=stdin, stdout=stdout, inline_caches=False)
+
+
+class TestEvaluator(TestInterpreter):
+
+    engine = Evaluator
+
+
+class TestCodegen(TestInterpreter):
+
+    engine = PythonProgram.compile
+
+
+class TestVM(TestInterpreter):
+
+    engine = VM.compile
+
+
+def _optimized(program, stdin=None, stdout=None):
+    return VM.compile(optimize(program)[0], stdin=stdin, stdout=stdout)
+
+
+class TestOptimized(TestInterpreter):
+
+    engine = staticmethod(_optimized)
+
+
+class TestInlineCaches:
+
+    classes = '''
+        class A { f() : Int { 1 }; };
+        class B inherits A { f() : Int { 2 }; };
+        class C inherits A { f() : Int { 3 }; };
+    '''
+
+    def statistics(self, body, classes=classes):
+        interpreter = Interpreter(parse(main(body, classes)), stdout=io.StringIO(),
+                                  count_hits=True)
+        return interpreter.run(), interpreter.runtime.cache_statistics()
+
+    def loop(self, receivers):
+        # Calls f() on the receivers in turn, 12 times in total
+        assignments = ' '.join('if i - i / {0} * {0} = {1} then a <- new {2} else 0 fi;'.format(
+            len(receivers), i, receiver) for i, receiver in enumerate(receivers))
+        return ('let a : A, i : Int, sum : Int in { while i < 12 loop { ' + assignments +
+                ' sum <- sum * 10 + (a.f()); i <- i + 1; } pool; sum; }')
+
+    def test_monomorphic(self):
+        result, statistics = self.statistics(self.loop(['B']))
+        assert_equal(result, 222222222222 % 2 ** 32 - 2 ** 32)
+        assert_equal((statistics['hits'], statistics['misses']), (11, 1))
+        assert_equal(statistics['monomorphic'], 1)
+
+    def test_polymorphic(self):
+        statistics = self.statistics(self.loop(['A', 'B', 'C']))[1]
+        assert_equal((statistics['hits'], statistics['misses']), (9, 3))
+        assert_equal(statistics['polymorphic'], 1)
+
+    def test_megamorphic(self):
+        classes = self.classes + 'class D inherits A {}; class E inherits C {};'
+        statistics = self.statistics(self.loop(['A', 'B', 'C', 'D', 'E']), classes)[1]
+        assert_equal(statistics['megamorphic'], 1)
+        # The fifth class is looked up on every call
+        assert_equal((statistics['hits'], statistics['misses']), (6, 6))
+
+    def test_static_dispatch(self):
+        statistics = self.statistics('(new B)@A.f()', self.classes)[1]
+        assert_equal(statistics['hits'] + statistics['misses'], 0)
+
+
+class TestRuntime:
+
+    def test_int32(self):
+        assert_equal(int32(2 ** 31), -2 ** 31)
+        assert_equal(int32(-2 ** 31 - 1), 2 ** 31 - 1)
+        assert_equal(int32(5), 5)
+
+    def test_divide(self):
+        assert_equal(divide(7, 2), 3)
+        assert_equal(divide(-7, 2), -3)
+        assert_equal(divide(7, -2), -3)
+        assert_equal(divide(-2 ** 31, -1), -2 ** 31)
+
+    def test_unescape(self):
+        assert_equal(unescape(r'a\nb\tc\d\\'), 'a\nb\tcd\\')
+        assert_equal(unescape('a\\\nb'), 'a\nb')
+
+    def test_layout(self):
+        runtime = Runtime(ClassTable(parse('''
+            class A { x : Int; s : String; f() : Int { x }; };
+            class B inherits A { b : Bool; g() : Int { 1 }; f() : Int { 2 }; };''')))
+        a, b = runtime.classes['A'], runtime.classes['B']
+        assert_equal(b.slots, {'x': 0, 's': 1, 'b': 2})
+        assert_equal(b.defaults, [0, '', False])
+        assert_equal(a.numbers['f'], b.numbers['f'])
+        assert_equal(b.numbers['g'], len(a.vtable))
+        assert_equal(b.lookup('type_name'), a.lookup('type_name'))
+        obj = runtime.new(b)
+        assert_equal(obj.fields, [0, '', False])
+        assert_equal(runtime.new(runtime.classes['Int']), 0)
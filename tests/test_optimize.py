@@ -0,0 +1,105 @@
+"""
+This module contains tests for the optimization passes.
+
+The semantics of optimized programs are tested together with the execution
+engines in ``test_interpreter``.
+"""
+from nose.tools import assert_equal, assert_false, assert_raises, assert_true
+
+from pycoolc import ast
+from pycoolc.optimize import Optimizer, is_pure
+from pycoolc.parser import parse
+
+
+def body(expr, passes=('fold', 'branches', 'dead_code', 'propagate'), classes=''):
+    optimizer = Optimizer(passes)
+    program = optimizer.optimize(parse(
+        classes + 'class Main inherits IO { x : Int; main() : Object { ' + expr + ' }; };'))
+    return program[-1].features[-1].expr, optimizer.stats
+
+
+class TestFold:
+
+    def test_arithmetic(self):
+        assert_equal(body('1 + 2 * 3 - 8 / 3')[0], 5)
+        assert_equal(body('2147483647 + 1')[0], -2147483648)
+        assert_equal(body('~(~2147483647 - 1)')[0], -2147483648)
+        assert_equal(body('~7 / 2')[0], -3)
+
+    def test_comparisons(self):
+        assert_equal(body('not 2 <= 1')[0], True)
+        assert_equal(body('"a\\tb" = "a\tb"')[0], True)
+        assert_equal(body('isvoid 3')[0], False)
+
+    def test_kept(self):
+        assert_equal(body('1 / 0')[0], ast.BinaryOperation('/', 1, 0))
+        assert_equal(body('x + 1')[0], ast.BinaryOperation('+', ast.Ident('x'), 1))
+
+    def test_stats(self):
+        assert_equal(body('1 + 2 * 3')[1],
+                     {'fold': 2, 'branches': 0, 'dead_code': 0, 'propagate': 0, 'rounds': 2})
+
+
+class TestBranches:
+
+    def test_if(self):
+        assert_equal(body('if 1 < 2 then x else 0 fi')[0], ast.Ident('x'))
+        assert_equal(body('if not true then x else 0 fi')[0], 0)
+
+    def test_types(self):
+        # The branch taken has a more specific type than the if, which is Object
+        expr = body('if true then 1 else "a" fi')[0]
+        assert_equal(expr.__class__, ast.If)
+
+    def test_while(self):
+        expr = body('while false loop out_int(1) pool')[0]
+        assert_equal(expr, ast.While(False, 0))
+
+
+class TestDeadCode:
+
+    def test_block(self):
+        expr, stats = body('{ 1; x; new Object; out_int(1); 2 + 3; x <- 2; x; }', ['dead_code'])
+        assert_equal(len(expr.elements), 3)
+        assert_equal(stats['dead_code'], 4)
+        assert_equal(body('{ 1; "a"; x; }')[0], ast.Ident('x'))
+
+    def test_purity(self):
+        assert_true(is_pure(parse('class A { f() : Int { if x then { ~1; y; } else 2 / 1 fi }; };')
+                            [0].features[0].expr))
+        for expr in ['2 / x', 'x <- 1', 'new Main', 'f()', 'let y : Int in y']:
+            assert_false(is_pure(parse('class A { f() : Int { ' + expr + ' }; };')
+                                 [0].features[0].expr), expr)
+
+
+class TestPropagate:
+
+    def test_let(self):
+        assert_equal(body('let a : Int <- 2, b : Int <- a * 3 in a + b')[0], 8)
+        assert_equal(body('let a : Int, s : String in (s.concat("x").length()) + a')[0],
+                     body('("".concat("x").length()) + 0', ['fold'])[0])
+
+    def test_assigned(self):
+        expr = body('let a : Int <- 2 in { a <- a + 1; a; }')[0]
+        assert_equal(expr.__class__, ast.Let)
+
+    def test_shadowing(self):
+        expr = body('let a : Int <- 2 in let a : Int <- 3 in { a <- a + 1; a; }')[0]
+        assert_equal(expr.assignments[0].expr, 3)
+        expr = body('let a : Int <- 2 in case x of a : Int => a; o : Object => a; esac')[0]
+        assert_equal([action.expr for action in expr.typeactions], [ast.Ident('a'), 2])
+
+    def test_types(self):
+        expr = body('let a : Object <- 2 in a', ['propagate'])[0]
+        assert_equal(expr.__class__, ast.Let)
+
+
+class TestOptimizer:
+
+    def test_disabled(self):
+        expr, stats = body('let a : Int <- 1 + 2 in if true then a else a fi', [])
+        assert_equal(expr.__class__, ast.Let)
+        assert_equal(stats['rounds'], 1)
+
+    def test_unknown(self):
+        assert_raises(ValueError, Optimizer, ['fold', 'inline'])
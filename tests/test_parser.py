@@ -0,0 +1,64 @@
+"""
+This module contains tests for the reentrant parser API.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from nose.tools import assert_equal, assert_is_not
+
+from pycoolc import ast
+from pycoolc.parser import Parser, parse, parse_many
+
+
+def program(n):
+    """Return a program with ``n`` classes and the expected AST."""
+    src = ' '.join('class C{0} {{ a : Int <- {0}; }};'.format(i) for i in range(n))
+    expected = tuple(
+        ast.Type(name='C{}'.format(i), inherits=None, features=(
+            ast.Attribute(ident=ast.Ident('a'), type='Int', expr=i),
+        )) for i in range(n)
+    )
+    return src, expected
+
+
+class TestParser:
+
+    def test_parse(self):
+        src, expected = program(3)
+        assert_equal(Parser().parse(src), expected)
+
+    def test_separate_state(self):
+        a, b = Parser(), Parser()
+        assert_is_not(a.lexer, b.lexer)
+        assert_is_not(a.parser, b.parser)
+
+    def test_threads(self):
+        programs = [program(n) for n in range(1, 40)]
+        results = {}
+        barrier = threading.Barrier(len(programs))
+
+        def work(i):
+            barrier.wait()
+            results[i] = parse(programs[i][0])
+
+        threads = [threading.Thread(target=work, args=(i,)) for i in range(len(programs))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        for i, (src, expected) in enumerate(programs):
+            assert_equal(results[i], expected)
+
+
+class TestParseMany:
+
+    def test_default_executor(self):
+        programs = [program(n) for n in range(1, 20)]
+        out = parse_many(src for src, expected in programs)
+        assert_equal(out, [expected for src, expected in programs])
+
+    def test_executor(self):
+        programs = [program(n) for n in range(1, 20)]
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            out = parse_many([src for src, expected in programs], executor=executor)
+        assert_equal(out, [expected for src, expected in programs])
@@ -0,0 +1,147 @@
+"""
+This module contains tests for the fast scanner backend, which needs to
+produce exactly the same tokens as the PLY lexer.
+"""
+import io
+import os
+
+from nose.tools import assert_equal
+
+from pycoolc import ast
+from pycoolc.diagnostics import Diagnostics
+from pycoolc.lexer import get_lexer
+from pycoolc.parser import Parser
+from pycoolc.scanner import Scanner, TokenBuffer, TOKEN_TYPES, scan, tokenize
+
+
+EXAMPLES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'examples')
+
+
+def tokens(lexer, data):
+    """Return the tokens and diagnostics of ``lexer`` for ``data``."""
+    lexer.diagnostics = Diagnostics()
+    lexer.input(data)
+    lexer.lineno = 1
+    result = []
+    while True:
+        token = lexer.token()
+        if token is None:
+            break
+        result.append((token.type, token.value, token.lineno, token.lexpos))
+    return result, lexer.diagnostics.errors
+
+
+class TestScanner:
+
+    def check(self, data):
+        assert_equal(tokens(Scanner(), data), tokens(get_lexer().clone(), data))
+
+    def test_examples(self):
+        for name in sorted(os.listdir(EXAMPLES)):
+            with open(os.path.join(EXAMPLES, name)) as source:
+                self.check(source.read())
+
+    def test_keywords(self):
+        self.check('class CLASS Class if fi iF then else while loop pool let in case of '
+                   'esac new isvoid inherits NOT not Not nothing notice')
+
+    def test_literals_and_operators(self):
+        self.check('+ - * / : ; ( ) { } @ . , <- < <= = => ~ <<=>=')
+
+    def test_values(self):
+        self.check('0 007 42 true false trueish falsey "" "spam" "multi\\\nline" True')
+
+    def test_comments(self):
+        self.check('a -- comment\nb (* block\ncomment *) c --\n (* (* *) *)')
+
+    def test_illegal(self):
+        self.check('a $ b !? "unterminated\n c # \x00')
+        self.check('a $$$ "$%^\x00\x01\n ~#!')
+
+    def test_scan(self):
+        out = [(TOKEN_TYPES[kind], value, lexpos) for kind, value, lexpos in scan('x <- 1;')]
+        assert_equal(out, [('ID', 'x', 0), ('ASSIGN', '<-', 2), ('INTEGER', 1, 5), (';', ';', 6)])
+
+    def test_parse(self):
+        out = Parser(lexer=Scanner()).parse('class Main { x : Int <- 42; };')
+        expected = (ast.Type(name='Main', inherits=None, features=(
+            ast.Attribute(ident=ast.Ident('x'), type='Int', expr=42),
+        )),)
+        assert_equal(out, expected)
+
+
+class TestTokenize:
+
+    def check(self, data):
+        expected = list(scan(data))
+        for chunk_size in (1, 2, 3, 7, 4096):
+            assert_equal(list(tokenize(io.StringIO(data), chunk_size)), expected)
+
+    def test_examples(self):
+        for name in sorted(os.listdir(EXAMPLES)):
+            with open(os.path.join(EXAMPLES, name)) as source:
+                self.check(source.read())
+
+    def test_straddling(self):
+        self.check('x <- "a long string \\\n continued" (* a\nblock *) -- line\n true')
+
+    def test_unterminated(self):
+        self.check('x (* never closed')
+        self.check('x "never closed')
+        self.check('x -- no newline')
+
+    def test_illegal(self):
+        data = 'a $ b !?#$%^ c ' + '\x00' * 10 + ' "$'
+        expected = Diagnostics()
+        list(scan(data, expected))
+        assert_equal(len(expected), 4)
+        for chunk_size in (1, 2, 3, 7, 4096):
+            diagnostics = Diagnostics()
+            list(tokenize(io.StringIO(data), chunk_size, diagnostics))
+            assert_equal(diagnostics.errors, expected.errors)
+
+    def test_path(self):
+        path = os.path.join(EXAMPLES, 'factorial.cl')
+        with open(path) as source:
+            expected = list(scan(source.read()))
+        assert_equal(list(tokenize(path, 16)), expected)
+
+
+class TestTokenBuffer:
+
+    def check(self, data):
+        assert_equal(tokens(TokenBuffer(), data), tokens(get_lexer().clone(), data))
+
+    def test_examples(self):
+        for name in sorted(os.listdir(EXAMPLES)):
+            with open(os.path.join(EXAMPLES, name)) as source:
+                self.check(source.read())
+
+    def test_values(self):
+        self.check('0 007 42 true false trueish "" "spam" "multi\\\nline" x\n\n(* a\nb *) y')
+
+    def test_illegal(self):
+        self.check('a $ b !?\n c # \x00')
+
+    def test_columns(self):
+        buf = TokenBuffer('class Main {\n  x : Int;\n\n};')
+        assert_equal(len(buf), 9)
+        assert_equal(buf.type(3), 'ID')
+        assert_equal(buf.text(3), 'x')
+        assert_equal(buf.line(3), 2)
+        assert_equal(buf.position(buf.starts[3]), (2, 3))
+        assert_equal(buf.position(buf.starts[7]), (4, 1))
+        assert_equal(buf.position(buf.starts[8]), (4, 2))
+        assert_equal(buf.position(0), (1, 1))
+
+    def test_lazy_values(self):
+        buf = TokenBuffer('42 "spam" false')
+        assert_equal([buf.value(i) for i in range(len(buf))], [42, 'spam', False])
+        assert_equal(list(buf.lengths), [2, 6, 5])
+
+    def test_parse(self):
+        out = Parser(lexer=TokenBuffer()).parse('class Main { x : Int <- 42; };')
+        expected = (ast.Type(name='Main', inherits=None, features=(
+            ast.Attribute(ident=ast.Ident('x'), type='Int', expr=42),
+        )),)
+        assert_equal(out, expected)
@@ -0,0 +1,144 @@
+"""
+This module contains tests for the class table of the semantic analysis.
+"""
+from nose.tools import assert_equal, assert_false, assert_in, assert_is, assert_raises, \
+        assert_true
+
+from pycoolc.parser import parse
+from pycoolc.semant import ClassTable, SemanticError
+
+
+SOURCE = '''
+class A inherits IO {
+  x : Int;
+  f() : Int { x };
+  g(y : String) : SELF_TYPE { self };
+};
+class B inherits A {
+  z : Bool;
+  f() : Int { 2 };
+};
+class C inherits A {};
+class D inherits B {};
+class Main { main() : Object { 0 }; };
+'''
+
+
+class TestClassTable:
+
+    def setUp(self):
+        self.table = ClassTable(parse(SOURCE))
+
+    def test_hierarchy(self):
+        d = self.table['D']
+        assert_equal(d.parent, 'B')
+        assert_equal(d.ancestors, ('Object', 'IO', 'A', 'B', 'D'))
+        assert_equal(d.depth, 4)
+        assert_equal(self.table['A'].children, ['B', 'C'])
+        assert_equal(self.table['Main'].parent, 'Object')
+        assert_true(self.table['IO'].basic)
+        assert_false(self.table['Main'].basic)
+        assert_equal(self.table.order[:3], ['Object', 'IO', 'A'])
+
+    def test_methods(self):
+        f = self.table.method('D', 'f')
+        assert_equal(f.owner, 'B')
+        assert_equal(f.index, self.table.method('A', 'f').index)
+        g = self.table.method('D', 'g')
+        assert_equal((g.owner, g.types, g.type), ('A', ('String',), 'SELF_TYPE'))
+        assert_equal(self.table.method('D', 'out_int').owner, 'IO')
+        assert_equal(self.table.method('String', 'substr').types, ('Int', 'Int'))
+        assert_is(self.table.method('C', 'h'), None)
+        assert_equal(list(self.table['D'].methods)[:3], ['abort', 'type_name', 'copy'])
+
+    def test_attributes(self):
+        attributes = self.table['D'].attributes
+        assert_equal(list(attributes), ['x', 'z'])
+        assert_equal(attributes['z'].index, 1)
+        assert_equal(self.table.attribute('C', 'x').owner, 'A')
+        assert_is(self.table.attribute('C', 'z'), None)
+
+    def test_conforms(self):
+        assert_true(self.table.conforms('D', 'A'))
+        assert_true(self.table.conforms('D', 'D'))
+        assert_true(self.table.conforms('Int', 'Object'))
+        assert_false(self.table.conforms('A', 'D'))
+        assert_false(self.table.conforms('C', 'B'))
+
+    def test_intervals(self):
+        a, b, c, d = (self.table[name] for name in 'ABCD')
+        assert_equal(self.table['Object'].preorder, 0)
+        assert_equal([b.preorder, d.preorder, c.preorder], [a.preorder + 1, a.preorder + 2,
+                                                            a.preorder + 3])
+        assert_equal([d.postorder, b.postorder, c.postorder], [d.postorder, d.postorder + 1,
+                                                               d.postorder + 2])
+        assert_equal(a.postorder, c.postorder + 1)
+        assert_equal(self.table['Object'].postorder, len(self.table.classes) - 1)
+
+    def test_case_table(self):
+        selected = self.table.case_table(['A', 'Object', 'B', 'Int'])
+        tags = dict((info.name, info.tag) for info in self.table)
+        assert_equal(dict((name, selected[tag]) for name, tag in tags.items()),
+                     {'Object': 1, 'IO': 1, 'Int': 3, 'String': 1, 'Bool': 1, 'A': 0, 'B': 2,
+                      'C': 0, 'D': 2, 'Main': 1})
+        selected = self.table.case_table(['B', 'String'])
+        assert_is(selected[tags['A']], None)
+        assert_equal(selected[tags['D']], 0)
+
+    def test_join(self):
+        assert_equal(self.table.join('D', 'C'), 'A')
+        assert_equal(self.table.join('C', 'D'), 'A')
+        assert_equal(self.table.join('D', 'B'), 'B')
+        assert_equal(self.table.join('D', 'Main'), 'Object')
+        assert_equal(self.table.join('Int', 'Int'), 'Int')
+        assert_equal(self.table.join_all(['D', 'B', 'C']), 'A')
+
+    def test_deep_hierarchy(self):
+        n = 5000
+        source = 'class C0 {};' + ''.join(
+            'class C{} inherits C{} {{}};'.format(i, i - 1) for i in range(1, n))
+        source += 'class X inherits C{} {{}};'.format(n // 2)
+        table = ClassTable(parse(source))
+        assert_equal(table['C{}'.format(n - 1)].depth, n)
+        assert_equal(table.join('C{}'.format(n - 1), 'X'), 'C{}'.format(n // 2))
+        assert_true(table.conforms('X', 'C0'))
+        assert_false(table.conforms('X', 'C{}'.format(n - 1)))
+
+
+class TestErrors:
+
+    def assert_error(self, source, message):
+        with assert_raises(SemanticError) as context:
+            ClassTable(parse(source))
+        assert_in(message, context.exception.message)
+        return context.exception
+
+    def test_cycle(self):
+        error = self.assert_error('class A inherits C {}; class B inherits A {}; '
+                                  'class C inherits B {}; class D inherits A {};',
+                                  'Inheritance cycle: A -> C -> B -> A')
+        assert_equal(error.span, (0, 21))
+
+    def test_self_inheritance(self):
+        self.assert_error('class A inherits A {};', 'Inheritance cycle: A -> A')
+
+    def test_undefined_parent(self):
+        self.assert_error('class A inherits B {};', 'undefined class B')
+
+    def test_final_parent(self):
+        self.assert_error('class A inherits String {};', 'cannot inherit from String')
+        self.assert_error('class A inherits SELF_TYPE {};', 'cannot inherit from SELF_TYPE')
+
+    def test_redefinition(self):
+        self.assert_error('class A {}; class A {};', 'defined more than once')
+        self.assert_error('class IO {};', 'Redefinition of basic class IO')
+        self.assert_error('class SELF_TYPE {};', 'Invalid class name')
+
+    def test_features(self):
+        self.assert_error('class A { x : Int; x() : Int { 0 }; };',
+                          'x is defined more than once in class A')
+        self.assert_error('class A { x : Int; }; class B inherits A { x : Int; };',
+                          'already defined in class A')
+        self.assert_error('class A { self : Int; };', "'self' cannot be the name")
+        self.assert_error('class A inherits IO { out_int(x : String) : SELF_TYPE { self }; };',
+                          'overrides IO.out_int with a different signature')
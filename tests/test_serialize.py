@@ -0,0 +1,87 @@
+"""
+This module contains tests for the binary AST serialization.
+"""
+import marshal
+import os
+import zlib
+
+from nose.tools import assert_equal, assert_is, assert_raises
+
+from pycoolc import ast
+from pycoolc.parser import Parser
+from pycoolc.serialize import MAGIC, TUPLE, dumps, loads
+
+
+EXAMPLES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'examples')
+
+
+def spans(tree):
+    """Return the spans of all nodes in ``tree``, in preorder."""
+    out = []
+    stack = [tree]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, ast.Node):
+            out.append(node.span)
+        if isinstance(node, (ast.Node, tuple)):
+            stack.extend(reversed(tuple(node)))
+    return out
+
+
+class TestSerialize:
+
+    def check(self, tree):
+        out = loads(dumps(tree))
+        assert_equal(out, tree)
+        assert_equal(spans(out), spans(tree))
+        return out
+
+    def test_examples(self):
+        for name in ['factorial.cl', 'simple.cl']:
+            with open(os.path.join(EXAMPLES, name)) as source:
+                self.check(Parser().parse(source.read()))
+
+    def test_values(self):
+        self.check((ast.Block((1, 'spam', True, False, None, ())), (), 'x', 2 ** 40))
+        self.check(None)
+
+    def test_interned_names(self):
+        tree = Parser().parse('class Main { a : Main; b : Main; };')
+        out = self.check(tree)
+        assert_is(out[0].features[0].type, out[0].features[1].type)
+        assert_is(out[0].features[0].type, tree[0].name)
+
+    def test_deep(self):
+        tree = ast.Ident('a')
+        for i in range(20000):
+            tree = ast.UnaryOperation(operator='~', right=tree, span=(0, i))
+        out = loads(dumps(tree))
+        for i in reversed(range(20000)):
+            assert_equal(out.span, (0, i))
+            out = out.right
+        assert_equal(out, ast.Ident('a'))
+
+    def test_invalid(self):
+        with assert_raises(TypeError):
+            dumps(ast.Block([1]))
+        with assert_raises(ValueError):
+            loads(b'spam')
+        with assert_raises(ValueError):
+            loads(dumps(ast.New('A'))[:-3])
+
+    def test_corrupt_payload(self):
+        new = dumps(ast.New('A', span=(0, 5)))
+        version, codes, lengths, spans, values = marshal.loads(zlib.decompress(new[len(MAGIC):]))
+        payloads = [
+            (version, codes, lengths, spans[:8], values),       # truncated spans
+            (version, codes, lengths, spans, []),               # missing leaf
+            (version, codes * 2, lengths, spans, values),       # node without children
+            (version, bytes([TUPLE]), lengths, spans, values),  # missing tuple length
+            (version, bytes([255]), lengths, spans, values),    # invalid opcode
+            (version, codes, lengths, spans + b'x', values),    # odd array size
+            (version, codes, lengths, spans, 42),               # values not a list
+            (version, b'', lengths, spans, values),             # empty tree
+        ]
+        for payload in payloads:
+            with assert_raises(ValueError):
+                loads(MAGIC + zlib.compress(marshal.dumps(payload)))
@@ -0,0 +1,101 @@
+"""
+This module contains tests for the statistics of the compiler phases.
+"""
+import json
+import pickle
+import tracemalloc
+
+from nose.tools import assert_equal, assert_false, assert_greater, assert_in, assert_is_none, \
+        assert_true
+
+from pycoolc.diagnostics import Diagnostics
+from pycoolc.lexer import get_lexer
+from pycoolc.parser import Parser, parse
+from pycoolc.scanner import Scanner
+from pycoolc.stats import Stats
+
+
+SOURCE = '''class Main inherits IO {
+  x : Int <- 1 + 2 * 3;
+  main() : Object { { out_int(x + 4); (* comment *) self; } };
+};'''
+
+
+class TestStats:
+
+    def test_phases(self):
+        stats = Stats()
+        with stats.phase('outer'):
+            with stats.phase('inner'):
+                data = [0] * 100000
+            del data
+        with stats.phase('inner'):
+            pass
+        assert_equal(list(stats.phases), ['inner', 'outer'])
+        inner, outer = stats.phases['inner'], stats.phases['outer']
+        assert_equal((inner.calls, outer.calls), (2, 1))
+        assert_greater(inner.peak, 800000)
+        assert_true(outer.peak >= inner.peak)
+        assert_true(outer.wall >= inner.wall > 0)
+
+    def test_caller_tracing(self):
+        assert_false(tracemalloc.is_tracing())
+        stats = Stats()
+        with stats.phase('phase'):
+            pass
+        assert_false(tracemalloc.is_tracing())
+        assert_is_none(stats.traced_peak)
+        tracemalloc.start()
+        try:
+            data = [0] * 100000
+            del data
+            with stats.phase('phase'):
+                pass
+            assert_true(tracemalloc.is_tracing())
+            assert_greater(stats.traced_peak, 800000)
+            assert_true(stats.phases['phase'].peak < 800000)
+        finally:
+            tracemalloc.stop()
+
+    def test_without_memory(self):
+        stats = Stats(memory=False)
+        with stats.phase('phase'):
+            pass
+        assert_is_none(stats.phases['phase'].peak)
+
+    def test_merge(self):
+        first, second = Stats(), Stats()
+        for stats in first, second:
+            with stats.phase('phase'):
+                stats.count('things', 'aab')
+        first.merge(pickle.loads(pickle.dumps(second)))
+        assert_equal(first.phases['phase'].calls, 2)
+        assert_equal(first.to_dict()['counters'], {'things': {'a': 4, 'b': 2}})
+        json.dumps(first.to_dict())
+        assert_in('things: 6 total, 2 kinds', first.format())
+
+
+class TestParser:
+
+    def test_counters(self):
+        for lexer in None, Scanner():
+            stats = Stats(memory=False)
+            tree = Parser(lexer=lexer, stats=stats).parse(SOURCE)
+            assert_equal(tree, parse(SOURCE))
+            assert_equal(list(stats.phases), ['lex', 'parse'])
+            tokens = stats.counters['tokens']
+            lexer = get_lexer().clone()
+            lexer.input(SOURCE)
+            assert_equal(sum(tokens.values()), len(list(lexer)))
+            assert_equal(tokens['INTEGER'], 4)
+            reductions = stats.counters['reductions']
+            assert_equal(reductions['expr -> expr + expr'], 2)
+            assert_equal(reductions['expr -> expr * expr'], 1)
+            assert_equal(stats.counters['nodes']['BinaryOperation'], 3)
+
+    def test_syntax_error(self):
+        stats = Stats(memory=False)
+        diagnostics = Diagnostics()
+        Parser(stats=stats).parse('class A { x : Int <- ; };', diagnostics)
+        assert_equal(len(diagnostics), 1)
+        assert_equal(stats.phases['parse'].calls, 1)
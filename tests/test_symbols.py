@@ -0,0 +1,74 @@
+"""
+This module contains tests for the symbol table and the interning of names.
+"""
+from nose.tools import assert_equal, assert_in, assert_is, assert_is_not, assert_not_in
+
+from pycoolc.parser import Parser
+from pycoolc.scanner import Scanner, TokenBuffer, scan
+from pycoolc.symbols import BUILTINS, SymbolTable, symbols
+
+
+SOURCE = 'class Foo { foo(x : Foo) : Foo { x.foo(x) }; };'
+
+
+class TestSymbolTable:
+
+    def setUp(self):
+        self.table = SymbolTable(['Int', 'self'])
+
+    def test_intern(self):
+        name = ''.join(['spam', 'Eggs'])
+        canonical = self.table.intern(name)
+        assert_equal(canonical, 'spamEggs')
+        assert_is(self.table.intern(''.join(['spam', 'Eggs'])), canonical)
+        assert_in('spamEggs', self.table)
+        assert_not_in('ham', self.table)
+
+    def test_ids(self):
+        assert_equal(self.table.id('Int'), 0)
+        assert_equal(self.table.id('self'), 1)
+        assert_equal(self.table.id('spam'), 2)
+        assert_is(self.table.name(2), self.table.intern('spam'))
+        assert_equal(len(self.table), 3)
+        assert_equal(list(self.table), ['Int', 'self', 'spam'])
+
+    def test_builtins(self):
+        for id, name in enumerate(BUILTINS):
+            assert_equal(symbols.id(name), id)
+
+
+class TestInterning:
+
+    def check(self, lexer):
+        parser = Parser(lexer=lexer)
+        cls, = parser.parse(SOURCE)
+        method, = cls.features
+        names = [cls.name, method.type, method.formals[0].type]
+        for name in names:
+            assert_is(name, parser.symbols.intern('Foo'))
+        idents = [method.ident.name, method.formals[0].ident.name,
+                  method.expr.object.name, method.expr.method.ident.name]
+        assert_is(idents[0], idents[3])
+        assert_is(idents[1], idents[2])
+        assert_is(idents[1], parser.symbols.intern('x'))
+        # Every parse has a table of its own, the shared one doesn't grow
+        assert_not_in('Foo', symbols)
+        symbols_before = parser.symbols
+        cls, = parser.parse('class Main inherits IO { x : Int; };')
+        assert_is_not(parser.symbols, symbols_before)
+        assert_not_in('Foo', parser.symbols)
+        assert_is(cls.name, symbols.intern('Main'))
+        assert_is(cls.inherits, symbols.intern('IO'))
+
+    def test_lexer(self):
+        self.check(None)
+
+    def test_scanner(self):
+        self.check(Scanner())
+
+    def test_token_buffer(self):
+        self.check(TokenBuffer())
+
+    def test_scan(self):
+        values = [value for kind, value, lexpos in scan(SOURCE) if value == 'foo']
+        assert_is(values[0], values[1])
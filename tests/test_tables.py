@@ -0,0 +1,47 @@
+"""
+This module contains tests for the pregenerated lexer and parser tables.
+"""
+import os
+import subprocess
+import sys
+import tempfile
+
+from nose.tools import assert_equal, assert_true
+import ply.lex as lex
+import ply.yacc as yacc
+
+from pycoolc import lexer, parser, lextab, parsetab
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class TestTables:
+
+    def test_lextab_up_to_date(self):
+        fresh = lex.lex(module=lexer)
+        tables = [rule[0] for rule in lextab._lexstatere['INITIAL']]
+        assert_equal(fresh.lexstateretext['INITIAL'], tables)
+        assert_equal(fresh.lexliterals, lextab._lexliterals)
+        assert_equal(fresh.lexstateignore, lextab._lexstateignore)
+
+    def test_parsetab_up_to_date(self):
+        pdict = dict((name, getattr(parser, name)) for name in dir(parser))
+        info = yacc.ParserReflect(pdict, log=yacc.NullLogger())
+        info.get_all()
+        assert_equal(info.signature(), parsetab._lr_signature)
+
+    def test_import_does_no_work(self):
+        code = ('import pycoolc.parser; '
+                'assert pycoolc.parser._parser is None; '
+                'assert pycoolc.lexer._lexer is None')
+        env = dict(os.environ, PYTHONPATH=ROOT)
+        cwd = tempfile.mkdtemp()
+        subprocess.check_call([sys.executable, '-c', code], cwd=cwd, env=env)
+        assert_equal(os.listdir(cwd), [])
+        os.rmdir(cwd)
+
+    def test_parse(self):
+        out = parser.parse('class Main {};')
+        assert_true(parser.get_parser() is parser.get_parser())
+        assert_equal(out, (parser.ast.Type(name='Main', inherits=None, features=()),))
@@ -0,0 +1,200 @@
+"""
+This module contains tests for the type checker.
+"""
+import os
+import shutil
+import tempfile
+
+from nose.tools import assert_equal, assert_false, assert_in
+
+from pycoolc import cli
+from pycoolc.parser import parse
+from pycoolc.typecheck import check
+
+
+VALID = '''
+class A inherits IO {
+  x : Int <- 1;
+  me : SELF_TYPE;
+  f(y : Int) : Int { x <- x + y };
+  g() : SELF_TYPE { out_int(f(2)) };
+  h(a : A) : Object { case a of b : B => b; c : C => c.copy(); o : Object => o; esac };
+};
+class B inherits A {
+  f(y : Int) : Int { if y < 0 then ~y else self@A.f(y) fi };
+};
+class C inherits A {
+  s : String <- ("c".concat("d"));
+};
+class Main {
+  a : A <- new B;
+  main() : Object { {
+    a.g().out_string("\\n");
+    let c : C <- new C, n : Int <- (c.f(1)) in while n <= 10 loop n <- n + 1 pool;
+    isvoid a;
+    not a = a;
+  } };
+};
+'''
+
+
+def messages(source, jobs=1):
+    return [error.message for error in check(parse(source), jobs=jobs)]
+
+
+class TestTypeChecker:
+
+    def test_valid(self):
+        assert_equal(messages(VALID), [])
+
+    def test_main(self):
+        assert_equal(messages('class A {};'), ['Class Main is not defined'])
+        assert_equal(messages('class Main {};'), ['Class Main has no method main'])
+        assert_equal(messages('class Main { main(x : Int) : Int { x }; };'),
+                     ['Method main of class Main must not take arguments'])
+
+    def test_hierarchy_error(self):
+        assert_equal(messages('class Main inherits Main {};'),
+                     ['Inheritance cycle: Main -> Main'])
+
+    def test_expressions(self):
+        errors = messages('''class Main {
+          x : Int <- "x";
+          main() : Object { {
+            y;
+            x <- true;
+            self <- new Main;
+            if 1 then 2 else 3 fi;
+            while x loop 0 pool;
+            1 + "a";
+            ~true;
+            not 1;
+            1 = "a";
+            new Foo;
+          } };
+        };''')
+        assert_equal(errors, [
+            'Type String of the initialization of attribute x does not conform to declared type Int',
+            'Undeclared identifier y',
+            'Type Bool of assigned expression does not conform to declared type Int of identifier x',
+            "Cannot assign to 'self'",
+            'Condition of if has type Int instead of Bool',
+            'Condition of while has type Int instead of Bool',
+            'Non-Int arguments: Int + String',
+            'Argument of ~ has type Bool instead of Int',
+            'Argument of not has type Int instead of Bool',
+            'Illegal comparison of Int and String',
+            'Undefined type Foo',
+        ])
+
+    def test_dispatch(self):
+        errors = messages('''class Main inherits IO {
+          main() : Object { {
+            out_int("1");
+            out_int(1, 2);
+            frob();
+            (new Object)@IO.out_int(1);
+            (new IO)@Main.copy();
+          } };
+        };''')
+        assert_equal(errors, [
+            'Argument 1 of the call of method out_int has type String instead of Int',
+            'Method out_int called with 2 arguments instead of 1',
+            'Dispatch to undefined method frob of class Main',
+            'Expression type Object does not conform to declared static dispatch type IO',
+            'Expression type IO does not conform to declared static dispatch type Main',
+        ])
+
+    def test_self_type(self):
+        errors = messages('''class Main {
+          main() : SELF_TYPE { new Main };
+          copy2() : SELF_TYPE { copy() };
+          f(x : SELF_TYPE) : Int { 0 };
+          g() : Main { let x : SELF_TYPE <- self in x };
+        };''')
+        assert_equal(errors, [
+            'Inferred return type Main of method main does not conform to declared return '
+            'type SELF_TYPE',
+            'Undefined type SELF_TYPE',
+        ])
+
+    def test_scopes(self):
+        errors = messages('''class Main {
+          main() : Object { 0 };
+          f(x : Int, x : Int, self : Int) : Int { 0 };
+          g(x : Int) : Int { (let x : String <- "a" in x).length() + x };
+          h() : Object { case 0 of x : Int => x; y : Int => y; esac };
+          i() : Object { let self : Int in self };
+        };''')
+        assert_equal(errors, [
+            'Formal parameter x is defined more than once',
+            "'self' cannot be the name of a formal parameter",
+            'Duplicate branch Int in case',
+            "'self' cannot be bound",
+        ])
+
+    def test_join(self):
+        errors = messages('''class A {}; class B inherits A {}; class C inherits A {};
+        class Main {
+          main() : Object { 0 };
+          f() : A { if true then new B else new C fi };
+          g() : B { case 0 of b : B => b; c : C => c; esac };
+        };''')
+        assert_equal(errors, ['Inferred return type A of method g does not conform to declared '
+                              'return type B'])
+
+    def test_undefined_declared_types(self):
+        sources = [
+            'class Main { x : Foo; main() : Object { x.bar() }; };',
+            'class Main { f() : Foo { 1 }; main() : Object { f().g() }; };',
+            'class Main { x : Foo; main() : Int { { x <- 1; 1; } }; };',
+            'class A { f(x : Foo) : Int { 1 }; }; '
+            'class Main { main() : Object { (new A).f(1) }; };',
+        ]
+        expected = [
+            ['Undefined type Foo', 'Dispatch to undefined method bar of class Object'],
+            ['Undefined type Foo', 'Dispatch to undefined method g of class Object'],
+            ['Undefined type Foo'],
+            ['Undefined type Foo'],
+        ]
+        for source, messages in zip(sources, expected):
+            errors = check(parse(source))
+            assert_equal([error.message for error in errors], messages)
+            # Reported once, at the declaration
+            start, end = errors[0].span
+            assert_in(': Foo', source[start:end])
+
+    def test_spans(self):
+        source = 'class Main { main() : Object { x }; };'
+        error, = check(parse(source))
+        assert_equal(error.span, (31, 32))
+
+    def test_parallel(self):
+        source = ''.join('class C{0} {{ f() : Int {{ {1} }}; }};'.format(
+            i, 'true' if i % 7 == 0 else i) for i in range(100))
+        source += 'class Main { main() : Object { undefined }; };'
+        expected = check(parse(source))
+        assert_equal(len(expected), 16)
+        assert_in('method f', expected[0].message)
+        for jobs, chunksize in [(2, None), (3, 7)]:
+            errors = check(parse(source), jobs=jobs, chunksize=chunksize)
+            assert_equal([(e.message, e.span) for e in errors],
+                         [(e.message, e.span) for e in expected])
+
+
+class TestCli:
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_check(self):
+        path = os.path.join(self.directory, 'main.cl')
+        with open(path, 'w') as source:
+            source.write('class Main {\n  main() : Int { "x" };\n};\n')
+        result, = cli.run([path], jobs=1, check=True)
+        assert_false(result.ok)
+        assert_equal(result.diagnostics, ['Line 2: Inferred return type String of method main '
+                                          'does not conform to declared return type Int'])
@@ -0,0 +1,139 @@
+"""
+This module contains tests for the AST visitors and ``print_ast``.
+"""
+import io
+import sys
+
+from nose.tools import assert_equal, assert_is
+
+from pycoolc import ast
+from pycoolc.utils import print_ast
+from pycoolc.visitor import NodeTransformer, NodeVisitor, children
+
+
+# Deeper than the recursion limit
+DEPTH = sys.getrecursionlimit() * 5
+
+
+def nested_ifs(depth):
+    """Return ``if a then 0 else if a then 1 else ... fi fi`` nested ``depth`` times."""
+    tree = ast.Ident('b')
+    for i in range(depth):
+        tree = ast.If(condition=ast.Ident('a'), true=i, false=tree, span=(i, i + 1))
+    return tree
+
+
+class Counter(NodeVisitor):
+
+    def __init__(self):
+        self.count = 0
+
+    def visit_Ident(self, node):
+        self.count += 1
+
+
+class Depth(NodeVisitor):
+
+    def generic_visit(self, node):
+        depth = 0
+        for child in children(node):
+            depth = max(depth, (yield child))
+        return depth + 1
+
+
+class Rename(NodeTransformer):
+
+    def visit_Ident(self, node):
+        if node.name == 'a':
+            return node._replace(name='c')
+        return node
+
+
+class TestNodeVisitor:
+
+    def test_visit(self):
+        counter = Counter()
+        counter.visit((ast.Block((ast.Ident('a'), 1, ast.Ident('b'))), ast.New('A')))
+        assert_equal(counter.count, 2)
+
+    def test_deep(self):
+        counter = Counter()
+        counter.visit(nested_ifs(DEPTH))
+        assert_equal(counter.count, DEPTH + 1)
+
+    def test_results(self):
+        assert_equal(Depth().visit(nested_ifs(DEPTH)), DEPTH + 1)
+        assert_equal(Depth().visit(42), 1)
+
+
+class TestNodeTransformer:
+
+    def test_unchanged(self):
+        tree = (ast.Block((ast.Ident('b'), 1)),)
+        assert_is(Rename().visit(tree), tree)
+
+    def test_replace(self):
+        tree = ast.Assignment(ident=ast.Ident('x'), expr=ast.Ident('a'), span=(0, 6))
+        out = Rename().visit(tree)
+        assert_equal(out, ast.Assignment(ident=ast.Ident('x'), expr=ast.Ident('c')))
+        assert_equal(out.span, (0, 6))
+        assert_is(out.ident, tree.ident)
+
+    def test_remove(self):
+
+        class RemoveIdents(NodeTransformer):
+            def visit_Ident(self, node):
+                return None
+
+        tree = ast.Block((ast.Ident('a'), 1, ast.New('A')))
+        assert_equal(RemoveIdents().visit(tree), ast.Block((1, ast.New('A'))))
+
+    def test_deep(self):
+        out = Rename().visit(nested_ifs(DEPTH))
+        assert_equal(Depth().visit(out), DEPTH + 1)
+        node = out
+        while isinstance(node, ast.If):
+            assert_equal(node.condition.name, 'c')
+            node = node.false
+        assert_equal(out.span, (DEPTH - 1, DEPTH))
+
+
+class TestPrintAST:
+
+    def test_output(self):
+        tree = (ast.Type(name='Main', inherits=None, features=(
+            ast.Method(ident=ast.Ident('main'), type='Int', formals=(), expr=ast.Block((1, 'x'))),
+        )),)
+        expected = (
+            "(\n"
+            "  Type(\n"
+            "    name='Main'\n"
+            "    inherits=None\n"
+            "    features=(\n"
+            "      Method(\n"
+            "        ident=Ident(\n"
+            "          name='main'\n"
+            "        )\n"
+            "        type='Int'\n"
+            "        formals=()\n"
+            "        expr=Block(\n"
+            "          elements=(\n"
+            "            1\n"
+            "            'x'\n"
+            "          )\n"
+            "        )\n"
+            "      )\n"
+            "    )\n"
+            "  )\n"
+            ")\n"
+        )
+        out = io.StringIO()
+        print_ast(tree, file=out)
+        assert_equal(out.getvalue(), expected)
+
+    def test_deep(self):
+        out = io.StringIO()
+        print_ast(nested_ifs(DEPTH), file=out)
+        lines = out.getvalue().splitlines()
+        assert_equal(len(lines), DEPTH * 6 + 3)
+        assert_equal(lines[-1], ')')